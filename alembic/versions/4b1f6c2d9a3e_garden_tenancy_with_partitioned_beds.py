@@ -0,0 +1,147 @@
+"""Garden tenancy with beds and assignments hash-partitioned by garden
+
+Revision ID: 4b1f6c2d9a3e
+Revises: e77df28219ca
+Create Date: 2026-10-19 09:12:44.318201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b1f6c2d9a3e'
+down_revision: Union[str, None] = 'e77df28219ca'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_GARDEN_ID = 1
+PARTITIONS = 8
+
+
+def _create_partitions(table: str) -> None:
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def upgrade() -> None:
+    op.create_table('gardens',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_gardens_id'), 'gardens', ['id'], unique=False)
+    op.execute(
+        f"INSERT INTO gardens (id, name) VALUES ({DEFAULT_GARDEN_ID}, 'Default garden')"
+    )
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('gardens', 'id'), max(id)) FROM gardens"
+    )
+
+    # Existing tables cannot be turned into partitioned ones, so the data is
+    # parked in temporary tables while beds and bed_plant_family are recreated
+    op.execute("CREATE TEMPORARY TABLE beds_backup AS SELECT * FROM beds")
+    op.execute(
+        "CREATE TEMPORARY TABLE bed_plant_family_backup AS "
+        "SELECT * FROM bed_plant_family"
+    )
+    op.drop_table('bed_plant_family')
+    op.drop_index(op.f('ix_beds_id'), table_name='beds')
+    op.drop_table('beds')
+
+    op.create_table('beds',
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('index', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['garden_id'], ['gardens.id'], ),
+    sa.PrimaryKeyConstraint('garden_id', 'id'),
+    sa.UniqueConstraint('garden_id', 'index'),
+    postgresql_partition_by='HASH (garden_id)'
+    )
+    _create_partitions('beds')
+    op.create_index(op.f('ix_beds_id'), 'beds', ['id'], unique=False)
+    op.create_table('bed_plant_family',
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('bed_id', sa.Integer(), nullable=False),
+    sa.Column('plant_family_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['garden_id', 'bed_id'], ['beds.garden_id', 'beds.id'], ),
+    sa.ForeignKeyConstraint(['plant_family_id'], ['plant_families.id'], ),
+    sa.PrimaryKeyConstraint('garden_id', 'bed_id', 'plant_family_id'),
+    postgresql_partition_by='HASH (garden_id)'
+    )
+    _create_partitions('bed_plant_family')
+
+    op.execute(
+        f"INSERT INTO beds (garden_id, id, length, width, index) "
+        f"SELECT {DEFAULT_GARDEN_ID}, id, length, width, index FROM beds_backup"
+    )
+    op.execute(
+        f"INSERT INTO bed_plant_family (garden_id, bed_id, plant_family_id) "
+        f"SELECT {DEFAULT_GARDEN_ID}, bed_id, plant_family_id "
+        f"FROM bed_plant_family_backup"
+    )
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('beds', 'id'), "
+        "coalesce(max(id), 0) + 1, false) FROM beds"
+    )
+    op.execute("DROP TABLE beds_backup")
+    op.execute("DROP TABLE bed_plant_family_backup")
+
+
+def downgrade() -> None:
+    # Only the default garden fits into the single-garden schema
+    op.execute(
+        f"CREATE TEMPORARY TABLE beds_backup AS "
+        f"SELECT id, length, width, index FROM beds "
+        f"WHERE garden_id = {DEFAULT_GARDEN_ID}"
+    )
+    op.execute(
+        f"CREATE TEMPORARY TABLE bed_plant_family_backup AS "
+        f"SELECT bed_id, plant_family_id FROM bed_plant_family "
+        f"WHERE garden_id = {DEFAULT_GARDEN_ID}"
+    )
+    op.drop_table('bed_plant_family')
+    op.drop_index(op.f('ix_beds_id'), table_name='beds')
+    op.drop_table('beds')
+
+    op.create_table('beds',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('index', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('index')
+    )
+    op.create_index(op.f('ix_beds_id'), 'beds', ['id'], unique=False)
+    op.create_table('bed_plant_family',
+    sa.Column('bed_id', sa.Integer(), nullable=False),
+    sa.Column('plant_family_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['bed_id'], ['beds.id'], ),
+    sa.ForeignKeyConstraint(['plant_family_id'], ['plant_families.id'], ),
+    sa.PrimaryKeyConstraint('bed_id', 'plant_family_id')
+    )
+
+    op.execute(
+        "INSERT INTO beds (id, length, width, index) "
+        "SELECT id, length, width, index FROM beds_backup"
+    )
+    op.execute(
+        "INSERT INTO bed_plant_family (bed_id, plant_family_id) "
+        "SELECT bed_id, plant_family_id FROM bed_plant_family_backup"
+    )
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('beds', 'id'), "
+        "coalesce(max(id), 0) + 1, false) FROM beds"
+    )
+    op.execute("DROP TABLE beds_backup")
+    op.execute("DROP TABLE bed_plant_family_backup")
+
+    op.drop_index(op.f('ix_gardens_id'), table_name='gardens')
+    op.drop_table('gardens')
@@ -0,0 +1,131 @@
+"""Row versions and bed tombstones for delta sync
+
+Revision ID: 8c3e5a71f0b2
+Revises: 4b1f6c2d9a3e
+Create Date: 2026-10-19 11:40:02.917533
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c3e5a71f0b2'
+down_revision: Union[str, None] = '4b1f6c2d9a3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGE_LOCK_CLASS = 7301
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE change_version_seq")
+    for table in ('beds', 'plant_families', 'bed_plant_family'):
+        op.add_column(table, sa.Column(
+            'row_version', sa.BigInteger(),
+            server_default=sa.text("nextval('change_version_seq')"), nullable=False
+        ))
+    op.create_index(
+        'ix_beds_garden_id_row_version', 'beds', ['garden_id', 'row_version'],
+        unique=False
+    )
+    op.create_table('bed_tombstones',
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('bed_id', sa.Integer(), nullable=False),
+    sa.Column('row_version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('garden_id', 'bed_id')
+    )
+    op.create_index(
+        'ix_bed_tombstones_garden_id_row_version', 'bed_tombstones',
+        ['garden_id', 'row_version'], unique=False
+    )
+
+    op.execute(f"""
+CREATE OR REPLACE FUNCTION stamp_garden_row_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock({CHANGE_LOCK_CLASS}, NEW.garden_id);
+    NEW.row_version := nextval('change_version_seq');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""")
+    op.execute("""
+CREATE OR REPLACE FUNCTION stamp_row_version() RETURNS trigger AS $$
+BEGIN
+    NEW.row_version := nextval('change_version_seq');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+""")
+    op.execute("""
+CREATE OR REPLACE FUNCTION touch_bed_on_assignment() RETURNS trigger AS $$
+DECLARE
+    assignment record;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        assignment := OLD;
+    ELSE
+        assignment := NEW;
+    END IF;
+    UPDATE beds SET row_version = row_version
+    WHERE garden_id = assignment.garden_id AND id = assignment.bed_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+    op.execute(f"""
+CREATE OR REPLACE FUNCTION record_bed_tombstones() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock({CHANGE_LOCK_CLASS}, garden_id)
+    FROM (SELECT DISTINCT garden_id FROM deleted_beds ORDER BY garden_id) AS gardens;
+    INSERT INTO bed_tombstones (garden_id, bed_id, row_version)
+    SELECT garden_id, id, nextval('change_version_seq') FROM deleted_beds
+    ON CONFLICT (garden_id, bed_id) DO UPDATE SET row_version = EXCLUDED.row_version;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+    op.execute(
+        "CREATE TRIGGER beds_stamp_row_version BEFORE INSERT OR UPDATE ON beds "
+        "FOR EACH ROW EXECUTE FUNCTION stamp_garden_row_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER beds_record_tombstones AFTER DELETE ON beds "
+        "REFERENCING OLD TABLE AS deleted_beds "
+        "FOR EACH STATEMENT EXECUTE FUNCTION record_bed_tombstones()"
+    )
+    op.execute(
+        "CREATE TRIGGER plant_families_stamp_row_version "
+        "BEFORE INSERT OR UPDATE ON plant_families "
+        "FOR EACH ROW EXECUTE FUNCTION stamp_row_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER bed_plant_family_stamp_row_version "
+        "BEFORE INSERT OR UPDATE ON bed_plant_family "
+        "FOR EACH ROW EXECUTE FUNCTION stamp_garden_row_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER bed_plant_family_touch_bed "
+        "AFTER INSERT OR DELETE ON bed_plant_family "
+        "FOR EACH ROW EXECUTE FUNCTION touch_bed_on_assignment()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER bed_plant_family_touch_bed ON bed_plant_family")
+    op.execute("DROP TRIGGER bed_plant_family_stamp_row_version ON bed_plant_family")
+    op.execute("DROP TRIGGER plant_families_stamp_row_version ON plant_families")
+    op.execute("DROP TRIGGER beds_record_tombstones ON beds")
+    op.execute("DROP TRIGGER beds_stamp_row_version ON beds")
+    op.execute("DROP FUNCTION record_bed_tombstones()")
+    op.execute("DROP FUNCTION touch_bed_on_assignment()")
+    op.execute("DROP FUNCTION stamp_row_version()")
+    op.execute("DROP FUNCTION stamp_garden_row_version()")
+    op.drop_index('ix_bed_tombstones_garden_id_row_version', table_name='bed_tombstones')
+    op.drop_table('bed_tombstones')
+    op.drop_index('ix_beds_garden_id_row_version', table_name='beds')
+    for table in ('bed_plant_family', 'plant_families', 'beds'):
+        op.drop_column(table, 'row_version')
+    op.execute("DROP SEQUENCE change_version_seq")
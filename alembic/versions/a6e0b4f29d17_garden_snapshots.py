@@ -0,0 +1,41 @@
+"""Immutable garden snapshots
+
+Revision ID: a6e0b4f29d17
+Revises: f1c6e83b2d95
+Create Date: 2026-10-19 19:12:40.581236
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e0b4f29d17'
+down_revision: Union[str, None] = 'f1c6e83b2d95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('garden_snapshots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('bed_count', sa.Integer(), nullable=False),
+    sa.Column('bed_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('bed_indexes', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('bed_lengths', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('bed_widths', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('assignment_bed_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('assignment_plant_family_ids', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.ForeignKeyConstraint(['garden_id'], ['gardens.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('garden_id', 'name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('garden_snapshots')
@@ -0,0 +1,54 @@
+"""Full-text and trigram search over plant families
+
+Revision ID: a93d27e4c5b1
+Revises: 8c3e5a71f0b2
+Create Date: 2026-10-19 14:05:37.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d27e4c5b1'
+down_revision: Union[str, None] = '8c3e5a71f0b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('plant_families', sa.Column(
+        'search_vector', postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('simple', name), 'A') || "
+            "setweight(to_tsvector('simple', nutrition_requirements), 'B')",
+            persisted=True
+        ),
+        nullable=False
+    ))
+    op.create_index(
+        'ix_plant_families_search_vector', 'plant_families', ['search_vector'],
+        unique=False, postgresql_using='gin'
+    )
+    op.create_index(
+        'ix_plant_families_name_trgm', 'plant_families', ['name'], unique=False,
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_plant_families_nutrition_requirements_trgm', 'plant_families',
+        ['nutrition_requirements'], unique=False, postgresql_using='gin',
+        postgresql_ops={'nutrition_requirements': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix_plant_families_nutrition_requirements_trgm', table_name='plant_families'
+    )
+    op.drop_index('ix_plant_families_name_trgm', table_name='plant_families')
+    op.drop_index('ix_plant_families_search_vector', table_name='plant_families')
+    op.drop_column('plant_families', 'search_vector')
@@ -0,0 +1,34 @@
+"""Plant family compatibility
+
+Revision ID: b83f5d10c7e4
+Revises: a6e0b4f29d17
+Create Date: 2026-10-19 20:05:18.443902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b83f5d10c7e4'
+down_revision: Union[str, None] = 'a6e0b4f29d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('plant_family_compatibility',
+    sa.Column('plant_family_id', sa.Integer(), nullable=False),
+    sa.Column('other_plant_family_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.SmallInteger(), nullable=False),
+    sa.CheckConstraint('plant_family_id <= other_plant_family_id'),
+    sa.ForeignKeyConstraint(['other_plant_family_id'], ['plant_families.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['plant_family_id'], ['plant_families.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('plant_family_id', 'other_plant_family_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('plant_family_compatibility')
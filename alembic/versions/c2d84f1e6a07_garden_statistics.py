@@ -0,0 +1,194 @@
+"""Incrementally maintained garden statistics
+
+Revision ID: c2d84f1e6a07
+Revises: a93d27e4c5b1
+Create Date: 2026-10-19 15:22:48.611390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2d84f1e6a07'
+down_revision: Union[str, None] = 'a93d27e4c5b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('garden_stats',
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('bed_count', sa.BigInteger(), nullable=False),
+    sa.Column('total_area', sa.BigInteger(), nullable=False),
+    sa.Column('unassigned_bed_count', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['garden_id'], ['gardens.id'], ),
+    sa.PrimaryKeyConstraint('garden_id')
+    )
+    op.create_table('garden_family_stats',
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('plant_family_id', sa.Integer(), nullable=False),
+    sa.Column('bed_count', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['garden_id'], ['gardens.id'], ),
+    sa.ForeignKeyConstraint(['plant_family_id'], ['plant_families.id'], ),
+    sa.PrimaryKeyConstraint('garden_id', 'plant_family_id')
+    )
+
+    op.execute("""CREATE OR REPLACE FUNCTION apply_bed_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT garden_id, count(*), sum(length::bigint * width), count(*)
+        FROM new_beds GROUP BY garden_id
+        ON CONFLICT (garden_id) DO UPDATE SET
+            bed_count = s.bed_count + EXCLUDED.bed_count,
+            total_area = s.total_area + EXCLUDED.total_area,
+            unassigned_bed_count = s.unassigned_bed_count + EXCLUDED.unassigned_bed_count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT garden_id, -count(*), -sum(length::bigint * width), -count(*)
+        FROM old_beds GROUP BY garden_id
+        ON CONFLICT (garden_id) DO UPDATE SET
+            bed_count = s.bed_count + EXCLUDED.bed_count,
+            total_area = s.total_area + EXCLUDED.total_area,
+            unassigned_bed_count = s.unassigned_bed_count + EXCLUDED.unassigned_bed_count;
+    ELSE
+        -- Most bed updates only bump row versions and leave the totals alone
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT garden_id, sum(beds), sum(area), sum(beds)
+        FROM (
+            SELECT garden_id, 1 AS beds, length::bigint * width AS area
+            FROM new_beds
+            UNION ALL
+            SELECT garden_id, -1, -(length::bigint * width) FROM old_beds
+        ) AS delta
+        GROUP BY garden_id
+        HAVING sum(beds) <> 0 OR sum(area) <> 0
+        ON CONFLICT (garden_id) DO UPDATE SET
+            bed_count = s.bed_count + EXCLUDED.bed_count,
+            total_area = s.total_area + EXCLUDED.total_area,
+            unassigned_bed_count = s.unassigned_bed_count + EXCLUDED.unassigned_bed_count;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+    op.execute("""CREATE OR REPLACE FUNCTION apply_assignment_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO garden_family_stats AS s (garden_id, plant_family_id, bed_count)
+        SELECT garden_id, plant_family_id, count(*)
+        FROM new_assignments GROUP BY garden_id, plant_family_id
+        ON CONFLICT (garden_id, plant_family_id)
+        DO UPDATE SET bed_count = s.bed_count + EXCLUDED.bed_count;
+        -- Beds whose only assignments are the new ones were unassigned before
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT added.garden_id, 0, 0, -count(*)
+        FROM (
+            SELECT garden_id, bed_id, count(*) AS assignments
+            FROM new_assignments GROUP BY garden_id, bed_id
+        ) AS added
+        WHERE added.assignments = (
+            SELECT count(*) FROM bed_plant_family AS a
+            WHERE a.garden_id = added.garden_id AND a.bed_id = added.bed_id
+        )
+        GROUP BY added.garden_id
+        ON CONFLICT (garden_id) DO UPDATE SET
+            bed_count = s.bed_count + EXCLUDED.bed_count,
+            total_area = s.total_area + EXCLUDED.total_area,
+            unassigned_bed_count = s.unassigned_bed_count + EXCLUDED.unassigned_bed_count;
+    ELSE
+        UPDATE garden_family_stats AS s SET bed_count = s.bed_count - removed.beds
+        FROM (
+            SELECT garden_id, plant_family_id, count(*) AS beds
+            FROM old_assignments GROUP BY garden_id, plant_family_id
+        ) AS removed
+        WHERE s.garden_id = removed.garden_id
+            AND s.plant_family_id = removed.plant_family_id;
+        DELETE FROM garden_family_stats AS s
+        USING (SELECT DISTINCT garden_id, plant_family_id FROM old_assignments) AS removed
+        WHERE s.garden_id = removed.garden_id
+            AND s.plant_family_id = removed.plant_family_id
+            AND s.bed_count <= 0;
+        -- Beds left without any assignment become unassigned
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT removed.garden_id, 0, 0, count(*)
+        FROM (SELECT DISTINCT garden_id, bed_id FROM old_assignments) AS removed
+        WHERE NOT EXISTS (
+            SELECT 1 FROM bed_plant_family AS a
+            WHERE a.garden_id = removed.garden_id AND a.bed_id = removed.bed_id
+        )
+        GROUP BY removed.garden_id
+        ON CONFLICT (garden_id) DO UPDATE SET
+            bed_count = s.bed_count + EXCLUDED.bed_count,
+            total_area = s.total_area + EXCLUDED.total_area,
+            unassigned_bed_count = s.unassigned_bed_count + EXCLUDED.unassigned_bed_count;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+""")
+    op.execute(
+        "CREATE TRIGGER beds_stats_insert AFTER INSERT ON beds "
+        "REFERENCING NEW TABLE AS new_beds "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_bed_stats()"
+    )
+    op.execute(
+        "CREATE TRIGGER beds_stats_update AFTER UPDATE ON beds "
+        "REFERENCING OLD TABLE AS old_beds NEW TABLE AS new_beds "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_bed_stats()"
+    )
+    op.execute(
+        "CREATE TRIGGER beds_stats_delete AFTER DELETE ON beds "
+        "REFERENCING OLD TABLE AS old_beds "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_bed_stats()"
+    )
+    op.execute(
+        "CREATE TRIGGER bed_plant_family_stats_insert "
+        "AFTER INSERT ON bed_plant_family "
+        "REFERENCING NEW TABLE AS new_assignments "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_assignment_stats()"
+    )
+    op.execute(
+        "CREATE TRIGGER bed_plant_family_stats_delete "
+        "AFTER DELETE ON bed_plant_family "
+        "REFERENCING OLD TABLE AS old_assignments "
+        "FOR EACH STATEMENT EXECUTE FUNCTION apply_assignment_stats()"
+    )
+
+    # Backfill every existing garden
+    op.execute("""
+INSERT INTO garden_stats (garden_id, bed_count, total_area, unassigned_bed_count)
+SELECT g.id, count(b.id), coalesce(sum(b.length::bigint * b.width), 0),
+    count(b.id) FILTER (WHERE NOT EXISTS (
+        SELECT 1 FROM bed_plant_family a
+        WHERE a.garden_id = b.garden_id AND a.bed_id = b.id
+    ))
+FROM gardens g LEFT JOIN beds b ON b.garden_id = g.id
+GROUP BY g.id
+""")
+    op.execute("""
+INSERT INTO garden_family_stats (garden_id, plant_family_id, bed_count)
+SELECT garden_id, plant_family_id, count(*)
+FROM bed_plant_family
+GROUP BY garden_id, plant_family_id
+""")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER bed_plant_family_stats_delete ON bed_plant_family")
+    op.execute("DROP TRIGGER bed_plant_family_stats_insert ON bed_plant_family")
+    op.execute("DROP TRIGGER beds_stats_delete ON beds")
+    op.execute("DROP TRIGGER beds_stats_update ON beds")
+    op.execute("DROP TRIGGER beds_stats_insert ON beds")
+    op.execute("DROP FUNCTION apply_assignment_stats()")
+    op.execute("DROP FUNCTION apply_bed_stats()")
+    op.drop_table('garden_family_stats')
+    op.drop_table('garden_stats')
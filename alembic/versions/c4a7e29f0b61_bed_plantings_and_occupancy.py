@@ -0,0 +1,68 @@
+"""Bed plantings and occupancy grids
+
+Revision ID: c4a7e29f0b61
+Revises: b83f5d10c7e4
+Create Date: 2026-10-19 21:02:36.905127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e29f0b61'
+down_revision: Union[str, None] = 'b83f5d10c7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 8
+
+
+def _create_partitions(table: str) -> None:
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def upgrade() -> None:
+    op.create_table('plantings',
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('bed_id', sa.Integer(), nullable=False),
+    sa.Column('plant_family_id', sa.Integer(), nullable=True),
+    sa.Column('x', sa.Integer(), nullable=False),
+    sa.Column('y', sa.Integer(), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('spacing', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['garden_id', 'bed_id'], ['beds.garden_id', 'beds.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['plant_family_id'], ['plant_families.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('garden_id', 'id'),
+    postgresql_partition_by='HASH (garden_id)'
+    )
+    _create_partitions('plantings')
+    op.create_index('ix_plantings_garden_id_bed_id', 'plantings', ['garden_id', 'bed_id'], unique=False)
+    op.create_index('ix_plantings_plant_family_id', 'plantings', ['plant_family_id'], unique=False)
+    op.create_table('bed_occupancy',
+    sa.Column('garden_id', sa.Integer(), nullable=False),
+    sa.Column('bed_id', sa.Integer(), nullable=False),
+    sa.Column('cell_size', sa.Integer(), nullable=False),
+    sa.Column('length', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('cells', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['garden_id', 'bed_id'], ['beds.garden_id', 'beds.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('garden_id', 'bed_id'),
+    postgresql_partition_by='HASH (garden_id)'
+    )
+    _create_partitions('bed_occupancy')
+
+
+def downgrade() -> None:
+    op.drop_table('bed_occupancy')
+    op.drop_index('ix_plantings_plant_family_id', table_name='plantings')
+    op.drop_index('ix_plantings_garden_id_bed_id', table_name='plantings')
+    op.drop_table('plantings')
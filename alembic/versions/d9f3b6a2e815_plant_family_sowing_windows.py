@@ -0,0 +1,32 @@
+"""Plant family sowing windows for the garden calendar
+
+Revision ID: d9f3b6a2e815
+Revises: c4a7e29f0b61
+Create Date: 2026-10-19 21:48:13.402871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f3b6a2e815'
+down_revision: Union[str, None] = 'c4a7e29f0b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('plant_families', sa.Column('sowing_start_week', sa.SmallInteger(), nullable=True))
+    op.add_column('plant_families', sa.Column('sowing_end_week', sa.SmallInteger(), nullable=True))
+    op.add_column('plant_families', sa.Column('growing_weeks', sa.SmallInteger(), nullable=True))
+    op.create_index('ix_plant_families_row_version', 'plant_families', ['row_version'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_plant_families_row_version', table_name='plant_families')
+    op.drop_column('plant_families', 'growing_weeks')
+    op.drop_column('plant_families', 'sowing_end_week')
+    op.drop_column('plant_families', 'sowing_start_week')
@@ -0,0 +1,35 @@
+"""Delete bed assignments together with their beds
+
+Revision ID: e2a57c9d4b13
+Revises: d9f3b6a2e815
+Create Date: 2026-10-19 22:31:06.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a57c9d4b13'
+down_revision: Union[str, None] = 'd9f3b6a2e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CONSTRAINT = 'bed_plant_family_garden_id_bed_id_fkey'
+
+
+def upgrade() -> None:
+    op.drop_constraint(CONSTRAINT, 'bed_plant_family', type_='foreignkey')
+    op.create_foreign_key(
+        CONSTRAINT, 'bed_plant_family', 'beds',
+        ['garden_id', 'bed_id'], ['garden_id', 'id'], ondelete='CASCADE'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(CONSTRAINT, 'bed_plant_family', type_='foreignkey')
+    op.create_foreign_key(
+        CONSTRAINT, 'bed_plant_family', 'beds',
+        ['garden_id', 'bed_id'], ['garden_id', 'id']
+    )
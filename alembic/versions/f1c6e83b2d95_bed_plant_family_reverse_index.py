@@ -0,0 +1,25 @@
+"""Index bed assignments by plant family
+
+Revision ID: f1c6e83b2d95
+Revises: d5a19b7e3c48
+Create Date: 2026-10-19 18:03:52.117460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c6e83b2d95'
+down_revision: Union[str, None] = 'd5a19b7e3c48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bed_plant_family_plant_family_id', 'bed_plant_family', ['plant_family_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bed_plant_family_plant_family_id', table_name='bed_plant_family')
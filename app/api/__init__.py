@@ -1,3 +1,4 @@
 from .bed_routes import router as bed_router
+from .garden_routes import router as garden_router
 
-__all__ = ["bed_router"]
+__all__ = ["bed_router", "garden_router"]
@@ -1,93 +1,217 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-
-from app.models.bed import Bed, BedCreate, BedCreationRequest, BedCreationResponse
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse, Response
+from typing import List, Optional, Union
+
+from app.models.bed import (
+    Bed,
+    BedBulkUpdateRequest,
+    BedBulkUpdateResponse,
+    BedChanges,
+    BedCreate,
+    BedCreationRequest,
+    BedCreationResponse,
+)
+from app.api.job_routes import job_accepted
+from app.api.versioning import get_expected_version, version_etag
+from app.database.base.errors import DatabaseUnavailable, VersionConflict
+from app.models.job import Job
 from app.services.bed_service import BedService
-from app.dependencies import get_bed_service
+from app.services.compute_pool import ComputePool
+from app.services.job_handlers import CREATE_BEDS_WITH_CLEANUP
+from app.services.job_runner import JobRunner
+from app.services.packed_arrays import beds_to_json, pack_beds
+from app.dependencies import (
+    get_bed_service,
+    get_compute_pool,
+    get_garden_id,
+    get_job_runner,
+)
 
 router = APIRouter(prefix="/garden", tags=["garden"])
 
 
 @router.post("/beds", response_model=BedCreationResponse)
 async def create_beds(
-    request: BedCreationRequest, bed_service: BedService = Depends(get_bed_service)
+    request: BedCreationRequest,
+    garden_id: int = Depends(get_garden_id),
+    bed_service: BedService = Depends(get_bed_service),
 ) -> BedCreationResponse:
     """Create multiple beds with the same dimensions"""
     try:
-        return await bed_service.create_beds(request)
+        return await bed_service.create_beds(request, garden_id)
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/beds/with-cleanup", response_model=BedCreationResponse)
+@router.post(
+    "/beds/with-cleanup",
+    response_model=BedCreationResponse,
+    responses={202: {"model": Job, "description": "Accepted as a background job"}},
+)
 async def create_beds_with_cleanup(
-    request: BedCreationRequest, bed_service: BedService = Depends(get_bed_service)
-) -> BedCreationResponse:
+    request: BedCreationRequest,
+    background: bool = Query(
+        False, description="Run as a background job and return 202 right away"
+    ),
+    garden_id: int = Depends(get_garden_id),
+    bed_service: BedService = Depends(get_bed_service),
+    job_runner: JobRunner = Depends(get_job_runner),
+) -> Union[BedCreationResponse, JSONResponse]:
     """Delete all existing beds and create new ones"""
     try:
-        return await bed_service.create_beds_with_cleanup(request)
+        if background:
+            job = await job_runner.submit(
+                CREATE_BEDS_WITH_CLEANUP,
+                {"request": request.model_dump()},
+                garden_id,
+            )
+            return job_accepted(job)
+        return await bed_service.create_beds_with_cleanup(request, garden_id)
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/beds/all")
-async def delete_all_beds(bed_service: BedService = Depends(get_bed_service)) -> dict:
+async def delete_all_beds(
+    garden_id: int = Depends(get_garden_id),
+    bed_service: BedService = Depends(get_bed_service),
+) -> dict:
     """Delete all beds"""
     try:
-        deleted_count = await bed_service.delete_all_beds()
+        deleted_count = await bed_service.delete_all_beds(garden_id)
         return {"message": f"Successfully deleted {deleted_count} beds"}
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/beds", response_model=List[Bed])
-async def get_all_beds(bed_service: BedService = Depends(get_bed_service)) -> List[Bed]:
+async def get_all_beds(
+    garden_id: int = Depends(get_garden_id),
+    bed_service: BedService = Depends(get_bed_service),
+    compute_pool: ComputePool = Depends(get_compute_pool),
+) -> Union[List[Bed], Response]:
     """Get all beds"""
     try:
-        return await bed_service.get_all_beds()
+        beds = await bed_service.get_all_beds(garden_id)
+        if not compute_pool.offloads(len(beds)):
+            return beds
+        # Serializing a large garden would block every other request
+        content = await compute_pool.run(len(beds), beds_to_json, pack_beds(beds))
+        return Response(content=content, media_type="application/json")
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/beds", response_model=BedBulkUpdateResponse)
+async def update_beds(
+    request: BedBulkUpdateRequest,
+    garden_id: int = Depends(get_garden_id),
+    bed_service: BedService = Depends(get_bed_service),
+) -> BedBulkUpdateResponse:
+    """Update the dimensions of many beds in one statement"""
+    try:
+        return await bed_service.update_beds(request, garden_id)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/beds/changes", response_model=BedChanges)
+async def get_bed_changes(
+    since: int = Query(0, ge=0, description="Version returned by the last sync"),
+    garden_id: int = Depends(get_garden_id),
+    bed_service: BedService = Depends(get_bed_service),
+) -> BedChanges:
+    """Get beds inserted, updated or deleted since a version"""
+    try:
+        return await bed_service.get_bed_changes(since, garden_id)
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/beds/{bed_id}", response_model=Bed)
 async def get_bed_by_id(
-    bed_id: int, bed_service: BedService = Depends(get_bed_service)
+    bed_id: int,
+    response: Response,
+    garden_id: int = Depends(get_garden_id),
+    bed_service: BedService = Depends(get_bed_service),
 ) -> Bed:
     """Get a bed by ID"""
     try:
-        return await bed_service.get_bed_by_id(bed_id)
+        bed = await bed_service.get_bed_by_id(bed_id, garden_id)
+        response.headers["ETag"] = version_etag(bed.version)
+        return bed
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.put("/beds/{bed_id}", response_model=Bed)
 async def update_bed(
-    bed_id: int, bed_data: BedCreate, bed_service: BedService = Depends(get_bed_service)
+    bed_id: int,
+    bed_data: BedCreate,
+    response: Response,
+    garden_id: int = Depends(get_garden_id),
+    expected_version: Optional[int] = Depends(get_expected_version),
+    bed_service: BedService = Depends(get_bed_service),
 ) -> Bed:
-    """Update a bed"""
+    """Update a bed; with If-Match, only if nobody changed it in the meantime"""
     try:
-        return await bed_service.update_bed(bed_id, bed_data)
+        bed = await bed_service.update_bed(
+            bed_id, bed_data, garden_id, expected_version
+        )
+        response.headers["ETag"] = version_etag(bed.version)
+        return bed
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=412,
+            detail=str(e),
+            headers={"ETag": version_etag(e.current_version)},
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/beds/{bed_id}")
 async def delete_bed(
-    bed_id: int, bed_service: BedService = Depends(get_bed_service)
+    bed_id: int,
+    garden_id: int = Depends(get_garden_id),
+    expected_version: Optional[int] = Depends(get_expected_version),
+    bed_service: BedService = Depends(get_bed_service),
 ) -> dict:
-    """Delete a bed"""
+    """Delete a bed; with If-Match, only if nobody changed it in the meantime"""
     try:
-        success = await bed_service.delete_bed(bed_id)
+        success = await bed_service.delete_bed(bed_id, garden_id, expected_version)
         if not success:
             raise HTTPException(
                 status_code=404, detail=f"Bed with ID {bed_id} not found"
             )
         return {"message": f"Bed {bed_id} deleted successfully"}
-    except HTTPException:
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=412,
+            detail=str(e),
+            headers={"ETag": version_etag(e.current_version)},
+        )
+    except (HTTPException, DatabaseUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+
+from app.database.base.errors import DatabaseUnavailable
+from app.models.calendar import GardenCalendar
+from app.models.plant_family import WEEKS_PER_YEAR
+from app.services.calendar_service import CalendarService
+from app.dependencies import get_calendar_service, get_garden_id
+
+router = APIRouter(prefix="/garden/calendar", tags=["calendar"])
+
+
+@router.get("", response_model=GardenCalendar)
+async def get_calendar(
+    from_week: int = Query(
+        1, alias="from", ge=1, le=WEEKS_PER_YEAR, description="First week"
+    ),
+    to_week: int = Query(
+        WEEKS_PER_YEAR,
+        alias="to",
+        ge=1,
+        le=WEEKS_PER_YEAR,
+        description="Last week; before `from` to span the turn of the year",
+    ),
+    garden_id: int = Depends(get_garden_id),
+    calendar_service: CalendarService = Depends(get_calendar_service),
+) -> GardenCalendar:
+    """Get what to sow and harvest in the garden's beds in a range of weeks"""
+    try:
+        return await calendar_service.get_calendar(garden_id, from_week, to_week)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,91 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List
+
+from app.models.garden import DEFAULT_GARDEN_ID
+from app.services.change_feed_service import ChangeFeedService, Subscription
+from app.dependencies import get_change_feed_service, get_garden_id
+
+router = APIRouter(prefix="/garden", tags=["garden"])
+
+# Seconds between keep-alive messages on idle streams
+KEEPALIVE_INTERVAL = 15.0
+
+
+async def _sse_events(
+    request: Request, feed: ChangeFeedService, garden_id: int
+) -> AsyncIterator[str]:
+    # Subscribed on first iteration: a client that leaves before the response
+    # starts never iterates, so it would never reach the finally below
+    subscription = await feed.subscribe(garden_id)
+    try:
+        while not await request.is_disconnected():
+            event = await subscription.next_event(timeout=KEEPALIVE_INTERVAL)
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {event.model_dump_json(exclude_none=True)}\n\n"
+    finally:
+        feed.unsubscribe(subscription)
+
+
+@router.get("/changes")
+async def stream_changes(
+    request: Request,
+    garden_id: int = Depends(get_garden_id),
+    feed: ChangeFeedService = Depends(get_change_feed_service),
+) -> StreamingResponse:
+    """Stream change events of a garden as server-sent events"""
+    # Fail with an error status rather than mid-stream if the database is down
+    await feed.start()
+    return StreamingResponse(
+        _sse_events(request, feed, garden_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        event = await subscription.next_event(timeout=KEEPALIVE_INTERVAL)
+        if event is None:
+            await websocket.send_json({"op": "keep-alive"})
+            continue
+        await websocket.send_text(event.model_dump_json(exclude_none=True))
+
+
+async def _receive_until_closed(websocket: WebSocket) -> None:
+    # Clients send nothing, so anything but the close is ignored
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/changes/ws")
+async def websocket_changes(
+    websocket: WebSocket,
+    garden_id: int = DEFAULT_GARDEN_ID,
+    all_gardens: bool = False,
+    feed: ChangeFeedService = Depends(get_change_feed_service),
+):
+    """Push change events of a garden, or of all gardens, over a WebSocket"""
+    # Subscribe before accepting so no change after the handshake is missed
+    subscription = await feed.subscribe(None if all_gardens else garden_id)
+    tasks: List[asyncio.Task] = []
+    try:
+        await websocket.accept()
+        # The close is received while the sender waits for events, so a
+        # client that leaves is unsubscribed at once, not on the next send
+        tasks = [
+            asyncio.create_task(_send_events(websocket, subscription)),
+            asyncio.create_task(_receive_until_closed(websocket)),
+        ]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        done.pop().result()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        feed.unsubscribe(subscription)
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List
+
+from app.database.base.errors import DatabaseUnavailable
+from app.models.garden import Garden, GardenCreate
+from app.services.garden_service import GardenService
+from app.dependencies import get_garden_service
+
+router = APIRouter(prefix="/gardens", tags=["gardens"])
+
+
+@router.post("", response_model=Garden)
+async def create_garden(
+    garden_data: GardenCreate,
+    garden_service: GardenService = Depends(get_garden_service),
+) -> Garden:
+    """Create a new garden"""
+    try:
+        return await garden_service.create_garden(garden_data)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("", response_model=List[Garden])
+async def get_all_gardens(
+    garden_service: GardenService = Depends(get_garden_service),
+) -> List[Garden]:
+    """Get all gardens"""
+    try:
+        return await garden_service.get_all_gardens()
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{garden_id}", response_model=Garden)
+async def get_garden_by_id(
+    garden_id: int, garden_service: GardenService = Depends(get_garden_service)
+) -> Garden:
+    """Get a garden by ID"""
+    try:
+        return await garden_service.get_garden_by_id(garden_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
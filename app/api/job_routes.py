@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import JSONResponse
+
+from app.database.base.errors import DatabaseUnavailable
+from app.models.job import Job
+from app.services.job_runner import JobRunner
+from app.dependencies import get_job_runner
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_accepted(job: Job) -> JSONResponse:
+    """Answer a request that was turned into a background job"""
+    return JSONResponse(
+        status_code=202,
+        content=job.model_dump(mode="json"),
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: int, job_runner: JobRunner = Depends(get_job_runner)) -> Job:
+    """Get the status and progress of a background job"""
+    try:
+        job = await job_runner.get_job(job_id)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=Job, status_code=202)
+async def cancel_job(
+    job_id: int, job_runner: JobRunner = Depends(get_job_runner)
+) -> Job:
+    """Request cancellation of a queued or running job"""
+    try:
+        job = await job_runner.cancel(job_id)
+        if job is None:
+            existing = await job_runner.get_job(job_id)
+            if existing is None:
+                raise HTTPException(
+                    status_code=404, detail=f"Job with ID {job_id} not found"
+                )
+            raise HTTPException(
+                status_code=409, detail=f"Job with ID {job_id} already {existing.status}"
+            )
+        return job
+    except (HTTPException, DatabaseUnavailable):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
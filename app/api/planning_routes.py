@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Depends
+
+from app.database.base.errors import DatabaseUnavailable
+from app.models.companion import CompanionPlan, CompanionPlanRequest
+from app.services.companion_planning_service import CompanionPlanningService
+from app.dependencies import get_companion_planning_service, get_garden_id
+
+router = APIRouter(prefix="/garden/plan", tags=["planning"])
+
+
+@router.post("/companions", response_model=CompanionPlan)
+async def plan_companions(
+    request: CompanionPlanRequest,
+    garden_id: int = Depends(get_garden_id),
+    planning_service: CompanionPlanningService = Depends(
+        get_companion_planning_service
+    ),
+) -> CompanionPlan:
+    """Assign a plant family to every bed so that neighbours grow well together"""
+    try:
+        return await planning_service.plan(request, garden_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse
+from typing import List, Optional, Union
 
-from app.models.plant_family import PlantFamily, PlantFamilyCreate
+from app.models.companion import PlantFamilyCompatibility
+from app.models.plant_family import (
+    PlantFamily,
+    PlantFamilyCreate,
+    PlantFamilyImportResult,
+)
+from app.api.job_routes import job_accepted
+from app.api.versioning import get_expected_version, version_etag
+from app.database.base.errors import DatabaseUnavailable, VersionConflict
+from app.models.job import Job
+from app.services.job_handlers import IMPORT_PLANT_FAMILIES, spool_upload
+from app.services.job_runner import JobRunner
+from app.services.plant_family_import import ImportFormat, import_format_for
 from app.services.plant_family_service import PlantFamilyService
-from app.dependencies import get_plant_family_service
+from app.dependencies import (
+    get_job_runner,
+    get_job_spool_dir,
+    get_plant_family_service,
+)
 
 router = APIRouter(prefix="/plants", tags=["plants"])
 
@@ -15,6 +32,56 @@ async def get_all_plant_families(
     """Get all plant families"""
     try:
         return await plant_family_service.get_all_plant_families()
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/families/search", response_model=List[PlantFamily])
+async def search_plant_families(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of results"),
+    plant_family_service: PlantFamilyService = Depends(get_plant_family_service),
+) -> List[PlantFamily]:
+    """Search plant families, best matches first"""
+    try:
+        return await plant_family_service.search_plant_families(q, limit)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get(
+    "/families/compatibility", response_model=List[PlantFamilyCompatibility]
+)
+async def get_compatibility_scores(
+    plant_family_service: PlantFamilyService = Depends(get_plant_family_service),
+) -> List[PlantFamilyCompatibility]:
+    """Get how well plant families grow next to each other"""
+    try:
+        return await plant_family_service.get_compatibility_scores()
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put(
+    "/families/compatibility", response_model=List[PlantFamilyCompatibility]
+)
+async def set_compatibility_scores(
+    scores: List[PlantFamilyCompatibility],
+    plant_family_service: PlantFamilyService = Depends(get_plant_family_service),
+) -> List[PlantFamilyCompatibility]:
+    """Set compatibility scores of plant family pairs; other pairs are kept"""
+    try:
+        return await plant_family_service.set_compatibility_scores(scores)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -27,24 +94,76 @@ async def create_plant_family(
     """Create a new plant family"""
     try:
         return await plant_family_service.create_plant_family(plant_family_data)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/families/import",
+    response_model=PlantFamilyImportResult,
+    responses={202: {"model": Job, "description": "Accepted as a background job"}},
+)
+async def import_plant_families(
+    request: Request,
+    format: Optional[ImportFormat] = Query(
+        None, description="Upload format; defaults to the Content-Type"
+    ),
+    background: bool = Query(
+        False, description="Run as a background job and return 202 once uploaded"
+    ),
+    plant_family_service: PlantFamilyService = Depends(get_plant_family_service),
+    job_runner: JobRunner = Depends(get_job_runner),
+) -> Union[PlantFamilyImportResult, JSONResponse]:
+    """Import plant families from a streamed CSV or NDJSON body"""
+    import_format = format or import_format_for(request.headers.get("content-type"))
+    if import_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or set ?format=",
+        )
+    try:
+        if background:
+            path = await spool_upload(request.stream(), get_job_spool_dir())
+            job = await job_runner.submit(
+                IMPORT_PLANT_FAMILIES, {"path": path, "format": import_format}
+            )
+            return job_accepted(job)
+        return await plant_family_service.import_plant_families(
+            request.stream(), import_format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.delete("/families/{plant_family_id}")
 async def delete_plant_family(
-    plant_family_id: str,
+    plant_family_id: int,
+    expected_version: Optional[int] = Depends(get_expected_version),
     plant_family_service: PlantFamilyService = Depends(get_plant_family_service),
 ):
-    """Delete a plant family"""
+    """Delete a plant family; with If-Match, only if it is still at that version"""
     try:
-        success = await plant_family_service.delete_plant_family(plant_family_id)
+        success = await plant_family_service.delete_plant_family(
+            plant_family_id, expected_version
+        )
         if not success:
             raise HTTPException(
                 status_code=404,
                 detail=f"Plant family with ID {plant_family_id} not found",
             )
-    except HTTPException:
+    except VersionConflict as e:
+        raise HTTPException(
+            status_code=412,
+            detail=str(e),
+            headers={"ETag": version_etag(e.current_version)},
+        )
+    except (HTTPException, DatabaseUnavailable):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
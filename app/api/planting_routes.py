@@ -0,0 +1,91 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
+
+from app.database.base.errors import DatabaseUnavailable, PlantingConflict
+from app.models.planting import BedCapacity, Planting, PlantingCreate
+from app.services.planting_service import PlantingService
+from app.dependencies import get_garden_id, get_planting_service
+
+router = APIRouter(prefix="/garden/beds", tags=["plantings"])
+
+
+@router.get("/{bed_id}/plantings", response_model=List[Planting])
+async def get_plantings(
+    bed_id: int,
+    garden_id: int = Depends(get_garden_id),
+    planting_service: PlantingService = Depends(get_planting_service),
+) -> List[Planting]:
+    """Get the plantings of a bed"""
+    try:
+        return await planting_service.get_plantings(bed_id, garden_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{bed_id}/plantings", response_model=Planting)
+async def create_planting(
+    bed_id: int,
+    planting_data: PlantingCreate,
+    garden_id: int = Depends(get_garden_id),
+    planting_service: PlantingService = Depends(get_planting_service),
+) -> Planting:
+    """Place a planting in a bed; 409 if it overlaps another one or its spacing"""
+    try:
+        return await planting_service.create_planting(bed_id, planting_data, garden_id)
+    except PlantingConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{bed_id}/plantings/{planting_id}")
+async def delete_planting(
+    bed_id: int,
+    planting_id: int,
+    garden_id: int = Depends(get_garden_id),
+    planting_service: PlantingService = Depends(get_planting_service),
+) -> dict:
+    """Remove a planting from a bed and free its space"""
+    try:
+        await planting_service.delete_planting(planting_id, bed_id, garden_id)
+        return {"message": f"Planting {planting_id} deleted successfully"}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{bed_id}/capacity", response_model=BedCapacity)
+async def get_bed_capacity(
+    bed_id: int,
+    length: Optional[int] = Query(
+        None, gt=0, description="Length in cm of the plantings to fit"
+    ),
+    width: Optional[int] = Query(
+        None, gt=0, description="Width in cm of the plantings to fit"
+    ),
+    spacing: int = Query(0, ge=0, description="Spacing in cm of the plantings"),
+    garden_id: int = Depends(get_garden_id),
+    planting_service: PlantingService = Depends(get_planting_service),
+) -> BedCapacity:
+    """Get the free space of a bed and how many plantings of a size still fit"""
+    try:
+        return await planting_service.get_capacity(
+            bed_id, garden_id, length, width, spacing
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional
+
+from app.middleware.profiling import RequestProfiler
+from app.models.profile import RequestProfile
+from app.dependencies import get_request_profiler
+
+router = APIRouter(prefix="/profiles", tags=["profiling"])
+
+
+def require_profile_access(
+    x_profile: Optional[str] = Header(None),
+    profiler: RequestProfiler = Depends(get_request_profiler),
+) -> RequestProfiler:
+    """Profiles show the code paths of the API, so only token holders read them.
+
+    Without PROFILE_TOKEN, e.g. when requests are only sampled, nobody does.
+    """
+    if profiler.token is None:
+        raise HTTPException(
+            status_code=403, detail="Set PROFILE_TOKEN to read profiles"
+        )
+    if x_profile is None or not profiler.is_token(x_profile.encode("latin-1")):
+        raise HTTPException(status_code=403, detail="Send the profiling token")
+    return profiler
+
+
+@router.get("", response_model=List[RequestProfile])
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=500, description="Profiles to list"),
+    profiler: RequestProfiler = Depends(require_profile_access),
+) -> List[RequestProfile]:
+    """List the most recent request profiles, newest first"""
+    return [RequestProfile(**profile) for profile in profiler.list_profiles(limit)]
+
+
+@router.get("/{name}", response_class=PlainTextResponse)
+async def get_profile(
+    name: str, profiler: RequestProfiler = Depends(require_profile_access)
+) -> str:
+    """Get a profile as collapsed stacks for flamegraph.pl or speedscope"""
+    profile = profiler.read_profile(name)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {name} not found")
+    return profile
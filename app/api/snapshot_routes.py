@@ -0,0 +1,114 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List
+
+from app.database.base.errors import DatabaseUnavailable
+from app.models.snapshot import (
+    GardenSnapshot,
+    GardenSnapshotCreate,
+    GardenSnapshotDiff,
+    GardenSnapshotRestore,
+)
+from app.services.snapshot_service import SnapshotNameTaken, SnapshotService
+from app.dependencies import get_garden_id, get_snapshot_service
+
+router = APIRouter(prefix="/garden/snapshots", tags=["snapshots"])
+
+
+@router.post("", response_model=GardenSnapshot)
+async def create_snapshot(
+    snapshot_data: GardenSnapshotCreate,
+    garden_id: int = Depends(get_garden_id),
+    snapshot_service: SnapshotService = Depends(get_snapshot_service),
+) -> GardenSnapshot:
+    """Snapshot the current beds and plant family assignments of the garden"""
+    try:
+        return await snapshot_service.create_snapshot(garden_id, snapshot_data)
+    except SnapshotNameTaken as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("", response_model=List[GardenSnapshot])
+async def get_snapshots(
+    garden_id: int = Depends(get_garden_id),
+    snapshot_service: SnapshotService = Depends(get_snapshot_service),
+) -> List[GardenSnapshot]:
+    """Get the snapshots of the garden, newest first"""
+    try:
+        return await snapshot_service.get_snapshots(garden_id)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{snapshot_id}", response_model=GardenSnapshot)
+async def get_snapshot(
+    snapshot_id: int,
+    garden_id: int = Depends(get_garden_id),
+    snapshot_service: SnapshotService = Depends(get_snapshot_service),
+) -> GardenSnapshot:
+    """Get a snapshot by ID"""
+    try:
+        return await snapshot_service.get_snapshot(snapshot_id, garden_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/{snapshot_id}")
+async def delete_snapshot(
+    snapshot_id: int,
+    garden_id: int = Depends(get_garden_id),
+    snapshot_service: SnapshotService = Depends(get_snapshot_service),
+):
+    """Delete a snapshot; the garden itself is not changed"""
+    try:
+        await snapshot_service.delete_snapshot(snapshot_id, garden_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/{snapshot_id}/restore", response_model=GardenSnapshotRestore)
+async def restore_snapshot(
+    snapshot_id: int,
+    garden_id: int = Depends(get_garden_id),
+    snapshot_service: SnapshotService = Depends(get_snapshot_service),
+) -> GardenSnapshotRestore:
+    """Replace the garden's beds and assignments with those of a snapshot"""
+    try:
+        return await snapshot_service.restore_snapshot(snapshot_id, garden_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{snapshot_id}/diff", response_model=GardenSnapshotDiff)
+async def diff_snapshots(
+    snapshot_id: int,
+    to: int = Query(..., description="Snapshot to compare with"),
+    garden_id: int = Depends(get_garden_id),
+    snapshot_service: SnapshotService = Depends(get_snapshot_service),
+) -> GardenSnapshotDiff:
+    """Get the beds and assignments that differ between two snapshots"""
+    try:
+        return await snapshot_service.diff_snapshots(snapshot_id, to, garden_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
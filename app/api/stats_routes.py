@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Depends
+
+from app.database.base.errors import DatabaseUnavailable
+from app.models.garden import GardenStats
+from app.services.garden_service import GardenService
+from app.dependencies import get_garden_id, get_garden_service
+
+router = APIRouter(prefix="/garden", tags=["garden"])
+
+
+@router.get("/stats", response_model=GardenStats)
+async def get_garden_stats(
+    garden_id: int = Depends(get_garden_id),
+    garden_service: GardenService = Depends(get_garden_service),
+) -> GardenStats:
+    """Get bed count, cultivated area and plant family usage of the garden"""
+    try:
+        return await garden_service.get_garden_stats(garden_id)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stats/recompute", response_model=GardenStats)
+async def recompute_garden_stats(
+    garden_id: int = Depends(get_garden_id),
+    garden_service: GardenService = Depends(get_garden_service),
+) -> GardenStats:
+    """Rebuild the garden statistics from its beds"""
+    try:
+        return await garden_service.recompute_garden_stats(garden_id)
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,28 @@
+import re
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+# Versions are sent as strong entity tags: "42"
+_ENTITY_TAG = re.compile(r'^\s*"(\d+)"\s*$')
+
+
+def version_etag(version: int) -> str:
+    """Entity tag of a bed or plant family version"""
+    return f'"{version}"'
+
+
+def get_expected_version(
+    if_match: Optional[str] = Header(
+        None, description='Only write if the resource is still at this ETag, e.g. "42"'
+    )
+) -> Optional[int]:
+    """Get the version a conditional write expects from the If-Match header"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    match = _ENTITY_TAG.match(if_match)
+    if match is None:
+        raise HTTPException(
+            status_code=400, detail='If-Match must be a single ETag such as "42"'
+        )
+    return int(match.group(1))
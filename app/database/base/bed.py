@@ -1,42 +1,101 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from app.models.bed import Bed, BedCreate
+from typing import Dict, List, Optional
+from app.models.bed import Bed, BedChanges, BedCreate
+from app.models.garden import DEFAULT_GARDEN_ID
 
 
 class BedRepository(ABC):
     """Abstract base class for bed database operations"""
 
     @abstractmethod
-    async def create_bed(self, bed: BedCreate) -> Bed:
-        """Create a single bed in the database"""
+    async def create_bed(
+        self, bed: BedCreate, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> Bed:
+        """Create a single bed in a garden"""
         pass
 
     @abstractmethod
-    async def create_multiple_beds(self, beds: List[BedCreate]) -> List[Bed]:
-        """Create multiple beds in the database"""
+    async def create_multiple_beds(
+        self, beds: List[BedCreate], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> List[Bed]:
+        """Create multiple beds in a garden"""
         pass
 
     @abstractmethod
-    async def get_bed_by_id(self, bed_id: int) -> Optional[Bed]:
-        """Get a bed by its ID"""
+    async def get_bed_by_id(
+        self, bed_id: int, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> Optional[Bed]:
+        """Get a bed of a garden by its ID"""
+        pass
+
+    async def get_beds_by_ids(
+        self, bed_ids: List[int], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> List[Bed]:
+        """Get the beds of a garden with the given IDs; unknown IDs are left out.
+
+        Fallback for backends without a batched lookup: one query per ID.
+        """
+        beds = [await self.get_bed_by_id(bed_id, garden_id) for bed_id in bed_ids]
+        return [bed for bed in beds if bed is not None]
+
+    @abstractmethod
+    async def get_all_beds(self, garden_id: int = DEFAULT_GARDEN_ID) -> List[Bed]:
+        """Get all beds of a garden"""
+        pass
+
+    @abstractmethod
+    async def update_bed(
+        self,
+        bed_id: int,
+        bed: BedCreate,
+        garden_id: int = DEFAULT_GARDEN_ID,
+        expected_version: Optional[int] = None,
+    ) -> Optional[Bed]:
+        """Update a bed of a garden. Raises VersionConflict if expected_version
+        is given and the bed is at another version."""
+        pass
+
+    @abstractmethod
+    async def update_beds(
+        self, updates: Dict[int, BedCreate], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> List[Bed]:
+        """Update the dimensions of many beds of a garden, keyed by bed ID.
+        Returns the beds that exist."""
+        pass
+
+    @abstractmethod
+    async def replace_plant_families(
+        self, assignments: Dict[int, int], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> int:
+        """Give each bed, keyed by bed ID, exactly the one plant family mapped
+        to it. Returns the number of beds that exist."""
         pass
 
     @abstractmethod
-    async def get_all_beds(self) -> List[Bed]:
-        """Get all beds from the database"""
+    async def delete_bed(
+        self,
+        bed_id: int,
+        garden_id: int = DEFAULT_GARDEN_ID,
+        expected_version: Optional[int] = None,
+    ) -> bool:
+        """Delete a bed from a garden. Raises VersionConflict if expected_version
+        is given and the bed is at another version."""
         pass
 
     @abstractmethod
-    async def update_bed(self, bed_id: int, bed: BedCreate) -> Optional[Bed]:
-        """Update a bed in the database"""
+    async def delete_all_beds(self, garden_id: int = DEFAULT_GARDEN_ID) -> int:
+        """Delete all beds of a garden and return the number of deleted beds"""
         pass
 
     @abstractmethod
-    async def delete_bed(self, bed_id: int) -> bool:
-        """Delete a bed from the database"""
+    async def get_bed_changes(
+        self, since: int, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> BedChanges:
+        """Get beds inserted, updated or deleted after the given version"""
         pass
 
     @abstractmethod
-    async def delete_all_beds(self) -> int:
-        """Delete all beds from the database and return the number of deleted beds"""
+    async def get_garden_version(self, garden_id: int = DEFAULT_GARDEN_ID) -> int:
+        """Get the highest change version of a garden's beds, bed assignments,
+        deleted beds and of the plant families; it grows with every change"""
         pass
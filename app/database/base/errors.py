@@ -0,0 +1,24 @@
+class VersionConflict(Exception):
+    """Raised when a conditional write finds the row at another version"""
+
+    def __init__(self, entity: str, entity_id: int, current_version: int):
+        super().__init__(
+            f"{entity} with ID {entity_id} was changed (now at version {current_version})"
+        )
+        self.current_version = current_version
+
+
+class PlantingConflict(Exception):
+    """Raised when a planting overlaps another one or lies outside its bed"""
+
+    def __init__(self, bed_id: int, reason: str):
+        self.bed_id = bed_id
+        super().__init__(reason)
+
+
+class DatabaseUnavailable(Exception):
+    """Raised instead of connecting while a database is known to be unreachable"""
+
+    def __init__(self, database: str, retry_after: float):
+        super().__init__(f"Database {database} is unavailable")
+        self.retry_after = retry_after
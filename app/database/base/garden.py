@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from app.models.garden import Garden, GardenCreate, GardenStats
+
+
+class GardenRepository(ABC):
+    """Abstract base class for garden database operations"""
+
+    @abstractmethod
+    async def create_garden(self, garden: GardenCreate) -> Garden:
+        """Create a new garden"""
+        pass
+
+    @abstractmethod
+    async def get_garden_by_id(self, garden_id: int) -> Optional[Garden]:
+        """Get a garden by its ID"""
+        pass
+
+    @abstractmethod
+    async def get_all_gardens(self) -> List[Garden]:
+        """Get all gardens"""
+        pass
+
+    @abstractmethod
+    async def get_garden_stats(self, garden_id: int) -> GardenStats:
+        """Get the maintained bed statistics of a garden"""
+        pass
+
+    @abstractmethod
+    async def recompute_garden_stats(self, garden_id: int) -> GardenStats:
+        """Rebuild the statistics of a garden from its beds"""
+        pass
@@ -0,0 +1,71 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from app.models.job import Job, JobStatus
+
+
+class JobRepository(ABC):
+    """Abstract base class for durable background job records"""
+
+    @abstractmethod
+    async def create_job(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        owner: str,
+        garden_id: Optional[int] = None,
+    ) -> Job:
+        """Record a queued job owned by a worker"""
+        pass
+
+    @abstractmethod
+    async def get_job(self, job_id: int) -> Optional[Job]:
+        """Get a job by its ID"""
+        pass
+
+    @abstractmethod
+    async def get_job_params(self, job_id: int) -> Dict[str, Any]:
+        """Get the parameters a job was submitted with"""
+        pass
+
+    @abstractmethod
+    async def start_job(self, job_id: int, owner: str) -> bool:
+        """Mark a job running; False if it was cancelled or finished meanwhile"""
+        pass
+
+    @abstractmethod
+    async def update_progress(
+        self, job_id: int, done: int, total: Optional[int]
+    ) -> bool:
+        """Store the progress of a job; returns whether cancellation was requested"""
+        pass
+
+    @abstractmethod
+    async def finish_job(
+        self,
+        job_id: int,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Record the outcome of a job"""
+        pass
+
+    @abstractmethod
+    async def request_cancel(self, job_id: int) -> Optional[Job]:
+        """Request cancellation; queued jobs are cancelled right away"""
+        pass
+
+    @abstractmethod
+    async def heartbeat(self, owner: str, job_ids: List[int]) -> List[int]:
+        """Prove a worker still runs its jobs; returns those to cancel"""
+        pass
+
+    @abstractmethod
+    async def claim_stale_jobs(self, owner: str, stale_after: float) -> List[Job]:
+        """Take over unfinished jobs whose worker stopped sending heartbeats"""
+        pass
+
+    @abstractmethod
+    async def release_jobs(self, owner: str) -> None:
+        """Hand a stopping worker's unfinished jobs to the next worker that starts"""
+        pass
@@ -1,9 +1,30 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterable, FrozenSet, List, Optional, Tuple
+from app.database.prefix_trie import PrefixTrie, search_tokens
+from app.models.companion import PlantFamilyCompatibility
 from app.models.plant_family import PlantFamily, PlantFamilyCreate
 
 
+class _SearchIndex:
+    """Prefix tries over the names and nutrition requirements of plant families"""
+
+    def __init__(self, families: List[PlantFamily]):
+        self.versions = _versions(families)
+        self.families = {pf.id: pf for pf in families}
+        self.names = PrefixTrie.from_texts((pf.id, pf.name) for pf in families)
+        self.requirements = PrefixTrie.from_texts(
+            (pf.id, pf.nutrition_requirements) for pf in families
+        )
+
+
+def _versions(families: List[PlantFamily]) -> FrozenSet[Tuple[int, int]]:
+    return frozenset((pf.id, pf.version) for pf in families)
+
+
 class PlantFamilyRepository(ABC):
+    # Tries of the last searched plant families, shared by all repositories
+    _search_index: Optional[_SearchIndex] = None
+
     @abstractmethod
     async def create_plant_family(self, plant_family: PlantFamilyCreate) -> PlantFamily:
         """Create a new plant family"""
@@ -22,6 +43,62 @@ class PlantFamilyRepository(ABC):
         pass
 
     @abstractmethod
-    async def delete_plant_family(self, plant_family_id: int) -> bool:
-        """Delete a plant family"""
+    async def delete_plant_family(
+        self, plant_family_id: int, expected_version: Optional[int] = None
+    ) -> bool:
+        """Delete a plant family. Raises VersionConflict if expected_version is
+        given and the plant family is at another version."""
+        pass
+
+    @abstractmethod
+    async def import_plant_families(
+        self, batches: AsyncIterable[List[PlantFamilyCreate]]
+    ) -> Tuple[int, int]:
+        """Insert or update (matched by name) plant families batch by batch.
+
+        Returns the number of inserted and updated plant families.
+        """
+        pass
+
+    @abstractmethod
+    async def get_compatibility_scores(self) -> List[PlantFamilyCompatibility]:
+        """Get the compatibility scores of all scored plant family pairs"""
+        pass
+
+    @abstractmethod
+    async def set_compatibility_scores(
+        self, scores: List[PlantFamilyCompatibility]
+    ) -> None:
+        """Insert or update compatibility scores. Each pair is given once,
+        with the lower plant family ID first."""
         pass
+
+    async def search_plant_families(self, query: str, limit: int) -> List[PlantFamily]:
+        """Search plant families by word prefixes of name and nutrition requirements.
+
+        Fallback for backends without native search: every word of the query
+        must prefix a word of the family; name matches rank first. Each query
+        still loads all plant families, so it costs O(n) in their number; the
+        tries are only rebuilt when a family was added, changed or removed.
+        """
+        tokens = search_tokens(query)
+        if not tokens:
+            return []
+        all_families = await self.get_all_plant_families()
+        index = PlantFamilyRepository._search_index
+        if index is None or index.versions != _versions(all_families):
+            index = PlantFamilyRepository._search_index = _SearchIndex(all_families)
+        families, names, requirements = index.families, index.names, index.requirements
+
+        matches = set(families)
+        name_hits = {pf_id: 0 for pf_id in families}
+        for token in tokens:
+            in_name = names.ids_with_prefix(token)
+            matches &= in_name | requirements.ids_with_prefix(token)
+            for pf_id in in_name:
+                name_hits[pf_id] += 1
+
+        ranked = sorted(
+            matches, key=lambda pf_id: (-name_hits[pf_id], families[pf_id].name)
+        )
+        return [families[pf_id] for pf_id in ranked[:limit]]
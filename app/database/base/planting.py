@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from app.database.occupancy_grid import OccupancyGrid
+from app.models.planting import Planting, PlantingCreate
+
+
+class PlantingRepository(ABC):
+    """Abstract base class for planting operations"""
+
+    @abstractmethod
+    async def get_plantings(
+        self, bed_id: int, garden_id: int
+    ) -> Optional[List[Planting]]:
+        """Get the plantings of a bed, or None if the bed does not exist"""
+        pass
+
+    @abstractmethod
+    async def create_planting(
+        self, bed_id: int, planting: PlantingCreate, garden_id: int, cell_size: int
+    ) -> Optional[Planting]:
+        """Place a planting in a bed, or return None if the bed does not exist.
+        Raises PlantingConflict if its cells are taken or it lies outside the bed."""
+        pass
+
+    @abstractmethod
+    async def delete_planting(
+        self, planting_id: int, bed_id: int, garden_id: int, cell_size: int
+    ) -> bool:
+        """Remove a planting from a bed and free its cells"""
+        pass
+
+    @abstractmethod
+    async def get_occupancy(
+        self, bed_id: int, garden_id: int, cell_size: int
+    ) -> Optional[OccupancyGrid]:
+        """Get the occupancy grid of a bed, or None if the bed does not exist"""
+        pass
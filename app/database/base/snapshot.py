@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+from app.models.snapshot import (
+    GardenSnapshot,
+    GardenSnapshotDiff,
+    GardenSnapshotRestore,
+)
+
+
+class SnapshotRepository(ABC):
+    """Abstract base class for garden snapshot operations"""
+
+    @abstractmethod
+    async def create_snapshot(
+        self, garden_id: int, name: str
+    ) -> Optional[GardenSnapshot]:
+        """Snapshot the beds and assignments of a garden.
+        Returns None if the garden already has a snapshot of that name."""
+        pass
+
+    @abstractmethod
+    async def get_snapshot(
+        self, snapshot_id: int, garden_id: int
+    ) -> Optional[GardenSnapshot]:
+        """Get a snapshot of a garden by its ID"""
+        pass
+
+    @abstractmethod
+    async def get_snapshots(self, garden_id: int) -> List[GardenSnapshot]:
+        """Get the snapshots of a garden, newest first"""
+        pass
+
+    @abstractmethod
+    async def delete_snapshot(self, snapshot_id: int, garden_id: int) -> bool:
+        """Delete a snapshot of a garden"""
+        pass
+
+    @abstractmethod
+    async def restore_snapshot(
+        self, snapshot_id: int, garden_id: int
+    ) -> Optional[GardenSnapshotRestore]:
+        """Replace the beds and assignments of a garden with a snapshot's"""
+        pass
+
+    @abstractmethod
+    async def diff_snapshots(
+        self, from_snapshot_id: int, to_snapshot_id: int, garden_id: int
+    ) -> GardenSnapshotDiff:
+        """Compare the beds and assignments of two snapshots of a garden"""
+        pass
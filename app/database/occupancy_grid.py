@@ -0,0 +1,188 @@
+"""Bit-packed occupancy grid of a bed.
+
+A bed of ``length`` x ``width`` centimetres is divided into square cells of
+``cell_size`` centimetres: rows run along the length, columns along the
+width. Each row is one Python integer with a set bit per occupied cell, so
+checking, occupying and searching a block of cells costs a few big-integer
+operations per row instead of a loop over cells. Stored as ``bytea``, each
+row takes ``ceil(columns / 8)`` bytes.
+
+A planting reserves its footprint plus its spacing on every side, clipped to
+the bed. A new planting needs a free block, so blocks placed on one grid
+never overlap.
+"""
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+
+class Block(NamedTuple):
+    """Cells [first_row, end_row) x [first_column, end_column)"""
+
+    first_row: int
+    end_row: int
+    first_column: int
+    end_column: int
+
+
+def _cells(start: int, size: int, cell_size: int) -> Tuple[int, int]:
+    """Cells touched by [start, start + size) centimetres"""
+    return start // cell_size, -(-(start + size) // cell_size)
+
+
+def _mask(first: int, end: int) -> int:
+    return ((1 << (end - first)) - 1) << first
+
+
+def _runs(free: int, width: int) -> int:
+    """Bits i such that bits i .. i + width - 1 of free are all set"""
+    runs, span = free, 1
+    while span < width:
+        # runs covers span bits; shifting by at most span doubles it
+        step = min(span, width - span)
+        runs &= runs >> step
+        span += step
+    return runs
+
+
+class OccupancyGrid:
+    """Occupied cells of a bed, one bitmask per row"""
+
+    def __init__(
+        self,
+        length: int,
+        width: int,
+        cell_size: int,
+        occupied: Optional[List[int]] = None,
+    ):
+        self.length = length
+        self.width = width
+        self.cell_size = cell_size
+        self.rows = -(-length // cell_size)
+        self.columns = -(-width // cell_size)
+        self.occupied = occupied if occupied is not None else [0] * self.rows
+
+    @property
+    def _row_bytes(self) -> int:
+        return (self.columns + 7) // 8
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, length: int, width: int, cell_size: int
+    ) -> "OccupancyGrid":
+        grid = cls(length, width, cell_size)
+        size = grid._row_bytes
+        grid.occupied = [
+            int.from_bytes(data[row * size:(row + 1) * size], "little")
+            for row in range(grid.rows)
+        ]
+        return grid
+
+    def to_bytes(self) -> bytes:
+        size = self._row_bytes
+        return b"".join(row.to_bytes(size, "little") for row in self.occupied)
+
+    def block(
+        self,
+        x: int,
+        y: int,
+        length: int,
+        width: int,
+        spacing: int = 0,
+        clip: bool = False,
+    ) -> Block:
+        """Cells reserved by a footprint at (x, y) cm with spacing around it.
+
+        Raises ValueError if the footprint lies outside the bed, unless clip
+        is set (for plantings of a bed that has been made smaller since).
+        """
+        outside = x < 0 or y < 0 or x + length > self.length or y + width > self.width
+        if outside and not clip:
+            raise ValueError(
+                f"A planting of {length} x {width} cm at ({x}, {y}) does not fit "
+                f"in a bed of {self.length} x {self.width} cm"
+            )
+        first_row, end_row = _cells(x - spacing, length + 2 * spacing, self.cell_size)
+        first_column, end_column = _cells(
+            y - spacing, width + 2 * spacing, self.cell_size
+        )
+        return Block(
+            max(0, first_row),
+            min(self.rows, end_row),
+            max(0, first_column),
+            min(self.columns, end_column),
+        )
+
+    def is_free(self, block: Block) -> bool:
+        mask = _mask(block.first_column, block.end_column)
+        return not any(
+            row & mask for row in self.occupied[block.first_row:block.end_row]
+        )
+
+    def occupy(self, block: Block) -> None:
+        mask = _mask(block.first_column, block.end_column)
+        for row in range(block.first_row, block.end_row):
+            self.occupied[row] |= mask
+
+    @property
+    def occupied_cells(self) -> int:
+        return sum(row.bit_count() for row in self.occupied)
+
+    @property
+    def free_cells(self) -> int:
+        return self.rows * self.columns - self.occupied_cells
+
+    def placements(
+        self, length: int, width: int, spacing: int = 0
+    ) -> Iterator[Tuple[int, int]]:
+        """Positions (x, y) in cm where footprints fit, placed greedily.
+
+        Each position is reserved before the next is searched, on a copy of
+        the grid: the count of positions is the number of such plantings that
+        still fit, the first one where the next planting could go. Positions
+        are on cell boundaries and reserve the same block as block().
+        """
+        if length > self.length or width > self.width:
+            return
+        cell = self.cell_size
+        # Block of a footprint starting at a cell boundary, relative to it
+        before = -(-spacing // cell)
+        block_rows = before + -(-(length + spacing) // cell)
+        block_columns = before + -(-(width + spacing) // cell)
+        last_row = (self.length - length) // cell
+        starts = (1 << ((self.width - width) // cell + 1)) - 1
+
+        # Blocks may hang over the edges of the bed: pad the grid with free
+        # cells so that a block is free iff its part inside the bed is
+        padding = _mask(0, before) | _mask(
+            self.columns + before, self.columns + before + block_columns
+        )
+        full = (1 << self.columns) - 1
+        occupied = list(self.occupied)
+
+        def row_starts(row: int) -> int:
+            """Columns where a block's columns are free in a row"""
+            if row < 0 or row >= self.rows:
+                return starts
+            free = (((~occupied[row]) & full) << before) | padding
+            return _runs(free, block_columns) & starts
+
+        # fits[i] belongs to grid row i - before
+        fits = [row_starts(row) for row in range(-before, self.rows + block_rows)]
+        for first_row in range(last_row + 1):
+            while True:
+                candidates = starts
+                for i in range(first_row, first_row + block_rows):
+                    candidates &= fits[i]
+                if not candidates:
+                    break
+                column = (candidates & -candidates).bit_length() - 1
+                yield first_row * cell, column * cell
+                block = Block(
+                    max(0, first_row - before),
+                    min(self.rows, first_row - before + block_rows),
+                    max(0, column - before),
+                    min(self.columns, column - before + block_columns),
+                )
+                mask = _mask(block.first_column, block.end_column)
+                for row in range(block.first_row, block.end_row):
+                    occupied[row] |= mask
+                    fits[row + before] = row_starts(row)
@@ -0,0 +1,54 @@
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+_WORD = re.compile(r"\w+")
+
+
+def search_tokens(text: str) -> List[str]:
+    """Split text into the lowercase words that search matches on"""
+    return _WORD.findall(text.lower())
+
+
+class _Node:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.ids: Set[int] = set()
+
+
+class PrefixTrie:
+    """Maps word prefixes to the IDs of the items containing such a word.
+
+    Every node keeps the IDs below it, so a lookup costs the length of the
+    prefix regardless of how many words are indexed.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, word: str, item_id: int) -> None:
+        node = self._root
+        for char in word:
+            node = node.children.setdefault(char, _Node())
+            node.ids.add(item_id)
+
+    def insert_text(self, text: str, item_id: int) -> None:
+        for word in search_tokens(text):
+            self.insert(word, item_id)
+
+    def ids_with_prefix(self, prefix: str) -> Set[int]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[Tuple[int, str]]) -> "PrefixTrie":
+        """Build a trie from (item_id, text) pairs"""
+        trie = cls()
+        for item_id, text in texts:
+            trie.insert_text(text, item_id)
+        return trie
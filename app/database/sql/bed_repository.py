@@ -1,125 +1,520 @@
-from typing import List, Optional
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from sqlalchemy import select, func, delete
-from sqlalchemy.orm import selectinload
+from typing import Dict, List, Optional
+from sqlalchemy import (
+    Integer,
+    and_,
+    any_,
+    bindparam,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    null,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from app.database.base.bed import BedRepository
-from app.models.bed import Bed, BedCreate
-from app.database.sql.models import SQLBed
+from app.database.base.errors import VersionConflict
+from app.models.bed import Bed, BedChanges, BedCreate
+from app.models.garden import DEFAULT_GARDEN_ID
+from app.database.sql.models import (
+    SQLBed,
+    SQLBedTombstone,
+    SQLPlantFamily,
+    bed_plant_family_association,
+)
+from app.database.sql.notifications import change_notification
+from app.database.sql.session_router import (
+    EngineOptions,
+    SessionRouter,
+    to_async_url,
+)
+from app.services.tracing import traced_methods
 
+# Hot-path statements are built once; their parameters are bound per call so
+# SQLAlchemy's compiled cache and asyncpg's prepared statements are reused
+_beds = SQLBed.__table__
+_SELECT_BED_VERSION = select(SQLBed.row_version).where(
+    SQLBed.garden_id == bindparam("garden_id"), SQLBed.id == bindparam("bed_id")
+)
+_DELETE_BED = (
+    delete(SQLBed)
+    .where(SQLBed.garden_id == bindparam("garden_id"), SQLBed.id == bindparam("bed_id"))
+    .execution_options(synchronize_session=False)
+)
+# Conditional writes compare the row version in the statement itself, so a
+# conflicting write costs neither a prior read nor a row lock
+_DELETE_BED_IF_VERSION = _DELETE_BED.where(
+    SQLBed.row_version == bindparam("expected_version")
+)
+_DELETE_ALL_BEDS = (
+    delete(SQLBed)
+    .where(SQLBed.garden_id == bindparam("garden_id"))
+    .execution_options(synchronize_session=False)
+)
 
+_bed_families = (
+    select(func.array_agg(bed_plant_family_association.c.plant_family_id))
+    .where(
+        bed_plant_family_association.c.garden_id == SQLBed.garden_id,
+        bed_plant_family_association.c.bed_id == SQLBed.id,
+    )
+    .scalar_subquery()
+)
+# Changed beds and tombstones of deleted beds in one round trip; each branch
+# is a range scan on its (garden_id, row_version) index
+_SELECT_BED_CHANGES = union_all(
+    select(
+        SQLBed.id,
+        SQLBed.index,
+        SQLBed.length,
+        SQLBed.width,
+        SQLBed.row_version,
+        _bed_families.label("plant_families"),
+        false().label("deleted"),
+    ).where(
+        SQLBed.garden_id == bindparam("garden_id"),
+        SQLBed.row_version > bindparam("since"),
+    ),
+    select(
+        SQLBedTombstone.bed_id,
+        null(),
+        null(),
+        null(),
+        SQLBedTombstone.row_version,
+        null(),
+        true(),
+    ).where(
+        SQLBedTombstone.garden_id == bindparam("garden_id"),
+        SQLBedTombstone.row_version > bindparam("since"),
+        # A bed restored with its old ID is reported as changed, not deleted
+        ~exists().where(
+            and_(
+                SQLBed.garden_id == SQLBedTombstone.garden_id,
+                SQLBed.id == SQLBedTombstone.bed_id,
+            )
+        ),
+    ),
+)
+
+# Every write returns the written rows, so no write reads them back
+_returned_bed = (
+    _beds.c.id,
+    _beds.c.index,
+    _beds.c.length,
+    _beds.c.width,
+    _beds.c.row_version,
+)
+
+# Reads return the plant families as an array column of the bed rows. With
+# the composite bed key, loading them separately (selectinload) took one OR
+# of 500 key pairs per 500 beds.
+_SELECT_BED_BY_ID = select(*_returned_bed, _bed_families.label("plant_families")).where(
+    _beds.c.garden_id == bindparam("garden_id"), _beds.c.id == bindparam("bed_id")
+)
+# Concurrent lookups of single beds are batched into one statement
+_SELECT_BEDS_BY_IDS = select(
+    *_returned_bed, _bed_families.label("plant_families")
+).where(
+    _beds.c.garden_id == bindparam("garden_id"),
+    _beds.c.id == any_(bindparam("bed_ids", type_=ARRAY(Integer))),
+)
+# A whole garden aggregates its assignments once instead of once per bed
+_garden_bed_families = (
+    select(
+        bed_plant_family_association.c.bed_id,
+        func.array_agg(bed_plant_family_association.c.plant_family_id).label(
+            "plant_families"
+        ),
+    )
+    .where(bed_plant_family_association.c.garden_id == bindparam("garden_id"))
+    .group_by(bed_plant_family_association.c.bed_id)
+    .subquery()
+)
+_SELECT_ALL_BEDS = (
+    select(*_returned_bed, _garden_bed_families.c.plant_families)
+    .select_from(
+        _beds.outerjoin(
+            _garden_bed_families, _garden_bed_families.c.bed_id == _beds.c.id
+        )
+    )
+    .where(_beds.c.garden_id == bindparam("garden_id"))
+    .order_by(_beds.c.index)
+)
+_next_index = (
+    select(func.coalesce(func.max(_beds.c.index), 0) + 1)
+    .where(_beds.c.garden_id == bindparam("garden_id"))
+    .scalar_subquery()
+)
+_INSERT_BED = (
+    insert(_beds)
+    .values(
+        garden_id=bindparam("garden_id"),
+        index=_next_index,
+        length=bindparam("new_length"),
+        width=bindparam("new_width"),
+    )
+    .returning(*_returned_bed)
+)
+_created_dimensions = (
+    func.unnest(
+        bindparam("lengths", type_=ARRAY(Integer)),
+        bindparam("widths", type_=ARRAY(Integer)),
+    )
+    .table_valued("length", "width", with_ordinality="ordinality")
+    .render_derived(name="v")
+)
+# Beds are numbered from 1 in the order given
+_INSERT_BEDS = (
+    insert(_beds)
+    .from_select(
+        ["garden_id", "index", "length", "width"],
+        select(
+            bindparam("garden_id", type_=Integer),
+            _created_dimensions.c.ordinality,
+            _created_dimensions.c.length,
+            _created_dimensions.c.width,
+        ),
+    )
+    .returning(*_returned_bed)
+)
+_UPDATE_BED = (
+    update(_beds)
+    .where(
+        _beds.c.garden_id == bindparam("bed_garden_id"),
+        _beds.c.id == bindparam("bed_id"),
+    )
+    .values(length=bindparam("new_length"), width=bindparam("new_width"))
+    .returning(*_returned_bed, _bed_families.label("plant_families"))
+)
+_UPDATE_BED_IF_VERSION = _UPDATE_BED.where(
+    _beds.c.row_version == bindparam("expected_version")
+)
+
+# Bulk dimension update in one statement: the new values arrive as three
+# arrays, so the statement text (and its prepared statement) is the same no
+# matter how many beds are updated. Parameters of an UPDATE must not be named
+# after a column of the table, which SQLAlchemy would add to the SET clause
+_new_dimensions = (
+    func.unnest(
+        bindparam("ids", type_=ARRAY(Integer)),
+        bindparam("lengths", type_=ARRAY(Integer)),
+        bindparam("widths", type_=ARRAY(Integer)),
+    )
+    .table_valued("id", "length", "width")
+    .render_derived(name="v")
+)
+_UPDATE_BEDS = (
+    update(_beds)
+    .where(
+        _beds.c.garden_id == bindparam("bed_garden_id"),
+        _beds.c.id == _new_dimensions.c.id,
+    )
+    .values(length=_new_dimensions.c.length, width=_new_dimensions.c.width)
+    .returning(*_returned_bed, _bed_families.label("plant_families"))
+)
+
+# Plant families of many beds replaced in two statements, with the new
+# assignments as arrays; beds deleted in the meantime are skipped
+_assignments = bed_plant_family_association
+_new_assignments = (
+    func.unnest(
+        bindparam("ids", type_=ARRAY(Integer)),
+        bindparam("plant_family_ids", type_=ARRAY(Integer)),
+    )
+    .table_valued("bed_id", "plant_family_id")
+    .render_derived(name="v")
+)
+_DELETE_BED_ASSIGNMENTS = delete(_assignments).where(
+    _assignments.c.garden_id == bindparam("garden_id"),
+    _assignments.c.bed_id == func.any(bindparam("ids", type_=ARRAY(Integer))),
+)
+_INSERT_BED_ASSIGNMENTS = insert(_assignments).from_select(
+    ["garden_id", "bed_id", "plant_family_id"],
+    select(
+        _beds.c.garden_id, _beds.c.id, _new_assignments.c.plant_family_id
+    ).where(
+        _beds.c.garden_id == bindparam("garden_id"),
+        _beds.c.id == _new_assignments.c.bed_id,
+    ),
+)
+
+# Each maximum is read from the end of a row_version index; assignments
+# touch their bed, so the bed versions cover them
+_SELECT_GARDEN_VERSION = select(
+    func.greatest(
+        select(func.max(SQLBed.row_version))
+        .where(SQLBed.garden_id == bindparam("garden_id"))
+        .scalar_subquery(),
+        select(func.max(SQLBedTombstone.row_version))
+        .where(SQLBedTombstone.garden_id == bindparam("garden_id"))
+        .scalar_subquery(),
+        select(func.max(SQLPlantFamily.row_version)).scalar_subquery(),
+        0,
+    )
+)
+
+
+@traced_methods
 class SQLBedRepository(BedRepository):
     """PostgreSQL implementation of BedRepository using SQLAlchemy"""
 
-    def __init__(self, database_url: str):
-        self.database_url = database_url.replace(
-            "postgresql://", "postgresql+asyncpg://"
+    def __init__(
+        self,
+        database_url: str,
+        replica_urls: Optional[List[str]] = None,
+        read_your_writes_window: float = 0.0,
+        engine_options: Optional[EngineOptions] = None,
+    ):
+        self.database_url = to_async_url(database_url)
+        # Reads are load-balanced across replicas, writes go to the primary
+        self.router = SessionRouter(
+            database_url, replica_urls, read_your_writes_window, engine_options
         )
-        self.engine = create_async_engine(self.database_url, echo=False)
-        self.async_session = async_sessionmaker(self.engine, expire_on_commit=False)
 
-    def _sql_bed_to_bed(self, sql_bed: SQLBed) -> Bed:
-        """Convert SQLBed model to Bed Pydantic model"""
+    def _row_to_bed(self, row, garden_id: int) -> Bed:
+        """Convert a returned or selected bed row to Bed Pydantic model"""
         return Bed(
-            id=sql_bed.id,
-            index=sql_bed.index,
-            length=sql_bed.length,
-            width=sql_bed.width,
-            plant_families=[pf.id for pf in sql_bed.plant_families],
+            id=row.id,
+            garden_id=garden_id,
+            index=row.index,
+            length=row.length,
+            width=row.width,
+            plant_families=getattr(row, "plant_families", None) or [],
+            version=row.row_version,
         )
 
-    async def create_bed(self, bed: BedCreate) -> Bed:
-        """Create a single bed in PostgreSQL"""
-        async with self.async_session() as session:
-            # Get the next available index
-            max_index_result = await session.execute(select(func.max(SQLBed.index)))
-            max_index = max_index_result.scalar() or 0
-            index = max_index + 1
-
-            sql_bed = SQLBed(length=bed.length, width=bed.width, index=index)
-            # Initialize relationship to avoid lazy loading in _sql_bed_to_bed which is
-            # outside the async context and would raise a missing greenlet error
-            sql_bed.plant_families = []
-
-            session.add(sql_bed)
+    async def create_bed(
+        self, bed: BedCreate, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> Bed:
+        """Create a single bed in PostgreSQL, numbered after the garden's last bed"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _INSERT_BED,
+                {
+                    "garden_id": garden_id,
+                    "new_length": bed.length,
+                    "new_width": bed.width,
+                },
+            )
+            created = self._row_to_bed(result.one(), garden_id)
+            await session.execute(
+                change_notification("bed", "insert", garden_id, [created.id])
+            )
             await session.commit()
+            return created
 
-            return self._sql_bed_to_bed(sql_bed)
-
-    async def create_multiple_beds(self, beds: List[BedCreate]) -> List[Bed]:
-        """Create multiple beds in PostgreSQL"""
-        async with self.async_session() as session:
+    async def create_multiple_beds(
+        self, beds: List[BedCreate], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> List[Bed]:
+        """Create multiple beds in PostgreSQL with a single INSERT ... RETURNING"""
+        if not beds:
+            return []
+        async with self.router.write_session() as session:
             # Since this is called after delete_all_beds, we start from index 1
-            sql_beds = []
-            for i, bed in enumerate(beds):
-                index = i + 1
-                sql_bed = SQLBed(length=bed.length, width=bed.width, index=index)
-                # Initialize relationship to avoid lazy loading in _sql_bed_to_bed which
-                # is outside the async context and would raise a missing greenlet error.
-                sql_bed.plant_families = []  
-                sql_beds.append(sql_bed)
-                session.add(sql_bed)
-
+            result = await session.execute(
+                _INSERT_BEDS,
+                {
+                    "garden_id": garden_id,
+                    "lengths": [bed.length for bed in beds],
+                    "widths": [bed.width for bed in beds],
+                },
+            )
+            created = sorted(
+                (self._row_to_bed(row, garden_id) for row in result),
+                key=lambda bed: bed.index,
+            )
+            await session.execute(
+                change_notification(
+                    "bed", "insert", garden_id, [bed.id for bed in created]
+                )
+            )
             await session.commit()
+            return created
 
-            return [self._sql_bed_to_bed(sql_bed) for sql_bed in sql_beds]
-
-    async def get_bed_by_id(self, bed_id: int) -> Optional[Bed]:
+    async def get_bed_by_id(
+        self, bed_id: int, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> Optional[Bed]:
         """Get a bed by its ID from PostgreSQL"""
-        async with self.async_session() as session:
+        async with self.router.read_session() as session:
             result = await session.execute(
-                select(SQLBed)
-                .options(selectinload(SQLBed.plant_families))
-                .where(SQLBed.id == bed_id)
+                _SELECT_BED_BY_ID, {"garden_id": garden_id, "bed_id": bed_id}
             )
-            sql_bed = result.scalar_one_or_none()
-            if sql_bed:
-                return self._sql_bed_to_bed(sql_bed)
+            row = result.one_or_none()
+            if row:
+                return self._row_to_bed(row, garden_id)
             return None
 
-    async def get_all_beds(self) -> List[Bed]:
-        """Get all beds from PostgreSQL"""
-        async with self.async_session() as session:
+    async def get_beds_by_ids(
+        self, bed_ids: List[int], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> List[Bed]:
+        """Get the beds with the given IDs from PostgreSQL in one statement"""
+        async with self.router.read_session() as session:
             result = await session.execute(
-                select(SQLBed)
-                .options(selectinload(SQLBed.plant_families))
-                .order_by(SQLBed.index)
+                _SELECT_BEDS_BY_IDS, {"garden_id": garden_id, "bed_ids": bed_ids}
             )
-            sql_beds = result.scalars().all()
-            return [self._sql_bed_to_bed(sql_bed) for sql_bed in sql_beds]
+            return [self._row_to_bed(row, garden_id) for row in result]
 
-    async def update_bed(self, bed_id: int, bed: BedCreate) -> Optional[Bed]:
-        """Update a bed in PostgreSQL"""
-        async with self.async_session() as session:
+    async def get_all_beds(self, garden_id: int = DEFAULT_GARDEN_ID) -> List[Bed]:
+        """Get all beds from PostgreSQL"""
+        async with self.router.read_session() as session:
             result = await session.execute(
-                select(SQLBed)
-                .options(selectinload(SQLBed.plant_families))
-                .where(SQLBed.id == bed_id)
+                _SELECT_ALL_BEDS, {"garden_id": garden_id}
             )
-            sql_bed = result.scalar_one_or_none()
+            return [self._row_to_bed(row, garden_id) for row in result]
 
-            if sql_bed:
-                sql_bed.length = bed.length
-                sql_bed.width = bed.width
-                await session.commit()
-                return self._sql_bed_to_bed(sql_bed)
+    async def update_bed(
+        self,
+        bed_id: int,
+        bed: BedCreate,
+        garden_id: int = DEFAULT_GARDEN_ID,
+        expected_version: Optional[int] = None,
+    ) -> Optional[Bed]:
+        """Update a bed in PostgreSQL with a single UPDATE ... RETURNING"""
+        params = {
+            "bed_garden_id": garden_id,
+            "bed_id": bed_id,
+            "new_length": bed.length,
+            "new_width": bed.width,
+        }
+        statement = _UPDATE_BED
+        if expected_version is not None:
+            statement = _UPDATE_BED_IF_VERSION
+            params["expected_version"] = expected_version
+        async with self.router.write_session() as session:
+            row = (await session.execute(statement, params)).one_or_none()
+            if row is None:
+                if expected_version is not None:
+                    await self._raise_if_bed_exists(session, bed_id, garden_id)
+                return None
+            await session.execute(
+                change_notification("bed", "update", garden_id, [bed_id])
+            )
+            await session.commit()
+            return self._row_to_bed(row, garden_id)
 
-            return None
+    async def _raise_if_bed_exists(self, session, bed_id: int, garden_id: int) -> None:
+        """Tell a version conflict from a missing bed after a conditional write"""
+        current_version = (
+            await session.execute(
+                _SELECT_BED_VERSION, {"garden_id": garden_id, "bed_id": bed_id}
+            )
+        ).scalar_one_or_none()
+        if current_version is not None:
+            raise VersionConflict("Bed", bed_id, current_version)
 
-    async def delete_bed(self, bed_id: int) -> bool:
+    async def update_beds(
+        self, updates: Dict[int, BedCreate], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> List[Bed]:
+        """Update many beds with a single UPDATE ... FROM unnest(...) RETURNING"""
+        if not updates:
+            return []
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _UPDATE_BEDS,
+                {
+                    "bed_garden_id": garden_id,
+                    "ids": list(updates),
+                    "lengths": [bed.length for bed in updates.values()],
+                    "widths": [bed.width for bed in updates.values()],
+                },
+            )
+            beds = [self._row_to_bed(row, garden_id) for row in result]
+            if beds:
+                await session.execute(
+                    change_notification(
+                        "bed", "update", garden_id, [bed.id for bed in beds]
+                    )
+                )
+            await session.commit()
+            return sorted(beds, key=lambda bed: bed.index)
+
+    async def replace_plant_families(
+        self, assignments: Dict[int, int], garden_id: int = DEFAULT_GARDEN_ID
+    ) -> int:
+        """Replace the plant families of many beds in one transaction"""
+        if not assignments:
+            return 0
+        params = {
+            "garden_id": garden_id,
+            "ids": list(assignments),
+            "plant_family_ids": list(assignments.values()),
+        }
+        async with self.router.write_session() as session:
+            await session.execute(_DELETE_BED_ASSIGNMENTS, params)
+            result = await session.execute(_INSERT_BED_ASSIGNMENTS, params)
+            await session.execute(
+                change_notification("bed", "update", garden_id, list(assignments))
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def delete_bed(
+        self,
+        bed_id: int,
+        garden_id: int = DEFAULT_GARDEN_ID,
+        expected_version: Optional[int] = None,
+    ) -> bool:
         """Delete a bed from PostgreSQL"""
-        async with self.async_session() as session:
-            result = await session.execute(delete(SQLBed).where(SQLBed.id == bed_id))
+        params = {"garden_id": garden_id, "bed_id": bed_id}
+        statement = _DELETE_BED
+        if expected_version is not None:
+            statement = _DELETE_BED_IF_VERSION
+            params["expected_version"] = expected_version
+        async with self.router.write_session() as session:
+            result = await session.execute(statement, params)
+            if result.rowcount == 0 and expected_version is not None:
+                await self._raise_if_bed_exists(session, bed_id, garden_id)
+            if result.rowcount > 0:
+                await session.execute(
+                    change_notification("bed", "delete", garden_id, [bed_id])
+                )
             await session.commit()
             return result.rowcount > 0
 
-    async def delete_all_beds(self) -> int:
-        """Delete all beds from PostgreSQL"""
-        async with self.async_session() as session:
-            result = await session.execute(delete(SQLBed))
+    async def delete_all_beds(self, garden_id: int = DEFAULT_GARDEN_ID) -> int:
+        """Delete all beds of a garden from PostgreSQL"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _DELETE_ALL_BEDS, {"garden_id": garden_id}
+            )
+            if result.rowcount > 0:
+                await session.execute(
+                    change_notification("bed", "delete_all", garden_id)
+                )
             await session.commit()
             return result.rowcount
 
+    async def get_bed_changes(
+        self, since: int, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> BedChanges:
+        """Get beds changed after a version with one query over both indexes"""
+        async with self.router.read_session() as session:
+            result = await session.execute(
+                _SELECT_BED_CHANGES, {"garden_id": garden_id, "since": since}
+            )
+            changes = BedChanges(version=since)
+            for row in result:
+                changes.version = max(changes.version, row.row_version)
+                if row.deleted:
+                    changes.deleted.append(row.id)
+                else:
+                    changes.beds.append(self._row_to_bed(row, garden_id))
+            changes.beds.sort(key=lambda bed: bed.index)
+            return changes
+
+    async def get_garden_version(self, garden_id: int = DEFAULT_GARDEN_ID) -> int:
+        """Get the highest change version of a garden in one round trip"""
+        async with self.router.read_session() as session:
+            result = await session.execute(
+                _SELECT_GARDEN_VERSION, {"garden_id": garden_id}
+            )
+            return result.scalar_one()
+
     async def close(self):
-        """Close the database connection"""
-        await self.engine.dispose()
+        """Release the repository's database resources"""
+        await self.router.dispose()
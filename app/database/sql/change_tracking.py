@@ -0,0 +1,121 @@
+"""Row versions and tombstones that let clients fetch only what changed.
+
+Every insert or update of a bed, plant family or bed assignment stamps the row
+with the next value of ``change_version_seq``; deleting beds leaves tombstones
+with a version of their own. Versions of one garden are handed out under a
+transaction-level advisory lock, so they become visible in increasing order
+and a client that synced up to version N can never miss a change below N.
+"""
+from sqlalchemy import DDL, Table, event
+
+CHANGE_VERSION_SEQUENCE = "change_version_seq"
+
+# Advisory lock class (first key) serialising version assignment per garden
+CHANGE_LOCK_CLASS = 7301
+
+STAMP_GARDEN_ROW_VERSION = DDL(
+    f"""
+CREATE OR REPLACE FUNCTION stamp_garden_row_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock({CHANGE_LOCK_CLASS}, NEW.garden_id);
+    NEW.row_version := nextval('{CHANGE_VERSION_SEQUENCE}');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+)
+
+STAMP_ROW_VERSION = DDL(
+    f"""
+CREATE OR REPLACE FUNCTION stamp_row_version() RETURNS trigger AS $$
+BEGIN
+    NEW.row_version := nextval('{CHANGE_VERSION_SEQUENCE}');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+)
+
+# A bed's plant families are part of the bed, so assignments touch the bed
+TOUCH_BED_ON_ASSIGNMENT = DDL(
+    """
+CREATE OR REPLACE FUNCTION touch_bed_on_assignment() RETURNS trigger AS $$
+DECLARE
+    assignment record;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        assignment := OLD;
+    ELSE
+        assignment := NEW;
+    END IF;
+    UPDATE beds SET row_version = row_version
+    WHERE garden_id = assignment.garden_id AND id = assignment.bed_id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+)
+
+RECORD_BED_TOMBSTONES = DDL(
+    f"""
+CREATE OR REPLACE FUNCTION record_bed_tombstones() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock({CHANGE_LOCK_CLASS}, garden_id)
+    FROM (SELECT DISTINCT garden_id FROM deleted_beds ORDER BY garden_id) AS gardens;
+    INSERT INTO bed_tombstones (garden_id, bed_id, row_version)
+    SELECT garden_id, id, nextval('{CHANGE_VERSION_SEQUENCE}') FROM deleted_beds
+    ON CONFLICT (garden_id, bed_id) DO UPDATE SET row_version = EXCLUDED.row_version;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+)
+
+
+def _listen(table: Table, *statements: DDL) -> None:
+    for statement in statements:
+        event.listen(table, "after_create", statement)
+
+
+def attach_change_tracking(
+    beds: Table, plant_families: Table, bed_plant_family: Table
+) -> None:
+    """Create the versioning triggers together with their tables"""
+    _listen(
+        beds,
+        STAMP_GARDEN_ROW_VERSION,
+        RECORD_BED_TOMBSTONES,
+        DDL(
+            "CREATE TRIGGER beds_stamp_row_version BEFORE INSERT OR UPDATE ON beds "
+            "FOR EACH ROW EXECUTE FUNCTION stamp_garden_row_version()"
+        ),
+        # Statement-level with a transition table: one INSERT per DELETE statement
+        DDL(
+            "CREATE TRIGGER beds_record_tombstones AFTER DELETE ON beds "
+            "REFERENCING OLD TABLE AS deleted_beds "
+            "FOR EACH STATEMENT EXECUTE FUNCTION record_bed_tombstones()"
+        ),
+    )
+    _listen(
+        plant_families,
+        STAMP_ROW_VERSION,
+        DDL(
+            "CREATE TRIGGER plant_families_stamp_row_version "
+            "BEFORE INSERT OR UPDATE ON plant_families "
+            "FOR EACH ROW EXECUTE FUNCTION stamp_row_version()"
+        ),
+    )
+    _listen(
+        bed_plant_family,
+        TOUCH_BED_ON_ASSIGNMENT,
+        DDL(
+            "CREATE TRIGGER bed_plant_family_stamp_row_version "
+            "BEFORE INSERT OR UPDATE ON bed_plant_family "
+            "FOR EACH ROW EXECUTE FUNCTION stamp_garden_row_version()"
+        ),
+        DDL(
+            "CREATE TRIGGER bed_plant_family_touch_bed "
+            "AFTER INSERT OR DELETE ON bed_plant_family "
+            "FOR EACH ROW EXECUTE FUNCTION touch_bed_on_assignment()"
+        ),
+    )
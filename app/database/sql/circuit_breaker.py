@@ -0,0 +1,162 @@
+"""Circuit breakers that fail fast while a database is unreachable.
+
+Each shared engine has a breaker fed by its own events: connection errors
+(failed connects and dropped connections) count as failures, and any
+statement that completes resets the count. After ``failure_threshold``
+failures in a row the breaker opens and sessions on the engine are refused
+with DatabaseUnavailable instead of waiting for connect timeouts. A
+background task then probes the database every ``reset_timeout`` seconds
+with ``SELECT 1``: the breaker is half-open during a probe and closes again
+once one succeeds. Requests never act as probes.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database.base.errors import DatabaseUnavailable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed, open and half-open states of one database"""
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], Awaitable[None]],
+        failure_threshold: int = 5,
+        reset_timeout: float = 5.0,
+        probe_timeout: float = 5.0,
+    ):
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_timeout = probe_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._recovery: Optional[asyncio.Task] = None
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe, or 0 if the breaker is closed"""
+        if self.closed:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def check(self) -> None:
+        """Raise DatabaseUnavailable unless the breaker is closed"""
+        if not self.closed:
+            self.rejected += 1
+            raise DatabaseUnavailable(self.name, self.retry_after())
+
+    def record_success(self) -> None:
+        # Only a probe closes an open breaker; statements that were already
+        # running when it opened say nothing about the database now
+        if self.closed:
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or (
+            self.closed and self.failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        if self.closed:
+            self.times_opened += 1
+            logger.warning(
+                "Database %s unavailable, failing fast for %.1fs",
+                self.name,
+                self.reset_timeout,
+            )
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        if self._recovery is None or self._recovery.done():
+            self._recovery = asyncio.get_running_loop().create_task(self._recover())
+
+    async def _recover(self) -> None:
+        while not self.closed:
+            await asyncio.sleep(self.retry_after())
+            self.state = HALF_OPEN
+            try:
+                await asyncio.wait_for(self.probe(), self.probe_timeout)
+            except Exception:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            else:
+                self.state = CLOSED
+                self.failures = 0
+                logger.info("Database %s available again", self.name)
+
+    def stop(self) -> None:
+        if self._recovery is not None:
+            self._recovery.cancel()
+            self._recovery = None
+
+    def stats(self) -> dict:
+        return {
+            "database": self.name,
+            "state": self.state,
+            "failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after": round(self.retry_after(), 1),
+        }
+
+
+async def _ping(engine: AsyncEngine) -> None:
+    async with engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def guard_engine(
+    engine: AsyncEngine,
+    name: str,
+    failure_threshold: int,
+    reset_timeout: float,
+) -> CircuitBreaker:
+    """A breaker fed by the engine's connection errors and statements"""
+    breaker = CircuitBreaker(
+        name,
+        lambda: _ping(engine),
+        failure_threshold=failure_threshold,
+        reset_timeout=reset_timeout,
+    )
+
+    def do_connect(dialect, connection_record, cargs, cparams):
+        # Connect errors never reach handle_error, so connect here to see them
+        try:
+            return dialect.connect(*cargs, **cparams)
+        except Exception:
+            breaker.record_failure()
+            raise
+
+    def after_cursor_execute(*args):
+        breaker.record_success()
+
+    def handle_error(exception_context):
+        # Lost connections count; errors in the SQL are not the database's
+        if exception_context.is_disconnect:
+            breaker.record_failure()
+
+    event.listen(engine.sync_engine, "do_connect", do_connect)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+    return breaker
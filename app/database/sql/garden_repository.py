@@ -0,0 +1,173 @@
+from typing import List, Optional
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+)
+
+from app.database.base.garden import GardenRepository
+from app.models.garden import (
+    Garden,
+    GardenCreate,
+    GardenStats,
+    PlantFamilyBedCount,
+)
+from app.database.sql.change_tracking import CHANGE_LOCK_CLASS
+from app.database.sql.models import (
+    SQLBed,
+    SQLGarden,
+    SQLGardenFamilyStats,
+    SQLGardenStats,
+    bed_plant_family_association,
+)
+from app.database.sql.notifications import change_notification
+from app.database.sql.session_router import (
+    EngineOptions,
+    SessionRouter,
+    to_async_url,
+)
+from app.services.tracing import traced_methods
+
+_assignments = bed_plant_family_association.c
+_garden_id = bindparam("garden_id", type_=Integer)
+_garden_stats = SQLGardenStats.__table__
+_garden_family_stats = SQLGardenFamilyStats.__table__
+
+_SELECT_GARDEN_STATS = select(SQLGardenStats).where(
+    SQLGardenStats.garden_id == _garden_id
+)
+_SELECT_GARDEN_FAMILY_STATS = (
+    select(SQLGardenFamilyStats.plant_family_id, SQLGardenFamilyStats.bed_count)
+    .where(
+        SQLGardenFamilyStats.garden_id == _garden_id,
+        SQLGardenFamilyStats.bed_count > 0,
+    )
+    .order_by(SQLGardenFamilyStats.plant_family_id)
+)
+
+# Full recompute, the fallback for statistics that drifted or predate the
+# triggers. It takes the garden's change lock, which bed writes hold as well.
+_LOCK_GARDEN = select(
+    func.pg_advisory_xact_lock(CHANGE_LOCK_CLASS, _garden_id)
+)
+_DELETE_GARDEN_STATS = delete(SQLGardenStats).where(
+    SQLGardenStats.garden_id == _garden_id
+)
+_DELETE_GARDEN_FAMILY_STATS = delete(SQLGardenFamilyStats).where(
+    SQLGardenFamilyStats.garden_id == _garden_id
+)
+# Core inserts: an ORM insert executed with parameters is run as a bulk insert
+_INSERT_RECOMPUTED_GARDEN_STATS = insert(_garden_stats).from_select(
+    ["garden_id", "bed_count", "total_area", "unassigned_bed_count"],
+    select(
+        _garden_id,
+        func.count(),
+        func.coalesce(func.sum(cast(SQLBed.length, BigInteger) * SQLBed.width), 0),
+        func.count().filter(
+            ~exists().where(
+                _assignments.garden_id == SQLBed.garden_id,
+                _assignments.bed_id == SQLBed.id,
+            )
+        ),
+    ).where(SQLBed.garden_id == _garden_id),
+)
+_INSERT_RECOMPUTED_GARDEN_FAMILY_STATS = insert(_garden_family_stats).from_select(
+    ["garden_id", "plant_family_id", "bed_count"],
+    select(_garden_id, _assignments.plant_family_id, func.count())
+    .where(_assignments.garden_id == _garden_id)
+    .group_by(_assignments.plant_family_id),
+)
+
+
+@traced_methods
+class SQLGardenRepository(GardenRepository):
+    """PostgreSQL implementation of GardenRepository using SQLAlchemy"""
+
+    def __init__(
+        self,
+        database_url: str,
+        replica_urls: Optional[List[str]] = None,
+        read_your_writes_window: float = 0.0,
+        engine_options: Optional[EngineOptions] = None,
+    ):
+        self.database_url = to_async_url(database_url)
+        self.router = SessionRouter(
+            database_url, replica_urls, read_your_writes_window, engine_options
+        )
+
+    def _sql_garden_to_garden(self, sql_garden: SQLGarden) -> Garden:
+        """Convert SQLGarden model to Garden Pydantic model"""
+        return Garden(id=sql_garden.id, name=sql_garden.name)
+
+    async def create_garden(self, garden: GardenCreate) -> Garden:
+        """Create a new garden in PostgreSQL"""
+        async with self.router.write_session() as session:
+            sql_garden = SQLGarden(name=garden.name)
+            session.add(sql_garden)
+            await session.flush()
+            await session.execute(
+                change_notification("garden", "insert", sql_garden.id, [sql_garden.id])
+            )
+            await session.commit()
+            return self._sql_garden_to_garden(sql_garden)
+
+    async def get_garden_by_id(self, garden_id: int) -> Optional[Garden]:
+        """Get a garden by its ID from PostgreSQL"""
+        async with self.router.read_session() as session:
+            result = await session.execute(
+                select(SQLGarden).where(SQLGarden.id == garden_id)
+            )
+            sql_garden = result.scalar_one_or_none()
+            if sql_garden:
+                return self._sql_garden_to_garden(sql_garden)
+            return None
+
+    async def get_all_gardens(self) -> List[Garden]:
+        """Get all gardens from PostgreSQL"""
+        async with self.router.read_session() as session:
+            result = await session.execute(select(SQLGarden).order_by(SQLGarden.id))
+            return [self._sql_garden_to_garden(g) for g in result.scalars().all()]
+
+    async def get_garden_stats(self, garden_id: int) -> GardenStats:
+        """Read the maintained statistics of a garden from PostgreSQL"""
+        async with self.router.read_session() as session:
+            params = {"garden_id": garden_id}
+            stats = (await session.execute(_SELECT_GARDEN_STATS, params)).scalar()
+            families = await session.execute(_SELECT_GARDEN_FAMILY_STATS, params)
+            return GardenStats(
+                garden_id=garden_id,
+                bed_count=stats.bed_count if stats else 0,
+                total_area=stats.total_area if stats else 0,
+                unassigned_bed_count=stats.unassigned_bed_count if stats else 0,
+                beds_per_plant_family=[
+                    PlantFamilyBedCount(
+                        plant_family_id=row.plant_family_id, bed_count=row.bed_count
+                    )
+                    for row in families
+                ],
+            )
+
+    async def recompute_garden_stats(self, garden_id: int) -> GardenStats:
+        """Rebuild the statistics of a garden from its beds in PostgreSQL"""
+        async with self.router.write_session() as session:
+            params = {"garden_id": garden_id}
+            for statement in (
+                _LOCK_GARDEN,
+                _DELETE_GARDEN_STATS,
+                _DELETE_GARDEN_FAMILY_STATS,
+                _INSERT_RECOMPUTED_GARDEN_STATS,
+                _INSERT_RECOMPUTED_GARDEN_FAMILY_STATS,
+            ):
+                await session.execute(statement, params)
+            await session.commit()
+        return await self.get_garden_stats(garden_id)
+
+    async def close(self):
+        """Release the repository's database resources"""
+        await self.router.dispose()
@@ -0,0 +1,148 @@
+"""Per-garden aggregates kept up to date by the write paths.
+
+Statement-level triggers with transition tables fold every insert, update and
+delete of beds and bed assignments into ``garden_stats`` and
+``garden_family_stats`` as one delta per garden, so reading the statistics of a
+garden never scans its beds. Beds are created without plant families, so the
+unassigned bed count moves with the bed count on bed inserts and with bed
+assignments otherwise. Deleting a bed cascades to its assignments first, which
+counts the bed as unassigned again before the bed delete takes it off.
+"""
+from sqlalchemy import DDL, Table, event
+
+# Adds a per-garden delta row to the running totals
+_ADD_GARDEN_STATS = """ON CONFLICT (garden_id) DO UPDATE SET
+            bed_count = s.bed_count + EXCLUDED.bed_count,
+            total_area = s.total_area + EXCLUDED.total_area,
+            unassigned_bed_count = s.unassigned_bed_count + EXCLUDED.unassigned_bed_count"""
+
+APPLY_BED_STATS = DDL(
+    f"""
+CREATE OR REPLACE FUNCTION apply_bed_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT garden_id, count(*), sum(length::bigint * width), count(*)
+        FROM new_beds GROUP BY garden_id
+        {_ADD_GARDEN_STATS};
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT garden_id, -count(*), -sum(length::bigint * width), -count(*)
+        FROM old_beds GROUP BY garden_id
+        {_ADD_GARDEN_STATS};
+    ELSE
+        -- Most bed updates only bump row versions and leave the totals alone
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT garden_id, sum(beds), sum(area), sum(beds)
+        FROM (
+            SELECT garden_id, 1 AS beds, length::bigint * width AS area
+            FROM new_beds
+            UNION ALL
+            SELECT garden_id, -1, -(length::bigint * width) FROM old_beds
+        ) AS delta
+        GROUP BY garden_id
+        HAVING sum(beds) <> 0 OR sum(area) <> 0
+        {_ADD_GARDEN_STATS};
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+)
+
+APPLY_ASSIGNMENT_STATS = DDL(
+    f"""
+CREATE OR REPLACE FUNCTION apply_assignment_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO garden_family_stats AS s (garden_id, plant_family_id, bed_count)
+        SELECT garden_id, plant_family_id, count(*)
+        FROM new_assignments GROUP BY garden_id, plant_family_id
+        ON CONFLICT (garden_id, plant_family_id)
+        DO UPDATE SET bed_count = s.bed_count + EXCLUDED.bed_count;
+        -- Beds whose only assignments are the new ones were unassigned before
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT added.garden_id, 0, 0, -count(*)
+        FROM (
+            SELECT garden_id, bed_id, count(*) AS assignments
+            FROM new_assignments GROUP BY garden_id, bed_id
+        ) AS added
+        WHERE added.assignments = (
+            SELECT count(*) FROM bed_plant_family AS a
+            WHERE a.garden_id = added.garden_id AND a.bed_id = added.bed_id
+        )
+        GROUP BY added.garden_id
+        {_ADD_GARDEN_STATS};
+    ELSE
+        UPDATE garden_family_stats AS s SET bed_count = s.bed_count - removed.beds
+        FROM (
+            SELECT garden_id, plant_family_id, count(*) AS beds
+            FROM old_assignments GROUP BY garden_id, plant_family_id
+        ) AS removed
+        WHERE s.garden_id = removed.garden_id
+            AND s.plant_family_id = removed.plant_family_id;
+        DELETE FROM garden_family_stats AS s
+        USING (SELECT DISTINCT garden_id, plant_family_id FROM old_assignments) AS removed
+        WHERE s.garden_id = removed.garden_id
+            AND s.plant_family_id = removed.plant_family_id
+            AND s.bed_count <= 0;
+        -- Beds left without any assignment become unassigned
+        INSERT INTO garden_stats AS s
+            (garden_id, bed_count, total_area, unassigned_bed_count)
+        SELECT removed.garden_id, 0, 0, count(*)
+        FROM (SELECT DISTINCT garden_id, bed_id FROM old_assignments) AS removed
+        WHERE NOT EXISTS (
+            SELECT 1 FROM bed_plant_family AS a
+            WHERE a.garden_id = removed.garden_id AND a.bed_id = removed.bed_id
+        )
+        GROUP BY removed.garden_id
+        {_ADD_GARDEN_STATS};
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+)
+
+
+def attach_garden_stats(beds: Table, bed_plant_family: Table) -> None:
+    """Create the statistics triggers together with their tables"""
+    for statement in (
+        APPLY_BED_STATS,
+        DDL(
+            "CREATE TRIGGER beds_stats_insert AFTER INSERT ON beds "
+            "REFERENCING NEW TABLE AS new_beds "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_bed_stats()"
+        ),
+        DDL(
+            "CREATE TRIGGER beds_stats_update AFTER UPDATE ON beds "
+            "REFERENCING OLD TABLE AS old_beds NEW TABLE AS new_beds "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_bed_stats()"
+        ),
+        DDL(
+            "CREATE TRIGGER beds_stats_delete AFTER DELETE ON beds "
+            "REFERENCING OLD TABLE AS old_beds "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_bed_stats()"
+        ),
+    ):
+        event.listen(beds, "after_create", statement)
+    for statement in (
+        APPLY_ASSIGNMENT_STATS,
+        DDL(
+            "CREATE TRIGGER bed_plant_family_stats_insert "
+            "AFTER INSERT ON bed_plant_family "
+            "REFERENCING NEW TABLE AS new_assignments "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_assignment_stats()"
+        ),
+        DDL(
+            "CREATE TRIGGER bed_plant_family_stats_delete "
+            "AFTER DELETE ON bed_plant_family "
+            "REFERENCING OLD TABLE AS old_assignments "
+            "FOR EACH STATEMENT EXECUTE FUNCTION apply_assignment_stats()"
+        ),
+    ):
+        event.listen(bed_plant_family, "after_create", statement)
@@ -0,0 +1,273 @@
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import (
+    Integer,
+    Interval,
+    bindparam,
+    case,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.database.base.job import JobRepository
+from app.models.job import UNFINISHED_JOB_STATUSES, Job, JobStatus
+from app.database.sql.models import SQLJob
+from app.database.sql.session_router import (
+    EngineOptions,
+    SessionRouter,
+    to_async_url,
+)
+from app.services.tracing import traced_methods
+
+_unfinished = SQLJob.status.in_(UNFINISHED_JOB_STATUSES)
+
+_INSERT_JOB = (
+    insert(SQLJob)
+    .values(
+        kind=bindparam("kind"),
+        garden_id=bindparam("garden_id"),
+        status="queued",
+        params=bindparam("params"),
+        owner=bindparam("owner"),
+        heartbeat_at=func.now(),
+    )
+    .returning(SQLJob)
+)
+_SELECT_JOB = select(SQLJob).where(SQLJob.id == bindparam("job_id"))
+_SELECT_JOB_PARAMS = select(SQLJob.params).where(SQLJob.id == bindparam("job_id"))
+_START_JOB = (
+    update(SQLJob)
+    .where(
+        SQLJob.id == bindparam("job_id"),
+        _unfinished,
+        SQLJob.cancel_requested.is_(False),
+    )
+    .values(
+        status="running",
+        owner=bindparam("owner"),
+        heartbeat_at=func.now(),
+        started_at=func.coalesce(SQLJob.started_at, func.now()),
+    )
+    .returning(SQLJob.id)
+)
+_UPDATE_PROGRESS = (
+    update(SQLJob)
+    .where(SQLJob.id == bindparam("job_id"), _unfinished)
+    .values(
+        progress_done=bindparam("done"),
+        progress_total=bindparam("total"),
+        heartbeat_at=func.now(),
+    )
+    .returning(SQLJob.cancel_requested)
+)
+_FINISH_JOB = (
+    update(SQLJob)
+    .where(SQLJob.id == bindparam("job_id"), _unfinished)
+    .values(
+        status=bindparam("status"),
+        result=bindparam("result"),
+        error=bindparam("error"),
+        finished_at=func.now(),
+    )
+)
+# Queued jobs have nothing to interrupt and are cancelled immediately
+_REQUEST_CANCEL = (
+    update(SQLJob)
+    .where(SQLJob.id == bindparam("job_id"), _unfinished)
+    .values(
+        cancel_requested=True,
+        status=case((SQLJob.status == "queued", "cancelled"), else_=SQLJob.status),
+        finished_at=case((SQLJob.status == "queued", func.now()), else_=None),
+    )
+    .returning(SQLJob)
+)
+_HEARTBEAT = (
+    update(SQLJob)
+    .where(
+        SQLJob.id == func.any(bindparam("job_ids", type_=ARRAY(Integer))),
+        SQLJob.owner == bindparam("job_owner"),
+        _unfinished,
+    )
+    .values(heartbeat_at=func.now())
+    .returning(SQLJob.id, SQLJob.cancel_requested)
+)
+# SKIP LOCKED lets several workers claim stale jobs at once without overlap
+_stale_jobs = (
+    select(SQLJob.id)
+    .where(
+        _unfinished,
+        (SQLJob.heartbeat_at.is_(None))
+        | (SQLJob.heartbeat_at < func.now() - bindparam("stale", type_=Interval)),
+    )
+    .order_by(SQLJob.id)
+    .with_for_update(skip_locked=True)
+    .scalar_subquery()
+)
+_CLAIM_STALE_JOBS = (
+    update(SQLJob)
+    .where(SQLJob.id.in_(_stale_jobs))
+    .values(owner=bindparam("owner"), heartbeat_at=func.now())
+    .returning(SQLJob)
+)
+_RELEASE_JOBS = (
+    update(SQLJob)
+    .where(SQLJob.owner == bindparam("job_owner"), _unfinished)
+    .values(heartbeat_at=None)
+)
+
+
+@traced_methods
+class SQLJobRepository(JobRepository):
+    """PostgreSQL implementation of JobRepository using SQLAlchemy"""
+
+    def __init__(
+        self,
+        database_url: str,
+        engine_options: Optional[EngineOptions] = None,
+    ):
+        self.database_url = to_async_url(database_url)
+        # Job bookkeeping always goes to the primary and commits right away,
+        # outside the request's unit of work: a job is scheduled as soon as it
+        # is recorded, and its task must already see it
+        self.router = SessionRouter(
+            database_url, engine_options=engine_options, join_unit_of_work=False
+        )
+
+    def _sql_job_to_job(self, sql_job: SQLJob) -> Job:
+        """Convert SQLJob model to Job Pydantic model"""
+        progress = None
+        if sql_job.progress_total:
+            progress = min(1.0, sql_job.progress_done / sql_job.progress_total)
+        elif sql_job.status == "succeeded":
+            progress = 1.0
+        return Job(
+            id=sql_job.id,
+            kind=sql_job.kind,
+            garden_id=sql_job.garden_id,
+            status=sql_job.status,
+            progress=progress,
+            progress_done=sql_job.progress_done,
+            progress_total=sql_job.progress_total,
+            result=sql_job.result,
+            error=sql_job.error,
+            cancel_requested=sql_job.cancel_requested,
+            created_at=sql_job.created_at,
+            started_at=sql_job.started_at,
+            finished_at=sql_job.finished_at,
+        )
+
+    async def create_job(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        owner: str,
+        garden_id: Optional[int] = None,
+    ) -> Job:
+        """Insert a queued job in PostgreSQL with a single INSERT ... RETURNING"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _INSERT_JOB,
+                {
+                    "kind": kind,
+                    "garden_id": garden_id,
+                    "params": params,
+                    "owner": owner,
+                },
+            )
+            sql_job = result.scalar_one()
+            await session.commit()
+            return self._sql_job_to_job(sql_job)
+
+    async def get_job(self, job_id: int) -> Optional[Job]:
+        """Get a job by its ID from PostgreSQL"""
+        async with self.router.read_session() as session:
+            result = await session.execute(_SELECT_JOB, {"job_id": job_id})
+            sql_job = result.scalar_one_or_none()
+            return self._sql_job_to_job(sql_job) if sql_job else None
+
+    async def get_job_params(self, job_id: int) -> Dict[str, Any]:
+        """Get the parameters of a job from PostgreSQL"""
+        async with self.router.read_session() as session:
+            result = await session.execute(_SELECT_JOB_PARAMS, {"job_id": job_id})
+            return result.scalar_one()
+
+    async def start_job(self, job_id: int, owner: str) -> bool:
+        """Mark a job running in PostgreSQL"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _START_JOB, {"job_id": job_id, "owner": owner}
+            )
+            started = result.scalar_one_or_none() is not None
+            await session.commit()
+            return started
+
+    async def update_progress(
+        self, job_id: int, done: int, total: Optional[int]
+    ) -> bool:
+        """Store job progress in PostgreSQL"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _UPDATE_PROGRESS, {"job_id": job_id, "done": done, "total": total}
+            )
+            cancel_requested = bool(result.scalar_one_or_none())
+            await session.commit()
+            return cancel_requested
+
+    async def finish_job(
+        self,
+        job_id: int,
+        status: JobStatus,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Record the outcome of a job in PostgreSQL"""
+        async with self.router.write_session() as session:
+            await session.execute(
+                _FINISH_JOB,
+                {"job_id": job_id, "status": status, "result": result, "error": error},
+            )
+            await session.commit()
+
+    async def request_cancel(self, job_id: int) -> Optional[Job]:
+        """Request cancellation of an unfinished job in PostgreSQL"""
+        async with self.router.write_session() as session:
+            result = await session.execute(_REQUEST_CANCEL, {"job_id": job_id})
+            sql_job = result.scalar_one_or_none()
+            await session.commit()
+            return self._sql_job_to_job(sql_job) if sql_job else None
+
+    async def heartbeat(self, owner: str, job_ids: List[int]) -> List[int]:
+        """Refresh the heartbeat of a worker's jobs in PostgreSQL"""
+        if not job_ids:
+            return []
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _HEARTBEAT, {"job_owner": owner, "job_ids": job_ids}
+            )
+            to_cancel = [row.id for row in result if row.cancel_requested]
+            await session.commit()
+            return to_cancel
+
+    async def claim_stale_jobs(self, owner: str, stale_after: float) -> List[Job]:
+        """Claim unfinished jobs of workers that went away from PostgreSQL"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _CLAIM_STALE_JOBS,
+                {"owner": owner, "stale": timedelta(seconds=stale_after)},
+            )
+            jobs = [self._sql_job_to_job(sql_job) for sql_job in result.scalars()]
+            await session.commit()
+            return jobs
+
+    async def release_jobs(self, owner: str) -> None:
+        """Clear the heartbeat of a worker's unfinished jobs in PostgreSQL"""
+        async with self.router.write_session() as session:
+            await session.execute(_RELEASE_JOBS, {"job_owner": owner})
+            await session.commit()
+
+    async def close(self):
+        """Release the repository's database resources"""
+        await self.router.dispose()
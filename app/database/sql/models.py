@@ -1,32 +1,142 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Table
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
+    CheckConstraint,
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    LargeBinary,
+    PrimaryKeyConstraint,
+    Sequence,
+    SmallInteger,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    event,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import relationship, DeclarativeBase, Mapped, mapped_column
-from typing import List
+from datetime import datetime
+from typing import List, Optional
+
+from app.database.sql.change_tracking import (
+    CHANGE_VERSION_SEQUENCE,
+    attach_change_tracking,
+)
+from app.database.sql.garden_stats import attach_garden_stats
+from app.models.garden import DEFAULT_GARDEN_ID
+
+# Number of hash partitions for the garden-scoped tables
+GARDEN_PARTITIONS = 8
 
 
 class Base(DeclarativeBase):
     pass
 
 
-# Association table for many-to-many relationship between beds and plant families
+# Global, monotonically increasing version stamped on every changed row
+change_version_seq = Sequence(CHANGE_VERSION_SEQUENCE, metadata=Base.metadata)
+
+
+def _row_version_column() -> Column:
+    # Set by triggers on insert and update, see change_tracking
+    return Column(
+        "row_version",
+        BigInteger,
+        server_default=change_version_seq.next_value(),
+        nullable=False,
+    )
+
+
+def _create_hash_partitions(table: Table, modulus: int = GARDEN_PARTITIONS) -> None:
+    """Create the hash partitions of a table partitioned by garden_id"""
+    for remainder in range(modulus):
+        event.listen(
+            table,
+            "after_create",
+            DDL(
+                f"CREATE TABLE {table.name}_p{remainder} PARTITION OF {table.name} "
+                f"FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder})"
+            ),
+        )
+
+
+class SQLGarden(Base):
+    __tablename__ = "gardens"
+
+    id: Mapped[int] = mapped_column(
+        Integer, primary_key=True, index=True, autoincrement=True
+    )
+    name: Mapped[str] = mapped_column(String, nullable=False)
+
+
+# Every database starts with a default garden that unscoped requests use
+event.listen(
+    SQLGarden.__table__,
+    "after_create",
+    DDL(
+        f"INSERT INTO gardens (id, name) VALUES ({DEFAULT_GARDEN_ID}, 'Default garden')"
+    ),
+)
+event.listen(
+    SQLGarden.__table__,
+    "after_create",
+    DDL("SELECT setval(pg_get_serial_sequence('gardens', 'id'), max(id)) FROM gardens"),
+)
+
+
+# Association table for many-to-many relationship between beds and plant families.
+# It is partitioned like beds so that a garden's assignments live next to its beds.
 bed_plant_family_association = Table(
     "bed_plant_family",
     Base.metadata,
-    Column("bed_id", Integer, ForeignKey("beds.id"), primary_key=True),
+    Column("garden_id", Integer, primary_key=True),
+    Column("bed_id", Integer, primary_key=True),
     Column(
         "plant_family_id", Integer, ForeignKey("plant_families.id"), primary_key=True
     ),
+    _row_version_column(),
+    # Deleting beds takes their assignments along; plant families are only
+    # deleted once their assignments are gone
+    ForeignKeyConstraint(
+        ["garden_id", "bed_id"], ["beds.garden_id", "beds.id"], ondelete="CASCADE"
+    ),
+    # Reverse lookups (and the foreign key check when a plant family is
+    # deleted) would otherwise scan every partition
+    Index("ix_bed_plant_family_plant_family_id", "plant_family_id"),
+    postgresql_partition_by="HASH (garden_id)",
 )
+_create_hash_partitions(bed_plant_family_association)
 
 
 class SQLBed(Base):
     __tablename__ = "beds"
-
-    id: Mapped[int] = mapped_column(
-        Integer, primary_key=True, index=True, autoincrement=True
+    __table_args__ = (
+        # Garden first so that garden-scoped lookups use the primary key index
+        PrimaryKeyConstraint("garden_id", "id"),
+        # Bed indexes are numbered per garden
+        UniqueConstraint("garden_id", "index"),
+        # Delta sync reads a garden's changes as one range scan
+        Index("ix_beds_garden_id_row_version", "garden_id", "row_version"),
+        {"postgresql_partition_by": "HASH (garden_id)"},
     )
+
+    garden_id: Mapped[int] = mapped_column(Integer, ForeignKey("gardens.id"))
+    id: Mapped[int] = mapped_column(Integer, index=True, autoincrement=True)
     length: Mapped[int] = mapped_column(Integer, nullable=False)
     width: Mapped[int] = mapped_column(Integer, nullable=False)
-    index: Mapped[int] = mapped_column(Integer, nullable=False, unique=True)
+    index: Mapped[int] = mapped_column(Integer, nullable=False)
+    row_version: Mapped[int] = mapped_column(
+        BigInteger, server_default=change_version_seq.next_value(), nullable=False
+    )
 
     # Many-to-many relationship with plant families
     plant_families: Mapped[List["SQLPlantFamily"]] = relationship(
@@ -34,8 +144,39 @@ class SQLBed(Base):
     )
 
 
+_create_hash_partitions(SQLBed.__table__)
+
+
+# Words of the name weigh more than words of the nutrition requirements
+PLANT_FAMILY_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', name), 'A') || "
+    "setweight(to_tsvector('simple', nutrition_requirements), 'B')"
+)
+
+
 class SQLPlantFamily(Base):
     __tablename__ = "plant_families"
+    __table_args__ = (
+        # Search: prefix matches through the tsvector, fuzzy matches through trigrams
+        Index(
+            "ix_plant_families_search_vector", "search_vector", postgresql_using="gin"
+        ),
+        Index(
+            "ix_plant_families_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_plant_families_nutrition_requirements_trgm",
+            "nutrition_requirements",
+            postgresql_using="gin",
+            postgresql_ops={"nutrition_requirements": "gin_trgm_ops"},
+        ),
+        # The garden version read before serving a cached calendar takes the
+        # highest plant family version from the end of this index
+        Index("ix_plant_families_row_version", "row_version"),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer, primary_key=True, index=True, autoincrement=True
@@ -43,6 +184,16 @@ class SQLPlantFamily(Base):
     name: Mapped[str] = mapped_column(String, nullable=False, unique=True)
     nutrition_requirements: Mapped[str] = mapped_column(Text, nullable=False)
     rotation_time: Mapped[int] = mapped_column(Integer, nullable=False)
+    sowing_start_week: Mapped[Optional[int]] = mapped_column(SmallInteger)
+    sowing_end_week: Mapped[Optional[int]] = mapped_column(SmallInteger)
+    growing_weeks: Mapped[Optional[int]] = mapped_column(SmallInteger)
+    row_version: Mapped[int] = mapped_column(
+        BigInteger, server_default=change_version_seq.next_value(), nullable=False
+    )
+    # Only used in search conditions, never loaded
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(PLANT_FAMILY_SEARCH_VECTOR, persisted=True), deferred=True
+    )
 
     # Many-to-many relationship with beds
     beds: Mapped[List[SQLBed]] = relationship(
@@ -50,3 +201,213 @@ class SQLPlantFamily(Base):
         secondary=bed_plant_family_association,
         back_populates="plant_families",
     )
+
+
+event.listen(
+    SQLPlantFamily.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
+
+
+class SQLPlantFamilyCompatibility(Base):
+    """How well two plant families grow in neighbouring beds.
+
+    Compatibility is symmetric, so each pair is stored once with the lower ID
+    first; a family paired with itself scores neighbouring beds of the same
+    family.
+    """
+
+    __tablename__ = "plant_family_compatibility"
+    __table_args__ = (
+        CheckConstraint("plant_family_id <= other_plant_family_id"),
+    )
+
+    plant_family_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("plant_families.id", ondelete="CASCADE"), primary_key=True
+    )
+    other_plant_family_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("plant_families.id", ondelete="CASCADE"), primary_key=True
+    )
+    score: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+
+class SQLBedTombstone(Base):
+    """Remembers deleted beds so delta sync can report their deletion"""
+
+    __tablename__ = "bed_tombstones"
+    __table_args__ = (
+        Index("ix_bed_tombstones_garden_id_row_version", "garden_id", "row_version"),
+    )
+
+    garden_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bed_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    row_version: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+attach_change_tracking(
+    SQLBed.__table__, SQLPlantFamily.__table__, bed_plant_family_association
+)
+
+
+class SQLGardenStats(Base):
+    """Running totals of a garden's beds, maintained by triggers"""
+
+    __tablename__ = "garden_stats"
+
+    garden_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("gardens.id"), primary_key=True
+    )
+    bed_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total_area: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    unassigned_bed_count: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )
+
+
+class SQLGardenFamilyStats(Base):
+    """Number of beds per plant family in a garden, maintained by triggers"""
+
+    __tablename__ = "garden_family_stats"
+
+    garden_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("gardens.id"), primary_key=True
+    )
+    plant_family_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("plant_families.id"), primary_key=True
+    )
+    bed_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+attach_garden_stats(SQLBed.__table__, bed_plant_family_association)
+
+
+class SQLPlanting(Base):
+    """Something grown at a position of a bed, with the spacing it needs"""
+
+    __tablename__ = "plantings"
+    __table_args__ = (
+        PrimaryKeyConstraint("garden_id", "id"),
+        ForeignKeyConstraint(
+            ["garden_id", "bed_id"], ["beds.garden_id", "beds.id"], ondelete="CASCADE"
+        ),
+        Index("ix_plantings_garden_id_bed_id", "garden_id", "bed_id"),
+        Index("ix_plantings_plant_family_id", "plant_family_id"),
+        {"postgresql_partition_by": "HASH (garden_id)"},
+    )
+
+    garden_id: Mapped[int] = mapped_column(Integer)
+    id: Mapped[int] = mapped_column(Integer, autoincrement=True)
+    bed_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    plant_family_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("plant_families.id", ondelete="SET NULL"), nullable=True
+    )
+    # Position along the bed's length (x) and width (y) in centimeters
+    x: Mapped[int] = mapped_column(Integer, nullable=False)
+    y: Mapped[int] = mapped_column(Integer, nullable=False)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    spacing: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+_create_hash_partitions(SQLPlanting.__table__)
+
+
+class SQLBedOccupancy(Base):
+    """Bit-packed occupancy grid of a bed's plantings, see occupancy_grid.
+
+    Kept with the bed dimensions and cell size it was built for; a grid that
+    no longer matches them is rebuilt from the plantings.
+    """
+
+    __tablename__ = "bed_occupancy"
+    __table_args__ = (
+        PrimaryKeyConstraint("garden_id", "bed_id"),
+        ForeignKeyConstraint(
+            ["garden_id", "bed_id"], ["beds.garden_id", "beds.id"], ondelete="CASCADE"
+        ),
+        {"postgresql_partition_by": "HASH (garden_id)"},
+    )
+
+    garden_id: Mapped[int] = mapped_column(Integer)
+    bed_id: Mapped[int] = mapped_column(Integer)
+    cell_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    width: Mapped[int] = mapped_column(Integer, nullable=False)
+    cells: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+
+_create_hash_partitions(SQLBedOccupancy.__table__)
+
+
+class SQLGardenSnapshot(Base):
+    """Immutable copy of a garden's beds and assignments.
+
+    The rows are stored as parallel integer arrays (one element per bed or
+    assignment), which PostgreSQL keeps compressed out of line and which
+    restore and diff unnest in set-based statements.
+    """
+
+    __tablename__ = "garden_snapshots"
+    __table_args__ = (UniqueConstraint("garden_id", "name"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    garden_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("gardens.id"), nullable=False
+    )
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    bed_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    bed_ids: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    bed_indexes: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    bed_lengths: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    bed_widths: Mapped[List[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    assignment_bed_ids: Mapped[List[int]] = mapped_column(
+        ARRAY(Integer), nullable=False
+    )
+    assignment_plant_family_ids: Mapped[List[int]] = mapped_column(
+        ARRAY(Integer), nullable=False
+    )
+
+
+class SQLJob(Base):
+    """Durable record of a background job"""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers look for unfinished jobs without a live owner
+        Index(
+            "ix_jobs_unfinished",
+            "heartbeat_at",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    garden_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    result: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    progress_done: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    progress_total: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False
+    )
+    # Worker running the job and when it last proved to be alive
+    owner: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql import Select
+
+from app.models.change import ChangeEntity, ChangeEvent, ChangeOperation
+
+logger = logging.getLogger(__name__)
+
+# pg_notify payloads are limited to 8000 bytes; larger batches omit their ids
+MAX_NOTIFIED_IDS = 100
+
+
+def notify_statement(channel: str, payload: str) -> Select:
+    """Build a statement that sends a notification when the transaction commits"""
+    return select(func.pg_notify(channel, payload))
+
+
+class PostgresListener:
+    """Keeps one LISTEN connection per worker and dispatches notifications.
+
+    The connection is opened on first use and re-opened with backoff if it is
+    lost. Callbacks run on the event loop and must not block.
+    """
+
+    def __init__(self, database_url: str, reconnect_delay: float = 1.0):
+        self.database_url = database_url
+        self.reconnect_delay = reconnect_delay
+        self._callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self._reconnect_callbacks: List[Callable[[], None]] = []
+        self._connection: Optional[asyncpg.Connection] = None
+        self._channels: Set[str] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    @property
+    def reconnecting(self) -> bool:
+        return self._reconnect_task is not None and not self._reconnect_task.done()
+
+    def listening(self, channel: str) -> bool:
+        """Whether notifications on a channel are received right now"""
+        return self.connected and channel in self._channels
+
+    def add_callback(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Register a callback for a channel (takes effect on the next start)"""
+        self._callbacks.setdefault(channel, []).append(callback)
+
+    def on_reconnect(self, callback: Callable[[], None]) -> None:
+        """Register a callback for when notifications may have been missed"""
+        self._reconnect_callbacks.append(callback)
+
+    async def ensure_started(self) -> None:
+        """Open the LISTEN connection if it is not open on this event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A connection opened on another (closed) loop cannot be reused
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._connection = None
+            self._reconnect_task = None
+        async with self._lock:
+            if not self.connected:
+                await self._connect()
+                return
+            # Channels registered after the connection was opened
+            for channel in self._callbacks.keys() - self._channels:
+                await self._connection.add_listener(channel, self._dispatch)
+                self._channels.add(channel)
+
+    async def _connect(self) -> None:
+        connection = await asyncpg.connect(self.database_url)
+        channels = set(self._callbacks)
+        for channel in channels:
+            await connection.add_listener(channel, self._dispatch)
+        connection.add_termination_listener(self._on_termination)
+        self._connection, self._channels = connection, channels
+        logger.info("Listening on %s", ", ".join(self._callbacks))
+
+    def _dispatch(self, connection, pid: int, channel: str, payload: str) -> None:
+        for callback in self._callbacks.get(channel, []):
+            try:
+                callback(payload)
+            except Exception:
+                logger.exception("Notification callback for %s failed", channel)
+
+    def _on_termination(self, connection) -> None:
+        if connection is not self._connection:
+            return
+        self._connection = None
+        self._channels = set()
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.reconnect_delay
+        while not self.connected:
+            try:
+                await self._connect()
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("LISTEN reconnect failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        # Anything sent while disconnected is lost
+        for callback in self._reconnect_callbacks:
+            callback()
+
+    async def stop(self) -> None:
+        """Close the LISTEN connection"""
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        connection, self._connection = self._connection, None
+        self._channels = set()
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+        self._loop = None
+
+
+# Channel carrying compact ChangeEvent payloads for the change feed
+CHANGE_CHANNEL = "garden_changes"
+
+# Channel carrying JSON lists of the keys of cached reads made stale by a write
+INVALIDATION_CHANNEL = "cache_invalidations"
+
+# Cache key of the list of all plant families
+PLANT_FAMILIES_KEY = "plant_families"
+
+
+def bed_list_key(garden_id: int) -> str:
+    """Cache key of the list of a garden's beds"""
+    return f"beds:{garden_id}"
+
+
+def invalidated_keys(entity: ChangeEntity, garden_id: Optional[int]) -> List[str]:
+    """Keys of the cached reads that a change of an entity makes stale"""
+    # A garden's beds go with it, so garden changes evict its bed list too
+    if entity in ("bed", "garden") and garden_id is not None:
+        return [bed_list_key(garden_id)]
+    if entity == "plant_family":
+        return [PLANT_FAMILIES_KEY]
+    return []
+
+
+def change_notification(
+    entity: ChangeEntity,
+    op: ChangeOperation,
+    garden_id: Optional[int] = None,
+    ids: Optional[List[int]] = None,
+) -> Select:
+    """Build the pg_notify statement announcing a change to the change feed.
+
+    The same statement publishes the keys of the cached reads the change
+    makes stale, so every write path that feeds the change feed also keeps
+    the workers' read caches coherent.
+    """
+    if ids is not None and len(ids) > MAX_NOTIFIED_IDS:
+        ids = None
+    event = ChangeEvent(entity=entity, op=op, garden_id=garden_id, ids=ids)
+    notifications = [
+        func.pg_notify(CHANGE_CHANNEL, event.model_dump_json(exclude_none=True))
+    ]
+    keys = invalidated_keys(entity, garden_id)
+    if keys:
+        notifications.append(func.pg_notify(INVALIDATION_CHANNEL, json.dumps(keys)))
+        # Collected by the executing session, see on_commit_invalidation
+        return select(*notifications).execution_options(invalidated_keys=keys)
+    return select(*notifications)
+
+
+# Session.info entry collecting the keys of a transaction's notifications
+_INVALIDATED_KEYS = "invalidated_keys"
+
+_commit_callbacks: List[Callable[[str], None]] = []
+
+
+def on_commit_invalidation(callback: Callable[[str], None]) -> None:
+    """Register a callback for each key a session of this worker committed.
+
+    It runs right after the commit, so the writing worker does not wait for
+    its own notification to come back before its reads see the write.
+    """
+    _commit_callbacks.append(callback)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_invalidated_keys(state: ORMExecuteState) -> None:
+    keys = state.execution_options.get(_INVALIDATED_KEYS)
+    if keys:
+        state.session.info.setdefault(_INVALIDATED_KEYS, set()).update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_keys(session: Session) -> None:
+    for key in session.info.pop(_INVALIDATED_KEYS, ()):
+        for callback in _commit_callbacks:
+            try:
+                callback(key)
+            except Exception:
+                logger.exception("Commit invalidation callback for %s failed", key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_invalidated_keys(session: Session) -> None:
+    session.info.pop(_INVALIDATED_KEYS, None)
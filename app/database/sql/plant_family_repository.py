@@ -1,22 +1,215 @@
-from typing import List, Optional
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
+from collections import defaultdict
+from typing import AsyncIterable, Dict, List, Optional, Tuple
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Integer,
+    MetaData,
+    SmallInteger,
+    String,
+    Table,
+    Text,
+    bindparam,
+    delete,
+    func,
+    literal_column,
+    not_,
+    select,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, distinct_on, insert
+from sqlalchemy.schema import CreateTable
 
+from app.database.base.errors import VersionConflict
 from app.database.base.plant_family import PlantFamilyRepository
+from app.database.prefix_trie import search_tokens
+from app.models.companion import PlantFamilyCompatibility
 from app.models.plant_family import PlantFamily, PlantFamilyCreate
-from app.database.sql.models import SQLPlantFamily
+from app.database.sql.models import (
+    SQLPlantFamily,
+    SQLPlantFamilyCompatibility,
+    bed_plant_family_association,
+)
+from app.database.sql.notifications import change_notification
+from app.database.sql.session_router import (
+    EngineOptions,
+    SessionRouter,
+    to_async_url,
+)
+from app.services.tracing import traced_methods
 
+# Hot-path statements are built once; their parameters are bound per call so
+# SQLAlchemy's compiled cache and asyncpg's prepared statements are reused.
+# The beds of a family are never part of the PlantFamily model, so they are
+# not loaded.
+_SELECT_PLANT_FAMILY_BY_ID = select(SQLPlantFamily).where(
+    SQLPlantFamily.id == bindparam("plant_family_id")
+)
+_SELECT_ALL_PLANT_FAMILIES = select(SQLPlantFamily).order_by(SQLPlantFamily.name)
+_SELECT_PLANT_FAMILY_VERSION = select(SQLPlantFamily.row_version).where(
+    SQLPlantFamily.id == bindparam("plant_family_id")
+)
+_DELETE_PLANT_FAMILY = (
+    delete(SQLPlantFamily)
+    .where(SQLPlantFamily.id == bindparam("plant_family_id"))
+    .execution_options(synchronize_session=False)
+)
+# The version is compared in the statement, without a prior read or row lock
+_DELETE_PLANT_FAMILY_IF_VERSION = _DELETE_PLANT_FAMILY.where(
+    SQLPlantFamily.row_version == bindparam("expected_version")
+)
+# Assignments keep a plant family from being deleted, so they go first. The
+# beds they leave are returned for the change notifications.
+_assignments = bed_plant_family_association
+_DELETE_PLANT_FAMILY_ASSIGNMENTS = (
+    delete(_assignments)
+    .where(_assignments.c.plant_family_id == bindparam("plant_family_id"))
+    .returning(_assignments.c.garden_id, _assignments.c.bed_id)
+)
+_plant_families = SQLPlantFamily.__table__
+# Returns the new row with its generated ID and version in the same round trip
+_INSERT_PLANT_FAMILY = (
+    insert(_plant_families)
+    .values(
+        name=bindparam("new_name"),
+        nutrition_requirements=bindparam("new_nutrition_requirements"),
+        rotation_time=bindparam("new_rotation_time"),
+        sowing_start_week=bindparam("new_sowing_start_week"),
+        sowing_end_week=bindparam("new_sowing_end_week"),
+        growing_weeks=bindparam("new_growing_weeks"),
+    )
+    .returning(
+        _plant_families.c.id,
+        _plant_families.c.name,
+        _plant_families.c.nutrition_requirements,
+        _plant_families.c.rotation_time,
+        _plant_families.c.sowing_start_week,
+        _plant_families.c.sowing_end_week,
+        _plant_families.c.growing_weeks,
+        _plant_families.c.row_version,
+    )
+)
 
+# Type-ahead search: every query word prefixes a word of the family (tsvector),
+# or the query is a close fuzzy match of a word sequence (trigrams, catches
+# typos). Both conditions are served by GIN indexes and combined as a BitmapOr.
+_search_query = func.to_tsquery("simple", bindparam("tsquery", type_=String))
+_search_text = bindparam("q", type_=String)
+_search_rank = func.ts_rank(SQLPlantFamily.search_vector, _search_query) + (
+    func.word_similarity(_search_text, SQLPlantFamily.name)
+)
+_SEARCH_PLANT_FAMILIES = (
+    select(SQLPlantFamily)
+    .where(
+        SQLPlantFamily.search_vector.bool_op("@@")(_search_query)
+        | _search_text.bool_op("<%")(SQLPlantFamily.name)
+        | _search_text.bool_op("<%")(SQLPlantFamily.nutrition_requirements)
+    )
+    .order_by(_search_rank.desc(), SQLPlantFamily.name)
+    .limit(bindparam("limit"))
+)
+
+# Imports are COPYed into a per-transaction staging table and merged into
+# plant_families with one upsert per batch
+_import_staging = Table(
+    "plant_families_import",
+    MetaData(),
+    Column("ordinal", BigInteger),
+    Column("name", Text),
+    Column("nutrition_requirements", Text),
+    Column("rotation_time", Integer),
+    Column("sowing_start_week", SmallInteger),
+    Column("sowing_end_week", SmallInteger),
+    Column("growing_weeks", SmallInteger),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+_IMPORT_COLUMNS = [
+    "name",
+    "nutrition_requirements",
+    "rotation_time",
+    "sowing_start_week",
+    "sowing_end_week",
+    "growing_weeks",
+]
+# An imported record replaces every column of a family matched by name
+_UPDATED_COLUMNS = _IMPORT_COLUMNS[1:]
+_CREATE_IMPORT_STAGING = CreateTable(_import_staging)
+_CLEAR_IMPORT_STAGING = text(f"TRUNCATE {_import_staging.name}")
+# ON CONFLICT may touch a row only once per statement: the last record wins
+_latest_staged = (
+    select(*(_import_staging.c[column] for column in _IMPORT_COLUMNS))
+    .ext(distinct_on(_import_staging.c.name))
+    .order_by(_import_staging.c.name, _import_staging.c.ordinal.desc())
+)
+_upsert = insert(SQLPlantFamily.__table__).from_select(_IMPORT_COLUMNS, _latest_staged)
+_upserted = (
+    _upsert.on_conflict_do_update(
+        index_elements=["name"],
+        set_={column: _upsert.excluded[column] for column in _UPDATED_COLUMNS},
+        # Unchanged families keep their row version
+        where=tuple_(
+            *(SQLPlantFamily.__table__.c[column] for column in _UPDATED_COLUMNS)
+        ).is_distinct_from(
+            tuple_(*(_upsert.excluded[column] for column in _UPDATED_COLUMNS))
+        ),
+    )
+    # xmax is 0 for freshly inserted rows
+    .returning(literal_column("xmax = 0", Boolean).label("inserted"))
+    .cte("upserted")
+)
+_UPSERT_STAGED_PLANT_FAMILIES = select(
+    func.count().filter(_upserted.c.inserted).label("inserted"),
+    func.count().filter(not_(_upserted.c.inserted)).label("updated"),
+)
+
+
+_compatibility = SQLPlantFamilyCompatibility.__table__
+_SELECT_COMPATIBILITY = select(_compatibility).order_by(
+    _compatibility.c.plant_family_id, _compatibility.c.other_plant_family_id
+)
+# All scores arrive as three arrays and are upserted in one statement
+_new_scores = (
+    func.unnest(
+        bindparam("plant_family_ids", type_=ARRAY(Integer)),
+        bindparam("other_plant_family_ids", type_=ARRAY(Integer)),
+        bindparam("scores", type_=ARRAY(Integer)),
+    )
+    .table_valued("plant_family_id", "other_plant_family_id", "score")
+    .render_derived(name="v")
+)
+_insert_scores = insert(_compatibility).from_select(
+    ["plant_family_id", "other_plant_family_id", "score"],
+    select(
+        _new_scores.c.plant_family_id,
+        _new_scores.c.other_plant_family_id,
+        _new_scores.c.score,
+    ),
+)
+_UPSERT_COMPATIBILITY = _insert_scores.on_conflict_do_update(
+    index_elements=["plant_family_id", "other_plant_family_id"],
+    set_={"score": _insert_scores.excluded.score},
+)
+
+
+@traced_methods
 class SQLPlantFamilyRepository(PlantFamilyRepository):
     """PostgreSQL implementation of PlantFamilyRepository using SQLAlchemy"""
 
-    def __init__(self, database_url: str):
-        self.database_url = database_url.replace(
-            "postgresql://", "postgresql+asyncpg://"
+    def __init__(
+        self,
+        database_url: str,
+        replica_urls: Optional[List[str]] = None,
+        read_your_writes_window: float = 0.0,
+        engine_options: Optional[EngineOptions] = None,
+    ):
+        self.database_url = to_async_url(database_url)
+        # Reads are load-balanced across replicas, writes go to the primary
+        self.router = SessionRouter(
+            database_url, replica_urls, read_your_writes_window, engine_options
         )
-        self.engine = create_async_engine(self.database_url, echo=False)
-        self.async_session = async_sessionmaker(self.engine, expire_on_commit=False)
 
     def _sql_plant_family_to_plant_family(self, sql_pf: SQLPlantFamily) -> PlantFamily:
         """Convert SQLPlantFamily model to PlantFamily Pydantic model"""
@@ -25,33 +218,41 @@ class SQLPlantFamilyRepository(PlantFamilyRepository):
             name=sql_pf.name,
             nutrition_requirements=sql_pf.nutrition_requirements,
             rotation_time=sql_pf.rotation_time,
+            sowing_start_week=sql_pf.sowing_start_week,
+            sowing_end_week=sql_pf.sowing_end_week,
+            growing_weeks=sql_pf.growing_weeks,
+            version=sql_pf.row_version,
         )
 
     async def create_plant_family(self, plant_family: PlantFamilyCreate) -> PlantFamily:
-        """Create a new plant family in PostgreSQL"""
-        async with self.async_session() as session:
-            # Create new plant family (ID will be auto-generated by PostgreSQL)
-            sql_pf = SQLPlantFamily(
-                name=plant_family.name,
-                nutrition_requirements=plant_family.nutrition_requirements,
-                rotation_time=plant_family.rotation_time,
+        """Create a new plant family in PostgreSQL with a single INSERT ... RETURNING"""
+        async with self.router.write_session() as session:
+            # ID and version are generated by PostgreSQL and returned
+            result = await session.execute(
+                _INSERT_PLANT_FAMILY,
+                {
+                    "new_name": plant_family.name,
+                    "new_nutrition_requirements": plant_family.nutrition_requirements,
+                    "new_rotation_time": plant_family.rotation_time,
+                    "new_sowing_start_week": plant_family.sowing_start_week,
+                    "new_sowing_end_week": plant_family.sowing_end_week,
+                    "new_growing_weeks": plant_family.growing_weeks,
+                },
+            )
+            created = self._sql_plant_family_to_plant_family(result.one())
+            await session.execute(
+                change_notification("plant_family", "insert", ids=[created.id])
             )
-
-            session.add(sql_pf)
             await session.commit()
-            await session.refresh(sql_pf)
-
-            return self._sql_plant_family_to_plant_family(sql_pf)
+            return created
 
     async def get_plant_family_by_id(
         self, plant_family_id: int
     ) -> Optional[PlantFamily]:
         """Get a plant family by its ID from PostgreSQL"""
-        async with self.async_session() as session:
+        async with self.router.read_session() as session:
             result = await session.execute(
-                select(SQLPlantFamily)
-                .options(selectinload(SQLPlantFamily.beds))
-                .where(SQLPlantFamily.id == plant_family_id)
+                _SELECT_PLANT_FAMILY_BY_ID, {"plant_family_id": plant_family_id}
             )
             sql_pf = result.scalar_one_or_none()
             if sql_pf:
@@ -60,26 +261,144 @@ class SQLPlantFamilyRepository(PlantFamilyRepository):
 
     async def get_all_plant_families(self) -> List[PlantFamily]:
         """Get all plant families from PostgreSQL"""
-        async with self.async_session() as session:
-            result = await session.execute(
-                select(SQLPlantFamily)
-                .options(selectinload(SQLPlantFamily.beds))
-                .order_by(SQLPlantFamily.name)
-            )
+        async with self.router.read_session() as session:
+            result = await session.execute(_SELECT_ALL_PLANT_FAMILIES)
             sql_pfs = result.scalars().all()
             return [
                 self._sql_plant_family_to_plant_family(sql_pf) for sql_pf in sql_pfs
             ]
 
-    async def delete_plant_family(self, plant_family_id: int) -> bool:
+    async def delete_plant_family(
+        self, plant_family_id: int, expected_version: Optional[int] = None
+    ) -> bool:
         """Delete a plant family from PostgreSQL"""
-        async with self.async_session() as session:
-            result = await session.execute(
-                delete(SQLPlantFamily).where(SQLPlantFamily.id == plant_family_id)
+        params = {"plant_family_id": plant_family_id}
+        statement = _DELETE_PLANT_FAMILY
+        if expected_version is not None:
+            statement = _DELETE_PLANT_FAMILY_IF_VERSION
+            params["expected_version"] = expected_version
+        async with self.router.write_session() as session:
+            # A version conflict raises below and rolls these back
+            unassigned = await session.execute(
+                _DELETE_PLANT_FAMILY_ASSIGNMENTS, {"plant_family_id": plant_family_id}
             )
+            beds_by_garden: Dict[int, List[int]] = defaultdict(list)
+            for garden_id, bed_id in unassigned:
+                beds_by_garden[garden_id].append(bed_id)
+            result = await session.execute(statement, params)
+            if result.rowcount == 0 and expected_version is not None:
+                # Tell a version conflict from a missing plant family
+                current_version = (
+                    await session.execute(
+                        _SELECT_PLANT_FAMILY_VERSION,
+                        {"plant_family_id": plant_family_id},
+                    )
+                ).scalar_one_or_none()
+                if current_version is not None:
+                    raise VersionConflict(
+                        "Plant family", plant_family_id, current_version
+                    )
+            if result.rowcount > 0:
+                await session.execute(
+                    change_notification("plant_family", "delete", ids=[plant_family_id])
+                )
+            for garden_id, bed_ids in beds_by_garden.items():
+                await session.execute(
+                    change_notification("bed", "update", garden_id, bed_ids)
+                )
             await session.commit()
             return result.rowcount > 0
 
+    async def search_plant_families(self, query: str, limit: int) -> List[PlantFamily]:
+        """Search plant families in PostgreSQL, best matches first"""
+        tokens = search_tokens(query)
+        if not tokens:
+            return []
+        if self.router.primary_engine.dialect.name != "postgresql":
+            return await super().search_plant_families(query, limit)
+        async with self.router.read_session() as session:
+            result = await session.execute(
+                _SEARCH_PLANT_FAMILIES,
+                {
+                    "q": " ".join(tokens),
+                    "tsquery": " & ".join(f"{token}:*" for token in tokens),
+                    "limit": limit,
+                },
+            )
+            return [
+                self._sql_plant_family_to_plant_family(sql_pf)
+                for sql_pf in result.scalars().all()
+            ]
+
+    async def import_plant_families(
+        self, batches: AsyncIterable[List[PlantFamilyCreate]]
+    ) -> Tuple[int, int]:
+        """COPY batches into a staging table and upsert them into PostgreSQL"""
+        inserted = updated = 0
+        async with self.router.write_session() as session:
+            connection = await session.connection()
+            await connection.execute(_CREATE_IMPORT_STAGING)
+            raw_connection = await connection.get_raw_connection()
+            # COPY needs the asyncpg connection behind the session's transaction
+            driver_connection = raw_connection.driver_connection
+            async for batch in batches:
+                await driver_connection.copy_records_to_table(
+                    _import_staging.name,
+                    records=(
+                        (
+                            ordinal,
+                            pf.name,
+                            pf.nutrition_requirements,
+                            pf.rotation_time,
+                            pf.sowing_start_week,
+                            pf.sowing_end_week,
+                            pf.growing_weeks,
+                        )
+                        for ordinal, pf in enumerate(batch)
+                    ),
+                    columns=["ordinal", *_IMPORT_COLUMNS],
+                )
+                counts = (await connection.execute(_UPSERT_STAGED_PLANT_FAMILIES)).one()
+                await connection.execute(_CLEAR_IMPORT_STAGING)
+                inserted += counts.inserted
+                updated += counts.updated
+            if inserted or updated:
+                await session.execute(change_notification("plant_family", "update"))
+            await session.commit()
+        return inserted, updated
+
+    async def get_compatibility_scores(self) -> List[PlantFamilyCompatibility]:
+        """Get all plant family compatibility scores from PostgreSQL"""
+        async with self.router.read_session() as session:
+            result = await session.execute(_SELECT_COMPATIBILITY)
+            return [
+                PlantFamilyCompatibility(
+                    plant_family_id=row.plant_family_id,
+                    other_plant_family_id=row.other_plant_family_id,
+                    score=row.score,
+                )
+                for row in result
+            ]
+
+    async def set_compatibility_scores(
+        self, scores: List[PlantFamilyCompatibility]
+    ) -> None:
+        """Upsert compatibility scores in PostgreSQL with a single statement"""
+        if not scores:
+            return
+        async with self.router.write_session() as session:
+            await session.execute(
+                _UPSERT_COMPATIBILITY,
+                {
+                    "plant_family_ids": [pair.plant_family_id for pair in scores],
+                    "other_plant_family_ids": [
+                        pair.other_plant_family_id for pair in scores
+                    ],
+                    "scores": [pair.score for pair in scores],
+                },
+            )
+            await session.commit()
+
     async def close(self):
-        """Close the database connection"""
-        await self.engine.dispose()
+        """Release the repository's database resources"""
+        await self.router.dispose()
@@ -0,0 +1,242 @@
+from typing import List, Optional
+from sqlalchemy import Integer, bindparam, delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database.base.errors import PlantingConflict
+from app.database.base.planting import PlantingRepository
+from app.database.occupancy_grid import OccupancyGrid
+from app.models.planting import Planting, PlantingCreate
+from app.database.sql.models import SQLBed, SQLBedOccupancy, SQLPlanting
+from app.database.sql.session_router import (
+    EngineOptions,
+    SessionRouter,
+    to_async_url,
+)
+from app.services.tracing import traced_methods
+
+_beds = SQLBed.__table__
+_plantings = SQLPlanting.__table__
+_occupancy = SQLBedOccupancy.__table__
+_garden_id = bindparam("garden_id", type_=Integer)
+_bed_id = bindparam("bed_id", type_=Integer)
+
+_SELECT_BED_DIMENSIONS = select(_beds.c.length, _beds.c.width).where(
+    _beds.c.garden_id == _garden_id, _beds.c.id == _bed_id
+)
+# Planting writes of a bed are serialized on the bed row, which also keeps
+# the bed from being resized while its grid is updated
+_LOCK_BED = _SELECT_BED_DIMENSIONS.with_for_update()
+_SELECT_OCCUPANCY = select(
+    _occupancy.c.cell_size,
+    _occupancy.c.length,
+    _occupancy.c.width,
+    _occupancy.c.cells,
+).where(_occupancy.c.garden_id == _garden_id, _occupancy.c.bed_id == _bed_id)
+_planting_columns = (
+    _plantings.c.id,
+    _plantings.c.bed_id,
+    _plantings.c.plant_family_id,
+    _plantings.c.x,
+    _plantings.c.y,
+    _plantings.c.length,
+    _plantings.c.width,
+    _plantings.c.spacing,
+)
+_SELECT_PLANTINGS = (
+    select(*_planting_columns)
+    .where(_plantings.c.garden_id == _garden_id, _plantings.c.bed_id == _bed_id)
+    .order_by(_plantings.c.id)
+)
+_INSERT_PLANTING = (
+    insert(_plantings)
+    .values(
+        garden_id=bindparam("new_garden_id"),
+        bed_id=bindparam("new_bed_id"),
+        plant_family_id=bindparam("new_plant_family_id"),
+        x=bindparam("new_x"),
+        y=bindparam("new_y"),
+        length=bindparam("new_length"),
+        width=bindparam("new_width"),
+        spacing=bindparam("new_spacing"),
+    )
+    .returning(*_planting_columns)
+)
+_DELETE_PLANTING = delete(_plantings).where(
+    _plantings.c.garden_id == _garden_id,
+    _plantings.c.bed_id == _bed_id,
+    _plantings.c.id == bindparam("planting_id", type_=Integer),
+)
+_upsert_occupancy = insert(_occupancy).values(
+    garden_id=bindparam("new_garden_id"),
+    bed_id=bindparam("new_bed_id"),
+    cell_size=bindparam("new_cell_size"),
+    length=bindparam("new_length"),
+    width=bindparam("new_width"),
+    cells=bindparam("new_cells"),
+)
+_UPSERT_OCCUPANCY = _upsert_occupancy.on_conflict_do_update(
+    index_elements=["garden_id", "bed_id"],
+    set_={
+        "cell_size": _upsert_occupancy.excluded.cell_size,
+        "length": _upsert_occupancy.excluded.length,
+        "width": _upsert_occupancy.excluded.width,
+        "cells": _upsert_occupancy.excluded.cells,
+    },
+)
+
+
+@traced_methods
+class SQLPlantingRepository(PlantingRepository):
+    """PostgreSQL implementation of PlantingRepository using SQLAlchemy"""
+
+    def __init__(
+        self,
+        database_url: str,
+        replica_urls: Optional[List[str]] = None,
+        read_your_writes_window: float = 0.0,
+        engine_options: Optional[EngineOptions] = None,
+    ):
+        self.database_url = to_async_url(database_url)
+        self.router = SessionRouter(
+            database_url, replica_urls, read_your_writes_window, engine_options
+        )
+
+    def _row_to_planting(self, row) -> Planting:
+        """Convert a planting row to Planting Pydantic model"""
+        return Planting(
+            id=row.id,
+            bed_id=row.bed_id,
+            plant_family_id=row.plant_family_id,
+            x=row.x,
+            y=row.y,
+            length=row.length,
+            width=row.width,
+            spacing=row.spacing,
+        )
+
+    async def _rebuild_grid(self, session, params, bed, cell_size) -> OccupancyGrid:
+        """Occupy the blocks of all plantings of a bed on an empty grid"""
+        grid = OccupancyGrid(bed.length, bed.width, cell_size)
+        for row in await session.execute(_SELECT_PLANTINGS, params):
+            # Plantings outside a bed that was made smaller keep what is left
+            grid.occupy(
+                grid.block(row.x, row.y, row.length, row.width, row.spacing, clip=True)
+            )
+        return grid
+
+    async def _load_grid(self, session, params, bed, cell_size) -> OccupancyGrid:
+        """The stored grid, or a rebuilt one if it is missing or outdated"""
+        row = (await session.execute(_SELECT_OCCUPANCY, params)).one_or_none()
+        if row is not None and (row.cell_size, row.length, row.width) == (
+            cell_size,
+            bed.length,
+            bed.width,
+        ):
+            return OccupancyGrid.from_bytes(row.cells, bed.length, bed.width, cell_size)
+        return await self._rebuild_grid(session, params, bed, cell_size)
+
+    async def _store_grid(self, session, params, grid: OccupancyGrid) -> None:
+        await session.execute(
+            _UPSERT_OCCUPANCY,
+            {
+                "new_garden_id": params["garden_id"],
+                "new_bed_id": params["bed_id"],
+                "new_cell_size": grid.cell_size,
+                "new_length": grid.length,
+                "new_width": grid.width,
+                "new_cells": grid.to_bytes(),
+            },
+        )
+
+    async def get_plantings(
+        self, bed_id: int, garden_id: int
+    ) -> Optional[List[Planting]]:
+        """Get the plantings of a bed from PostgreSQL"""
+        params = {"garden_id": garden_id, "bed_id": bed_id}
+        async with self.router.read_session() as session:
+            bed = (await session.execute(_SELECT_BED_DIMENSIONS, params)).one_or_none()
+            if bed is None:
+                return None
+            result = await session.execute(_SELECT_PLANTINGS, params)
+            return [self._row_to_planting(row) for row in result]
+
+    async def create_planting(
+        self, bed_id: int, planting: PlantingCreate, garden_id: int, cell_size: int
+    ) -> Optional[Planting]:
+        """Check the bed's grid, insert the planting and store the grid"""
+        params = {"garden_id": garden_id, "bed_id": bed_id}
+        async with self.router.write_session() as session:
+            bed = (await session.execute(_LOCK_BED, params)).one_or_none()
+            if bed is None:
+                return None
+            grid = await self._load_grid(session, params, bed, cell_size)
+            try:
+                block = grid.block(
+                    planting.x,
+                    planting.y,
+                    planting.length,
+                    planting.width,
+                    planting.spacing,
+                )
+            except ValueError as e:
+                raise PlantingConflict(bed_id, str(e))
+            if not grid.is_free(block):
+                raise PlantingConflict(
+                    bed_id,
+                    f"The planting at ({planting.x}, {planting.y}) overlaps another "
+                    f"planting of bed {bed_id} or its spacing",
+                )
+            result = await session.execute(
+                _INSERT_PLANTING,
+                {
+                    "new_garden_id": garden_id,
+                    "new_bed_id": bed_id,
+                    "new_plant_family_id": planting.plant_family_id,
+                    "new_x": planting.x,
+                    "new_y": planting.y,
+                    "new_length": planting.length,
+                    "new_width": planting.width,
+                    "new_spacing": planting.spacing,
+                },
+            )
+            created = self._row_to_planting(result.one())
+            grid.occupy(block)
+            await self._store_grid(session, params, grid)
+            await session.commit()
+            return created
+
+    async def delete_planting(
+        self, planting_id: int, bed_id: int, garden_id: int, cell_size: int
+    ) -> bool:
+        """Delete a planting and rebuild the bed's grid from the others"""
+        params = {"garden_id": garden_id, "bed_id": bed_id}
+        async with self.router.write_session() as session:
+            bed = (await session.execute(_LOCK_BED, params)).one_or_none()
+            if bed is None:
+                return False
+            result = await session.execute(
+                _DELETE_PLANTING, {**params, "planting_id": planting_id}
+            )
+            if result.rowcount == 0:
+                return False
+            # Blocks of a resized bed may overlap; clearing one could free
+            # cells another planting still needs
+            grid = await self._rebuild_grid(session, params, bed, cell_size)
+            await self._store_grid(session, params, grid)
+            await session.commit()
+            return True
+
+    async def get_occupancy(
+        self, bed_id: int, garden_id: int, cell_size: int
+    ) -> Optional[OccupancyGrid]:
+        """Get the occupancy grid of a bed from PostgreSQL"""
+        params = {"garden_id": garden_id, "bed_id": bed_id}
+        async with self.router.read_session() as session:
+            bed = (await session.execute(_SELECT_BED_DIMENSIONS, params)).one_or_none()
+            if bed is None:
+                return None
+            return await self._load_grid(session, params, bed, cell_size)
+
+    async def close(self):
+        """Release the repository's database resources"""
+        await self.router.dispose()
@@ -0,0 +1,132 @@
+"""Capture the statements a request emits and compare their plans to baselines.
+
+Used by ``scripts/explain_plans.py``: statements executed while a
+``StatementCapture`` is active are recorded with their parameters, explained
+with ``EXPLAIN (FORMAT JSON)`` and reduced to a plan shape. Shapes are
+compared per route with a checked-in baseline, flagging more statements,
+new sequential scans and estimated costs above a tolerance.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Only these statements can be explained; DDL, TRUNCATE and COPY are skipped
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+@dataclass
+class CapturedStatement:
+    sql: str
+    parameters: Sequence[Any]
+
+
+class StatementCapture:
+    """Records every statement executed on any engine while active"""
+
+    def __init__(self):
+        self.statements: List[CapturedStatement] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            # Plans do not depend on the number of parameter sets
+            parameters = parameters[0] if parameters else ()
+        self.statements.append(CapturedStatement(statement, tuple(parameters or ())))
+
+    def __enter__(self) -> "StatementCapture":
+        event.listen(Engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(Engine, "before_cursor_execute", self._record)
+
+    def take(self) -> List[CapturedStatement]:
+        """Return the statements recorded so far and start over"""
+        statements, self.statements = self.statements, []
+        return statements
+
+
+def is_explainable(sql: str) -> bool:
+    return sql.lstrip().lower().startswith(_EXPLAINABLE)
+
+
+@dataclass
+class PlanSummary:
+    """What a plan regression check looks at"""
+
+    sql: str
+    shape: List[str] = field(default_factory=list)
+    seq_scans: List[str] = field(default_factory=list)
+    total_cost: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sql": self.sql,
+            "shape": self.shape,
+            "seq_scans": self.seq_scans,
+            "total_cost": self.total_cost,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanSummary":
+        return cls(**data)
+
+
+def _walk(node: Dict[str, Any], depth: int, summary: PlanSummary) -> None:
+    label = node["Node Type"]
+    relation = node.get("Relation Name")
+    if relation:
+        label += f" on {relation}"
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    summary.shape.append("  " * depth + label)
+    if node["Node Type"] == "Seq Scan" and relation:
+        summary.seq_scans.append(relation)
+    for child in node.get("Plans", []):
+        _walk(child, depth + 1, summary)
+
+
+def summarize_plan(sql: str, explain_output: List[Dict[str, Any]]) -> PlanSummary:
+    """Reduce the output of EXPLAIN (FORMAT JSON) to its shape and cost"""
+    plan = explain_output[0]["Plan"]
+    summary = PlanSummary(sql=sql, total_cost=plan["Total Cost"])
+    _walk(plan, 0, summary)
+    # Partitioned tables are scanned per partition; report each table once
+    summary.seq_scans = sorted(set(summary.seq_scans))
+    return summary
+
+
+def _partition_parent(relation: str) -> str:
+    """beds_p3 -> beds, so that partition counts do not matter"""
+    base, _, suffix = relation.rpartition("_p")
+    return base if base and suffix.isdigit() else relation
+
+
+def compare_route(
+    baseline: Optional[List[PlanSummary]],
+    current: List[PlanSummary],
+    cost_tolerance: float = 0.5,
+) -> List[str]:
+    """Describe the regressions of a route's statements against its baseline"""
+    if baseline is None:
+        return ["no baseline recorded"]
+    problems = []
+    if len(current) > len(baseline):
+        problems.append(f"{len(current)} statements, baseline {len(baseline)}")
+    by_sql = {summary.sql: summary for summary in baseline}
+    for summary in current:
+        before = by_sql.get(summary.sql)
+        if before is None:
+            problems.append(f"new statement: {summary.sql[:120]}")
+            continue
+        known = {_partition_parent(relation) for relation in before.seq_scans}
+        for relation in summary.seq_scans:
+            if _partition_parent(relation) not in known:
+                problems.append(f"new seq scan on {relation}: {summary.sql[:120]}")
+        if summary.total_cost > before.total_cost * (1 + cost_tolerance) + 1:
+            problems.append(
+                f"estimated cost {summary.total_cost:.0f}, baseline "
+                f"{before.total_cost:.0f}: {summary.sql[:120]}"
+            )
+    return problems
@@ -0,0 +1,383 @@
+import asyncio
+import random
+import time
+import weakref
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.database.sql.circuit_breaker import CircuitBreaker, guard_engine
+
+# Identifies the client of the current request for read-your-writes pinning
+current_client_id: ContextVar[Optional[str]] = ContextVar(
+    "current_client_id", default=None
+)
+
+# The unit of work of the current request, see unit_of_work()
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar(
+    "current_unit_of_work", default=None
+)
+_unit_of_work_stats = {"started": 0, "sessions": 0, "rolled_back": 0}
+
+# Writes this worker has finished; reads shared between requests only join
+# reads that started after the last one, see write_epoch()
+_write_epoch = 0
+
+# Client id -> monotonic time until which its reads go to the primary
+_primary_pins: Dict[str, float] = {}
+_MAX_PINS = 10_000
+
+
+def to_async_url(database_url: str) -> str:
+    """Convert a postgresql:// URL to use the asyncpg driver"""
+    return database_url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+@dataclass(frozen=True)
+class EngineOptions:
+    """Settings of the shared engines: statement reuse and outage handling"""
+
+    # SQLAlchemy's cache of compiled statements, shared by all connections
+    query_cache_size: int = 1200
+    # asyncpg prepared statements kept per pooled connection
+    prepared_statement_cache_size: int = 500
+    # Seconds a new connection may take before the attempt counts as failed
+    connect_timeout: float = 10.0
+    # Connection failures in a row that open the engine's circuit breaker
+    breaker_failure_threshold: int = 5
+    # Seconds between probes of a database whose breaker is open
+    breaker_reset_timeout: float = 5.0
+
+
+# Engines are shared by all repositories so that pooled connections and their
+# prepared statements outlive a request. asyncpg connections belong to the
+# event loop that opened them, hence one set of engines per loop.
+_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = (
+    weakref.WeakKeyDictionary()
+)
+# Engine -> connections checked out of its pool so far
+_checkouts: "weakref.WeakKeyDictionary[AsyncEngine, int]" = weakref.WeakKeyDictionary()
+_breakers: "weakref.WeakKeyDictionary[AsyncEngine, CircuitBreaker]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _count_checkouts(engine: AsyncEngine) -> None:
+    _checkouts[engine] = 0
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _checkouts[engine] += 1
+
+    event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+
+
+def get_engine(database_url: str, options: EngineOptions) -> AsyncEngine:
+    """Get the shared engine for a URL on the running event loop"""
+    engines: Dict[tuple, AsyncEngine] = _engines.setdefault(
+        asyncio.get_running_loop(), {}
+    )
+    key = (database_url, options)
+    engine = engines.get(key)
+    if engine is None:
+        engine = create_async_engine(
+            to_async_url(database_url),
+            echo=False,
+            query_cache_size=options.query_cache_size,
+            connect_args={
+                "prepared_statement_cache_size": options.prepared_statement_cache_size,
+                "timeout": options.connect_timeout,
+            },
+        )
+        _count_checkouts(engine)
+        _breakers[engine] = guard_engine(
+            engine,
+            _database_name(engine),
+            options.breaker_failure_threshold,
+            options.breaker_reset_timeout,
+        )
+        engines[key] = engine
+    return engine
+
+
+async def dispose_engines() -> None:
+    """Close all shared engines of the running event loop"""
+    engines = _engines.pop(asyncio.get_running_loop(), {})
+    for engine in engines.values():
+        _breakers[engine].stop()
+        await engine.dispose()
+
+
+def _database_name(engine: AsyncEngine) -> str:
+    """Host, port and database of an engine, without credentials"""
+    url = engine.url
+    return f"{url.host}:{url.port}/{url.database}"
+
+
+def get_breaker(engine: AsyncEngine) -> CircuitBreaker:
+    return _breakers[engine]
+
+
+def pool_stats() -> List[dict]:
+    """Connection pool usage of the shared engines of the running event loop"""
+    stats = []
+    for engine in _engines.get(asyncio.get_running_loop(), {}).values():
+        pool = engine.sync_engine.pool
+        stats.append(
+            {
+                "database": _database_name(engine),
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "checkouts": _checkouts.get(engine, 0),
+            }
+        )
+    return stats
+
+
+def breaker_stats() -> List[dict]:
+    """Circuit breakers of the shared engines of the running event loop"""
+    return [
+        _breakers[engine].stats()
+        for engine in _engines.get(asyncio.get_running_loop(), {}).values()
+    ]
+
+
+def database_stats() -> dict:
+    return {
+        "pools": pool_stats(),
+        "circuit_breakers": breaker_stats(),
+        "units_of_work": dict(_unit_of_work_stats),
+    }
+
+
+class _UnitOfWorkSession(AsyncSession):
+    """A session shared by the repository calls of a unit of work.
+
+    Repositories commit and close their sessions as if they owned them; here
+    a commit only flushes and leaving ``async with`` keeps the session open.
+    The unit of work commits and closes it.
+    """
+
+    async def commit(self) -> None:
+        await self.flush()
+
+    async def __aexit__(self, type_, value, traceback) -> None:
+        pass
+
+
+class UnitOfWork:
+    """The sessions of a request: at most one per engine, committed together"""
+
+    def __init__(self):
+        # Tasks started by the request, such as background jobs, get their own
+        # sessions; they may outlive it and must not share its connection
+        self.task = asyncio.current_task()
+        self.failed = False
+        self.wrote = False
+        self._sessions: Dict[AsyncEngine, _UnitOfWorkSession] = {}
+
+    def session(self, engine: AsyncEngine) -> AsyncSession:
+        """The unit of work's session on an engine, opened on first use"""
+        session = self._sessions.get(engine)
+        if session is None:
+            session = self._sessions[engine] = _UnitOfWorkSession(
+                engine, expire_on_commit=False
+            )
+            _unit_of_work_stats["sessions"] += 1
+        return session
+
+    def open_session(self, *engines: AsyncEngine) -> Optional[AsyncSession]:
+        """The first of the engines' sessions that is already open"""
+        for engine in engines:
+            session = self._sessions.get(engine)
+            if session is not None:
+                return session
+        return None
+
+    async def commit(self) -> None:
+        for session in self._sessions.values():
+            await AsyncSession.commit(session)
+
+    async def close(self) -> None:
+        """Close the sessions, rolling back what was not committed"""
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+
+
+def _finish_write() -> None:
+    global _write_epoch
+    _write_epoch += 1
+
+
+def write_epoch() -> int:
+    """Counter of the writes this worker committed.
+
+    A read that started at an earlier epoch may miss a write that finished
+    since, so callers must not share its result with a request issued later.
+    """
+    return _write_epoch
+
+
+def has_pending_writes() -> bool:
+    """Whether the current task's unit of work wrote and has not committed yet"""
+    work = current_unit_of_work()
+    return work is not None and work.wrote
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """The unit of work of the running task, if it started one"""
+    work = _current_unit_of_work.get()
+    if work is not None and work.task is asyncio.current_task():
+        return work
+    return None
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Share one transaction per engine among the repository calls of a block.
+
+    The block's writes are committed together when it ends, and rolled back
+    if it raises or a repository write inside it failed.
+    """
+    work = UnitOfWork()
+    token = _current_unit_of_work.set(work)
+    _unit_of_work_stats["started"] += 1
+    try:
+        yield work
+        if work.failed:
+            _unit_of_work_stats["rolled_back"] += 1
+        else:
+            await work.commit()
+            if work.wrote:
+                _finish_write()
+    except BaseException:
+        _unit_of_work_stats["rolled_back"] += 1
+        raise
+    finally:
+        _current_unit_of_work.reset(token)
+        await work.close()
+
+
+@asynccontextmanager
+async def joined_unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Join the running task's unit of work, or start one for the block.
+
+    Reads that must agree with each other run in it: they share a session,
+    so they cannot be served by replicas at different positions.
+    """
+    work = current_unit_of_work()
+    if work is not None:
+        yield work
+        return
+    async with unit_of_work() as work:
+        yield work
+
+
+def pin_to_primary(client_id: str, window: float) -> None:
+    """Route reads of a client to the primary for the next `window` seconds"""
+    now = time.monotonic()
+    if len(_primary_pins) >= _MAX_PINS:
+        for key in [k for k, until in _primary_pins.items() if until <= now]:
+            del _primary_pins[key]
+    _primary_pins[client_id] = now + window
+
+
+def is_pinned_to_primary(client_id: Optional[str]) -> bool:
+    """Check whether a client wrote recently enough to read from the primary"""
+    if client_id is None:
+        return False
+    until = _primary_pins.get(client_id)
+    return until is not None and until > time.monotonic()
+
+
+class SessionRouter:
+    """Hands out sessions bound to the primary for writes and to a replica for reads"""
+
+    def __init__(
+        self,
+        database_url: str,
+        replica_urls: Optional[Sequence[str]] = None,
+        read_your_writes_window: float = 0.0,
+        engine_options: Optional[EngineOptions] = None,
+        join_unit_of_work: bool = True,
+    ):
+        self.database_url = database_url
+        self.replica_urls: List[str] = list(replica_urls or [])
+        self.read_your_writes_window = read_your_writes_window
+        self.engine_options = engine_options or EngineOptions()
+        self.join_unit_of_work = join_unit_of_work
+
+    @property
+    def primary_engine(self) -> AsyncEngine:
+        return get_engine(self.database_url, self.engine_options)
+
+    @property
+    def replica_engines(self) -> List[AsyncEngine]:
+        return [get_engine(url, self.engine_options) for url in self.replica_urls]
+
+    def _session(self, engine: AsyncEngine) -> AsyncSession:
+        return AsyncSession(engine, expire_on_commit=False)
+
+    def _unit_of_work(self) -> Optional[UnitOfWork]:
+        return current_unit_of_work() if self.join_unit_of_work else None
+
+    @property
+    def primary_breaker(self) -> CircuitBreaker:
+        return get_breaker(self.primary_engine)
+
+    def has_available_replica(self) -> bool:
+        """Whether reads can be served by a replica while the primary is down"""
+        return any(get_breaker(engine).closed for engine in self.replica_engines)
+
+    def _read_engine(self) -> AsyncEngine:
+        # Replicas whose breaker is open are skipped; clients pinned to the
+        # primary rather read from a replica than not at all
+        replicas = [
+            engine for engine in self.replica_engines if get_breaker(engine).closed
+        ]
+        if replicas and (
+            not is_pinned_to_primary(current_client_id.get())
+            or not self.primary_breaker.closed
+        ):
+            return random.choice(replicas)
+        self.primary_breaker.check()
+        return self.primary_engine
+
+    def read_session(self) -> AsyncSession:
+        """Get a session for read-only queries, load-balanced across replicas"""
+        work = self._unit_of_work()
+        if work is None:
+            return self._session(self._read_engine())
+        # Stay on the connection the request already uses: the primary one,
+        # which sees the request's own writes, or else its replica
+        session = work.open_session(self.primary_engine, *self.replica_engines)
+        return session if session is not None else work.session(self._read_engine())
+
+    @asynccontextmanager
+    async def write_session(self) -> AsyncIterator[AsyncSession]:
+        """Open a primary session and pin the current client to the primary afterwards"""
+        self.primary_breaker.check()
+        work = self._unit_of_work()
+        if work is None:
+            async with self._session(self.primary_engine) as session:
+                yield session
+            _finish_write()
+        else:
+            work.wrote = True
+            try:
+                yield work.session(self.primary_engine)
+            except BaseException:
+                # Whatever the write did before it failed must not be committed
+                work.failed = True
+                raise
+        client_id = current_client_id.get()
+        if self.read_your_writes_window > 0 and client_id is not None:
+            pin_to_primary(client_id, self.read_your_writes_window)
+
+    async def dispose(self) -> None:
+        """Nothing to release per router; engines are shared, see dispose_engines"""
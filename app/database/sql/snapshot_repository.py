@@ -0,0 +1,412 @@
+from typing import List, Optional
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    bindparam,
+    delete,
+    exists,
+    false,
+    func,
+    literal_column,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+
+from app.database.base.snapshot import SnapshotRepository
+from app.models.snapshot import (
+    BedAssignment,
+    GardenSnapshot,
+    GardenSnapshotDiff,
+    GardenSnapshotRestore,
+    SnapshotBed,
+    SnapshotBedChange,
+)
+from app.database.sql.change_tracking import CHANGE_LOCK_CLASS
+from app.database.sql.models import (
+    SQLBed,
+    SQLGardenSnapshot,
+    SQLPlantFamily,
+    bed_plant_family_association,
+)
+from app.database.sql.notifications import change_notification
+from app.database.sql.session_router import (
+    EngineOptions,
+    SessionRouter,
+    to_async_url,
+)
+from app.services.tracing import traced_methods
+
+_snapshots = SQLGardenSnapshot.__table__
+_beds = SQLBed.__table__
+_assignments = bed_plant_family_association
+_garden_id = bindparam("garden_id", type_=Integer)
+_snapshot_id = bindparam("snapshot_id", type_=Integer)
+_EMPTY_ARRAY = literal_column("'{}'::integer[]")
+
+_snapshot_columns = (
+    _snapshots.c.id,
+    _snapshots.c.garden_id,
+    _snapshots.c.name,
+    _snapshots.c.created_at,
+    _snapshots.c.bed_count,
+    func.cardinality(_snapshots.c.assignment_bed_ids).label("assignment_count"),
+)
+
+
+def _array_agg(column, *order_by):
+    return func.coalesce(
+        func.array_agg(aggregate_order_by(column, *order_by)), _EMPTY_ARRAY
+    )
+
+
+# A snapshot is one INSERT ... SELECT: both aggregates read the same MVCC
+# snapshot, so the copy is consistent without locking the garden
+_garden_beds = (
+    select(
+        func.count().label("bed_count"),
+        _array_agg(_beds.c.id, _beds.c.index).label("ids"),
+        _array_agg(_beds.c.index, _beds.c.index).label("indexes"),
+        _array_agg(_beds.c.length, _beds.c.index).label("lengths"),
+        _array_agg(_beds.c.width, _beds.c.index).label("widths"),
+    )
+    .where(_beds.c.garden_id == _garden_id)
+    .subquery("b")
+)
+_assignment_order = (_assignments.c.bed_id, _assignments.c.plant_family_id)
+_garden_assignments = (
+    select(
+        _array_agg(_assignments.c.bed_id, *_assignment_order).label("bed_ids"),
+        _array_agg(_assignments.c.plant_family_id, *_assignment_order).label(
+            "plant_family_ids"
+        ),
+    )
+    .where(_assignments.c.garden_id == _garden_id)
+    .subquery("a")
+)
+_INSERT_SNAPSHOT = (
+    insert(_snapshots)
+    .from_select(
+        [
+            "garden_id",
+            "name",
+            "bed_count",
+            "bed_ids",
+            "bed_indexes",
+            "bed_lengths",
+            "bed_widths",
+            "assignment_bed_ids",
+            "assignment_plant_family_ids",
+        ],
+        select(
+            _garden_id,
+            bindparam("name", type_=String),
+            _garden_beds.c.bed_count,
+            _garden_beds.c.ids,
+            _garden_beds.c.indexes,
+            _garden_beds.c.lengths,
+            _garden_beds.c.widths,
+            _garden_assignments.c.bed_ids,
+            _garden_assignments.c.plant_family_ids,
+        ).select_from(_garden_beds.join(_garden_assignments, true())),
+    )
+    .on_conflict_do_nothing(index_elements=["garden_id", "name"])
+    .returning(*_snapshot_columns)
+)
+
+_this_snapshot = and_(
+    _snapshots.c.garden_id == _garden_id, _snapshots.c.id == _snapshot_id
+)
+_SELECT_SNAPSHOT = select(*_snapshot_columns).where(_this_snapshot)
+_SELECT_SNAPSHOTS = (
+    select(*_snapshot_columns)
+    .where(_snapshots.c.garden_id == _garden_id)
+    .order_by(_snapshots.c.created_at.desc(), _snapshots.c.id.desc())
+)
+_DELETE_SNAPSHOT = delete(_snapshots).where(_this_snapshot)
+
+
+def _snapshot_beds(snapshot_id, name: str):
+    """The beds of a snapshot as rows (parallel arrays unnest in lockstep)"""
+    return (
+        select(
+            func.unnest(_snapshots.c.bed_ids).label("id"),
+            func.unnest(_snapshots.c.bed_indexes).label("index"),
+            func.unnest(_snapshots.c.bed_lengths).label("length"),
+            func.unnest(_snapshots.c.bed_widths).label("width"),
+        )
+        .where(_snapshots.c.garden_id == _garden_id, _snapshots.c.id == snapshot_id)
+        .subquery(name)
+    )
+
+
+def _snapshot_assignments(snapshot_id):
+    return select(
+        func.unnest(_snapshots.c.assignment_bed_ids).label("bed_id"),
+        func.unnest(_snapshots.c.assignment_plant_family_ids).label("plant_family_id"),
+    ).where(_snapshots.c.garden_id == _garden_id, _snapshots.c.id == snapshot_id)
+
+
+# Restore replaces the garden in one transaction of set-based statements,
+# under the garden's change lock so that row versions stay ordered. Beds are
+# updated in place rather than replaced, so their plantings survive.
+_LOCK_GARDEN = select(func.pg_advisory_xact_lock(CHANGE_LOCK_CLASS, _garden_id))
+_DELETE_GARDEN_ASSIGNMENTS = delete(_assignments).where(
+    _assignments.c.garden_id == _garden_id
+)
+_restored_beds = _snapshot_beds(_snapshot_id, "s")
+# Beds added since the snapshot go, and their plantings with them
+_DELETE_ADDED_BEDS = (
+    delete(_beds)
+    .where(
+        _beds.c.garden_id == _garden_id,
+        _beds.c.id.not_in(select(_restored_beds.c.id)),
+    )
+    .returning(_beds.c.id)
+)
+# Indexes are unique per garden and checked row by row, so the remaining
+# beds move to negative ones first; restored beds may then swap indexes. The
+# garden parameter of an UPDATE must not be named after a column of beds
+_PARK_BED_INDEXES = (
+    update(_beds)
+    .where(_beds.c.garden_id == bindparam("bed_garden_id", type_=Integer))
+    .values(index=-1 - _beds.c.index)
+    .returning(_beds.c.id)
+)
+_restore_beds = insert(_beds).from_select(
+    ["garden_id", "id", "index", "length", "width"],
+    select(
+        _garden_id,
+        _restored_beds.c.id,
+        _restored_beds.c.index,
+        _restored_beds.c.length,
+        _restored_beds.c.width,
+    ),
+)
+# Beds keep their IDs, so delta sync reports them as changed, not deleted
+_RESTORE_BEDS = _restore_beds.on_conflict_do_update(
+    index_elements=["garden_id", "id"],
+    set_={
+        "index": _restore_beds.excluded.index,
+        "length": _restore_beds.excluded.length,
+        "width": _restore_beds.excluded.width,
+    },
+).returning(_beds.c.id)
+_restored_assignments = _snapshot_assignments(_snapshot_id).subquery("s")
+# Plant families deleted since the snapshot cannot be assigned again
+_RESTORE_ASSIGNMENTS = insert(_assignments).from_select(
+    ["garden_id", "bed_id", "plant_family_id"],
+    select(
+        _garden_id,
+        _restored_assignments.c.bed_id,
+        _restored_assignments.c.plant_family_id,
+    ).where(
+        exists().where(SQLPlantFamily.id == _restored_assignments.c.plant_family_id)
+    ),
+)
+
+_from_id = bindparam("from_snapshot_id", type_=Integer)
+_to_id = bindparam("to_snapshot_id", type_=Integer)
+_SELECT_SNAPSHOT_PAIR = select(_snapshots.c.id).where(
+    _snapshots.c.garden_id == _garden_id, _snapshots.c.id.in_([_from_id, _to_id])
+)
+_before = _snapshot_beds(_from_id, "from_beds")
+_after = _snapshot_beds(_to_id, "to_beds")
+_DIFF_SNAPSHOT_BEDS = (
+    select(
+        _before.c.id.label("before_id"),
+        _before.c.index.label("before_index"),
+        _before.c.length.label("before_length"),
+        _before.c.width.label("before_width"),
+        _after.c.id.label("after_id"),
+        _after.c.index.label("after_index"),
+        _after.c.length.label("after_length"),
+        _after.c.width.label("after_width"),
+    )
+    .select_from(_before.join(_after, _before.c.id == _after.c.id, full=True))
+    .where(
+        tuple_(_before.c.index, _before.c.length, _before.c.width).is_distinct_from(
+            tuple_(_after.c.index, _after.c.length, _after.c.width)
+        )
+    )
+    .order_by(func.coalesce(_after.c.index, _before.c.index))
+)
+_DIFF_SNAPSHOT_ASSIGNMENTS = union_all(
+    select(true().label("added"), _snapshot_assignments(_to_id).except_(
+        _snapshot_assignments(_from_id)
+    ).subquery("added")),
+    select(false(), _snapshot_assignments(_from_id).except_(
+        _snapshot_assignments(_to_id)
+    ).subquery("removed")),
+)
+
+
+@traced_methods
+class SQLSnapshotRepository(SnapshotRepository):
+    """PostgreSQL implementation of SnapshotRepository using SQLAlchemy"""
+
+    def __init__(
+        self,
+        database_url: str,
+        replica_urls: Optional[List[str]] = None,
+        read_your_writes_window: float = 0.0,
+        engine_options: Optional[EngineOptions] = None,
+    ):
+        self.database_url = to_async_url(database_url)
+        self.router = SessionRouter(
+            database_url, replica_urls, read_your_writes_window, engine_options
+        )
+
+    def _row_to_snapshot(self, row) -> GardenSnapshot:
+        """Convert a snapshot row to GardenSnapshot Pydantic model"""
+        return GardenSnapshot(
+            id=row.id,
+            garden_id=row.garden_id,
+            name=row.name,
+            created_at=row.created_at,
+            bed_count=row.bed_count,
+            assignment_count=row.assignment_count,
+        )
+
+    async def create_snapshot(
+        self, garden_id: int, name: str
+    ) -> Optional[GardenSnapshot]:
+        """Copy the garden's beds and assignments into arrays in PostgreSQL"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _INSERT_SNAPSHOT, {"garden_id": garden_id, "name": name}
+            )
+            row = result.one_or_none()
+            await session.commit()
+            return self._row_to_snapshot(row) if row else None
+
+    async def get_snapshot(
+        self, snapshot_id: int, garden_id: int
+    ) -> Optional[GardenSnapshot]:
+        """Get a snapshot's metadata by its ID from PostgreSQL"""
+        async with self.router.read_session() as session:
+            result = await session.execute(
+                _SELECT_SNAPSHOT, {"garden_id": garden_id, "snapshot_id": snapshot_id}
+            )
+            row = result.one_or_none()
+            return self._row_to_snapshot(row) if row else None
+
+    async def get_snapshots(self, garden_id: int) -> List[GardenSnapshot]:
+        """Get the metadata of a garden's snapshots from PostgreSQL"""
+        async with self.router.read_session() as session:
+            result = await session.execute(_SELECT_SNAPSHOTS, {"garden_id": garden_id})
+            return [self._row_to_snapshot(row) for row in result]
+
+    async def delete_snapshot(self, snapshot_id: int, garden_id: int) -> bool:
+        """Delete a snapshot from PostgreSQL"""
+        async with self.router.write_session() as session:
+            result = await session.execute(
+                _DELETE_SNAPSHOT, {"garden_id": garden_id, "snapshot_id": snapshot_id}
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    async def restore_snapshot(
+        self, snapshot_id: int, garden_id: int
+    ) -> Optional[GardenSnapshotRestore]:
+        """Restore the garden's beds in place and replace its assignments"""
+        params = {"garden_id": garden_id, "snapshot_id": snapshot_id}
+        async with self.router.write_session() as session:
+            row = (await session.execute(_SELECT_SNAPSHOT, params)).one_or_none()
+            if row is None:
+                return None
+            snapshot = self._row_to_snapshot(row)
+            await session.execute(_LOCK_GARDEN, params)
+            await session.execute(_DELETE_GARDEN_ASSIGNMENTS, params)
+            deleted_ids = list(
+                (await session.execute(_DELETE_ADDED_BEDS, params)).scalars()
+            )
+            kept_ids = set(
+                (
+                    await session.execute(
+                        _PARK_BED_INDEXES, {"bed_garden_id": garden_id}
+                    )
+                ).scalars()
+            )
+            bed_ids = list((await session.execute(_RESTORE_BEDS, params)).scalars())
+            assignments = (await session.execute(_RESTORE_ASSIGNMENTS, params)).rowcount
+            changes = (
+                ("delete", deleted_ids),
+                ("update", [bed_id for bed_id in bed_ids if bed_id in kept_ids]),
+                ("insert", [bed_id for bed_id in bed_ids if bed_id not in kept_ids]),
+            )
+            for op, ids in changes:
+                if ids:
+                    await session.execute(
+                        change_notification("bed", op, garden_id, ids)
+                    )
+            await session.commit()
+            return GardenSnapshotRestore(
+                snapshot=snapshot,
+                beds=len(bed_ids),
+                assignments=assignments,
+                skipped_assignments=snapshot.assignment_count - assignments,
+            )
+
+    async def diff_snapshots(
+        self, from_snapshot_id: int, to_snapshot_id: int, garden_id: int
+    ) -> GardenSnapshotDiff:
+        """Compare two snapshots with set-based queries in PostgreSQL"""
+        params = {
+            "garden_id": garden_id,
+            "from_snapshot_id": from_snapshot_id,
+            "to_snapshot_id": to_snapshot_id,
+        }
+        async with self.router.read_session() as session:
+            found = set(
+                (await session.execute(_SELECT_SNAPSHOT_PAIR, params)).scalars()
+            )
+            for snapshot_id in (from_snapshot_id, to_snapshot_id):
+                if snapshot_id not in found:
+                    raise ValueError(f"Snapshot with ID {snapshot_id} not found")
+
+            diff = GardenSnapshotDiff(
+                from_snapshot_id=from_snapshot_id, to_snapshot_id=to_snapshot_id
+            )
+            for row in await session.execute(_DIFF_SNAPSHOT_BEDS, params):
+                before = after = None
+                if row.before_id is not None:
+                    before = SnapshotBed(
+                        id=row.before_id,
+                        index=row.before_index,
+                        length=row.before_length,
+                        width=row.before_width,
+                    )
+                if row.after_id is not None:
+                    after = SnapshotBed(
+                        id=row.after_id,
+                        index=row.after_index,
+                        length=row.after_length,
+                        width=row.after_width,
+                    )
+                if before is None:
+                    diff.added_beds.append(after)
+                elif after is None:
+                    diff.removed_beds.append(before)
+                else:
+                    diff.changed_beds.append(
+                        SnapshotBedChange(id=before.id, before=before, after=after)
+                    )
+
+            for row in await session.execute(_DIFF_SNAPSHOT_ASSIGNMENTS, params):
+                assignment = BedAssignment(
+                    bed_id=row.bed_id, plant_family_id=row.plant_family_id
+                )
+                if row.added:
+                    diff.added_assignments.append(assignment)
+                else:
+                    diff.removed_assignments.append(assignment)
+            return diff
+
+    async def close(self):
+        """Release the repository's database resources"""
+        await self.router.dispose()
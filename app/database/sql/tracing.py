@@ -0,0 +1,60 @@
+"""SQL statement spans below the span of the current request.
+
+Statements run by SQLAlchemy's asyncio engines execute in greenlets that
+share the context of the awaiting coroutine, so the current span is visible
+to the engine events. Each statement gets a client span with the
+parameterized SQL text and the number of rows it returned or changed.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.tracing import SPAN_KIND_CLIENT, Span, current_span
+
+# Statements longer than this are cut in the span
+MAX_STATEMENT_LENGTH = 2000
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = current_span()
+    if parent is None or context is None:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else "SQL"
+    context._trace_span = Span(
+        parent.tracer,
+        operation,
+        parent.trace_id,
+        parent.span_id,
+        SPAN_KIND_CLIENT,
+        {
+            "db.system.name": conn.dialect.name,
+            "db.operation.name": operation,
+            "db.query.text": statement[:MAX_STATEMENT_LENGTH],
+        },
+    )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_trace_span", None)
+    if span is None:
+        return
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        span.set_attribute("db.response.rows", cursor.rowcount)
+    span.end()
+
+
+def _handle_error(exception_context):
+    span = getattr(exception_context.execution_context, "_trace_span", None)
+    if span is not None:
+        span.record_exception(exception_context.original_exception)
+        span.end()
+
+
+def instrument_sql() -> None:
+    """Trace the statements of every engine"""
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
@@ -0,0 +1,13 @@
+from .admission_control import (
+    AdmissionControlMiddleware,
+    AdmissionController,
+    RouteLimit,
+)
+from .client_identity import ClientIdentityMiddleware
+
+__all__ = [
+    "AdmissionControlMiddleware",
+    "AdmissionController",
+    "RouteLimit",
+    "ClientIdentityMiddleware",
+]
@@ -0,0 +1,212 @@
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+READ = "read"
+WRITE = "write"
+
+# Methods that never modify state are admitted with read priority
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted (queue full or wait timed out)"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    """Concurrency and queueing limits for a group of routes"""
+
+    max_concurrency: int
+    max_queue: int
+    queue_timeout: float = 5.0
+    # Slots that only write requests may use, so reads can never take them all
+    reserved_write_slots: int = 0
+
+
+class PriorityLimiter:
+    """Concurrency limiter with bounded wait queues per priority class.
+
+    Writes are always woken before reads, and reads may only use
+    ``max_concurrency - reserved_write_slots`` slots at the same time.
+    """
+
+    def __init__(self, name: str, limit: RouteLimit):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {
+            WRITE: deque(),
+            READ: deque(),
+        }
+        self.admitted = {READ: 0, WRITE: 0}
+        self.rejected = {READ: 0, WRITE: 0}
+        self.timed_out = {READ: 0, WRITE: 0}
+        self.max_queue_depth = 0
+
+    def _capacity(self, priority: str) -> int:
+        if priority == WRITE:
+            return self.limit.max_concurrency
+        return max(1, self.limit.max_concurrency - self.limit.reserved_write_slots)
+
+    def _has_slot(self, priority: str) -> bool:
+        return self.active < self._capacity(priority)
+
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    async def acquire(self, priority: str) -> None:
+        """Wait for a slot or raise AdmissionRejected"""
+        # Only take a slot directly if nobody of the same or higher priority waits
+        blocked = bool(self._waiters[WRITE]) or (
+            priority == READ and bool(self._waiters[READ])
+        )
+        if not blocked and self._has_slot(priority):
+            self.active += 1
+            self.admitted[priority] += 1
+            return
+
+        waiters = self._waiters[priority]
+        if len(waiters) >= self.limit.max_queue:
+            self.rejected[priority] += 1
+            raise AdmissionRejected(f"{self.name}: {priority} queue is full")
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth())
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(future), timeout=self.limit.queue_timeout
+            )
+        except asyncio.TimeoutError:
+            if not self._abandon(future, priority):
+                self.timed_out[priority] += 1
+                self.rejected[priority] += 1
+                raise AdmissionRejected(f"{self.name}: timed out waiting for a slot")
+        except asyncio.CancelledError:
+            if self._abandon(future, priority):
+                self.release()
+            raise
+        self.admitted[priority] += 1
+
+    def _abandon(self, future: asyncio.Future, priority: str) -> bool:
+        """Withdraw a waiter; returns True if it had already been granted a slot"""
+        if future.done() and not future.cancelled():
+            return True
+        future.cancel()
+        try:
+            self._waiters[priority].remove(future)
+        except ValueError:
+            pass
+        return False
+
+    def release(self) -> None:
+        """Return a slot and hand it to the next waiter, writes first"""
+        self.active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for priority in (WRITE, READ):
+            waiters = self._waiters[priority]
+            while waiters and self._has_slot(priority):
+                future = waiters.popleft()
+                if future.done():
+                    continue
+                self.active += 1
+                future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_concurrency": self.limit.max_concurrency,
+            "queue_depth": {
+                READ: len(self._waiters[READ]),
+                WRITE: len(self._waiters[WRITE]),
+            },
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "timed_out": dict(self.timed_out),
+        }
+
+
+class AdmissionController:
+    """Maps request paths to limiters by longest matching prefix"""
+
+    def __init__(
+        self, limits: Dict[str, Optional[RouteLimit]], retry_after: int = 1
+    ):
+        self.retry_after = retry_after
+        # A limit of None exempts a prefix, e.g. for long-lived streams
+        self._limiters: List[Tuple[str, Optional[PriorityLimiter]]] = sorted(
+            (
+                (prefix, PriorityLimiter(prefix, limit) if limit else None)
+                for prefix, limit in limits.items()
+            ),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+
+    def limiter_for(self, path: str) -> Optional[PriorityLimiter]:
+        for prefix, limiter in self._limiters:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return limiter
+        return None
+
+    def stats(self) -> dict:
+        return {
+            prefix: limiter.stats()
+            for prefix, limiter in self._limiters
+            if limiter is not None
+        }
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware that sheds load before requests reach the database pool"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.controller.limiter_for(scope["path"])
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        priority = READ if scope["method"] in READ_METHODS else WRITE
+        try:
+            await limiter.acquire(priority)
+        except AdmissionRejected as e:
+            await self._reject(send, e.reason)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, reason: str) -> None:
+        body = json.dumps({"detail": f"Service overloaded ({reason})"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.controller.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,102 @@
+import json
+import math
+from typing import Sequence
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from app.database.base.errors import DatabaseUnavailable
+from app.database.sql.session_router import SessionRouter
+from app.middleware.admission_control import READ_METHODS
+
+# Close code asking websocket clients to reconnect later
+TRY_AGAIN_LATER = 1013
+
+
+def retry_after_header(retry_after: float) -> str:
+    """Retry-After in whole seconds, never 0 so that clients do back off"""
+    return str(max(1, math.ceil(retry_after)))
+
+
+async def database_unavailable_handler(
+    request: Request, exc: DatabaseUnavailable
+) -> JSONResponse:
+    """Answer 503 when a breaker opens while a request is already running"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
+
+
+class CircuitBreakerMiddleware:
+    """ASGI middleware answering 503 right away while the database is down.
+
+    Requests under the guarded prefixes are rejected while the primary's
+    circuit breaker is open, without waiting for a connection attempt. Reads
+    still pass if a replica is available to serve them, except under the
+    primary prefixes, whose reads need the primary as well. Websockets are
+    closed before they are accepted.
+    """
+
+    def __init__(
+        self,
+        app,
+        router: SessionRouter,
+        prefixes: Sequence[str],
+        primary_prefixes: Sequence[str] = (),
+    ):
+        self.app = app
+        self.router = router
+        self.prefixes = [prefix.rstrip("/") for prefix in prefixes]
+        self.primary_prefixes = [prefix.rstrip("/") for prefix in primary_prefixes]
+
+    @staticmethod
+    def _matches(path: str, prefixes: Sequence[str]) -> bool:
+        return any(
+            path == prefix or path.startswith(prefix + "/") for prefix in prefixes
+        )
+
+    def _guards(self, path: str) -> bool:
+        return self._matches(path, self.prefixes) or self._needs_primary(path)
+
+    def _needs_primary(self, path: str) -> bool:
+        return self._matches(path, self.primary_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not self._guards(
+            scope["path"]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        breaker = self.router.primary_breaker
+        if breaker.closed or (
+            scope["type"] == "http"
+            and scope["method"] in READ_METHODS
+            and not self._needs_primary(scope["path"])
+            and self.router.has_available_replica()
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        breaker.rejected += 1
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": TRY_AGAIN_LATER})
+            return
+        await self._reject(send, breaker.name, breaker.retry_after())
+
+    async def _reject(self, send, database: str, retry_after: float) -> None:
+        body = json.dumps({"detail": f"Database {database} is unavailable"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after_header(retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,30 @@
+from app.database.sql.session_router import current_client_id
+
+CLIENT_ID_HEADER = b"x-client-id"
+
+
+class ClientIdentityMiddleware:
+    """ASGI middleware that records who sent the request for read-your-writes.
+
+    Clients can send an ``X-Client-Id`` header; otherwise the peer address is used.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        client_id = dict(scope.get("headers") or []).get(CLIENT_ID_HEADER)
+        if client_id is not None:
+            client_id = client_id.decode("latin-1")
+        elif scope.get("client"):
+            client_id = scope["client"][0]
+
+        token = current_client_id.set(client_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_client_id.reset(token)
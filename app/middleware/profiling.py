@@ -0,0 +1,276 @@
+"""Opt-in sampling profiler for single requests.
+
+A profiled request gets a sampler thread that looks at the event loop
+thread's stack every ``interval`` seconds. While the request's coroutine is
+on that stack the sample is its running call stack; otherwise the request
+is suspended (waiting for the database, a thread pool dependency or its
+turn on the loop) and the sample is the chain of coroutines it awaits,
+ending in ``(waiting)``. Samples are therefore wall-clock time of the
+request, split into running and waiting.
+
+Profiles are written by the sampler thread, off the event loop, in the
+collapsed stack format (``frame;frame;frame count`` per line) that
+flamegraph.pl and speedscope read. Requests that are not profiled never
+reach this module: the middleware is only installed when profiling is
+configured.
+"""
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_SUFFIX = ".folded"
+WAITING = "(waiting)"
+
+_NAME = re.compile(r"^\d{8}T\d{6}-[A-Z]+-[\w.-]*-[0-9a-f]{8}\.folded$")
+
+
+def _label(code) -> str:
+    """Frame label: qualified function name and the file's last two parts"""
+    filename = "/".join(code.co_filename.replace("\\", "/").split("/")[-2:])
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class RequestSampler(threading.Thread):
+    """Samples one request's coroutine until stopped, then writes the profile"""
+
+    def __init__(
+        self,
+        coroutine,
+        thread_id: int,
+        interval: float,
+        path: str,
+        on_written: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__(name="request-profiler", daemon=True)
+        self.coroutine = coroutine
+        self.thread_id = thread_id
+        self.interval = interval
+        self.path = path
+        self.on_written = on_written
+        self.samples: Counter = Counter()
+        self._labels: Dict[object, str] = {}
+        self._stopped = threading.Event()
+
+    def label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _label(code)
+        return label
+
+    def sample(self) -> Optional[Tuple[str, ...]]:
+        """The request's current stack, root first; None once it finished"""
+        root = self.coroutine.cr_frame
+        if root is None:
+            return None
+        codes = []
+        frame = sys._current_frames().get(self.thread_id)
+        while frame is not None and frame is not root:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if frame is root:
+            codes.append(root.f_code)
+            return tuple(self.label(code) for code in reversed(codes))
+
+        # Suspended: follow the awaited coroutines down to what blocks them
+        labels = []
+        awaitable = self.coroutine
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(
+                awaitable, "gi_frame", None
+            )
+            if frame is None:
+                break
+            labels.append(self.label(frame.f_code))
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(
+                awaitable, "gi_yieldfrom", None
+            )
+        labels.append(WAITING)
+        return tuple(labels)
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            stack = self.sample()
+            if stack is not None:
+                self.samples[stack] += 1
+        self.write()
+        if self.on_written is not None:
+            self.on_written()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def write(self) -> None:
+        lines = (
+            f"{';'.join(stack)} {count}\n" for stack, count in self.samples.items()
+        )
+        partial = self.path + ".tmp"
+        with open(partial, "w") as f:
+            f.writelines(lines)
+        # Listings never see a half-written profile
+        os.replace(partial, self.path)
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps their profiles on disk.
+
+    A request is profiled if it sends ``X-Profile`` with the configured
+    token, or with probability ``sample_rate``. At most ``max_active``
+    requests are profiled at once and the newest ``keep`` profiles are kept.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        keep: int = 100,
+        max_active: int = 2,
+    ):
+        self.directory = directory
+        self.token = token.encode("latin-1") if token else None
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.keep = keep
+        self.max_active = max_active
+        self.active: List[RequestSampler] = []
+        self.profiled = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None or self.sample_rate > 0
+
+    def is_token(self, value: Optional[bytes]) -> bool:
+        """Whether a header value is the token, compared in constant time"""
+        if self.token is None or value is None:
+            return False
+        return hmac.compare_digest(value, self.token)
+
+    def wants(self, headers: Dict[bytes, bytes]) -> bool:
+        if self.is_token(headers.get(PROFILE_HEADER)):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def profile_name(self, method: str, path: str) -> str:
+        started = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        slug = re.sub(r"[^\w.-]+", "_", path.strip("/"))[:80]
+        return f"{started}-{method}-{slug}-{uuid.uuid4().hex[:8]}{PROFILE_SUFFIX}"
+
+    def start(self, coroutine, name: str) -> Optional[RequestSampler]:
+        """Start sampling a request's coroutine; None if enough run already"""
+        self.active = [sampler for sampler in self.active if sampler.is_alive()]
+        if len(self.active) >= self.max_active:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        sampler = RequestSampler(
+            coroutine,
+            threading.get_ident(),
+            self.interval,
+            os.path.join(self.directory, name),
+            self.prune,
+        )
+        sampler.start()
+        self.active.append(sampler)
+        self.profiled += 1
+        return sampler
+
+    def _names(self) -> List[str]:
+        """Profile files in the directory, newest first"""
+        try:
+            names = [name for name in os.listdir(self.directory) if _NAME.match(name)]
+        except FileNotFoundError:
+            return []
+        # Names start with the UTC start time
+        return sorted(names, reverse=True)
+
+    def prune(self) -> None:
+        """Delete all but the newest profiles"""
+        for name in self._names()[self.keep:]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def list_profiles(self, limit: int = 50) -> List[dict]:
+        """The newest profiles in the directory, of any worker"""
+        profiles = []
+        for name in self._names()[:limit]:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            started, method, _ = name.split("-", 2)
+            profiles.append(
+                {
+                    "name": name,
+                    "method": method,
+                    "started_at": datetime.strptime(started, "%Y%m%dT%H%M%S").replace(
+                        tzinfo=timezone.utc
+                    ),
+                    "size": stat.st_size,
+                }
+            )
+        return profiles
+
+    def read_profile(self, name: str) -> Optional[str]:
+        if not _NAME.match(name):
+            return None
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "profiled": self.profiled,
+            "active": sum(sampler.is_alive() for sampler in self.active),
+        }
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles the requests the profiler wants"""
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.wants(
+            dict(scope.get("headers") or [])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        name = self.profiler.profile_name(scope["method"], scope["path"])
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_ID_HEADER, name.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        coroutine = self.app(scope, receive, send_with_profile_id)
+        sampler = self.profiler.start(coroutine, name)
+        if sampler is None:
+            # Enough requests are being profiled; serve this one unprofiled
+            coroutine.close()
+            await self.app(scope, receive, send)
+            return
+        try:
+            await coroutine
+        finally:
+            sampler.stop()
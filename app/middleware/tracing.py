@@ -0,0 +1,47 @@
+from app.services.tracing import STATUS_ERROR, Tracer, use_span
+
+TRACEPARENT_HEADER = b"traceparent"
+
+
+class TracingMiddleware:
+    """ASGI middleware that opens the server span of sampled requests.
+
+    The span is named after the matched route template once routing has
+    run, so that all requests of one route share a name.
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = dict(scope.get("headers") or []).get(TRACEPARENT_HEADER)
+        span = self.tracer.start_request_span(
+            scope["method"],
+            traceparent.decode("latin-1") if traceparent is not None else None,
+            **{"http.request.method": scope["method"], "url.path": scope["path"]},
+        )
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status_code = STATUS_ERROR
+            await send(message)
+
+        with use_span(span):
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                # Routing stores the matched route in the shared scope
+                route = scope.get("route")
+                if route is not None and hasattr(route, "path"):
+                    span.name = f"{scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
@@ -1,3 +1,31 @@
-from .bed import Bed, BedCreate, BedCreationRequest, BedCreationResponse
+from .bed import (
+    Bed,
+    BedBulkUpdateRequest,
+    BedBulkUpdateResponse,
+    BedChanges,
+    BedCreate,
+    BedCreationRequest,
+    BedCreationResponse,
+)
+from .garden import (
+    DEFAULT_GARDEN_ID,
+    Garden,
+    GardenCreate,
+    GardenStats,
+    PlantFamilyBedCount,
+)
 
-__all__ = ["Bed", "BedCreate", "BedCreationRequest", "BedCreationResponse"]
+__all__ = [
+    "Bed",
+    "BedBulkUpdateRequest",
+    "BedBulkUpdateResponse",
+    "BedChanges",
+    "BedCreate",
+    "BedCreationRequest",
+    "BedCreationResponse",
+    "DEFAULT_GARDEN_ID",
+    "Garden",
+    "GardenCreate",
+    "GardenStats",
+    "PlantFamilyBedCount",
+]
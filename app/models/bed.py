@@ -13,15 +13,36 @@ class BedCreate(BedBase):
 
 class Bed(BedBase):
     id: int = Field(..., description="Unique identifier for the bed")
+    garden_id: int = Field(..., description="Garden the bed belongs to")
     index: int = Field(..., description="User-readable bed index (1-based)")
     plant_families: List[int] = Field(
         default_factory=list, description="List of plant families in this bed referenced by their ids"
     )
+    version: int = Field(
+        ..., description="Changes with every write; send it as If-Match to update safely"
+    )
 
     class Config:
         from_attributes = True
 
 
+class BedDimensionsUpdate(BedBase):
+    id: int = Field(..., description="ID of the bed to update")
+
+
+class BedBulkUpdateRequest(BaseModel):
+    beds: List[BedDimensionsUpdate] = Field(
+        ..., min_length=1, description="New dimensions per bed"
+    )
+
+
+class BedBulkUpdateResponse(BaseModel):
+    beds: List[Bed] = Field(..., description="Updated beds ordered by index")
+    not_found: List[int] = Field(
+        default_factory=list, description="Requested IDs that matched no bed"
+    )
+
+
 class BedCreationRequest(BaseModel):
     numberOfBeds: int = Field(..., gt=0, description="Number of beds to create")
     length: int = Field(..., gt=0, description="Length of each bed in centimeters")
@@ -31,3 +52,15 @@ class BedCreationRequest(BaseModel):
 class BedCreationResponse(BaseModel):
     beds: List[Bed]
     message: str
+
+
+class BedChanges(BaseModel):
+    version: int = Field(
+        ..., description="Version to pass as `since` on the next delta sync"
+    )
+    beds: List[Bed] = Field(
+        default_factory=list, description="Beds inserted or updated since `since`"
+    )
+    deleted: List[int] = Field(
+        default_factory=list, description="IDs of beds deleted since `since`"
+    )
@@ -0,0 +1,31 @@
+from typing import List, Literal
+
+from pydantic import BaseModel, Field
+
+CalendarActivity = Literal["sow", "harvest"]
+
+
+class CalendarEntry(BaseModel):
+    activity: CalendarActivity = Field(..., description="What to do")
+    start_week: int = Field(..., description="First week of the activity")
+    end_week: int = Field(
+        ...,
+        description="Last week of the activity; before the first week if it "
+        "spans the turn of the year",
+    )
+    bed_id: int = Field(..., description="Bed the activity takes place in")
+    bed_index: int = Field(..., description="User-readable index of the bed")
+    plant_family_id: int = Field(..., description="Plant family sown or harvested")
+    plant_family_name: str = Field(..., description="Name of the plant family")
+
+
+class GardenCalendar(BaseModel):
+    version: int = Field(
+        ..., description="Garden version the calendar was computed for"
+    )
+    from_week: int = Field(..., description="First week asked for")
+    to_week: int = Field(..., description="Last week asked for")
+    entries: List[CalendarEntry] = Field(
+        default_factory=list,
+        description="Activities taking place in any of the weeks, by first week",
+    )
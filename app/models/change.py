@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+ChangeEntity = Literal["bed", "plant_family", "garden"]
+ChangeOperation = Literal["insert", "update", "delete", "delete_all", "resync"]
+
+
+class ChangeEvent(BaseModel):
+    entity: Optional[ChangeEntity] = Field(
+        None, description="Kind of record that changed"
+    )
+    op: ChangeOperation = Field(
+        ...,
+        description="What happened; 'resync' means events were dropped and the "
+        "client should reload",
+    )
+    garden_id: Optional[int] = Field(
+        None, description="Garden of the changed records, if garden-scoped"
+    )
+    ids: Optional[List[int]] = Field(
+        None, description="IDs of the changed records, omitted for large batches"
+    )
@@ -0,0 +1,46 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.snapshot import BedAssignment
+
+MIN_COMPATIBILITY_SCORE = -10
+MAX_COMPATIBILITY_SCORE = 10
+
+
+class PlantFamilyCompatibility(BaseModel):
+    plant_family_id: int = Field(..., description="ID of a plant family")
+    other_plant_family_id: int = Field(
+        ..., description="ID of its neighbour; may be the same plant family"
+    )
+    score: int = Field(
+        ...,
+        ge=MIN_COMPATIBILITY_SCORE,
+        le=MAX_COMPATIBILITY_SCORE,
+        description="How well the two grow next to each other; negative is harmful",
+    )
+
+
+class CompanionPlanRequest(BaseModel):
+    plant_family_ids: Optional[List[int]] = Field(
+        None, description="Plant families to choose from; all if omitted"
+    )
+    time_budget: float = Field(
+        1.0, gt=0, description="Seconds the optimizer may search"
+    )
+    seed: Optional[int] = Field(None, description="Seed for a reproducible plan")
+    apply: bool = Field(
+        False, description="Replace the beds' plant families with the plan"
+    )
+
+
+class CompanionPlan(BaseModel):
+    assignments: List[BedAssignment] = Field(
+        default_factory=list, description="One plant family per bed, by bed index"
+    )
+    score: int = Field(..., description="Sum of the compatibility of neighbouring beds")
+    current_score: int = Field(
+        ..., description="The same sum for the garden's current plant families"
+    )
+    iterations: int = Field(..., description="Moves the optimizer evaluated")
+    applied: bool = Field(False, description="Whether the plan was written")
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+# Garden used when a request does not name one
+DEFAULT_GARDEN_ID = 1
+
+
+class GardenBase(BaseModel):
+    name: str = Field(..., min_length=1, description="Name of the garden")
+
+
+class GardenCreate(GardenBase):
+    pass
+
+
+class Garden(GardenBase):
+    id: int = Field(..., description="Unique identifier for the garden")
+
+    class Config:
+        from_attributes = True
+
+
+class PlantFamilyBedCount(BaseModel):
+    plant_family_id: int = Field(..., description="ID of the plant family")
+    bed_count: int = Field(..., description="Beds the plant family is assigned to")
+
+
+class GardenStats(BaseModel):
+    garden_id: int = Field(..., description="Garden the statistics describe")
+    bed_count: int = Field(0, description="Number of beds")
+    total_area: int = Field(
+        0, description="Sum of length * width over all beds in square centimeters"
+    )
+    unassigned_bed_count: int = Field(0, description="Beds without any plant family")
+    beds_per_plant_family: List[PlantFamilyBedCount] = Field(
+        default_factory=list, description="Bed count per assigned plant family"
+    )
@@ -0,0 +1,35 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Literal, Optional
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+# Jobs in these states are still owned by a worker and may be resumed
+UNFINISHED_JOB_STATUSES = ("queued", "running")
+
+
+class Job(BaseModel):
+    id: int = Field(..., description="Unique identifier for the job")
+    kind: str = Field(..., description="Operation the job performs")
+    garden_id: Optional[int] = Field(None, description="Garden the job works on")
+    status: JobStatus = Field(..., description="Current state of the job")
+    progress: Optional[float] = Field(
+        None, description="Completed fraction between 0 and 1, if known"
+    )
+    progress_done: int = Field(0, description="Units of work completed")
+    progress_total: Optional[int] = Field(
+        None, description="Units of work in total, if known"
+    )
+    result: Optional[Dict[str, Any]] = Field(
+        None, description="Outcome of a succeeded job"
+    )
+    error: Optional[str] = Field(None, description="Why the job failed")
+    cancel_requested: bool = Field(
+        False, description="Cancellation was requested and is being carried out"
+    )
+    created_at: datetime = Field(..., description="When the job was submitted")
+    started_at: Optional[datetime] = Field(None, description="When the job started")
+    finished_at: Optional[datetime] = Field(None, description="When the job ended")
+
+    class Config:
+        from_attributes = True
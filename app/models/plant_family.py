@@ -1,15 +1,52 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
 from app.models.base_model import BusinessModelBase
 
+# Calendar weeks run from 1 to 52; windows past week 52 continue in week 1
+WEEKS_PER_YEAR = 52
+
 
 class PlantFamilyBase(BusinessModelBase):
     name: str
     nutrition_requirements: str
     rotation_time: int
+    sowing_start_week: Optional[int] = Field(
+        None, ge=1, le=WEEKS_PER_YEAR, description="First week to sow"
+    )
+    sowing_end_week: Optional[int] = Field(
+        None,
+        ge=1,
+        le=WEEKS_PER_YEAR,
+        description="Last week to sow; before the first week if sowing spans "
+        "the turn of the year",
+    )
+    growing_weeks: Optional[int] = Field(
+        None, ge=1, le=WEEKS_PER_YEAR, description="Weeks from sowing to harvest"
+    )
 
 
 class PlantFamily(PlantFamilyBase):
     id: int
+    version: int = Field(
+        ..., description="Changes with every write; send it as If-Match to delete safely"
+    )
 
 
 class PlantFamilyCreate(PlantFamilyBase):
     pass
+
+
+class PlantFamilyImportError(BaseModel):
+    line: int = Field(..., description="Line of the rejected record in the upload")
+    error: str = Field(..., description="Why the record was rejected")
+
+
+class PlantFamilyImportResult(BaseModel):
+    inserted: int = Field(0, description="Plant families created")
+    updated: int = Field(0, description="Existing plant families (by name) changed")
+    failed: int = Field(0, description="Records rejected")
+    errors: List[PlantFamilyImportError] = Field(
+        default_factory=list,
+        description="Rejected records, capped at the first 100",
+    )
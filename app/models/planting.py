@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class PlantingBase(BaseModel):
+    plant_family_id: Optional[int] = Field(
+        None, description="Plant family grown, if known"
+    )
+    x: int = Field(..., ge=0, description="Position along the bed's length in cm")
+    y: int = Field(..., ge=0, description="Position along the bed's width in cm")
+    length: int = Field(..., gt=0, description="Extent along the bed's length in cm")
+    width: int = Field(..., gt=0, description="Extent along the bed's width in cm")
+    spacing: int = Field(
+        0, ge=0, description="Space in cm kept free around the planting"
+    )
+
+
+class PlantingCreate(PlantingBase):
+    pass
+
+
+class Planting(PlantingBase):
+    id: int = Field(..., description="Unique identifier for the planting")
+    bed_id: int = Field(..., description="Bed the planting is in")
+
+
+class PlantingPosition(BaseModel):
+    x: int = Field(..., description="Position along the bed's length in cm")
+    y: int = Field(..., description="Position along the bed's width in cm")
+
+
+class BedCapacity(BaseModel):
+    bed_id: int = Field(..., description="ID of the bed")
+    cell_size: int = Field(..., description="Edge of a grid cell in cm")
+    rows: int = Field(..., description="Grid cells along the bed's length")
+    columns: int = Field(..., description="Grid cells along the bed's width")
+    free_cells: int = Field(..., description="Cells not reserved by a planting")
+    free_area: int = Field(
+        ...,
+        description="Area of the free cells in cm² (cells at the edges count fully)",
+    )
+    fits: Optional[int] = Field(
+        None, description="How many more plantings of the requested size fit"
+    )
+    next_position: Optional[PlantingPosition] = Field(
+        None, description="Where the next planting of the requested size fits"
+    )
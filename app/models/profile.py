@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class RequestProfile(BaseModel):
+    name: str = Field(
+        ..., description="File name; also sent as X-Profile-Id with the response"
+    )
+    method: str = Field(..., description="HTTP method of the profiled request")
+    started_at: datetime = Field(..., description="When the request started")
+    size: int = Field(..., description="Size of the collapsed stacks in bytes")
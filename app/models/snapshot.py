@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class GardenSnapshotCreate(BaseModel):
+    name: str = Field(
+        ..., min_length=1, max_length=200, description="Name, unique within the garden"
+    )
+
+
+class GardenSnapshot(BaseModel):
+    id: int = Field(..., description="Unique identifier for the snapshot")
+    garden_id: int = Field(..., description="Garden the snapshot was taken of")
+    name: str = Field(..., description="Name, unique within the garden")
+    created_at: datetime = Field(..., description="When the snapshot was taken")
+    bed_count: int = Field(..., description="Beds in the snapshot")
+    assignment_count: int = Field(
+        ..., description="Bed to plant family assignments in the snapshot"
+    )
+
+
+class SnapshotBed(BaseModel):
+    id: int = Field(..., description="ID of the bed")
+    index: int = Field(..., description="User-readable bed index (1-based)")
+    length: int = Field(..., description="Length of the bed in centimeters")
+    width: int = Field(..., description="Width of the bed in centimeters")
+
+
+class SnapshotBedChange(BaseModel):
+    id: int = Field(..., description="ID of the bed")
+    before: SnapshotBed = Field(..., description="The bed in the first snapshot")
+    after: SnapshotBed = Field(..., description="The bed in the second snapshot")
+
+
+class BedAssignment(BaseModel):
+    bed_id: int = Field(..., description="ID of the bed")
+    plant_family_id: int = Field(..., description="ID of the plant family")
+
+
+class GardenSnapshotDiff(BaseModel):
+    from_snapshot_id: int = Field(..., description="Snapshot compared from")
+    to_snapshot_id: int = Field(..., description="Snapshot compared to")
+    added_beds: List[SnapshotBed] = Field(
+        default_factory=list, description="Beds only in the second snapshot"
+    )
+    removed_beds: List[SnapshotBed] = Field(
+        default_factory=list, description="Beds only in the first snapshot"
+    )
+    changed_beds: List[SnapshotBedChange] = Field(
+        default_factory=list, description="Beds with another index or dimensions"
+    )
+    added_assignments: List[BedAssignment] = Field(
+        default_factory=list, description="Assignments only in the second snapshot"
+    )
+    removed_assignments: List[BedAssignment] = Field(
+        default_factory=list, description="Assignments only in the first snapshot"
+    )
+
+
+class GardenSnapshotRestore(BaseModel):
+    snapshot: GardenSnapshot = Field(..., description="The restored snapshot")
+    beds: int = Field(..., description="Beds the garden has after the restore")
+    assignments: int = Field(..., description="Assignments restored")
+    skipped_assignments: int = Field(
+        0, description="Assignments of plant families deleted since the snapshot"
+    )
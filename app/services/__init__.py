@@ -1,3 +1,4 @@
 from .bed_service import BedService
+from .garden_service import GardenService
 
-__all__ = ["BedService"]
+__all__ = ["BedService", "GardenService"]
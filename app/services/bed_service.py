@@ -1,15 +1,43 @@
-from typing import List
+from typing import Dict, List, Optional
 from app.database.base.bed import BedRepository
-from app.models.bed import Bed, BedCreate, BedCreationRequest, BedCreationResponse
+from app.models.bed import (
+    Bed,
+    BedBulkUpdateRequest,
+    BedBulkUpdateResponse,
+    BedChanges,
+    BedCreate,
+    BedCreationRequest,
+    BedCreationResponse,
+)
+from app.database.sql.notifications import bed_list_key
+from app.models.garden import DEFAULT_GARDEN_ID
+from app.services.bed_update_coalescer import BedUpdateCoalescer
+from app.services.read_cache import ReadCache
+from app.services.read_coalescing import BatchLoader, SingleFlight
+from app.services.tracing import traced_methods
 
 
+@traced_methods
 class BedService:
     """Service layer for bed operations"""
 
-    def __init__(self, bed_repository: BedRepository):
+    def __init__(
+        self,
+        bed_repository: BedRepository,
+        coalescer: Optional[BedUpdateCoalescer] = None,
+        single_flight: Optional[SingleFlight] = None,
+        bed_loader: Optional[BatchLoader] = None,
+        read_cache: Optional[ReadCache] = None,
+    ):
         self.bed_repository = bed_repository
+        self.coalescer = coalescer
+        self.single_flight = single_flight
+        self.bed_loader = bed_loader
+        self.read_cache = read_cache
 
-    async def create_beds(self, request: BedCreationRequest) -> BedCreationResponse:
+    async def create_beds(
+        self, request: BedCreationRequest, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> BedCreationResponse:
         """Create multiple beds with the same dimensions"""
         # Create BedCreate objects for each bed
         beds_to_create = [
@@ -18,44 +46,111 @@ class BedService:
         ]
 
         # Create beds in database
-        created_beds = await self.bed_repository.create_multiple_beds(beds_to_create)
+        created_beds = await self.bed_repository.create_multiple_beds(
+            beds_to_create, garden_id
+        )
 
         # Create response
         message = f"Successfully created {len(created_beds)} beds"
         return BedCreationResponse(beds=created_beds, message=message)
 
     async def create_beds_with_cleanup(
-        self, request: BedCreationRequest
+        self, request: BedCreationRequest, garden_id: int = DEFAULT_GARDEN_ID
     ) -> BedCreationResponse:
-        """Delete all existing beds and create new ones"""
+        """Delete all existing beds of the garden and create new ones"""
         # Delete all existing beds
-        await self.bed_repository.delete_all_beds()
+        await self.bed_repository.delete_all_beds(garden_id)
 
         # Create new beds
-        return await self.create_beds(request)
+        return await self.create_beds(request, garden_id)
 
-    async def get_all_beds(self) -> List[Bed]:
+    async def get_all_beds(self, garden_id: int = DEFAULT_GARDEN_ID) -> List[Bed]:
         """Get all beds"""
-        return await self.bed_repository.get_all_beds()
+        if self.read_cache is None:
+            return await self._load_beds(garden_id)
+        return await self.read_cache.get_or_load(
+            bed_list_key(garden_id), lambda: self._load_beds(garden_id)
+        )
+
+    async def _load_beds(self, garden_id: int) -> List[Bed]:
+        if self.single_flight is None:
+            return await self.bed_repository.get_all_beds(garden_id)
+        return await self.single_flight.do(
+            ("beds", garden_id),
+            lambda: self.bed_repository.get_all_beds(garden_id),
+        )
+
+    async def _fetch_beds(self, bed_ids: List[int], garden_id: int) -> Dict[int, Bed]:
+        beds = await self.bed_repository.get_beds_by_ids(bed_ids, garden_id)
+        return {bed.id: bed for bed in beds}
 
-    async def get_bed_by_id(self, bed_id: int) -> Bed:
+    async def get_bed_changes(
+        self, since: int, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> BedChanges:
+        """Get the beds changed or deleted since a version"""
+        return await self.bed_repository.get_bed_changes(since, garden_id)
+
+    async def get_bed_by_id(
+        self, bed_id: int, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> Bed:
         """Get a bed by ID"""
-        bed = await self.bed_repository.get_bed_by_id(bed_id)
+        if self.bed_loader is None:
+            bed = await self.bed_repository.get_bed_by_id(bed_id, garden_id)
+        else:
+            bed = await self.bed_loader.load(
+                garden_id,
+                bed_id,
+                lambda bed_ids: self._fetch_beds(bed_ids, garden_id),
+            )
         if not bed:
             raise ValueError(f"Bed with ID {bed_id} not found")
         return bed
 
-    async def update_bed(self, bed_id: int, bed_data: BedCreate) -> Bed:
-        """Update a bed"""
-        bed = await self.bed_repository.update_bed(bed_id, bed_data)
+    async def update_bed(
+        self,
+        bed_id: int,
+        bed_data: BedCreate,
+        garden_id: int = DEFAULT_GARDEN_ID,
+        expected_version: Optional[int] = None,
+    ) -> Bed:
+        """Update a bed, optionally only if it is still at expected_version"""
+        if self.coalescer is not None and expected_version is None:
+            # Conditional updates must see the version they were checked
+            # against, so only unconditional ones are merged
+            bed = await self.coalescer.update_bed(
+                self.bed_repository, bed_id, bed_data, garden_id
+            )
+        else:
+            bed = await self.bed_repository.update_bed(
+                bed_id, bed_data, garden_id, expected_version
+            )
         if not bed:
             raise ValueError(f"Bed with ID {bed_id} not found")
         return bed
 
-    async def delete_bed(self, bed_id: int) -> bool:
-        """Delete a bed"""
-        return await self.bed_repository.delete_bed(bed_id)
+    async def update_beds(
+        self, request: BedBulkUpdateRequest, garden_id: int = DEFAULT_GARDEN_ID
+    ) -> BedBulkUpdateResponse:
+        """Update the dimensions of many beds at once"""
+        # Later entries for the same bed win
+        updates = {
+            bed.id: BedCreate(length=bed.length, width=bed.width)
+            for bed in request.beds
+        }
+        updated_beds = await self.bed_repository.update_beds(updates, garden_id)
+        updated_ids = {bed.id for bed in updated_beds}
+        not_found = [bed_id for bed_id in updates if bed_id not in updated_ids]
+        return BedBulkUpdateResponse(beds=updated_beds, not_found=not_found)
+
+    async def delete_bed(
+        self,
+        bed_id: int,
+        garden_id: int = DEFAULT_GARDEN_ID,
+        expected_version: Optional[int] = None,
+    ) -> bool:
+        """Delete a bed, optionally only if it is still at expected_version"""
+        return await self.bed_repository.delete_bed(bed_id, garden_id, expected_version)
 
-    async def delete_all_beds(self) -> int:
+    async def delete_all_beds(self, garden_id: int = DEFAULT_GARDEN_ID) -> int:
         """Delete all beds"""
-        return await self.bed_repository.delete_all_beds()
+        return await self.bed_repository.delete_all_beds(garden_id)
@@ -0,0 +1,123 @@
+import asyncio
+from typing import Dict, List, Optional, Set
+
+from app.database.base.bed import BedRepository
+from app.database.sql.session_router import current_client_id, pin_to_primary
+from app.models.bed import Bed, BedCreate
+from app.services.tracing import traced_methods
+
+
+class _Batch:
+    """Updates of one garden waiting for the same flush"""
+
+    def __init__(self, bed_repository: BedRepository):
+        self.bed_repository = bed_repository
+        # Later updates of a bed replace earlier ones
+        self.updates: Dict[int, BedCreate] = {}
+        self.waiters: Dict[int, List[asyncio.Future]] = {}
+        self.clients: Set[str] = set()
+
+
+@traced_methods
+class BedUpdateCoalescer:
+    """Merges rapid updates of beds into one UPDATE per garden and window.
+
+    The first update of a garden opens a batch that is flushed ``window``
+    seconds later with a single ``update_beds`` call; updates arriving in the
+    meantime join it, the last one per bed winning. Every caller gets the bed
+    as persisted by the flush. Flushes of one garden run one after another,
+    so a later batch never overtakes an earlier one.
+    """
+
+    def __init__(self, window: float, read_your_writes_window: float = 0.0):
+        self.window = window
+        self.read_your_writes_window = read_your_writes_window
+        self._batches: Dict[int, _Batch] = {}
+        self._flushes: Dict[int, asyncio.Task] = {}
+        self.submitted = 0
+        self.flushed = 0
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    async def update_bed(
+        self,
+        bed_repository: BedRepository,
+        bed_id: int,
+        bed: BedCreate,
+        garden_id: int,
+    ) -> Optional[Bed]:
+        """Update a bed with the next flush; None if the bed does not exist"""
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(garden_id)
+        if batch is None:
+            batch = self._batches[garden_id] = _Batch(bed_repository)
+            loop.call_later(self.window, self._start_flush, garden_id, batch)
+        batch.updates[bed_id] = bed
+        future = loop.create_future()
+        batch.waiters.setdefault(bed_id, []).append(future)
+        client_id = current_client_id.get()
+        if client_id is not None:
+            batch.clients.add(client_id)
+        self.submitted += 1
+        return await future
+
+    def _start_flush(self, garden_id: int, batch: _Batch) -> None:
+        if self._batches.get(garden_id) is batch:
+            del self._batches[garden_id]
+        previous = self._flushes.get(garden_id)
+        task = asyncio.ensure_future(self._flush(garden_id, batch, previous))
+        self._flushes[garden_id] = task
+        task.add_done_callback(lambda _: self._forget_flush(garden_id, task))
+
+    def _forget_flush(self, garden_id: int, task: asyncio.Task) -> None:
+        if self._flushes.get(garden_id) is task:
+            del self._flushes[garden_id]
+
+    async def _flush(
+        self, garden_id: int, batch: _Batch, previous: Optional[asyncio.Task]
+    ) -> None:
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            try:
+                beds = await batch.bed_repository.update_beds(
+                    batch.updates, garden_id
+                )
+            except Exception as e:
+                self._fail(batch, e)
+                return
+            self.flushed += 1
+            self.written += len(beds)
+            # Every caller of the batch wrote, not just the one whose context
+            # the flush runs in
+            if self.read_your_writes_window > 0:
+                for client_id in batch.clients:
+                    pin_to_primary(client_id, self.read_your_writes_window)
+            persisted = {bed.id: bed for bed in beds}
+            for bed_id, futures in batch.waiters.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(persisted.get(bed_id))
+        finally:
+            # Reached with callers still waiting only if the flush was cancelled
+            self._fail(batch, RuntimeError("Bed update flush was cancelled"))
+
+    @staticmethod
+    def _fail(batch: _Batch, error: Exception) -> None:
+        for futures in batch.waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_ms": round(self.window * 1000, 1),
+            "submitted": self.submitted,
+            "flushes": self.flushed,
+            "written": self.written,
+            "pending": sum(len(batch.updates) for batch in self._batches.values()),
+        }
@@ -0,0 +1,55 @@
+from app.database.base.bed import BedRepository
+from app.database.base.plant_family import PlantFamilyRepository
+from app.database.sql.session_router import joined_unit_of_work
+from app.models.calendar import GardenCalendar
+from app.services.garden_calendar import (
+    CalendarCache,
+    CalendarIndex,
+    calendar_entries,
+)
+from app.services.tracing import traced_methods
+
+
+@traced_methods
+class CalendarService:
+    """Serves garden calendars, computed once per garden version"""
+
+    def __init__(
+        self,
+        bed_repository: BedRepository,
+        plant_family_repository: PlantFamilyRepository,
+        cache: CalendarCache,
+    ):
+        self.bed_repository = bed_repository
+        self.plant_family_repository = plant_family_repository
+        self.cache = cache
+
+    async def get_index(self, garden_id: int) -> CalendarIndex:
+        """Get the calendar of the garden's current version, building it if needed"""
+        # One session, so the version and the data come from the same replica.
+        # The version is read first: a change in between leaves the index
+        # labelled with an older version than its data, so it is rebuilt,
+        # never stale.
+        async with joined_unit_of_work():
+            version = await self.bed_repository.get_garden_version(garden_id)
+            index = self.cache.get(garden_id, version)
+            if index is None:
+                beds = await self.bed_repository.get_all_beds(garden_id)
+                plant_families = (
+                    await self.plant_family_repository.get_all_plant_families()
+                )
+                index = CalendarIndex(version, calendar_entries(beds, plant_families))
+                self.cache.put(garden_id, index)
+        return index
+
+    async def get_calendar(
+        self, garden_id: int, from_week: int, to_week: int
+    ) -> GardenCalendar:
+        """Get what to sow and harvest in a garden from from_week to to_week"""
+        index = await self.get_index(garden_id)
+        return GardenCalendar(
+            version=index.version,
+            from_week=from_week,
+            to_week=to_week,
+            entries=index.between(from_week, to_week),
+        )
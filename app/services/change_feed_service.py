@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Optional, Set
+
+from pydantic import ValidationError
+
+from app.database.sql.notifications import CHANGE_CHANNEL, PostgresListener
+from app.models.change import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+RESYNC_EVENT = ChangeEvent(op="resync")
+
+
+class Subscription:
+    """A subscriber's bounded buffer of change events.
+
+    When a slow consumer lets the buffer fill up, the buffered events are
+    replaced by a single resync event so memory stays bounded and the client
+    knows to reload.
+    """
+
+    def __init__(self, garden_id: Optional[int], buffer_size: int):
+        self.garden_id = garden_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+
+    def wants(self, event: ChangeEvent) -> bool:
+        return (
+            event.garden_id is None
+            or self.garden_id is None
+            or event.entity == "garden"
+            or event.garden_id == self.garden_id
+        )
+
+    def offer(self, event: ChangeEvent) -> None:
+        if not self.wants(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+    async def next_event(self, timeout: float) -> Optional[ChangeEvent]:
+        """Wait for the next event; returns None if none arrived in time"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChangeFeedService:
+    """Fans change notifications from one LISTEN connection out to all subscribers"""
+
+    def __init__(self, listener: PostgresListener, buffer_size: int = 100):
+        self.listener = listener
+        self.buffer_size = buffer_size
+        self.subscriptions: Set[Subscription] = set()
+        self.received = 0
+        listener.add_callback(CHANGE_CHANNEL, self._on_notification)
+        listener.on_reconnect(self._on_reconnect)
+
+    async def start(self) -> None:
+        """Start the listener if needed, raising if the database is unreachable"""
+        await self.listener.ensure_started()
+
+    async def subscribe(self, garden_id: Optional[int] = None) -> Subscription:
+        """Register a subscriber, starting the listener if needed"""
+        await self.start()
+        subscription = Subscription(garden_id, self.buffer_size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def publish(self, event: ChangeEvent) -> None:
+        """Deliver an event to every interested subscriber without waiting"""
+        for subscription in list(self.subscriptions):
+            subscription.offer(event)
+
+    def _on_notification(self, payload: str) -> None:
+        self.received += 1
+        try:
+            event = ChangeEvent.model_validate_json(payload)
+        except ValidationError:
+            logger.warning("Ignoring malformed change notification: %s", payload)
+            return
+        self.publish(event)
+
+    def _on_reconnect(self) -> None:
+        # Notifications sent while the listener was down are lost
+        self.publish(RESYNC_EVENT)
+
+    async def stop(self) -> None:
+        """Drop all subscribers and close the listener"""
+        self.subscriptions.clear()
+        await self.listener.stop()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscriptions),
+            "received": self.received,
+            "dropped": sum(s.dropped for s in self.subscriptions),
+            "listening": self.listener.connected,
+        }
@@ -0,0 +1,156 @@
+"""Neighbour-aware assignment of plant families to beds.
+
+Beds are neighbours when their indexes are consecutive. A plan gives every
+bed one plant family and scores the sum of the compatibility of all
+neighbouring pairs. Plans are found by simulated annealing: each move
+changes the family of one bed, so its score delta only involves the bed's
+two neighbours and costs the same for any garden size.
+
+Everything here works on positions (0..n-1) into the candidate families and
+the beds in index order, packed as ``array`` buffers so that the search can
+run in a worker process of the compute pool.
+"""
+import math
+import random
+import time
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Checking the clock on every move would cost more than the move itself
+_CLOCK_INTERVAL = 1024
+# Temperature at the end of the search, relative to the start
+_FINAL_TEMPERATURE = 0.01
+
+UNASSIGNED = -1
+
+
+class CompatibilityMatrix(NamedTuple):
+    """Dense, symmetric family-by-family scores; scores[a * size + b]"""
+
+    family_ids: List[int]
+    scores: array
+
+    @property
+    def size(self) -> int:
+        return len(self.family_ids)
+
+    @classmethod
+    def build(
+        cls, family_ids: List[int], pairs: Iterable[Tuple[int, int, int]]
+    ) -> "CompatibilityMatrix":
+        """Build the matrix of family_ids from (family, other family, score)"""
+        positions = {family_id: i for i, family_id in enumerate(family_ids)}
+        size = len(family_ids)
+        scores = array("b", bytes(size * size))
+        for family_id, other_family_id, score in pairs:
+            a, b = positions.get(family_id), positions.get(other_family_id)
+            if a is None or b is None:
+                continue
+            scores[a * size + b] = scores[b * size + a] = score
+        return cls(family_ids, scores)
+
+
+def chain_score(positions: array, scores: array, size: int) -> int:
+    """Score of neighbouring beds; unassigned beds score 0 with any neighbour"""
+    total = 0
+    for left, right in zip(positions, positions[1:]):
+        if left != UNASSIGNED and right != UNASSIGNED:
+            total += scores[left * size + right]
+    return total
+
+
+def _fill_greedily(positions: array, scores: array, size: int) -> None:
+    """Give unassigned beds the family that suits their left neighbour best"""
+    for i, position in enumerate(positions):
+        if position != UNASSIGNED:
+            continue
+        left = positions[i - 1] if i > 0 else UNASSIGNED
+        if left == UNASSIGNED:
+            positions[i] = i % size
+            continue
+        row = scores[left * size:(left + 1) * size]
+        positions[i] = max(range(size), key=row.__getitem__)
+
+
+class PlanResult(NamedTuple):
+    positions: bytes
+    score: int
+    iterations: int
+
+
+def plan_companions(
+    initial: bytes,
+    scores: bytes,
+    size: int,
+    time_budget: float,
+    seed: Optional[int] = None,
+    max_iterations: Optional[int] = None,
+) -> PlanResult:
+    """Search a family position per bed maximizing the neighbour score.
+
+    ``initial`` holds an int32 position per bed in index order, UNASSIGNED
+    for beds without a candidate family; ``scores`` is the int8 matrix of a
+    CompatibilityMatrix. Returns the best plan found within the time budget.
+    """
+    positions = array("i")
+    positions.frombytes(initial)
+    matrix = array("b")
+    matrix.frombytes(scores)
+    beds = len(positions)
+    if beds == 0 or size == 0:
+        return PlanResult(positions.tobytes(), 0, 0)
+
+    _fill_greedily(positions, matrix, size)
+    score = chain_score(positions, matrix, size)
+    best, best_positions = score, positions.tobytes()
+    if beds == 1 or size == 1:
+        return PlanResult(best_positions, best, 0)
+
+    rng = random.Random(seed)
+    start_temperature = max(1, max(abs(value) for value in matrix))
+    temperature = start_temperature
+    start = time.perf_counter()
+    deadline = start + time_budget
+    last = beds - 1
+    iterations = 0
+    while max_iterations is None or iterations < max_iterations:
+        if iterations % _CLOCK_INTERVAL == 0:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            progress = (now - start) / time_budget
+            temperature = start_temperature * _FINAL_TEMPERATURE**progress
+        iterations += 1
+
+        bed = rng.randrange(beds)
+        old = positions[bed]
+        new = rng.randrange(size)
+        if new == old:
+            continue
+        delta = 0
+        if bed > 0:
+            left = positions[bed - 1] * size
+            delta += matrix[left + new] - matrix[left + old]
+        if bed < last:
+            right = positions[bed + 1] * size
+            delta += matrix[right + new] - matrix[right + old]
+        if delta < 0 and rng.random() >= math.exp(delta / temperature):
+            continue
+        positions[bed] = new
+        score += delta
+        if score > best:
+            best, best_positions = score, positions.tobytes()
+    return PlanResult(best_positions, best, iterations)
+
+
+def initial_positions(
+    current: List[List[int]], family_positions: Dict[int, int]
+) -> array:
+    """Position of each bed's first candidate family, UNASSIGNED if it has none"""
+    positions = array("i")
+    for family_ids in current:
+        candidates = (
+            family_positions[pf_id] for pf_id in family_ids if pf_id in family_positions
+        )
+        positions.append(next(candidates, UNASSIGNED))
+    return positions
@@ -0,0 +1,99 @@
+from array import array
+from app.database.base.bed import BedRepository
+from app.database.base.plant_family import PlantFamilyRepository
+from app.models.companion import CompanionPlan, CompanionPlanRequest
+from app.models.snapshot import BedAssignment
+from app.services.companion_planner import (
+    CompatibilityMatrix,
+    chain_score,
+    initial_positions,
+    plan_companions,
+)
+from app.services.compute_pool import ComputePool
+from app.services.tracing import traced_methods
+
+
+@traced_methods
+class CompanionPlanningService:
+    """Plans which plant family grows in which bed of a garden"""
+
+    def __init__(
+        self,
+        bed_repository: BedRepository,
+        plant_family_repository: PlantFamilyRepository,
+        compute_pool: ComputePool,
+        max_time_budget: float = 10.0,
+    ):
+        self.bed_repository = bed_repository
+        self.plant_family_repository = plant_family_repository
+        self.compute_pool = compute_pool
+        self.max_time_budget = max_time_budget
+
+    async def build_matrix(self, request: CompanionPlanRequest) -> CompatibilityMatrix:
+        """Load the compatibility of the candidate plant families"""
+        plant_families = await self.plant_family_repository.get_all_plant_families()
+        known = [pf.id for pf in plant_families]
+        family_ids = sorted(known)
+        if request.plant_family_ids is not None:
+            unknown = sorted(set(request.plant_family_ids) - set(known))
+            if unknown:
+                raise ValueError(f"Plant families with IDs {unknown} not found")
+            family_ids = sorted(set(request.plant_family_ids))
+        if not family_ids:
+            raise ValueError("There are no plant families to plan with")
+        scores = await self.plant_family_repository.get_compatibility_scores()
+        return CompatibilityMatrix.build(
+            family_ids,
+            (
+                (pair.plant_family_id, pair.other_plant_family_id, pair.score)
+                for pair in scores
+            ),
+        )
+
+    async def plan(
+        self, request: CompanionPlanRequest, garden_id: int
+    ) -> CompanionPlan:
+        """Assign one plant family per bed maximizing neighbour compatibility"""
+        if request.time_budget > self.max_time_budget:
+            raise ValueError(
+                f"Time budget must not exceed {self.max_time_budget} seconds"
+            )
+        matrix = await self.build_matrix(request)
+        beds = sorted(
+            await self.bed_repository.get_all_beds(garden_id),
+            key=lambda bed: bed.index,
+        )
+        family_positions = {pf_id: i for i, pf_id in enumerate(matrix.family_ids)}
+        current = initial_positions(
+            [bed.plant_families for bed in beds], family_positions
+        )
+
+        # The search runs for its time budget whatever the garden size, so it
+        # always leaves the event loop
+        result = await self.compute_pool.offload(
+            plan_companions,
+            current.tobytes(),
+            matrix.scores.tobytes(),
+            matrix.size,
+            request.time_budget,
+            request.seed,
+        )
+        positions = array("i")
+        positions.frombytes(result.positions)
+        plan = CompanionPlan(
+            assignments=[
+                BedAssignment(
+                    bed_id=bed.id, plant_family_id=matrix.family_ids[position]
+                )
+                for bed, position in zip(beds, positions)
+            ],
+            score=result.score,
+            current_score=chain_score(current, matrix.scores, matrix.size),
+            iterations=result.iterations,
+        )
+        if request.apply:
+            await self.bed_repository.replace_plant_families(
+                {a.bed_id: a.plant_family_id for a in plan.assignments}, garden_id
+            )
+            plan.applied = True
+        return plan
@@ -0,0 +1,88 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ComputePool:
+    """Runs CPU-bound work in worker processes so it does not stall the event loop.
+
+    Work below ``offload_threshold`` items runs inline, where it is cheaper
+    than the handoff to another process. Functions and their arguments must be
+    picklable; large inputs should be passed as packed buffers (see
+    ``app.services.packed_arrays``).
+    """
+
+    def __init__(self, max_workers: int = 2, offload_threshold: int = 5000):
+        self.max_workers = max_workers
+        self.offload_threshold = offload_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.running = 0
+        self.offloaded = 0
+        self.inline = 0
+        self.failed = 0
+        self.offload_seconds = 0.0
+
+    def offloads(self, size: int) -> bool:
+        """Whether work on this many items is sent to a worker process"""
+        return self.max_workers > 0 and size >= self.offload_threshold
+
+    def start(self) -> None:
+        """Create the worker pool; processes are spawned on first use"""
+        if self._executor is None and self.max_workers > 0:
+            # Forking a process that runs an event loop and database pools
+            # copies their state; spawned workers start clean
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, size: int, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args), in a worker process if size is above the threshold"""
+        if not self.offloads(size):
+            self.inline += 1
+            return fn(*args)
+        return await self.offload(fn, *args)
+
+    async def offload(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) in a worker process whatever its size.
+
+        For work whose running time does not depend on its input size, such
+        as searches with a time budget. Runs inline if the pool is disabled.
+        """
+        if self.max_workers <= 0:
+            self.inline += 1
+            return fn(*args)
+        self.start()
+        self.running += 1
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.offloaded += 1
+            self.offload_seconds += time.perf_counter() - start
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "offload_threshold": self.offload_threshold,
+            "running": self.running,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "failed": self.failed,
+            "offload_seconds": round(self.offload_seconds, 3),
+        }
@@ -0,0 +1,150 @@
+"""Sowing and harvest calendar of a garden, indexed by week.
+
+Every plant family of a bed with a sowing window contributes a "sow" entry
+for that window and, if its growing time is known, a "harvest" entry for the
+same window shifted by the growing time. The calendar repeats every year, so
+entries are kept with a first week in 1..52 and a last week that may run past
+52 into the next year.
+
+A CalendarIndex sorts the entries by first week once. An entry is at most
+``longest`` weeks long, so the entries overlapping weeks [a, b] are among
+those starting in [a - longest, b]: two bisections and a filter instead of a
+scan of the whole garden.
+"""
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from app.models.bed import Bed
+from app.models.calendar import CalendarEntry
+from app.models.plant_family import WEEKS_PER_YEAR, PlantFamily
+
+
+def _entry(
+    activity: str, start: int, end: int, bed: Bed, plant_family: PlantFamily
+) -> CalendarEntry:
+    """Entry for weeks start..end, moved into the year of its first week"""
+    shift = (start - 1) // WEEKS_PER_YEAR * WEEKS_PER_YEAR
+    return CalendarEntry(
+        activity=activity,
+        start_week=start - shift,
+        end_week=end - shift,
+        bed_id=bed.id,
+        bed_index=bed.index,
+        plant_family_id=plant_family.id,
+        plant_family_name=plant_family.name,
+    )
+
+
+def calendar_entries(
+    beds: Iterable[Bed], plant_families: Iterable[PlantFamily]
+) -> List[CalendarEntry]:
+    """Sow and harvest entries of every bed's plant families"""
+    families: Dict[int, PlantFamily] = {pf.id: pf for pf in plant_families}
+    entries = []
+    for bed in beds:
+        for plant_family_id in bed.plant_families:
+            plant_family = families.get(plant_family_id)
+            if (
+                plant_family is None
+                or plant_family.sowing_start_week is None
+                or plant_family.sowing_end_week is None
+            ):
+                continue
+            start = plant_family.sowing_start_week
+            end = plant_family.sowing_end_week
+            if end < start:
+                end += WEEKS_PER_YEAR
+            entries.append(_entry("sow", start, end, bed, plant_family))
+            growing_weeks = plant_family.growing_weeks
+            if growing_weeks is not None:
+                entries.append(
+                    _entry(
+                        "harvest",
+                        start + growing_weeks,
+                        end + growing_weeks,
+                        bed,
+                        plant_family,
+                    )
+                )
+    return entries
+
+
+class CalendarIndex:
+    """A garden's calendar entries, searchable by week"""
+
+    def __init__(self, version: int, entries: List[CalendarEntry]):
+        self.version = version
+        self.entries = sorted(
+            entries, key=lambda entry: (entry.start_week, entry.bed_index)
+        )
+        self._starts = [entry.start_week for entry in self.entries]
+        self._longest = max(
+            (entry.end_week - entry.start_week for entry in self.entries), default=0
+        )
+
+    def between(self, first_week: int, last_week: int) -> List[CalendarEntry]:
+        """Entries taking place in any week from first_week to last_week.
+
+        last_week before first_week wraps around the turn of the year. The
+        returned entries have weeks in 1..52, in the order of their first week.
+        """
+        if last_week < first_week:
+            last_week += WEEKS_PER_YEAR
+        found = set()
+        # An entry may also overlap the weeks as last year's or next year's
+        # occurrence
+        for shift in (-WEEKS_PER_YEAR, 0, WEEKS_PER_YEAR):
+            low = bisect_left(self._starts, first_week - shift - self._longest)
+            high = bisect_right(self._starts, last_week - shift)
+            for position in range(low, high):
+                if self.entries[position].end_week + shift >= first_week:
+                    found.add(position)
+        return [self._in_year(self.entries[position]) for position in sorted(found)]
+
+    @staticmethod
+    def _in_year(entry: CalendarEntry) -> CalendarEntry:
+        if entry.end_week <= WEEKS_PER_YEAR:
+            return entry
+        end_week = (entry.end_week - 1) % WEEKS_PER_YEAR + 1
+        return entry.model_copy(update={"end_week": end_week})
+
+
+class CalendarCache:
+    """The latest CalendarIndex of the most recently used gardens.
+
+    An index is only served for the garden version it was built for; any
+    change of a bed, an assignment or a plant family raises the version and
+    so invalidates it.
+    """
+
+    def __init__(self, max_gardens: int = 1000):
+        self.max_gardens = max_gardens
+        self._indexes: "OrderedDict[int, CalendarIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, garden_id: int, version: int) -> Optional[CalendarIndex]:
+        index = self._indexes.get(garden_id)
+        if index is None or index.version != version:
+            self.misses += 1
+            return None
+        self._indexes.move_to_end(garden_id)
+        self.hits += 1
+        return index
+
+    def put(self, garden_id: int, index: CalendarIndex) -> None:
+        current = self._indexes.get(garden_id)
+        # A slower request must not replace a newer calendar with an older one
+        if current is not None and current.version > index.version:
+            return
+        self._indexes[garden_id] = index
+        self._indexes.move_to_end(garden_id)
+        while len(self._indexes) > self.max_gardens:
+            self._indexes.popitem(last=False)
+
+    def invalidate(self, garden_id: int) -> None:
+        self._indexes.pop(garden_id, None)
+
+    def stats(self) -> dict:
+        return {"gardens": len(self._indexes), "hits": self.hits, "misses": self.misses}
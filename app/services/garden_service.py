@@ -0,0 +1,35 @@
+from typing import List
+from app.database.base.garden import GardenRepository
+from app.models.garden import Garden, GardenCreate, GardenStats
+from app.services.tracing import traced_methods
+
+
+@traced_methods
+class GardenService:
+    """Service layer for garden operations"""
+
+    def __init__(self, garden_repository: GardenRepository):
+        self.garden_repository = garden_repository
+
+    async def create_garden(self, garden_data: GardenCreate) -> Garden:
+        """Create a new garden"""
+        return await self.garden_repository.create_garden(garden_data)
+
+    async def get_garden_by_id(self, garden_id: int) -> Garden:
+        """Get a garden by ID"""
+        garden = await self.garden_repository.get_garden_by_id(garden_id)
+        if not garden:
+            raise ValueError(f"Garden with ID {garden_id} not found")
+        return garden
+
+    async def get_all_gardens(self) -> List[Garden]:
+        """Get all gardens"""
+        return await self.garden_repository.get_all_gardens()
+
+    async def get_garden_stats(self, garden_id: int) -> GardenStats:
+        """Get bed statistics of a garden"""
+        return await self.garden_repository.get_garden_stats(garden_id)
+
+    async def recompute_garden_stats(self, garden_id: int) -> GardenStats:
+        """Rebuild bed statistics of a garden from scratch"""
+        return await self.garden_repository.recompute_garden_stats(garden_id)
@@ -0,0 +1,63 @@
+"""Background job kinds and the coroutines that carry them out"""
+import os
+import uuid
+from typing import Any, AsyncIterable, AsyncIterator, Dict
+
+from app.models.bed import BedCreationRequest
+from app.services.bed_service import BedService
+from app.services.job_runner import JobContext
+from app.services.plant_family_service import PlantFamilyService
+
+CREATE_BEDS_WITH_CLEANUP = "create_beds_with_cleanup"
+IMPORT_PLANT_FAMILIES = "import_plant_families"
+
+_SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+async def spool_upload(chunks: AsyncIterable[bytes], spool_dir: str) -> str:
+    """Write an upload to a file that outlives the request (and the worker)"""
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}.upload")
+    with open(path, "wb") as spool:
+        async for chunk in chunks:
+            spool.write(chunk)
+    return path
+
+
+async def create_beds_with_cleanup(
+    bed_service: BedService, job: JobContext
+) -> Dict[str, Any]:
+    """Replace all beds of the job's garden"""
+    request = BedCreationRequest.model_validate(job.params["request"])
+    await job.report_progress(0, request.numberOfBeds)
+    response = await bed_service.create_beds_with_cleanup(request, job.garden_id)
+    await job.report_progress(len(response.beds), request.numberOfBeds)
+    return {"created": len(response.beds)}
+
+
+async def _read_spool(path: str, job: JobContext) -> AsyncIterator[bytes]:
+    total = os.path.getsize(path)
+    done = 0
+    with open(path, "rb") as spool:
+        while chunk := spool.read(_SPOOL_CHUNK_SIZE):
+            done += len(chunk)
+            yield chunk
+            await job.report_progress(done, total)
+
+
+async def import_plant_families(
+    plant_family_service: PlantFamilyService, job: JobContext
+) -> Dict[str, Any]:
+    """Import a spooled plant family upload; progress counts bytes read"""
+    path = job.params["path"]
+    if not os.path.exists(path):
+        raise ValueError("The uploaded file is no longer available")
+    try:
+        result = await plant_family_service.import_plant_families(
+            _read_spool(path, job), job.params["format"]
+        )
+    finally:
+        # Keep the upload for the worker that resumes an interrupted import
+        if not job.interrupted:
+            os.remove(path)
+    return result.model_dump()
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.database.base.job import JobRepository
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when its cancellation was requested"""
+
+
+class JobContext:
+    """What a running job sees of the runner: its parameters and progress"""
+
+    def __init__(
+        self,
+        job: Job,
+        params: Dict[str, Any],
+        repository: JobRepository,
+        progress_interval: float,
+    ):
+        self.job = job
+        self.params = params
+        self.repository = repository
+        self.progress_interval = progress_interval
+        # Set when the worker shuts down; the job stays unfinished and resumes
+        self.interrupted = False
+        self._last_report = 0.0
+
+    @property
+    def garden_id(self) -> Optional[int]:
+        return self.job.garden_id
+
+    async def report_progress(self, done: int, total: Optional[int] = None) -> None:
+        """Store progress (throttled) and raise JobCancelled if cancel was requested"""
+        now = time.monotonic()
+        if now - self._last_report < self.progress_interval and done != total:
+            return
+        self._last_report = now
+        if await self.repository.update_progress(self.job.id, done, total):
+            raise JobCancelled()
+
+
+JobHandler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobRunner:
+    """Runs durable background jobs on the event loop with bounded concurrency.
+
+    Jobs are recorded in the job repository before they are scheduled, so a job
+    submitted to a worker that stops is picked up again by the next worker that
+    starts or notices its missing heartbeat. Handlers must therefore be safe to
+    run again from the start.
+    """
+
+    def __init__(
+        self,
+        repository: JobRepository,
+        max_concurrency: int = 2,
+        heartbeat_interval: float = 10.0,
+        stale_after: float = 60.0,
+        progress_interval: float = 1.0,
+    ):
+        self.repository = repository
+        self.max_concurrency = max_concurrency
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.progress_interval = progress_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._contexts: Dict[int, JobContext] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.completed = {"succeeded": 0, "failed": 0, "cancelled": 0}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that carries out jobs of a kind"""
+        self._handlers[kind] = handler
+
+    def _ensure_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Tasks and semaphores of a previous (closed) loop are unusable
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._tasks = {}
+            self._contexts = {}
+            self._heartbeat_task = None
+            self._stopping = False
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def start(self) -> None:
+        """Resume unfinished jobs whose worker went away"""
+        self._ensure_loop()
+        await self._claim_stale_jobs()
+
+    async def stop(self) -> None:
+        """Interrupt running jobs and hand them to the next worker"""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        self._stopping = True
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        tasks = list(self._tasks.values())
+        for context in self._contexts.values():
+            context.interrupted = True
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.repository.release_jobs(self.worker_id)
+        self._loop = None
+
+    async def submit(
+        self, kind: str, params: Dict[str, Any], garden_id: Optional[int] = None
+    ) -> Job:
+        """Record a job and schedule it on this worker"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind {kind}")
+        self._ensure_loop()
+        job = await self.repository.create_job(kind, params, self.worker_id, garden_id)
+        self._schedule(job)
+        return job
+
+    async def get_job(self, job_id: int) -> Optional[Job]:
+        return await self.repository.get_job(job_id)
+
+    async def cancel(self, job_id: int) -> Optional[Job]:
+        """Request cancellation; returns None if the job is unknown or finished"""
+        job = await self.repository.request_cancel(job_id)
+        if job is not None:
+            # Jobs running on other workers are cancelled on their next heartbeat
+            self._cancel_local(job_id)
+        return job
+
+    def _cancel_local(self, job_id: int) -> None:
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+
+    def _schedule(self, job: Job) -> None:
+        if job.id not in self._tasks:
+            self._tasks[job.id] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Job) -> None:
+        try:
+            async with self._semaphore:
+                if job.cancel_requested:
+                    raise JobCancelled()
+                if not await self.repository.start_job(job.id, self.worker_id):
+                    return
+                params = await self.repository.get_job_params(job.id)
+                context = JobContext(job, params, self.repository, self.progress_interval)
+                self._contexts[job.id] = context
+                result = await self._handlers[job.kind](context)
+            await self._finish(job, "succeeded", result=result)
+        except (asyncio.CancelledError, JobCancelled):
+            # Jobs interrupted by a shutdown stay unfinished and are resumed
+            if not self._stopping:
+                await self._finish(job, "cancelled")
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            await self._finish(job, "failed", error=str(e))
+        finally:
+            self._tasks.pop(job.id, None)
+            self._contexts.pop(job.id, None)
+
+    async def _finish(self, job: Job, status: str, **outcome) -> None:
+        self.completed[status] += 1
+        try:
+            await self.repository.finish_job(job.id, status, **outcome)
+        except Exception:
+            # The job stays unfinished and is retried once its heartbeat is stale
+            logger.exception("Could not record the outcome of job %s", job.id)
+
+    async def _claim_stale_jobs(self) -> None:
+        for job in await self.repository.claim_stale_jobs(
+            self.worker_id, self.stale_after
+        ):
+            if job.kind not in self._handlers:
+                await self._finish(job, "failed", error=f"Unknown job kind {job.kind}")
+                continue
+            logger.info("Resuming job %s (%s)", job.id, job.kind)
+            self._schedule(job)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                for job_id in await self.repository.heartbeat(
+                    self.worker_id, list(self._tasks)
+                ):
+                    self._cancel_local(job_id)
+                await self._claim_stale_jobs()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Job heartbeat failed")
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "max_concurrency": self.max_concurrency,
+            "running": len(self._contexts),
+            "scheduled": len(self._tasks),
+            "completed": dict(self.completed),
+        }
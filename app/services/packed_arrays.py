@@ -0,0 +1,129 @@
+"""Compact columnar encoding of beds and plant families for worker processes.
+
+Beds and plant families are sent to the compute pool as one ``bytes`` buffer
+of int32 columns (int64 for versions) instead of pickled model objects: the
+buffer crosses the process boundary as a single copy, and workers read the
+columns without building a Python object per bed. Plant family assignments
+are stored as a flat ID column with per-bed offsets.
+"""
+import json
+import struct
+from array import array
+from typing import Iterable, List, NamedTuple, Tuple
+
+from app.models.bed import Bed
+from app.models.plant_family import PlantFamily
+
+_HEADER = struct.Struct("<II")
+
+
+def _int32(values: Iterable[int]) -> array:
+    return array("i", values)
+
+
+def _int64(values: Iterable[int]) -> array:
+    return array("q", values)
+
+
+def _read_columns(data: bytes, columns: List[Tuple[str, int]]) -> List[array]:
+    """Read (typecode, length) columns following the header"""
+    arrays = []
+    offset = _HEADER.size
+    for typecode, length in columns:
+        column = array(typecode)
+        column.frombytes(data[offset:offset + length * column.itemsize])
+        offset += length * column.itemsize
+        arrays.append(column)
+    return arrays
+
+
+class PackedBeds(NamedTuple):
+    """Bed columns; bed i has family_ids[family_offsets[i]:family_offsets[i + 1]]"""
+
+    ids: array
+    garden_ids: array
+    indexes: array
+    lengths: array
+    widths: array
+    versions: array
+    family_offsets: array
+    family_ids: array
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def plant_families(self, position: int) -> array:
+        start, end = self.family_offsets[position], self.family_offsets[position + 1]
+        return self.family_ids[start:end]
+
+
+class PackedPlantFamilies(NamedTuple):
+    """Plant family columns used by planning"""
+
+    ids: array
+    rotation_times: array
+    versions: array
+
+
+def pack_beds(beds: List[Bed]) -> bytes:
+    """Encode beds as int32 columns"""
+    family_offsets = _int32([0])
+    family_ids = _int32([])
+    for bed in beds:
+        family_ids.extend(bed.plant_families)
+        family_offsets.append(len(family_ids))
+    columns = (
+        _int32(bed.id for bed in beds),
+        _int32(bed.garden_id for bed in beds),
+        _int32(bed.index for bed in beds),
+        _int32(bed.length for bed in beds),
+        _int32(bed.width for bed in beds),
+        _int64(bed.version for bed in beds),
+        family_offsets,
+        family_ids,
+    )
+    header = _HEADER.pack(len(beds), len(family_ids))
+    return header + b"".join(column.tobytes() for column in columns)
+
+
+def unpack_beds(data: bytes) -> PackedBeds:
+    count, family_count = _HEADER.unpack_from(data)
+    columns = [("i", count)] * 5 + [("q", count), ("i", count + 1), ("i", family_count)]
+    return PackedBeds(*_read_columns(data, columns))
+
+
+def pack_plant_families(plant_families: List[PlantFamily]) -> bytes:
+    """Encode the numeric fields of plant families as int32 columns"""
+    columns = (
+        _int32(family.id for family in plant_families),
+        _int32(family.rotation_time for family in plant_families),
+        _int64(family.version for family in plant_families),
+    )
+    header = _HEADER.pack(len(plant_families), 0)
+    return header + b"".join(column.tobytes() for column in columns)
+
+
+def unpack_plant_families(data: bytes) -> PackedPlantFamilies:
+    count, _ = _HEADER.unpack_from(data)
+    columns = [("i", count), ("i", count), ("q", count)]
+    return PackedPlantFamilies(*_read_columns(data, columns))
+
+
+def beds_to_json(data: bytes) -> bytes:
+    """Render packed beds as the JSON body of a list of Bed models"""
+    beds = unpack_beds(data)
+    return json.dumps(
+        [
+            {
+                "length": beds.lengths[i],
+                "width": beds.widths[i],
+                "id": beds.ids[i],
+                "garden_id": beds.garden_ids[i],
+                "index": beds.indexes[i],
+                "plant_families": beds.plant_families(i).tolist(),
+                "version": beds.versions[i],
+            }
+            for i in range(len(beds))
+        ],
+        separators=(",", ":"),
+    ).encode()
@@ -0,0 +1,155 @@
+"""Incremental parsing of plant family uploads.
+
+Uploads are read chunk by chunk and turned into one record at a time, so an
+import needs the same memory for a hundred rows as for a hundred thousand.
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterable, AsyncIterator, Literal, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.models.plant_family import PlantFamilyCreate
+
+ImportFormat = Literal["csv", "ndjson"]
+
+IMPORT_COLUMNS = ("name", "nutrition_requirements", "rotation_time")
+# Columns a record may leave out or empty; they are then unset
+OPTIONAL_IMPORT_COLUMNS = ("sowing_start_week", "sowing_end_week", "growing_weeks")
+
+# A single record larger than this is treated as a broken upload
+MAX_RECORD_BYTES = 1024 * 1024
+
+_INT32_MAX = 2**31 - 1
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+
+
+class ImportRow(NamedTuple):
+    line: int
+    plant_family: Optional[PlantFamilyCreate]
+    error: Optional[str]
+
+
+def import_format_for(content_type: Optional[str]) -> Optional[ImportFormat]:
+    """Derive the upload format from a Content-Type header"""
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered text lines"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            number += 1
+            yield number, line.rstrip("\r")
+        if len(pending) > MAX_RECORD_BYTES:
+            raise ValueError(f"Line {number + 1} exceeds {MAX_RECORD_BYTES} bytes")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield number + 1, pending.rstrip("\r")
+
+
+async def _csv_records(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    header: Optional[list] = None
+    record, start = "", 0
+    async for number, line in _lines(chunks):
+        if record:
+            record += "\n" + line
+        else:
+            record, start = line, number
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            if len(record) > MAX_RECORD_BYTES:
+                raise ValueError(
+                    f"Record on line {start} exceeds {MAX_RECORD_BYTES} bytes"
+                )
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [column.strip() for column in values]
+            missing = [column for column in IMPORT_COLUMNS if column not in header]
+            if missing:
+                raise ValueError(f"CSV header is missing {', '.join(missing)}")
+            continue
+        if len(values) != len(header):
+            yield start, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, dict(zip(header, values)), None
+    if record:
+        yield start, None, "unterminated quoted field"
+
+
+async def _ndjson_records(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    async for number, line in _lines(chunks):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f"invalid JSON: {e.msg}"
+            continue
+        if not isinstance(value, dict):
+            yield number, None, "expected a JSON object"
+            continue
+        yield number, value, None
+
+
+def _to_plant_family(record: dict) -> PlantFamilyCreate:
+    try:
+        values = {column: record.get(column) for column in IMPORT_COLUMNS}
+        for column in OPTIONAL_IMPORT_COLUMNS:
+            # Empty CSV fields mean the value is not known
+            values[column] = record.get(column) if record.get(column) != "" else None
+        plant_family = PlantFamilyCreate.model_validate(values)
+    except ValidationError as e:
+        error = e.errors()[0]
+        field = ".".join(str(part) for part in error["loc"])
+        raise ValueError(f"{field}: {error['msg']}")
+    # Rows PostgreSQL would refuse must not fail the COPY of a whole batch
+    if not -_INT32_MAX - 1 <= plant_family.rotation_time <= _INT32_MAX:
+        raise ValueError("rotation_time: out of range")
+    if "\x00" in plant_family.name or "\x00" in plant_family.nutrition_requirements:
+        raise ValueError("NUL characters are not allowed")
+    return plant_family
+
+
+async def read_plant_families(
+    chunks: AsyncIterable[bytes], import_format: ImportFormat
+) -> AsyncIterator[ImportRow]:
+    """Parse an upload into plant families, reporting bad records instead of failing.
+
+    Raises ValueError if the upload as a whole is unusable (e.g. no CSV header).
+    """
+    records = _csv_records(chunks) if import_format == "csv" else _ndjson_records(chunks)
+    async for line, record, error in records:
+        if error is None:
+            try:
+                plant_family = _to_plant_family(record)
+            except ValueError as e:
+                error = str(e)
+            else:
+                yield ImportRow(line, plant_family, None)
+                continue
+        yield ImportRow(line, None, error)
@@ -1,13 +1,37 @@
-from typing import List, Optional
+from typing import AsyncIterable, AsyncIterator, List, Optional
 from app.database.base.plant_family import PlantFamilyRepository
-from app.models.plant_family import PlantFamily, PlantFamilyCreate
+from app.database.sql.notifications import PLANT_FAMILIES_KEY
+from app.models.companion import PlantFamilyCompatibility
+from app.models.plant_family import (
+    PlantFamily,
+    PlantFamilyCreate,
+    PlantFamilyImportError,
+    PlantFamilyImportResult,
+)
+from app.services.plant_family_import import ImportFormat, read_plant_families
+from app.services.read_cache import ReadCache
+from app.services.read_coalescing import SingleFlight
+from app.services.tracing import traced_methods
 
+# Records sent to the database per COPY and upsert
+IMPORT_BATCH_SIZE = 5000
+# Rejected records listed in an import result; the rest are only counted
+MAX_REPORTED_IMPORT_ERRORS = 100
 
+
+@traced_methods
 class PlantFamilyService:
     """Service layer for plant family operations"""
 
-    def __init__(self, plant_family_repository: PlantFamilyRepository):
+    def __init__(
+        self,
+        plant_family_repository: PlantFamilyRepository,
+        single_flight: Optional[SingleFlight] = None,
+        read_cache: Optional[ReadCache] = None,
+    ):
         self.plant_family_repository = plant_family_repository
+        self.single_flight = single_flight
+        self.read_cache = read_cache
 
     async def create_plant_family(
         self, plant_family_data: PlantFamilyCreate
@@ -26,8 +50,77 @@ class PlantFamilyService:
 
     async def get_all_plant_families(self) -> List[PlantFamily]:
         """Get all plant families"""
-        return await self.plant_family_repository.get_all_plant_families()
+        if self.read_cache is None:
+            return await self._load_plant_families()
+        return await self.read_cache.get_or_load(
+            PLANT_FAMILIES_KEY, self._load_plant_families
+        )
+
+    async def _load_plant_families(self) -> List[PlantFamily]:
+        if self.single_flight is None:
+            return await self.plant_family_repository.get_all_plant_families()
+        return await self.single_flight.do(
+            ("plant_families",), self.plant_family_repository.get_all_plant_families
+        )
+
+    async def search_plant_families(self, query: str, limit: int) -> List[PlantFamily]:
+        """Search plant families by name and nutrition requirements"""
+        return await self.plant_family_repository.search_plant_families(query, limit)
+
+    async def delete_plant_family(
+        self, plant_family_id: int, expected_version: Optional[int] = None
+    ) -> bool:
+        """Delete a plant family, optionally only if it is still at expected_version"""
+        return await self.plant_family_repository.delete_plant_family(
+            plant_family_id, expected_version
+        )
+
+    async def get_compatibility_scores(self) -> List[PlantFamilyCompatibility]:
+        """Get the compatibility scores of plant family pairs"""
+        return await self.plant_family_repository.get_compatibility_scores()
+
+    async def set_compatibility_scores(
+        self, scores: List[PlantFamilyCompatibility]
+    ) -> List[PlantFamilyCompatibility]:
+        """Set compatibility scores; a pair given twice keeps its last score"""
+        pairs = {}
+        for score in scores:
+            low, high = sorted((score.plant_family_id, score.other_plant_family_id))
+            pairs[low, high] = PlantFamilyCompatibility(
+                plant_family_id=low, other_plant_family_id=high, score=score.score
+            )
+        known = {pf.id for pf in await self.get_all_plant_families()}
+        unknown = sorted({pf_id for pair in pairs for pf_id in pair} - known)
+        if unknown:
+            raise ValueError(f"Plant families with IDs {unknown} not found")
+        normalized = list(pairs.values())
+        await self.plant_family_repository.set_compatibility_scores(normalized)
+        return normalized
 
-    async def delete_plant_family(self, plant_family_id: str) -> bool:
-        """Delete a plant family"""
-        return await self.plant_family_repository.delete_plant_family(plant_family_id)
+    async def import_plant_families(
+        self, chunks: AsyncIterable[bytes], import_format: ImportFormat
+    ) -> PlantFamilyImportResult:
+        """Import plant families from a CSV or NDJSON byte stream, upserting by name"""
+        result = PlantFamilyImportResult()
+
+        async def batches() -> AsyncIterator[List[PlantFamilyCreate]]:
+            batch: List[PlantFamilyCreate] = []
+            async for row in read_plant_families(chunks, import_format):
+                if row.error is not None:
+                    result.failed += 1
+                    if len(result.errors) < MAX_REPORTED_IMPORT_ERRORS:
+                        result.errors.append(
+                            PlantFamilyImportError(line=row.line, error=row.error)
+                        )
+                    continue
+                batch.append(row.plant_family)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        result.inserted, result.updated = (
+            await self.plant_family_repository.import_plant_families(batches())
+        )
+        return result
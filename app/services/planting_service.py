@@ -0,0 +1,87 @@
+from typing import List, Optional
+from app.database.base.planting import PlantingRepository
+from app.database.base.plant_family import PlantFamilyRepository
+from app.models.planting import (
+    BedCapacity,
+    Planting,
+    PlantingCreate,
+    PlantingPosition,
+)
+from app.services.tracing import traced_methods
+
+
+@traced_methods
+class PlantingService:
+    """Service layer for plantings and the occupancy of beds"""
+
+    def __init__(
+        self,
+        planting_repository: PlantingRepository,
+        plant_family_repository: PlantFamilyRepository,
+        cell_size: int = 10,
+    ):
+        self.planting_repository = planting_repository
+        self.plant_family_repository = plant_family_repository
+        self.cell_size = cell_size
+
+    async def get_plantings(self, bed_id: int, garden_id: int) -> List[Planting]:
+        """Get the plantings of a bed"""
+        plantings = await self.planting_repository.get_plantings(bed_id, garden_id)
+        if plantings is None:
+            raise ValueError(f"Bed with ID {bed_id} not found")
+        return plantings
+
+    async def create_planting(
+        self, bed_id: int, planting_data: PlantingCreate, garden_id: int
+    ) -> Planting:
+        """Place a planting in a bed if its cells and spacing are free"""
+        plant_family_id = planting_data.plant_family_id
+        if plant_family_id is not None and not (
+            await self.plant_family_repository.get_plant_family_by_id(plant_family_id)
+        ):
+            raise ValueError(f"Plant family with ID {plant_family_id} not found")
+        planting = await self.planting_repository.create_planting(
+            bed_id, planting_data, garden_id, self.cell_size
+        )
+        if planting is None:
+            raise ValueError(f"Bed with ID {bed_id} not found")
+        return planting
+
+    async def delete_planting(
+        self, planting_id: int, bed_id: int, garden_id: int
+    ) -> None:
+        """Remove a planting from a bed"""
+        if not await self.planting_repository.delete_planting(
+            planting_id, bed_id, garden_id, self.cell_size
+        ):
+            raise ValueError(f"Planting with ID {planting_id} not found")
+
+    async def get_capacity(
+        self,
+        bed_id: int,
+        garden_id: int,
+        length: Optional[int] = None,
+        width: Optional[int] = None,
+        spacing: int = 0,
+    ) -> BedCapacity:
+        """Get the free cells of a bed and how many plantings of a size fit"""
+        grid = await self.planting_repository.get_occupancy(
+            bed_id, garden_id, self.cell_size
+        )
+        if grid is None:
+            raise ValueError(f"Bed with ID {bed_id} not found")
+        capacity = BedCapacity(
+            bed_id=bed_id,
+            cell_size=grid.cell_size,
+            rows=grid.rows,
+            columns=grid.columns,
+            free_cells=grid.free_cells,
+            free_area=grid.free_cells * grid.cell_size**2,
+        )
+        if length is not None and width is not None:
+            capacity.fits = 0
+            for x, y in grid.placements(length, width, spacing):
+                if capacity.next_position is None:
+                    capacity.next_position = PlantingPosition(x=x, y=y)
+                capacity.fits += 1
+        return capacity
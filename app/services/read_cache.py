@@ -0,0 +1,181 @@
+"""Per-worker cache of read-mostly lists, kept coherent across workers.
+
+Writes publish the keys of the cached reads they make stale on
+INVALIDATION_CHANNEL when they commit, and each worker's PostgresListener
+evicts those keys from its cache. The writing worker also evicts them right
+after its commit, without waiting for its own notification. Notifications
+sent while a listener is disconnected are lost, so the cache keeps
+generation numbers. A reconnect raises the cache's generation, which drops
+every entry and every load in flight. An invalidation raises the generation
+of its key, so a load that it overtook is returned to its caller but not
+stored. Nothing is served or stored while the listener is down.
+
+Entries also expire after ``max_age`` seconds. This bounds how long a list
+read from a lagging replica can be served after its invalidation arrived.
+Callers that must see their own writes bypass the cache: units of work with
+uncommitted writes and clients pinned to the primary.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Awaitable, Callable, List, Optional, TypeVar
+
+import asyncpg
+from pydantic import TypeAdapter, ValidationError
+
+from app.database.sql.notifications import INVALIDATION_CHANNEL, PostgresListener
+from app.database.sql.session_router import (
+    current_client_id,
+    has_pending_writes,
+    is_pinned_to_primary,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_keys = TypeAdapter(List[str])
+
+
+class _Slot:
+    """A key's cached value and the loads of it in flight"""
+
+    def __init__(self):
+        self.generation = 0
+        self.loads = 0
+        self.stored = False
+        self.value: Any = None
+        self.stored_at = 0.0
+
+    def clear(self) -> None:
+        self.stored, self.value = False, None
+
+
+class ReadCache:
+    """Caches the results of loads by key until a write invalidates them"""
+
+    def __init__(
+        self,
+        listener: PostgresListener,
+        max_age: float = 0.0,
+        max_entries: int = 1000,
+    ):
+        self.listener = listener
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.generation = 0
+        self._slots: "OrderedDict[str, _Slot]" = OrderedDict()
+        self._start: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.invalidations = 0
+        if self.enabled:
+            listener.add_callback(INVALIDATION_CHANNEL, self._on_notification)
+            listener.on_reconnect(self.invalidate_all)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age > 0
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[T]]) -> T:
+        """The cached value of a key, or the result of load() stored under it"""
+        if not self._coherent():
+            self.bypassed += 1
+            return await load()
+        slot = self._slots.get(key)
+        if slot is not None and slot.stored:
+            if time.monotonic() - slot.stored_at < self.max_age:
+                self._slots.move_to_end(key)
+                self.hits += 1
+                return slot.value
+            slot.clear()
+        self.misses += 1
+        if slot is None:
+            slot = self._slots[key] = _Slot()
+        started = (self.generation, slot.generation)
+        slot.loads += 1
+        try:
+            value = await load()
+        finally:
+            slot.loads -= 1
+        if self._slots.get(key) is not slot:
+            # Dropped by a reconnect or evicted while loading
+            return value
+        if (self.generation, slot.generation) == started and self._coherent():
+            slot.stored, slot.value, slot.stored_at = True, value, time.monotonic()
+            self._slots.move_to_end(key)
+            self._evict()
+        elif not slot.stored and slot.loads == 0:
+            del self._slots[key]
+        return value
+
+    def _coherent(self) -> bool:
+        """Whether this caller may share cached values with other requests"""
+        if has_pending_writes() or is_pinned_to_primary(current_client_id.get()):
+            return False
+        if self.listener.listening(INVALIDATION_CHANNEL):
+            return True
+        # Requests never wait for the listener; they read uncached meanwhile
+        if not self.listener.reconnecting and (
+            self._start is None or self._start.done()
+        ):
+            self._start = asyncio.ensure_future(self._start_listener())
+        return False
+
+    async def _start_listener(self) -> None:
+        try:
+            await self.listener.ensure_started()
+        except (OSError, asyncpg.PostgresError) as e:
+            logger.warning("Read cache cannot listen for invalidations: %s", e)
+
+    def _evict(self) -> None:
+        excess = len(self._slots) - self.max_entries
+        if excess <= 0:
+            return
+        for key in list(islice(self._slots, excess)):
+            slot = self._slots[key]
+            if slot.loads:
+                # Kept for its loads in flight, which must see invalidations
+                slot.clear()
+            else:
+                del self._slots[key]
+
+    def invalidate(self, key: str) -> None:
+        """Drop a key and keep the loads of it in flight from storing"""
+        self.invalidations += 1
+        slot = self._slots.get(key)
+        if slot is None:
+            return
+        slot.generation += 1
+        slot.clear()
+        if slot.loads == 0:
+            del self._slots[key]
+
+    def invalidate_all(self) -> None:
+        """Drop everything, e.g. after invalidations may have been missed"""
+        self.generation += 1
+        self._slots.clear()
+
+    def _on_notification(self, payload: str) -> None:
+        try:
+            keys = _keys.validate_json(payload)
+        except ValidationError:
+            logger.warning("Malformed invalidation, dropping all entries: %s", payload)
+            self.invalidate_all()
+            return
+        for key in keys:
+            self.invalidate(key)
+
+    def stats(self) -> dict:
+        return {
+            "entries": sum(slot.stored for slot in self._slots.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "invalidations": self.invalidations,
+            "generation": self.generation,
+            "listening": self.listener.listening(INVALIDATION_CHANNEL),
+        }
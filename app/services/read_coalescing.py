@@ -0,0 +1,169 @@
+"""Sharing identical reads between concurrent requests.
+
+``SingleFlight`` lets concurrent callers asking for the same key share one
+in-flight call. ``BatchLoader`` collects the keys requested within one
+event loop iteration and fetches them with one call, DataLoader-style.
+Neither caches: a result is only shared while it is being fetched.
+
+Shared calls run in their own task, so they read committed data through
+their own session rather than in the unit of work of whichever request came
+first, and one caller giving up does not cancel them for the others. A
+caller only joins a read that started after the last write this worker
+committed, and reads alone while its own unit of work has uncommitted
+writes. Clients pinned to the primary share reads only among themselves.
+"""
+import asyncio
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from app.database.sql.session_router import (
+    current_client_id,
+    has_pending_writes,
+    is_pinned_to_primary,
+    write_epoch,
+)
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def _shared_view() -> Optional[Tuple[int, bool]]:
+    """What a shared read must have in common with the caller's own read"""
+    if has_pending_writes():
+        return None
+    return write_epoch(), is_pinned_to_primary(current_client_id.get())
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    # Nobody may be left waiting for a failed shared call
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one call"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executed = 0
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """The result of call(), shared with concurrent callers of the same key"""
+        self.calls += 1
+        view = _shared_view()
+        if view is None:
+            self.executed += 1
+            return await call()
+        key = (key, view)
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = asyncio.ensure_future(call())
+            flight.add_done_callback(lambda _: self._land(key, flight))
+            self.executed += 1
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        _retrieve_exception(flight)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "queries": self.executed,
+            "saved": self.calls - self.executed,
+            "in_flight": len(self._flights),
+        }
+
+
+class _Batch:
+    """Keys of one group requested in the same event loop iteration"""
+
+    def __init__(self, fetch: Callable[[List], Awaitable[Mapping]]):
+        self.fetch = fetch
+        self.futures: Dict[Hashable, asyncio.Future] = {}
+
+
+class BatchLoader:
+    """Fetches the keys loaded within one event loop iteration in one call.
+
+    Keys are grouped, e.g. by garden, and each group is fetched with one call
+    of the ``fetch`` passed by its first caller, which maps the keys to their
+    values; keys it leaves out load as None. Keys already being fetched are
+    joined rather than fetched again.
+    """
+
+    def __init__(self):
+        self._batches: Dict[Hashable, _Batch] = {}
+        self._in_flight: Dict[Tuple[Hashable, Hashable], asyncio.Future] = {}
+        self.loads = 0
+        self.fetches = 0
+        self.fetched_keys = 0
+
+    async def load(
+        self,
+        group: Hashable,
+        key: K,
+        fetch: Callable[[List[K]], Awaitable[Mapping[K, V]]],
+    ) -> Optional[V]:
+        """The value of a key, fetched together with the group's other keys"""
+        self.loads += 1
+        view = _shared_view()
+        if view is None:
+            self.fetches += 1
+            self.fetched_keys += 1
+            return (await fetch([key])).get(key)
+        group = (group, view)
+        future = self._in_flight.get((group, key))
+        if future is None:
+            loop = asyncio.get_running_loop()
+            batch = self._batches.get(group)
+            if batch is None:
+                batch = self._batches[group] = _Batch(fetch)
+                loop.call_soon(self._dispatch, group)
+            future = batch.futures[key] = loop.create_future()
+            self._in_flight[(group, key)] = future
+        return await asyncio.shield(future)
+
+    def _dispatch(self, group: Hashable) -> None:
+        batch = self._batches.pop(group)
+        self.fetches += 1
+        self.fetched_keys += len(batch.futures)
+        asyncio.ensure_future(self._fetch(group, batch))
+
+    async def _fetch(self, group: Hashable, batch: _Batch) -> None:
+        error: Optional[Exception] = None
+        try:
+            values = await batch.fetch(list(batch.futures))
+        except Exception as e:
+            values, error = {}, e
+        for key, future in batch.futures.items():
+            del self._in_flight[(group, key)]
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+                _retrieve_exception(future)
+            else:
+                future.set_result(values.get(key))
+
+    def stats(self) -> dict:
+        return {
+            "loads": self.loads,
+            "queries": self.fetches,
+            "saved": self.loads - self.fetches,
+            "keys_per_query": round(self.fetched_keys / self.fetches, 2)
+            if self.fetches
+            else 0.0,
+        }
@@ -0,0 +1,69 @@
+from typing import List
+from app.database.base.snapshot import SnapshotRepository
+from app.models.snapshot import (
+    GardenSnapshot,
+    GardenSnapshotCreate,
+    GardenSnapshotDiff,
+    GardenSnapshotRestore,
+)
+from app.services.tracing import traced_methods
+
+
+class SnapshotNameTaken(ValueError):
+    """Raised when a garden already has a snapshot of the requested name"""
+
+
+@traced_methods
+class SnapshotService:
+    """Service layer for garden snapshot operations"""
+
+    def __init__(self, snapshot_repository: SnapshotRepository):
+        self.snapshot_repository = snapshot_repository
+
+    async def create_snapshot(
+        self, garden_id: int, snapshot_data: GardenSnapshotCreate
+    ) -> GardenSnapshot:
+        """Snapshot the beds and assignments of a garden"""
+        snapshot = await self.snapshot_repository.create_snapshot(
+            garden_id, snapshot_data.name
+        )
+        if snapshot is None:
+            raise SnapshotNameTaken(
+                f"Snapshot with name {snapshot_data.name} already exists"
+            )
+        return snapshot
+
+    async def get_snapshot(self, snapshot_id: int, garden_id: int) -> GardenSnapshot:
+        """Get a snapshot by ID"""
+        snapshot = await self.snapshot_repository.get_snapshot(snapshot_id, garden_id)
+        if not snapshot:
+            raise ValueError(f"Snapshot with ID {snapshot_id} not found")
+        return snapshot
+
+    async def get_snapshots(self, garden_id: int) -> List[GardenSnapshot]:
+        """Get the snapshots of a garden"""
+        return await self.snapshot_repository.get_snapshots(garden_id)
+
+    async def delete_snapshot(self, snapshot_id: int, garden_id: int) -> None:
+        """Delete a snapshot"""
+        if not await self.snapshot_repository.delete_snapshot(snapshot_id, garden_id):
+            raise ValueError(f"Snapshot with ID {snapshot_id} not found")
+
+    async def restore_snapshot(
+        self, snapshot_id: int, garden_id: int
+    ) -> GardenSnapshotRestore:
+        """Replace the beds and assignments of a garden with a snapshot's"""
+        restore = await self.snapshot_repository.restore_snapshot(
+            snapshot_id, garden_id
+        )
+        if not restore:
+            raise ValueError(f"Snapshot with ID {snapshot_id} not found")
+        return restore
+
+    async def diff_snapshots(
+        self, from_snapshot_id: int, to_snapshot_id: int, garden_id: int
+    ) -> GardenSnapshotDiff:
+        """Compare two snapshots of a garden"""
+        return await self.snapshot_repository.diff_snapshots(
+            from_snapshot_id, to_snapshot_id, garden_id
+        )
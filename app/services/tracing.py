@@ -0,0 +1,356 @@
+"""Request tracing with OpenTelemetry-compatible spans.
+
+A sampled request gets a server span from the tracing middleware, made
+current through a context variable. Methods of classes decorated with
+``traced_methods`` and SQL statements (see ``app.database.sql.tracing``)
+open child spans only while a recording span is current, so unsampled
+requests cost them one context variable lookup.
+
+Trace context follows the W3C ``traceparent`` header; a request that comes
+with a sampled parent is always sampled, one without a parent is sampled
+with probability ``sample_ratio`` based on its trace ID. Finished spans are
+queued and exported in batches by a background thread, as OTLP/HTTP JSON
+or as one OTLP span object per line of a local JSONL file.
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Trace ID, parent span ID and sampled flag of a traceparent header"""
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if not match:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == _INVALID_TRACE_ID or parent_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP JSON carries 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed operation of a trace; ended spans go to the tracer's exporter"""
+
+    __slots__ = (
+        "tracer",
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "kind",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "status_code",
+        "status_message",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str],
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = str(exception)
+        self.attributes["exception.type"] = type(exception).__name__
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.tracer.export(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _attribute_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def child_span(
+    name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any
+) -> Iterator[Optional[Span]]:
+    """A span below the current one; yields None outside a sampled trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(parent.tracer, name, parent.trace_id, parent.span_id, kind, attributes)
+    with use_span(span):
+        yield span
+
+
+@contextmanager
+def use_span(span: Span) -> Iterator[Span]:
+    """Make a span current until the block ends, then end it"""
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced_methods(cls):
+    """Class decorator giving every public coroutine method of cls a span"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _traced(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _traced(span_name: str, method):
+    @functools.wraps(method)
+    async def traced(*args, **kwargs):
+        if _current_span.get() is None:
+            return await method(*args, **kwargs)
+        with child_span(span_name):
+            return await method(*args, **kwargs)
+
+    return traced
+
+
+class SpanExporter(ABC):
+    """Sends a batch of finished spans somewhere"""
+
+    @abstractmethod
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        """Export OTLP span objects; runs on the tracer's export thread"""
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends one OTLP span object per line to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(span) + "\n" for span in spans)
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Posts spans as OTLP/HTTP JSON to a collector's /v1/traces"""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 10.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.resource = {
+            "attributes": [
+                {"key": "service.name", "value": {"stringValue": service_name}}
+            ]
+        }
+        self.timeout = timeout
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": self.resource,
+                    "scopeSpans": [{"scope": {"name": "grow-backend"}, "spans": spans}],
+                }
+            ]
+        }
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class Tracer:
+    """Samples traces and exports their spans in batches from a thread.
+
+    The queue of finished spans is bounded; when the exporter falls behind,
+    spans are dropped and counted instead of growing memory.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter],
+        sample_ratio: float = 1.0,
+        max_queue: int = 2048,
+        batch_size: int = 512,
+        export_interval: float = 1.0,
+    ):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.batch_size = batch_size
+        self.export_interval = export_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self.sampled = 0
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _samples(self, trace_id: str) -> bool:
+        # Like OpenTelemetry's TraceIdRatioBased: the lower 64 bits decide
+        return int(trace_id[16:], 16) < self.sample_ratio * 2**64
+
+    def start_request_span(
+        self, name: str, traceparent: Optional[str], **attributes: Any
+    ) -> Optional[Span]:
+        """The server span of a request, or None if it is not sampled"""
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_span_id, sampled = parent
+        else:
+            trace_id, parent_span_id = os.urandom(16).hex(), None
+            sampled = self._samples(trace_id)
+        if not sampled or not self.enabled:
+            return None
+        self.sampled += 1
+        return Span(self, name, trace_id, parent_span_id, SPAN_KIND_SERVER, attributes)
+
+    def export(self, span: Span) -> None:
+        """Queue a finished span without blocking"""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="span-exporter", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not (self._stopped.is_set() and self._queue.empty()):
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.export_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch:
+                self._export(batch)
+
+    def _export(self, batch: List[Span]) -> None:
+        try:
+            self.exporter.export([span.to_otlp() for span in batch])
+            self.exported += len(batch)
+        except Exception:
+            self.failed += len(batch)
+            logger.warning("Could not export %d spans", len(batch), exc_info=True)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Export the queued spans and stop the exporter thread"""
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_ratio": self.sample_ratio,
+            "sampled": self.sampled,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
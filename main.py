@@ -1,21 +1,121 @@
 import click
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from app.api.bed_routes import router as bed_router
+from app.api.calendar_routes import router as calendar_router
+from app.api.change_routes import router as change_router
+from app.api.garden_routes import router as garden_router
+from app.api.job_routes import router as job_router
 from app.api.plant_family_routes import router as plant_family_router
+from app.api.profile_routes import router as profile_router
+from app.api.planning_routes import router as planning_router
+from app.api.planting_routes import router as planting_router
+from app.api.snapshot_routes import router as snapshot_router
+from app.api.stats_routes import router as stats_router
+from app.database.base.errors import DatabaseUnavailable
+from app.database.sql.session_router import (
+    breaker_stats,
+    database_stats,
+    dispose_engines,
+)
+from app.dependencies import (
+    get_admission_controller,
+    get_bed_loader,
+    get_bed_update_coalescer,
+    get_calendar_cache,
+    get_change_feed_service,
+    get_compute_pool,
+    get_job_runner,
+    get_loop_monitor,
+    get_read_cache,
+    get_request_profiler,
+    get_session_router,
+    get_single_flight,
+    get_tracer,
+    get_unit_of_work,
+)
+from app.middleware.admission_control import AdmissionControlMiddleware
+from app.middleware.circuit_breaker import (
+    CircuitBreakerMiddleware,
+    database_unavailable_handler,
+)
+from app.middleware.client_identity import ClientIdentityMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.tracing import TracingMiddleware
 
 # Load environment variables
 load_dotenv("local.env")
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_loop_monitor().start()
+    get_compute_pool().start()
+    # Pick up jobs left unfinished by workers that stopped; a database outage
+    # must not keep the API from starting
+    try:
+        await get_job_runner().start()
+    except Exception:
+        logger.exception("Could not resume background jobs")
+    yield
+    try:
+        await get_job_runner().stop()
+    except Exception:
+        logger.exception("Could not hand over background jobs")
+    await get_change_feed_service().stop()
+    get_compute_pool().shutdown()
+    await get_loop_monitor().stop()
+    get_tracer().shutdown()
+    # Engines are shared across requests and closed once on shutdown
+    await dispose_engines()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="GROW Backend API",
     description="Backend API for the GROW garden planning application",
     version="1.0.0",
+    lifespan=lifespan,
+    # Ends before the response is sent, so that a failed commit is reported
+    dependencies=[Depends(get_unit_of_work, scope="function")],
+)
+
+# Identify clients so that reads can be pinned to the primary after a write
+app.add_middleware(ClientIdentityMiddleware)
+
+# Only installed when profiling is configured, so that it costs nothing
+# otherwise. Inside admission control: time spent queueing is not profiled.
+if get_request_profiler().enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=get_request_profiler())
+
+# Shed load before requests start waiting for database connections. Added
+# before CORS so that CORS stays outermost and 503 responses carry its headers.
+app.add_middleware(
+    AdmissionControlMiddleware, controller=get_admission_controller()
 )
 
+# While the database is down, answer 503 before requests queue for a slot.
+# Background jobs are only recorded on the primary, and the change feed
+# listens on it, so their reads cannot fall back to a replica.
+app.add_middleware(
+    CircuitBreakerMiddleware,
+    router=get_session_router(),
+    prefixes=["/garden", "/gardens", "/plants"],
+    primary_prefixes=["/jobs", "/garden/changes"],
+)
+# Breakers that open while a request runs are reported the same way
+app.add_exception_handler(DatabaseUnavailable, database_unavailable_handler)
+
+# Outside admission control, so that request spans include queueing time
+if get_tracer().enabled:
+    app.add_middleware(TracingMiddleware, tracer=get_tracer())
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,8 +126,17 @@ app.add_middleware(
 )
 
 # Include routers
+app.include_router(garden_router)
+app.include_router(change_router)
+app.include_router(stats_router)
+app.include_router(snapshot_router)
+app.include_router(planning_router)
+app.include_router(calendar_router)
 app.include_router(bed_router)
+app.include_router(planting_router)
 app.include_router(plant_family_router)
+app.include_router(job_router)
+app.include_router(profile_router)
 
 
 @app.get("/")
@@ -37,7 +146,30 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    breakers = breaker_stats()
+    healthy = all(breaker["state"] == "closed" for breaker in breakers)
+    return {"status": "healthy" if healthy else "degraded", "databases": breakers}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "admission": get_admission_controller().stats(),
+        "bed_update_coalescer": get_bed_update_coalescer().stats(),
+        "calendar_cache": get_calendar_cache().stats(),
+        "change_feed": get_change_feed_service().stats(),
+        "jobs": get_job_runner().stats(),
+        "compute_pool": get_compute_pool().stats(),
+        "database": database_stats(),
+        "event_loop": get_loop_monitor().stats(),
+        "profiling": get_request_profiler().stats(),
+        "read_cache": get_read_cache().stats(),
+        "read_coalescing": {
+            "single_flight": get_single_flight().stats(),
+            "bed_loader": get_bed_loader().stats(),
+        },
+        "tracing": get_tracer().stats(),
+    }
 
 
 @click.command()
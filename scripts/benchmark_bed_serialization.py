@@ -0,0 +1,101 @@
+"""Benchmark serializing GET /garden/beds inline against offloading it.
+
+Inline, FastAPI validates the beds against the response model and renders
+the JSON on the event loop. Offloaded, only packing the beds runs on the
+event loop; rendering runs in a compute pool worker. The report shows the
+event loop time of both paths and the wall time of the offloaded one, which
+is what COMPUTE_OFFLOAD_THRESHOLD trades off.
+
+Usage:
+    python scripts/benchmark_bed_serialization.py
+    python scripts/benchmark_bed_serialization.py --sizes 1000,5000 --repeat 20
+"""
+import asyncio
+import os
+import sys
+import time
+from typing import Callable, List
+
+import click
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.models.bed import Bed  # noqa: E402
+from app.services.compute_pool import ComputePool  # noqa: E402
+from app.services.packed_arrays import beds_to_json, pack_beds  # noqa: E402
+
+RESPONSE_FIELD = create_model_field("Response", List[Bed], mode="serialization")
+
+
+def make_beds(count: int) -> List[Bed]:
+    return [
+        Bed(
+            id=bed_id,
+            garden_id=1,
+            index=bed_id,
+            length=200,
+            width=100,
+            plant_families=[bed_id % 7, bed_id % 11],
+            version=bed_id,
+        )
+        for bed_id in range(1, count + 1)
+    ]
+
+
+async def serialize_inline(beds: List[Bed]) -> bytes:
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=beds)
+    return JSONResponse(content).body
+
+
+def _best_ms(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def _best_async_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def run(sizes: List[int], repeat: int) -> None:
+    pool = ComputePool(max_workers=1, offload_threshold=0)
+    pool.start()
+    try:
+        # Spawn the worker before measuring
+        await pool.offload(beds_to_json, pack_beds(make_beds(1)))
+        print(
+            f"{'beds':>7} {'inline loop ms':>15} {'pack loop ms':>13} "
+            f"{'offload wall ms':>16}"
+        )
+        for size in sizes:
+            beds = make_beds(size)
+            inline = await _best_async_ms(lambda: serialize_inline(beds), repeat)
+            pack = _best_ms(lambda: pack_beds(beds), repeat)
+            wall = await _best_async_ms(
+                lambda: pool.offload(beds_to_json, pack_beds(beds)), repeat
+            )
+            print(f"{size:>7} {inline:>15.2f} {pack:>13.2f} {wall:>16.2f}")
+    finally:
+        pool.shutdown()
+
+
+@click.command()
+@click.option("--sizes", default="100,500,1000,2000,5000,10000,20000")
+@click.option("--repeat", default=10, help="Runs per size; the best is reported")
+def main(sizes: str, repeat: int):
+    asyncio.run(run([int(size) for size in sizes.split(",")], repeat))
+
+
+if __name__ == "__main__":
+    main()
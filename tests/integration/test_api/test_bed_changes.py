@@ -0,0 +1,57 @@
+"""Integration tests for delta sync of beds"""
+from fastapi.testclient import TestClient
+
+
+class TestBedChanges:
+    """Tests for GET /garden/beds/changes"""
+
+    def test_initial_sync_returns_all_beds(self, client: TestClient):
+        """Syncing from version 0 returns every bed and a version to continue from"""
+        client.post("/garden/beds", json={"numberOfBeds": 3, "length": 200, "width": 100})
+
+        response = client.get("/garden/beds/changes", params={"since": 0})
+
+        assert response.status_code == 200
+        changes = response.json()
+        assert [bed["index"] for bed in changes["beds"]] == [1, 2, 3]
+        assert changes["deleted"] == []
+        assert changes["version"] > 0
+
+    def test_returns_only_changes_since_version(self, client: TestClient):
+        """Only beds updated or deleted after the version are returned"""
+        beds = client.post(
+            "/garden/beds", json={"numberOfBeds": 3, "length": 200, "width": 100}
+        ).json()["beds"]
+        version = client.get("/garden/beds/changes").json()["version"]
+
+        client.put(f"/garden/beds/{beds[0]['id']}", json={"length": 500, "width": 100})
+        client.delete(f"/garden/beds/{beds[1]['id']}")
+
+        changes = client.get("/garden/beds/changes", params={"since": version}).json()
+
+        assert [bed["id"] for bed in changes["beds"]] == [beds[0]["id"]]
+        assert changes["beds"][0]["length"] == 500
+        assert changes["deleted"] == [beds[1]["id"]]
+        assert changes["version"] > version
+
+    def test_delete_all_beds_leaves_tombstones(self, client: TestClient):
+        """Deleting all beds reports every deleted bed"""
+        beds = client.post(
+            "/garden/beds", json={"numberOfBeds": 2, "length": 200, "width": 100}
+        ).json()["beds"]
+        version = client.get("/garden/beds/changes").json()["version"]
+
+        client.delete("/garden/beds/all")
+
+        changes = client.get("/garden/beds/changes", params={"since": version}).json()
+        assert sorted(changes["deleted"]) == sorted(bed["id"] for bed in beds)
+        assert changes["beds"] == []
+
+    def test_no_changes_keeps_version(self, client: TestClient):
+        """An up-to-date client gets an empty response with the same version"""
+        client.post("/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100})
+        version = client.get("/garden/beds/changes").json()["version"]
+
+        changes = client.get("/garden/beds/changes", params={"since": version}).json()
+
+        assert changes == {"version": version, "beds": [], "deleted": []}
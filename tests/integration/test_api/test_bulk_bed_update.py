@@ -0,0 +1,77 @@
+"""Integration tests for bulk bed updates"""
+from fastapi.testclient import TestClient
+
+
+class TestBulkBedUpdate:
+    """Tests for PATCH /garden/beds"""
+
+    def test_updates_all_beds(self, client: TestClient):
+        """All listed beds get their new dimensions"""
+        beds = client.post(
+            "/garden/beds", json={"numberOfBeds": 3, "length": 200, "width": 100}
+        ).json()["beds"]
+
+        response = client.patch(
+            "/garden/beds",
+            json={
+                "beds": [
+                    {"id": beds[2]["id"], "length": 300, "width": 120},
+                    {"id": beds[0]["id"], "length": 150, "width": 80},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["not_found"] == []
+        assert [(bed["index"], bed["length"], bed["width"]) for bed in result["beds"]] == [
+            (1, 150, 80),
+            (3, 300, 120),
+        ]
+        untouched = client.get(f"/garden/beds/{beds[1]['id']}").json()
+        assert (untouched["length"], untouched["width"]) == (200, 100)
+
+    def test_reports_unknown_beds(self, client: TestClient):
+        """Unknown ids are reported instead of failing the whole update"""
+        bed = client.post(
+            "/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100}
+        ).json()["beds"][0]
+
+        response = client.patch(
+            "/garden/beds",
+            json={
+                "beds": [
+                    {"id": bed["id"], "length": 250, "width": 100},
+                    {"id": 99999, "length": 250, "width": 100},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert [b["id"] for b in result["beds"]] == [bed["id"]]
+        assert result["not_found"] == [99999]
+
+    def test_last_update_of_a_bed_wins(self, client: TestClient):
+        """A bed listed twice ends up with its last dimensions"""
+        bed = client.post(
+            "/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100}
+        ).json()["beds"][0]
+
+        result = client.patch(
+            "/garden/beds",
+            json={
+                "beds": [
+                    {"id": bed["id"], "length": 250, "width": 100},
+                    {"id": bed["id"], "length": 400, "width": 90},
+                ]
+            },
+        ).json()
+
+        assert [(b["length"], b["width"]) for b in result["beds"]] == [(400, 90)]
+
+    def test_empty_update_is_rejected(self, client: TestClient):
+        """At least one bed must be given"""
+        response = client.patch("/garden/beds", json={"beds": []})
+
+        assert response.status_code == 422
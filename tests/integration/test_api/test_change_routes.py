@@ -0,0 +1,75 @@
+"""Integration tests for the change feed"""
+from fastapi.testclient import TestClient
+
+
+class TestChangeRoutes:
+    """Writes are pushed to subscribers through Postgres LISTEN/NOTIFY"""
+
+    def test_websocket_receives_bed_changes(self, client: TestClient):
+        """Test WS /garden/changes/ws - Creating and deleting beds emits events"""
+        with client.websocket_connect("/garden/changes/ws?garden_id=1") as websocket:
+            bed_id = client.post(
+                "/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100}
+            ).json()["beds"][0]["id"]
+            client.delete(f"/garden/beds/{bed_id}")
+
+            inserted = websocket.receive_json()
+            deleted = websocket.receive_json()
+
+        assert inserted == {"entity": "bed", "op": "insert", "garden_id": 1, "ids": [bed_id]}
+        assert deleted == {"entity": "bed", "op": "delete", "garden_id": 1, "ids": [bed_id]}
+
+    def test_websocket_ignores_other_gardens(self, client: TestClient):
+        """Subscribers of one garden do not see another garden's beds"""
+        other_garden = client.post("/gardens", json={"name": "Allotment"}).json()["id"]
+
+        with client.websocket_connect("/garden/changes/ws?garden_id=1") as websocket:
+            client.post(
+                "/garden/beds",
+                json={"numberOfBeds": 1, "length": 200, "width": 100},
+                headers={"X-Garden-Id": str(other_garden)},
+            )
+            client.post(
+                "/garden/beds", json={"numberOfBeds": 1, "length": 300, "width": 100}
+            )
+
+            event = websocket.receive_json()
+
+        assert event["entity"] == "bed"
+        assert event["garden_id"] == 1
+
+    def test_websocket_defaults_to_the_default_garden(self, client: TestClient):
+        """Without garden_id only the default garden's changes are pushed"""
+        other_garden = client.post("/gardens", json={"name": "Allotment"}).json()["id"]
+
+        with client.websocket_connect("/garden/changes/ws") as websocket:
+            client.post(
+                "/garden/beds",
+                json={"numberOfBeds": 1, "length": 200, "width": 100},
+                headers={"X-Garden-Id": str(other_garden)},
+            )
+            client.post(
+                "/garden/beds", json={"numberOfBeds": 1, "length": 300, "width": 100}
+            )
+
+            event = websocket.receive_json()
+
+        assert (event["entity"], event["garden_id"]) == ("bed", 1)
+
+    def test_websocket_all_gardens(self, client: TestClient):
+        """Subscribing to all gardens takes an explicit all_gardens=true"""
+        other_garden = client.post("/gardens", json={"name": "Allotment"}).json()["id"]
+
+        with client.websocket_connect(
+            "/garden/changes/ws?all_gardens=true"
+        ) as websocket:
+            client.post(
+                "/garden/beds",
+                json={"numberOfBeds": 1, "length": 200, "width": 100},
+                headers={"X-Garden-Id": str(other_garden)},
+            )
+
+            event = websocket.receive_json()
+
+        assert (event["entity"], event["garden_id"]) == ("bed", other_garden)
+
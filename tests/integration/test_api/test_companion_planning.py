@@ -0,0 +1,201 @@
+"""Integration tests for plant family compatibility and companion planning"""
+from fastapi.testclient import TestClient
+
+
+def create_plant_family(client: TestClient, name: str) -> dict:
+    response = client.post(
+        "/plants/families",
+        json={"name": name, "nutrition_requirements": "low", "rotation_time": 2},
+    )
+    return response.json()
+
+
+class TestCompatibilityScores:
+    """Tests for /plants/families/compatibility"""
+
+    def test_set_and_get(self, client: TestClient):
+        beans = create_plant_family(client, "Fabaceae")
+        cabbage = create_plant_family(client, "Brassicaceae")
+
+        response = client.put(
+            "/plants/families/compatibility",
+            json=[
+                {
+                    "plant_family_id": cabbage["id"],
+                    "other_plant_family_id": beans["id"],
+                    "score": 4,
+                },
+                {
+                    "plant_family_id": beans["id"],
+                    "other_plant_family_id": beans["id"],
+                    "score": -2,
+                },
+            ],
+        )
+
+        assert response.status_code == 200
+        scores = client.get("/plants/families/compatibility").json()
+        low, high = sorted((beans["id"], cabbage["id"]))
+        assert {
+            (s["plant_family_id"], s["other_plant_family_id"], s["score"])
+            for s in scores
+        } == {(low, high, 4), (beans["id"], beans["id"], -2)}
+
+    def test_unknown_plant_family_is_rejected(self, client: TestClient):
+        beans = create_plant_family(client, "Fabaceae")
+
+        response = client.put(
+            "/plants/families/compatibility",
+            json=[
+                {
+                    "plant_family_id": beans["id"],
+                    "other_plant_family_id": 999,
+                    "score": 1,
+                }
+            ],
+        )
+
+        assert response.status_code == 400
+
+    def test_scores_are_bounded(self, client: TestClient):
+        beans = create_plant_family(client, "Fabaceae")
+
+        response = client.put(
+            "/plants/families/compatibility",
+            json=[
+                {
+                    "plant_family_id": beans["id"],
+                    "other_plant_family_id": beans["id"],
+                    "score": 11,
+                }
+            ],
+        )
+
+        assert response.status_code == 422
+
+
+class TestCompanionPlanning:
+    """Tests for POST /garden/plan/companions"""
+
+    def test_plan_alternates_compatible_families(self, client: TestClient):
+        beans = create_plant_family(client, "Fabaceae")
+        cabbage = create_plant_family(client, "Brassicaceae")
+        client.put(
+            "/plants/families/compatibility",
+            json=[
+                {
+                    "plant_family_id": family["id"],
+                    "other_plant_family_id": other["id"],
+                    "score": score,
+                }
+                for family, other, score in (
+                    (beans, beans, -3),
+                    (cabbage, cabbage, -3),
+                    (beans, cabbage, 5),
+                )
+            ],
+        )
+        beds = client.post(
+            "/garden/beds", json={"numberOfBeds": 6, "length": 200, "width": 100}
+        ).json()["beds"]
+
+        response = client.post(
+            "/garden/plan/companions", json={"time_budget": 0.5, "seed": 1}
+        )
+
+        assert response.status_code == 200
+        plan = response.json()
+        assert plan["score"] == 5 * 5
+        assert plan["current_score"] == 0
+        assert not plan["applied"]
+        assert [a["bed_id"] for a in plan["assignments"]] == [b["id"] for b in beds]
+        families = [a["plant_family_id"] for a in plan["assignments"]]
+        assert all(left != right for left, right in zip(families, families[1:]))
+        assert client.get("/garden/beds").json()[0]["plant_families"] == []
+
+    def test_apply_writes_the_plan(self, client: TestClient):
+        beans = create_plant_family(client, "Fabaceae")
+        client.post(
+            "/garden/beds", json={"numberOfBeds": 3, "length": 200, "width": 100}
+        )
+
+        response = client.post(
+            "/garden/plan/companions", json={"time_budget": 0.1, "apply": True}
+        )
+
+        assert response.json()["applied"]
+        beds = client.get("/garden/beds").json()
+        assert [bed["plant_families"] for bed in beds] == [[beans["id"]]] * 3
+        assert client.get("/garden/stats").json()["unassigned_bed_count"] == 0
+
+    def test_rejects_bad_requests(self, client: TestClient):
+        assert client.post("/garden/plan/companions", json={}).status_code == 400
+
+        create_plant_family(client, "Fabaceae")
+        response = client.post(
+            "/garden/plan/companions", json={"plant_family_ids": [999]}
+        )
+        assert response.status_code == 400
+        response = client.post("/garden/plan/companions", json={"time_budget": 3600})
+        assert response.status_code == 400
+
+
+class TestDeletingPlannedBeds:
+    """Beds and plant families stay deletable after a plan was applied"""
+
+    def apply_plan(self, client: TestClient, number_of_beds: int) -> dict:
+        beans = create_plant_family(client, "Fabaceae")
+        client.post(
+            "/garden/beds",
+            json={"numberOfBeds": number_of_beds, "length": 200, "width": 100},
+        )
+        response = client.post(
+            "/garden/plan/companions", json={"time_budget": 0.1, "apply": True}
+        )
+        assert response.json()["applied"]
+        return beans
+
+    def test_delete_one_bed_and_then_all(self, client: TestClient):
+        self.apply_plan(client, 3)
+        beds = client.get("/garden/beds").json()
+
+        response = client.delete(f"/garden/beds/{beds[0]['id']}")
+
+        assert response.status_code == 200
+        assert len(client.get("/garden/beds").json()) == 2
+        stats = client.get("/garden/stats").json()
+        assert stats["bed_count"] == 2
+        assert stats["unassigned_bed_count"] == 0
+
+        response = client.delete("/garden/beds/all")
+
+        assert response.status_code == 200
+        assert client.get("/garden/beds").json() == []
+        stats = client.get("/garden/stats").json()
+        assert stats["bed_count"] == 0
+        assert stats["unassigned_bed_count"] == 0
+
+    def test_create_with_cleanup_replaces_planned_beds(self, client: TestClient):
+        self.apply_plan(client, 2)
+
+        response = client.post(
+            "/garden/beds/with-cleanup",
+            json={"numberOfBeds": 1, "length": 200, "width": 100},
+        )
+
+        assert response.status_code == 200
+        beds = client.get("/garden/beds").json()
+        assert [bed["plant_families"] for bed in beds] == [[]]
+        assert client.get("/garden/stats").json()["unassigned_bed_count"] == 1
+
+    def test_delete_assigned_plant_family(self, client: TestClient):
+        beans = self.apply_plan(client, 2)
+
+        response = client.delete(f"/plants/families/{beans['id']}")
+
+        assert response.status_code == 200
+        beds = client.get("/garden/beds").json()
+        assert [bed["plant_families"] for bed in beds] == [[], []]
+        stats = client.get("/garden/stats").json()
+        assert stats["unassigned_bed_count"] == 2
+        assert stats["beds_per_plant_family"] == []
@@ -0,0 +1,117 @@
+"""Integration tests for versioned, conditional writes"""
+from fastapi.testclient import TestClient
+
+
+def create_bed(client: TestClient) -> dict:
+    response = client.post(
+        "/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100}
+    )
+    return response.json()["beds"][0]
+
+
+class TestConditionalBedWrites:
+    """Tests for If-Match on PUT and DELETE /garden/beds/{bed_id}"""
+
+    def test_versions_and_etags(self, client: TestClient):
+        """Every write returns a new version, exposed as the ETag"""
+        bed = create_bed(client)
+
+        response = client.get(f"/garden/beds/{bed['id']}")
+        assert response.headers["ETag"] == f'"{bed["version"]}"'
+
+        response = client.put(
+            f"/garden/beds/{bed['id']}", json={"length": 300, "width": 100}
+        )
+        updated = response.json()
+        assert updated["version"] > bed["version"]
+        assert response.headers["ETag"] == f'"{updated["version"]}"'
+
+    def test_matching_version_updates(self, client: TestClient):
+        bed = create_bed(client)
+
+        response = client.put(
+            f"/garden/beds/{bed['id']}",
+            json={"length": 300, "width": 150},
+            headers={"If-Match": f'"{bed["version"]}"'},
+        )
+
+        assert response.status_code == 200
+        assert (response.json()["length"], response.json()["width"]) == (300, 150)
+
+    def test_concurrent_update_is_rejected(self, client: TestClient):
+        """The second of two writes based on the same version gets 412"""
+        bed = create_bed(client)
+        if_match = {"If-Match": f'"{bed["version"]}"'}
+
+        first = client.put(
+            f"/garden/beds/{bed['id']}",
+            json={"length": 300, "width": 100},
+            headers=if_match,
+        )
+        second = client.put(
+            f"/garden/beds/{bed['id']}",
+            json={"length": 400, "width": 100},
+            headers=if_match,
+        )
+
+        assert first.status_code == 200
+        assert second.status_code == 412
+        assert second.headers["ETag"] == f'"{first.json()["version"]}"'
+        assert client.get(f"/garden/beds/{bed['id']}").json()["length"] == 300
+
+    def test_stale_delete_is_rejected(self, client: TestClient):
+        bed = create_bed(client)
+        client.put(f"/garden/beds/{bed['id']}", json={"length": 300, "width": 100})
+
+        response = client.delete(
+            f"/garden/beds/{bed['id']}", headers={"If-Match": f'"{bed["version"]}"'}
+        )
+
+        assert response.status_code == 412
+        assert client.get(f"/garden/beds/{bed['id']}").status_code == 200
+
+    def test_missing_bed_with_if_match(self, client: TestClient):
+        response = client.put(
+            "/garden/beds/999999",
+            json={"length": 300, "width": 100},
+            headers={"If-Match": '"1"'},
+        )
+
+        assert response.status_code == 404
+
+    def test_malformed_if_match(self, client: TestClient):
+        bed = create_bed(client)
+
+        response = client.put(
+            f"/garden/beds/{bed['id']}",
+            json={"length": 300, "width": 100},
+            headers={"If-Match": "latest"},
+        )
+
+        assert response.status_code == 400
+
+
+class TestConditionalPlantFamilyWrites:
+    """Tests for If-Match on DELETE /plants/families/{plant_family_id}"""
+
+    def test_delete_with_version(self, client: TestClient):
+        family = client.post(
+            "/plants/families",
+            json={
+                "name": "Legumes",
+                "nutrition_requirements": "low",
+                "rotation_time": 3,
+            },
+        ).json()
+
+        stale = client.delete(
+            f"/plants/families/{family['id']}",
+            headers={"If-Match": f'"{family["version"] - 1}"'},
+        )
+        current = client.delete(
+            f"/plants/families/{family['id']}",
+            headers={"If-Match": f'"{family["version"]}"'},
+        )
+
+        assert stale.status_code == 412
+        assert current.status_code == 200
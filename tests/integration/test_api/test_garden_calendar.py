@@ -0,0 +1,81 @@
+"""Integration tests for the garden calendar"""
+from fastapi.testclient import TestClient
+
+
+def create_plant_family(client: TestClient, name: str, **windows) -> dict:
+    response = client.post(
+        "/plants/families",
+        json={
+            "name": name,
+            "nutrition_requirements": "low",
+            "rotation_time": 2,
+            **windows,
+        },
+    )
+    return response.json()
+
+
+def plant_everywhere(client: TestClient, plant_family_id: int) -> None:
+    client.post(
+        "/garden/plan/companions",
+        json={"plant_family_ids": [plant_family_id], "apply": True},
+    )
+
+
+class TestGardenCalendar:
+    """Tests for GET /garden/calendar"""
+
+    def test_sowing_and_harvest_weeks(self, client: TestClient):
+        client.post(
+            "/garden/beds", json={"numberOfBeds": 2, "length": 200, "width": 100}
+        )
+        beans = create_plant_family(
+            client,
+            "Fabaceae",
+            sowing_start_week=18,
+            sowing_end_week=22,
+            growing_weeks=10,
+        )
+        plant_everywhere(client, beans["id"])
+
+        sowing = client.get("/garden/calendar", params={"from": 20, "to": 20}).json()
+        harvest = client.get("/garden/calendar", params={"from": 30, "to": 30}).json()
+        idle = client.get("/garden/calendar", params={"from": 40, "to": 45}).json()
+
+        assert [(e["activity"], e["bed_index"]) for e in sowing["entries"]] == [
+            ("sow", 1),
+            ("sow", 2),
+        ]
+        assert {(e["start_week"], e["end_week"]) for e in harvest["entries"]} == {
+            (28, 32)
+        }
+        assert idle["entries"] == []
+
+    def test_changes_invalidate_the_calendar(self, client: TestClient):
+        client.post(
+            "/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100}
+        )
+        garlic = create_plant_family(
+            client, "Alliaceae", sowing_start_week=44, sowing_end_week=2
+        )
+        first = client.get("/garden/calendar").json()
+        assert first["entries"] == []
+
+        plant_everywhere(client, garlic["id"])
+        planted = client.get("/garden/calendar", params={"from": 1, "to": 1}).json()
+
+        assert planted["version"] > first["version"]
+        assert [(e["start_week"], e["end_week"]) for e in planted["entries"]] == [
+            (44, 2)
+        ]
+
+        client.delete("/garden/beds/all")
+        cleared = client.get("/garden/calendar").json()
+
+        assert cleared["version"] > planted["version"]
+        assert cleared["entries"] == []
+
+    def test_weeks_are_validated(self, client: TestClient):
+        response = client.get("/garden/calendar", params={"from": 0, "to": 53})
+
+        assert response.status_code == 422
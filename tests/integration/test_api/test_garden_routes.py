@@ -0,0 +1,93 @@
+"""Integration tests for garden routes and garden-scoped bed routes"""
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def garden_id(client: TestClient) -> int:
+    """Create a second garden next to the default one"""
+    response = client.post("/gardens", json={"name": "Allotment"})
+    return response.json()["id"]
+
+
+class TestGardenRoutes:
+    """Integration tests for garden endpoints and tenancy"""
+
+    def test_default_garden_exists(self, client: TestClient):
+        """Test GET /gardens - The default garden is always present"""
+        response = client.get("/gardens")
+
+        assert response.status_code == 200
+        assert [garden["id"] for garden in response.json()] == [1]
+
+    def test_create_garden(self, client: TestClient):
+        """Test POST /gardens - Create a new garden"""
+        response = client.post("/gardens", json={"name": "Allotment"})
+
+        assert response.status_code == 200
+        garden = response.json()
+        assert garden["name"] == "Allotment"
+        assert garden["id"] != 1
+
+        get_response = client.get(f"/gardens/{garden['id']}")
+        assert get_response.json() == garden
+
+    def test_get_garden_not_found(self, client: TestClient):
+        """Test GET /gardens/{garden_id} - Unknown garden returns 404"""
+        response = client.get("/gardens/99999")
+
+        assert response.status_code == 404
+
+    def test_bed_indexes_are_numbered_per_garden(
+        self, client: TestClient, garden_id: int
+    ):
+        """Each garden numbers its beds from 1"""
+        client.post("/garden/beds", json={"numberOfBeds": 2, "length": 200, "width": 100})
+        response = client.post(
+            "/garden/beds",
+            json={"numberOfBeds": 2, "length": 300, "width": 100},
+            headers={"X-Garden-Id": str(garden_id)},
+        )
+
+        beds = response.json()["beds"]
+        assert [bed["index"] for bed in beds] == [1, 2]
+        assert all(bed["garden_id"] == garden_id for bed in beds)
+
+    def test_beds_are_isolated_between_gardens(
+        self, client: TestClient, garden_id: int
+    ):
+        """Reads and deletes only touch the requested garden"""
+        headers = {"X-Garden-Id": str(garden_id)}
+        default_bed = client.post(
+            "/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100}
+        ).json()["beds"][0]
+        client.post(
+            "/garden/beds",
+            json={"numberOfBeds": 3, "length": 300, "width": 100},
+            headers=headers,
+        )
+
+        assert len(client.get("/garden/beds", headers=headers).json()) == 3
+        assert (
+            client.get(f"/garden/beds/{default_bed['id']}", headers=headers).status_code
+            == 404
+        )
+
+        response = client.delete("/garden/beds/all", headers=headers)
+
+        assert "3 beds" in response.json()["message"]
+        assert len(client.get("/garden/beds").json()) == 1
+
+    def test_unknown_garden_header(self, client: TestClient):
+        """Requests scoped to a garden that does not exist return 404"""
+        headers = {"X-Garden-Id": "99999"}
+
+        response = client.post(
+            "/garden/beds",
+            json={"numberOfBeds": 1, "length": 200, "width": 100},
+            headers=headers,
+        )
+
+        assert response.status_code == 404
+        assert client.get("/garden/beds", headers=headers).status_code == 404
+        assert len(client.get("/garden/beds").json()) == 0
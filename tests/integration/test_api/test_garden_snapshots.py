@@ -0,0 +1,155 @@
+"""Integration tests for garden snapshots"""
+from fastapi.testclient import TestClient
+
+
+def create_beds(client: TestClient, count: int, cleanup: bool = False) -> list:
+    # Beds are numbered from 1, so only the first creation may skip the cleanup
+    path = "/garden/beds/with-cleanup" if cleanup else "/garden/beds"
+    response = client.post(
+        path, json={"numberOfBeds": count, "length": 200, "width": 100}
+    )
+    return response.json()["beds"]
+
+
+def dimensions(client: TestClient) -> list:
+    return [
+        (bed["id"], bed["index"], bed["length"], bed["width"])
+        for bed in client.get("/garden/beds").json()
+    ]
+
+
+class TestGardenSnapshots:
+    """Tests for /garden/snapshots"""
+
+    def test_create_and_list(self, client: TestClient):
+        create_beds(client, 3)
+
+        response = client.post("/garden/snapshots", json={"name": "spring"})
+
+        assert response.status_code == 200
+        snapshot = response.json()
+        assert (snapshot["name"], snapshot["bed_count"]) == ("spring", 3)
+        assert snapshot["assignment_count"] == 0
+        assert client.get("/garden/snapshots").json() == [snapshot]
+        assert client.get(f"/garden/snapshots/{snapshot['id']}").json() == snapshot
+
+    def test_duplicate_name_conflicts(self, client: TestClient):
+        client.post("/garden/snapshots", json={"name": "spring"})
+
+        response = client.post("/garden/snapshots", json={"name": "spring"})
+
+        assert response.status_code == 409
+
+    def test_restore_brings_back_the_garden(self, client: TestClient):
+        """Beds changed, deleted and added after the snapshot are undone"""
+        beds = create_beds(client, 3)
+        before = dimensions(client)
+        snapshot = client.post("/garden/snapshots", json={"name": "spring"}).json()
+
+        client.put(f"/garden/beds/{beds[0]['id']}", json={"length": 300, "width": 50})
+        client.delete(f"/garden/beds/{beds[1]['id']}")
+
+        response = client.post(f"/garden/snapshots/{snapshot['id']}/restore")
+
+        assert response.status_code == 200
+        assert response.json()["beds"] == 3
+        assert dimensions(client) == before
+        assert client.get("/garden/stats").json()["bed_count"] == 3
+
+    def test_restore_replaces_added_beds(self, client: TestClient):
+        """Beds created after the snapshot go, even where they took its indexes"""
+        create_beds(client, 3)
+        before = dimensions(client)
+        snapshot = client.post("/garden/snapshots", json={"name": "spring"}).json()
+        create_beds(client, 2, cleanup=True)
+
+        response = client.post(f"/garden/snapshots/{snapshot['id']}/restore")
+
+        assert response.status_code == 200
+        assert dimensions(client) == before
+        assert client.get("/garden/stats").json()["bed_count"] == 3
+
+    def test_restore_keeps_plantings(self, client: TestClient):
+        """Beds are restored in place, so what grows on them stays"""
+        beds = create_beds(client, 2)
+        snapshot = client.post("/garden/snapshots", json={"name": "spring"}).json()
+        planting = client.post(
+            f"/garden/beds/{beds[0]['id']}/plantings",
+            json={"x": 0, "y": 0, "length": 30, "width": 30, "spacing": 10},
+        ).json()
+        client.put(f"/garden/beds/{beds[0]['id']}", json={"length": 300, "width": 50})
+
+        response = client.post(f"/garden/snapshots/{snapshot['id']}/restore")
+
+        assert response.status_code == 200
+        plantings = client.get(f"/garden/beds/{beds[0]['id']}/plantings").json()
+        assert plantings == [planting]
+        overlapping = client.post(
+            f"/garden/beds/{beds[0]['id']}/plantings",
+            json={"x": 10, "y": 10, "length": 10, "width": 10},
+        )
+        assert overlapping.status_code == 409
+
+    def test_restore_is_reported_to_delta_sync(self, client: TestClient):
+        """Restored beds keep their IDs and show up as changed"""
+        beds = create_beds(client, 2)
+        snapshot = client.post("/garden/snapshots", json={"name": "spring"}).json()
+        version = client.get("/garden/beds/changes").json()["version"]
+
+        client.post(f"/garden/snapshots/{snapshot['id']}/restore")
+
+        changes = client.get("/garden/beds/changes", params={"since": version}).json()
+        assert sorted(bed["id"] for bed in changes["beds"]) == sorted(
+            bed["id"] for bed in beds
+        )
+        assert changes["deleted"] == []
+
+    def test_diff(self, client: TestClient):
+        beds = create_beds(client, 3)
+        first = client.post("/garden/snapshots", json={"name": "first"}).json()
+        client.put(f"/garden/beds/{beds[0]['id']}", json={"length": 300, "width": 100})
+        client.delete(f"/garden/beds/{beds[1]['id']}")
+        second = client.post("/garden/snapshots", json={"name": "second"}).json()
+
+        response = client.get(
+            f"/garden/snapshots/{first['id']}/diff", params={"to": second["id"]}
+        )
+
+        assert response.status_code == 200
+        diff = response.json()
+        assert diff["added_beds"] == []
+        assert [bed["id"] for bed in diff["removed_beds"]] == [beds[1]["id"]]
+        assert [change["id"] for change in diff["changed_beds"]] == [beds[0]["id"]]
+        assert diff["changed_beds"][0]["after"]["length"] == 300
+
+    def test_diff_reports_added_beds(self, client: TestClient):
+        removed = create_beds(client, 1)[0]
+        first = client.post("/garden/snapshots", json={"name": "first"}).json()
+        added = create_beds(client, 1, cleanup=True)[0]
+        second = client.post("/garden/snapshots", json={"name": "second"}).json()
+
+        diff = client.get(
+            f"/garden/snapshots/{first['id']}/diff", params={"to": second["id"]}
+        ).json()
+
+        assert [bed["id"] for bed in diff["added_beds"]] == [added["id"]]
+        assert [bed["id"] for bed in diff["removed_beds"]] == [removed["id"]]
+        assert diff["changed_beds"] == []
+
+    def test_snapshots_are_scoped_to_the_garden(self, client: TestClient):
+        snapshot = client.post("/garden/snapshots", json={"name": "spring"}).json()
+        garden = client.post("/gardens", json={"name": "Allotment"}).json()
+        other = {"X-Garden-Id": str(garden["id"])}
+
+        assert client.get("/garden/snapshots", headers=other).json() == []
+        response = client.post(
+            f"/garden/snapshots/{snapshot['id']}/restore", headers=other
+        )
+        assert response.status_code == 404
+
+    def test_unknown_snapshot(self, client: TestClient):
+        assert client.get("/garden/snapshots/999").status_code == 404
+        assert client.delete("/garden/snapshots/999").status_code == 404
+        assert client.post("/garden/snapshots/999/restore").status_code == 404
+        response = client.get("/garden/snapshots/999/diff", params={"to": 998})
+        assert response.status_code == 404
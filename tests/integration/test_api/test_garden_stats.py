@@ -0,0 +1,70 @@
+"""Integration tests for garden statistics"""
+from fastapi.testclient import TestClient
+
+
+class TestGardenStats:
+    """Tests for GET /garden/stats"""
+
+    def test_empty_garden(self, client: TestClient):
+        """A garden without beds has zero statistics"""
+        response = client.get("/garden/stats")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "garden_id": 1,
+            "bed_count": 0,
+            "total_area": 0,
+            "unassigned_bed_count": 0,
+            "beds_per_plant_family": [],
+        }
+
+    def test_follows_bed_writes(self, client: TestClient):
+        """Creating, updating and deleting beds keeps the totals current"""
+        beds = client.post(
+            "/garden/beds", json={"numberOfBeds": 3, "length": 200, "width": 100}
+        ).json()["beds"]
+
+        stats = client.get("/garden/stats").json()
+        assert (stats["bed_count"], stats["total_area"]) == (3, 60000)
+        assert stats["unassigned_bed_count"] == 3
+
+        client.put(f"/garden/beds/{beds[0]['id']}", json={"length": 300, "width": 100})
+        client.delete(f"/garden/beds/{beds[1]['id']}")
+
+        stats = client.get("/garden/stats").json()
+        assert (stats["bed_count"], stats["total_area"]) == (2, 50000)
+        assert stats["unassigned_bed_count"] == 2
+
+        client.delete("/garden/beds/all")
+
+        stats = client.get("/garden/stats").json()
+        assert (stats["bed_count"], stats["total_area"]) == (0, 0)
+
+    def test_gardens_are_counted_separately(self, client: TestClient):
+        """Beds of another garden don't show up in the statistics"""
+        garden = client.post("/gardens", json={"name": "Allotment"}).json()
+        client.post(
+            "/garden/beds",
+            json={"numberOfBeds": 2, "length": 100, "width": 100},
+            headers={"X-Garden-Id": str(garden["id"])},
+        )
+
+        assert client.get("/garden/stats").json()["bed_count"] == 0
+        stats = client.get(
+            "/garden/stats", headers={"X-Garden-Id": str(garden["id"])}
+        ).json()
+        assert (stats["garden_id"], stats["bed_count"]) == (garden["id"], 2)
+
+
+class TestRecomputeGardenStats:
+    """Tests for POST /garden/stats/recompute"""
+
+    def test_recompute_matches_maintained_stats(self, client: TestClient):
+        """A full recompute agrees with the incrementally maintained totals"""
+        client.post("/garden/beds", json={"numberOfBeds": 4, "length": 120, "width": 80})
+        maintained = client.get("/garden/stats").json()
+
+        response = client.post("/garden/stats/recompute")
+
+        assert response.status_code == 200
+        assert response.json() == maintained
@@ -0,0 +1,92 @@
+"""Integration tests for background jobs"""
+import time
+
+from fastapi.testclient import TestClient
+
+from app.database.sql.job_repository import SQLJobRepository
+
+
+def wait_for_job(client: TestClient, location: str) -> dict:
+    for _ in range(100):
+        job = client.get(location).json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"{location} did not finish")
+
+
+class TestJobRoutes:
+    """Tests for /jobs and the background flag of long-running endpoints"""
+
+    def test_background_create_with_cleanup(self, client: TestClient):
+        """A background request returns 202 and the job replaces the beds"""
+        client.post("/garden/beds", json={"numberOfBeds": 2, "length": 100, "width": 50})
+
+        response = client.post(
+            "/garden/beds/with-cleanup?background=true",
+            json={"numberOfBeds": 3, "length": 200, "width": 100},
+        )
+
+        assert response.status_code == 202
+        location = response.headers["Location"]
+        assert location == f"/jobs/{response.json()['id']}"
+
+        job = wait_for_job(client, location)
+        assert job["status"] == "succeeded"
+        assert job["progress"] == 1.0
+        assert job["garden_id"] == 1
+
+        beds = client.get("/garden/beds").json()
+        assert [(bed["length"], bed["width"]) for bed in beds] == [(200, 100)] * 3
+
+    def test_background_import(self, client: TestClient):
+        """A spooled import reports its counts as the job result"""
+        response = client.post(
+            "/plants/families/import?background=true",
+            content=b"name,nutrition_requirements,rotation_time\nLegumes,low,3\n",
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 202
+        job = wait_for_job(client, response.headers["Location"])
+        assert job["status"] == "succeeded"
+        assert job["result"]["inserted"] == 1
+
+    def test_unknown_job(self, client: TestClient):
+        assert client.get("/jobs/999999").status_code == 404
+        assert client.post("/jobs/999999/cancel").status_code == 404
+
+    def test_cancel_finished_job(self, client: TestClient):
+        """Finished jobs cannot be cancelled"""
+        response = client.post(
+            "/garden/beds/with-cleanup?background=true",
+            json={"numberOfBeds": 1, "length": 100, "width": 100},
+        )
+        job = wait_for_job(client, response.headers["Location"])
+
+        assert client.post(f"/jobs/{job['id']}/cancel").status_code == 409
+
+
+class TestJobOwnership:
+    """Tests for the heartbeats and handover of jobs between workers"""
+
+    async def test_released_job_is_claimed_by_the_next_worker(
+        self, test_database_url: str
+    ):
+        """A stopping worker's job is taken over without waiting for staleness"""
+        repository = SQLJobRepository(test_database_url)
+        try:
+            job = await repository.create_job("replace_beds", {}, "worker-a", 1)
+            assert await repository.start_job(job.id, "worker-a")
+            assert await repository.heartbeat("worker-a", [job.id]) == []
+            assert await repository.claim_stale_jobs("worker-b", 3600) == []
+
+            await repository.release_jobs("worker-a")
+
+            claimed = await repository.claim_stale_jobs("worker-b", 3600)
+            assert [claimed_job.id for claimed_job in claimed] == [job.id]
+            # The old owner's heartbeats no longer touch the job
+            assert await repository.heartbeat("worker-a", [job.id]) == []
+            assert await repository.claim_stale_jobs("worker-c", 3600) == []
+        finally:
+            await repository.close()
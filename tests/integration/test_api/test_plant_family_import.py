@@ -0,0 +1,98 @@
+"""Integration tests for importing plant families"""
+from fastapi.testclient import TestClient
+
+
+class TestPlantFamilyImport:
+    """Tests for POST /plants/families/import"""
+
+    def test_csv_import_upserts_by_name(self, client: TestClient):
+        """New names are inserted, known names are updated"""
+        client.post(
+            "/plants/families",
+            json={"name": "Legumes", "nutrition_requirements": "low", "rotation_time": 2},
+        )
+        csv_body = (
+            "name,nutrition_requirements,rotation_time\n"
+            "Legumes,light,3\n"
+            "Nightshades,heavy,4\n"
+        )
+
+        response = client.post(
+            "/plants/families/import",
+            content=csv_body,
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "inserted": 1,
+            "updated": 1,
+            "failed": 0,
+            "errors": [],
+        }
+        families = {pf["name"]: pf for pf in client.get("/plants/families").json()}
+        assert families["Legumes"]["rotation_time"] == 3
+        assert families["Nightshades"]["nutrition_requirements"] == "heavy"
+
+    def test_bad_rows_do_not_abort_the_import(self, client: TestClient):
+        """Rejected records are reported and the rest is imported"""
+        ndjson_body = (
+            '{"name": "Alliums", "nutrition_requirements": "medium", '
+            '"rotation_time": 3}\n'
+            "{broken\n"
+            '{"name": "Roots", "nutrition_requirements": "light"}\n'
+        )
+
+        response = client.post(
+            "/plants/families/import",
+            params={"format": "ndjson"},
+            content=ndjson_body,
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert (result["inserted"], result["failed"]) == (1, 2)
+        assert [error["line"] for error in result["errors"]] == [2, 3]
+        assert [pf["name"] for pf in client.get("/plants/families").json()] == [
+            "Alliums"
+        ]
+
+    def test_duplicate_names_last_record_wins(self, client: TestClient):
+        """A name repeated in one upload is stored once with its last values"""
+        csv_body = (
+            "name,nutrition_requirements,rotation_time\n"
+            "Legumes,light,2\n"
+            "Legumes,light,5\n"
+        )
+
+        result = client.post(
+            "/plants/families/import",
+            content=csv_body,
+            headers={"Content-Type": "text/csv"},
+        ).json()
+
+        assert result["inserted"] == 1
+        families = client.get("/plants/families").json()
+        assert [(pf["name"], pf["rotation_time"]) for pf in families] == [
+            ("Legumes", 5)
+        ]
+
+    def test_unknown_format(self, client: TestClient):
+        """Uploads of unknown type are refused"""
+        response = client.post(
+            "/plants/families/import",
+            content="{}",
+            headers={"Content-Type": "application/json"},
+        )
+
+        assert response.status_code == 415
+
+    def test_missing_csv_column(self, client: TestClient):
+        """A CSV header without the required columns is a bad request"""
+        response = client.post(
+            "/plants/families/import",
+            content="name\nLegumes\n",
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,63 @@
+"""Integration tests for plant family search"""
+from fastapi.testclient import TestClient
+
+FAMILIES = [
+    ("Nightshades", "heavy feeder"),
+    ("Legumes", "light, fixes nitrogen"),
+    ("Brassicas", "heavy, needs nitrogen"),
+]
+
+
+class TestPlantFamilySearch:
+    """Tests for GET /plants/families/search"""
+
+    def create_families(self, client: TestClient):
+        for name, nutrition_requirements in FAMILIES:
+            client.post(
+                "/plants/families",
+                json={
+                    "name": name,
+                    "nutrition_requirements": nutrition_requirements,
+                    "rotation_time": 3,
+                },
+            )
+
+    def test_prefix_search(self, client: TestClient):
+        """A name prefix finds the family"""
+        self.create_families(client)
+
+        response = client.get("/plants/families/search", params={"q": "leg"})
+
+        assert response.status_code == 200
+        assert [pf["name"] for pf in response.json()] == ["Legumes"]
+
+    def test_searches_nutrition_requirements(self, client: TestClient):
+        """All words must match; nutrition requirements are searched too"""
+        self.create_families(client)
+
+        response = client.get("/plants/families/search", params={"q": "heavy nitro"})
+
+        assert [pf["name"] for pf in response.json()] == ["Brassicas"]
+
+    def test_tolerates_typos(self, client: TestClient):
+        """Close misspellings still match through trigrams"""
+        self.create_families(client)
+
+        response = client.get("/plants/families/search", params={"q": "nightshads"})
+
+        assert [pf["name"] for pf in response.json()] == ["Nightshades"]
+
+    def test_limit(self, client: TestClient):
+        """No more than limit results are returned"""
+        self.create_families(client)
+
+        response = client.get(
+            "/plants/families/search", params={"q": "nitrogen", "limit": 1}
+        )
+
+        assert len(response.json()) == 1
+
+    def test_query_is_required(self, client: TestClient):
+        response = client.get("/plants/families/search")
+
+        assert response.status_code == 422
@@ -0,0 +1,104 @@
+"""Integration tests for plantings and bed capacity"""
+from fastapi.testclient import TestClient
+
+
+def create_bed(client: TestClient, length: int = 100, width: int = 60) -> dict:
+    response = client.post(
+        "/garden/beds", json={"numberOfBeds": 1, "length": length, "width": width}
+    )
+    return response.json()["beds"][0]
+
+
+def plant(client: TestClient, bed_id: int, **planting):
+    return client.post(f"/garden/beds/{bed_id}/plantings", json=planting)
+
+
+class TestPlantings:
+    """Tests for /garden/beds/{bed_id}/plantings"""
+
+    def test_place_and_list(self, client: TestClient):
+        bed = create_bed(client)
+
+        response = plant(client, bed["id"], x=0, y=0, length=30, width=30, spacing=10)
+
+        assert response.status_code == 200
+        planting = response.json()
+        assert (planting["bed_id"], planting["spacing"]) == (bed["id"], 10)
+        plantings = client.get(f"/garden/beds/{bed['id']}/plantings").json()
+        assert plantings == [planting]
+
+    def test_overlap_and_spacing_conflict(self, client: TestClient):
+        bed = create_bed(client)
+        plant(client, bed["id"], x=0, y=0, length=30, width=30, spacing=10)
+
+        overlapping = plant(client, bed["id"], x=20, y=20, length=10, width=10)
+        too_close = plant(client, bed["id"], x=35, y=0, length=10, width=10)
+        far_enough = plant(client, bed["id"], x=50, y=0, length=10, width=10)
+
+        assert overlapping.status_code == 409
+        assert too_close.status_code == 409
+        assert far_enough.status_code == 200
+
+    def test_outside_the_bed_conflicts(self, client: TestClient):
+        bed = create_bed(client, length=100, width=60)
+
+        response = plant(client, bed["id"], x=90, y=0, length=20, width=10)
+
+        assert response.status_code == 409
+
+    def test_delete_frees_the_space(self, client: TestClient):
+        bed = create_bed(client)
+        planting = plant(client, bed["id"], x=0, y=0, length=100, width=60).json()
+        blocked = plant(client, bed["id"], x=0, y=0, length=10, width=10)
+        assert blocked.status_code == 409
+
+        response = client.delete(
+            f"/garden/beds/{bed['id']}/plantings/{planting['id']}"
+        )
+
+        assert response.status_code == 200
+        freed = plant(client, bed["id"], x=0, y=0, length=10, width=10)
+        assert freed.status_code == 200
+
+    def test_unknown_bed_and_planting(self, client: TestClient):
+        bed = create_bed(client)
+
+        assert client.get("/garden/beds/999/plantings").status_code == 404
+        assert plant(client, 999, x=0, y=0, length=10, width=10).status_code == 404
+        response = client.delete(f"/garden/beds/{bed['id']}/plantings/999")
+        assert response.status_code == 404
+
+
+class TestBedCapacity:
+    """Tests for GET /garden/beds/{bed_id}/capacity"""
+
+    def test_free_space_and_fits(self, client: TestClient):
+        bed = create_bed(client, length=100, width=60)
+        plant(client, bed["id"], x=0, y=0, length=20, width=60)
+
+        response = client.get(
+            f"/garden/beds/{bed['id']}/capacity",
+            params={"length": 20, "width": 30},
+        )
+
+        assert response.status_code == 200
+        capacity = response.json()
+        assert (capacity["rows"], capacity["columns"]) == (10, 6)
+        assert capacity["free_cells"] == 48
+        assert capacity["free_area"] == 48 * 100
+        assert capacity["fits"] == 8
+        assert capacity["next_position"] == {"x": 20, "y": 0}
+
+    def test_resized_bed_is_rebuilt(self, client: TestClient):
+        """A grid built for other bed dimensions is rebuilt from the plantings"""
+        bed = create_bed(client, length=100, width=60)
+        plant(client, bed["id"], x=0, y=0, length=50, width=60)
+        client.put(f"/garden/beds/{bed['id']}", json={"length": 200, "width": 60})
+
+        capacity = client.get(f"/garden/beds/{bed['id']}/capacity").json()
+
+        assert capacity["rows"] == 20
+        assert capacity["free_cells"] == 15 * 6
+
+    def test_unknown_bed(self, client: TestClient):
+        assert client.get("/garden/beds/999/capacity").status_code == 404
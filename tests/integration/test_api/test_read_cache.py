@@ -0,0 +1,230 @@
+"""Integration tests for read caches kept coherent across worker processes"""
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List
+
+import asyncpg
+import httpx
+import pytest
+
+from app.database.sql import notifications
+from app.database.sql.bed_repository import SQLBedRepository
+from app.database.sql.notifications import (
+    PostgresListener,
+    bed_list_key,
+    on_commit_invalidation,
+)
+from app.database.sql.session_router import unit_of_work
+from app.models.bed import BedCreate
+from app.services.read_cache import ReadCache
+
+ROOT = Path(__file__).resolve().parents[3]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(condition: Callable[[], bool], timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+class Worker:
+    """The API served by a uvicorn process of its own, with the read cache on"""
+
+    def __init__(self, database_url: str):
+        self.port = free_port()
+        env = {
+            **os.environ,
+            "DATABASE_URL": database_url,
+            "READ_CACHE_MAX_AGE_SECONDS": "300",
+        }
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--port",
+                str(self.port),
+                "--log-level",
+                "warning",
+            ],
+            cwd=ROOT,
+            env=env,
+        )
+        self.client = httpx.Client(base_url=f"http://127.0.0.1:{self.port}")
+
+    def is_up(self) -> bool:
+        try:
+            return self.client.get("/health").status_code == 200
+        except httpx.TransportError:
+            return False
+
+    def cache_stats(self) -> dict:
+        return self.client.get("/metrics").json()["read_cache"]
+
+    def warm(self, path: str) -> None:
+        """Read a path until the worker listens for invalidations and caches it"""
+        self.client.get(path)
+        assert wait_until(lambda: self.cache_stats()["listening"])
+        self.client.get(path)
+        hits = self.cache_stats()["hits"]
+        self.client.get(path)
+        assert self.cache_stats()["hits"] == hits + 1
+
+    def stop(self) -> None:
+        self.client.close()
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+@pytest.fixture
+def workers(clean_database, test_database_url: str) -> Iterator[List[Worker]]:
+    """Two worker processes sharing the test database"""
+    started = [Worker(test_database_url), Worker(test_database_url)]
+    try:
+        for worker in started:
+            assert wait_until(worker.is_up, timeout=30), "worker did not start"
+        yield started
+    finally:
+        for worker in started:
+            worker.stop()
+
+
+def family_names(worker: Worker) -> List[str]:
+    return [pf["name"] for pf in worker.client.get("/plants/families").json()]
+
+
+class SilentListener(PostgresListener):
+    """Listens as far as the cache can tell, but no notification ever arrives"""
+
+    def listening(self, channel: str) -> bool:
+        return True
+
+
+class TestReadCacheOnTheWritingWorker:
+    """A worker evicts what its own writes make stale as soon as they commit"""
+
+    @pytest.fixture
+    async def repository(self, test_database_url: str):
+        repository = SQLBedRepository(test_database_url)
+        yield repository
+        await repository.close()
+
+    @pytest.fixture
+    def read_cache(self, monkeypatch) -> ReadCache:
+        monkeypatch.setattr(notifications, "_commit_callbacks", [])
+        read_cache = ReadCache(SilentListener("postgresql://unused"), max_age=300)
+        on_commit_invalidation(read_cache.invalidate)
+        return read_cache
+
+    async def test_write_evicts_without_a_notification(
+        self, repository: SQLBedRepository, read_cache: ReadCache
+    ):
+        def load():
+            return repository.get_all_beds(1)
+
+        assert await read_cache.get_or_load(bed_list_key(1), load) == []
+
+        await repository.create_multiple_beds([BedCreate(length=100, width=50)], 1)
+
+        beds = await read_cache.get_or_load(bed_list_key(1), load)
+        assert [(bed.length, bed.width) for bed in beds] == [(100, 50)]
+
+    async def test_unit_of_work_evicts_when_it_commits(
+        self, repository: SQLBedRepository, read_cache: ReadCache
+    ):
+        def load():
+            return repository.get_all_beds(1)
+
+        await read_cache.get_or_load(bed_list_key(1), load)
+
+        async with unit_of_work():
+            await repository.create_multiple_beds([BedCreate(length=100, width=50)], 1)
+            assert read_cache.invalidations == 0
+
+        assert read_cache.invalidations == 1
+        assert len(await read_cache.get_or_load(bed_list_key(1), load)) == 1
+
+    def test_write_then_read_on_one_worker(self, test_database_url: str):
+        """A worker's reads see its writes right after they are answered"""
+        worker = Worker(test_database_url)
+        try:
+            assert wait_until(worker.is_up, timeout=30), "worker did not start"
+            worker.warm("/garden/beds")
+
+            worker.client.post(
+                "/garden/beds", json={"numberOfBeds": 2, "length": 200, "width": 100}
+            )
+
+            assert len(worker.client.get("/garden/beds").json()) == 2
+        finally:
+            worker.stop()
+
+
+class TestReadCacheAcrossWorkers:
+    """A write on one worker evicts the cached reads of every other worker"""
+
+    def test_plant_family_writes_reach_other_workers(self, workers):
+        writer, reader = workers
+        reader.warm("/plants/families")
+
+        response = writer.client.post(
+            "/plants/families",
+            json={
+                "name": "Legumes",
+                "nutrition_requirements": "low",
+                "rotation_time": 2,
+            },
+        )
+        assert response.status_code == 200
+
+        assert wait_until(lambda: family_names(reader) == ["Legumes"])
+        assert reader.cache_stats()["invalidations"] >= 1
+
+    def test_bed_writes_reach_other_workers(self, workers):
+        writer, reader = workers
+        reader.warm("/garden/beds")
+
+        writer.client.post(
+            "/garden/beds", json={"numberOfBeds": 2, "length": 200, "width": 100}
+        )
+
+        assert wait_until(lambda: len(reader.client.get("/garden/beds").json()) == 2)
+
+    async def test_reconnect_drops_entries_of_missed_invalidations(
+        self, workers, test_database_url: str
+    ):
+        """Changes made while a listener was down are seen once it reconnects"""
+        _, reader = workers
+        reader.warm("/plants/families")
+        connection = await asyncpg.connect(test_database_url)
+        try:
+            # A change without a notification, like one sent while disconnected
+            await connection.execute(
+                "INSERT INTO plant_families (name, nutrition_requirements, "
+                "rotation_time) VALUES ('Brassicas', 'high', 3)"
+            )
+            assert family_names(reader) == []
+
+            await connection.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE query LIKE 'LISTEN%' AND pid <> pg_backend_pid()"
+            )
+        finally:
+            await connection.close()
+
+        assert wait_until(lambda: family_names(reader) == ["Brassicas"])
+        assert wait_until(lambda: reader.cache_stats()["generation"] >= 1)
@@ -0,0 +1,35 @@
+"""Integration tests for read-replica routing using the test database as a stand-in replica"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_read_your_writes_window, get_replica_urls
+
+
+@pytest.fixture(autouse=True)
+def stand_in_replica(test_database_url: str, monkeypatch):
+    """Configure the test database as both primary and replica"""
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", f"{test_database_url},{test_database_url}")
+    monkeypatch.setenv("DATABASE_READ_YOUR_WRITES_SECONDS", "5")
+    get_replica_urls.cache_clear()
+    get_read_your_writes_window.cache_clear()
+    yield
+    get_replica_urls.cache_clear()
+    get_read_your_writes_window.cache_clear()
+
+
+class TestReadReplicas:
+    """Routes keep working when reads are routed to replicas"""
+
+    def test_read_after_write(self, client: TestClient):
+        """A client sees its own writes through the replica-routed reads"""
+        headers = {"X-Client-Id": "planner-1"}
+        client.post(
+            "/garden/beds",
+            json={"numberOfBeds": 2, "length": 200, "width": 100},
+            headers=headers,
+        )
+
+        response = client.get("/garden/beds", headers=headers)
+
+        assert response.status_code == 200
+        assert len(response.json()) == 2
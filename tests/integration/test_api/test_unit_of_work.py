@@ -0,0 +1,40 @@
+"""Integration tests for the request-scoped unit of work"""
+from fastapi.testclient import TestClient
+
+
+def checkouts(client: TestClient) -> int:
+    pools = client.get("/metrics").json()["database"]["pools"]
+    return sum(pool["checkouts"] for pool in pools)
+
+
+class TestUnitOfWork:
+    """Requests run all their repository calls in one transaction"""
+
+    def test_one_connection_per_request(self, client: TestClient):
+        """Deleting and recreating beds checks out a single connection"""
+        client.post("/garden/beds", json={"numberOfBeds": 3, "length": 200, "width": 100})
+        before = checkouts(client)
+
+        response = client.post(
+            "/garden/beds/with-cleanup",
+            json={"numberOfBeds": 2, "length": 300, "width": 100},
+        )
+
+        assert response.status_code == 200
+        assert checkouts(client) == before + 1
+        assert len(client.get("/garden/beds").json()) == 2
+
+    def test_failed_request_writes_nothing(self, client: TestClient):
+        """A conditional update that conflicts leaves no partial writes behind"""
+        bed = client.post(
+            "/garden/beds", json={"numberOfBeds": 1, "length": 200, "width": 100}
+        ).json()["beds"][0]
+
+        response = client.put(
+            f"/garden/beds/{bed['id']}",
+            json={"length": 250, "width": 100},
+            headers={"If-Match": f'"{bed["version"] + 1}"'},
+        )
+
+        assert response.status_code == 412
+        assert client.get(f"/garden/beds/{bed['id']}").json()["length"] == 200
@@ -0,0 +1,92 @@
+"""Unit tests for the bit-packed bed occupancy grid"""
+import pytest
+
+from app.database.occupancy_grid import Block, OccupancyGrid
+
+
+class TestOccupancyGrid:
+    def test_dimensions_round_up_to_whole_cells(self):
+        grid = OccupancyGrid(length=105, width=80, cell_size=10)
+
+        assert (grid.rows, grid.columns) == (11, 8)
+        assert grid.free_cells == 88
+
+    def test_block_includes_spacing_clipped_to_the_bed(self):
+        grid = OccupancyGrid(length=100, width=100, cell_size=10)
+
+        assert grid.block(0, 0, 20, 10) == Block(0, 2, 0, 1)
+        assert grid.block(0, 0, 20, 10, spacing=5) == Block(0, 3, 0, 2)
+        assert grid.block(45, 50, 10, 10, spacing=10) == Block(3, 7, 4, 7)
+
+    def test_footprint_outside_the_bed_is_rejected(self):
+        grid = OccupancyGrid(length=100, width=50, cell_size=10)
+
+        with pytest.raises(ValueError):
+            grid.block(90, 0, 20, 10)
+        assert grid.block(90, 0, 20, 10, clip=True) == Block(9, 10, 0, 1)
+
+    def test_occupy_and_is_free(self):
+        grid = OccupancyGrid(length=100, width=100, cell_size=10)
+        block = grid.block(20, 20, 30, 30, spacing=10)
+
+        grid.occupy(block)
+
+        assert grid.occupied_cells == 25
+        assert not grid.is_free(grid.block(55, 55, 10, 10))
+        assert grid.is_free(grid.block(60, 60, 10, 10))
+
+    def test_round_trips_through_bytes(self):
+        grid = OccupancyGrid(length=70, width=130, cell_size=10)
+        grid.occupy(grid.block(10, 40, 20, 90))
+
+        data = grid.to_bytes()
+        loaded = OccupancyGrid.from_bytes(data, 70, 130, 10)
+
+        assert len(data) == 7 * 2
+        assert loaded.occupied == grid.occupied
+
+
+class TestPlacements:
+    """Tests for the greedy search of free positions"""
+
+    def test_tiles_an_empty_bed(self):
+        grid = OccupancyGrid(length=100, width=60, cell_size=10)
+
+        positions = list(grid.placements(20, 30))
+
+        assert len(positions) == 5 * 2
+        assert positions[:3] == [(0, 0), (0, 30), (20, 0)]
+
+    def test_spacing_separates_plantings(self):
+        grid = OccupancyGrid(length=100, width=100, cell_size=10)
+
+        positions = list(grid.placements(10, 10, spacing=10))
+
+        # Each planting reserves a 3 x 3 block around its cell; blocks at the
+        # edges are clipped, so a bed of 10 x 10 cells fits 4 x 4
+        assert positions[:3] == [(0, 0), (0, 30), (0, 60)]
+        assert len(positions) == 4 * 4
+
+    def test_skips_occupied_cells(self):
+        grid = OccupancyGrid(length=40, width=40, cell_size=10)
+        grid.occupy(grid.block(0, 0, 40, 20))
+
+        assert list(grid.placements(20, 20)) == [(0, 20), (20, 20)]
+
+    def test_matches_block_and_is_free(self):
+        """Every greedy position is free by the rules placements are checked with"""
+        grid = OccupancyGrid(length=230, width=170, cell_size=10)
+        grid.occupy(grid.block(50, 30, 40, 25, spacing=15))
+        simulated = OccupancyGrid(230, 170, 10, list(grid.occupied))
+
+        for x, y in grid.placements(25, 15, spacing=5):
+            block = simulated.block(x, y, 25, 15, spacing=5)
+            assert simulated.is_free(block)
+            simulated.occupy(block)
+
+        assert not list(simulated.placements(25, 15, spacing=5))
+
+    def test_nothing_fits_in_a_smaller_bed(self):
+        grid = OccupancyGrid(length=50, width=50, cell_size=10)
+
+        assert list(grid.placements(60, 10)) == []
@@ -0,0 +1,111 @@
+"""Unit tests for the prefix trie search fallback"""
+from typing import List
+
+from app.database.base.plant_family import PlantFamilyRepository
+from app.database.prefix_trie import PrefixTrie, search_tokens
+from app.models.plant_family import PlantFamily
+
+
+class ListPlantFamilyRepository(PlantFamilyRepository):
+    """Repository without native search, backed by a list"""
+
+    def __init__(self, plant_families: List[PlantFamily]):
+        self.plant_families = plant_families
+
+    async def get_all_plant_families(self):
+        return list(self.plant_families)
+
+    async def create_plant_family(self, plant_family):
+        raise NotImplementedError
+
+    async def get_plant_family_by_id(self, plant_family_id):
+        raise NotImplementedError
+
+    async def delete_plant_family(self, plant_family_id, expected_version=None):
+        raise NotImplementedError
+
+    async def import_plant_families(self, batches):
+        raise NotImplementedError
+
+    async def get_compatibility_scores(self):
+        raise NotImplementedError
+
+    async def set_compatibility_scores(self, scores):
+        raise NotImplementedError
+
+
+def family(pf_id: int, name: str, nutrition_requirements: str) -> PlantFamily:
+    return PlantFamily(
+        id=pf_id,
+        name=name,
+        nutrition_requirements=nutrition_requirements,
+        rotation_time=3,
+        version=1,
+    )
+
+
+class TestPrefixTrie:
+    """Tests for prefix lookups"""
+
+    def test_finds_ids_by_word_prefix(self):
+        """Any prefix of any word finds the item"""
+        trie = PrefixTrie.from_texts([(1, "Nightshades"), (2, "Night-blooming Cereus")])
+
+        assert trie.ids_with_prefix("night") == {1, 2}
+        assert trie.ids_with_prefix("nights") == {1}
+        assert trie.ids_with_prefix("cer") == {2}
+        assert trie.ids_with_prefix("x") == set()
+
+    def test_tokens_are_lowercase_words(self):
+        assert search_tokens("Heavy-feeder, LOTS of N") == [
+            "heavy",
+            "feeder",
+            "lots",
+            "of",
+            "n",
+        ]
+
+
+class TestSearchFallback:
+    """Tests for PlantFamilyRepository.search_plant_families"""
+
+    async def test_every_word_must_match_and_names_rank_first(self):
+        """Families match if all words prefix a word; name matches come first"""
+        repository = ListPlantFamilyRepository(
+            [
+                family(1, "Legumes", "light, fixes nitrogen"),
+                family(2, "Nightshades", "heavy"),
+                family(3, "Brassicas", "heavy, needs nitrogen"),
+            ]
+        )
+
+        assert [pf.id for pf in await repository.search_plant_families("ni", 10)] == [
+            2,
+            3,
+            1,
+        ]
+        assert [
+            pf.id for pf in await repository.search_plant_families("heavy nitro", 10)
+        ] == [3]
+        assert await repository.search_plant_families("  ", 10) == []
+
+    async def test_limit(self):
+        repository = ListPlantFamilyRepository(
+            [family(pf_id, f"Family {pf_id}", "light") for pf_id in range(5)]
+        )
+
+        assert len(await repository.search_plant_families("fam", 2)) == 2
+
+    async def test_tries_are_rebuilt_only_after_changes(self):
+        families = [family(1, "Legumes", "light"), family(2, "Nightshades", "heavy")]
+        repository = ListPlantFamilyRepository(families)
+
+        await repository.search_plant_families("leg", 10)
+        index = PlantFamilyRepository._search_index
+        await repository.search_plant_families("night", 10)
+        assert PlantFamilyRepository._search_index is index
+
+        families[0] = families[0].model_copy(update={"name": "Beans", "version": 2})
+        beans = await repository.search_plant_families("bea", 10)
+        assert [pf.id for pf in beans] == [1]
+        assert PlantFamilyRepository._search_index is not index
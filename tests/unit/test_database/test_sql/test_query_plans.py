@@ -0,0 +1,96 @@
+"""Unit tests for query plan summaries and baseline comparison"""
+from app.database.sql.query_plans import (
+    PlanSummary,
+    compare_route,
+    is_explainable,
+    summarize_plan,
+)
+
+SELECT_BEDS = "SELECT beds.id FROM beds WHERE beds.garden_id = $1::INTEGER"
+
+
+def explain_output(*scans, cost=100.0):
+    """EXPLAIN (FORMAT JSON) output of an Append over the given scans"""
+    return [
+        {
+            "Plan": {
+                "Node Type": "Append",
+                "Total Cost": cost,
+                "Plans": [dict(scan) for scan in scans],
+            }
+        }
+    ]
+
+
+INDEX_SCAN = {
+    "Node Type": "Index Scan",
+    "Relation Name": "beds_p0",
+    "Index Name": "beds_p0_pkey",
+}
+SEQ_SCAN = {"Node Type": "Seq Scan", "Relation Name": "beds_p1"}
+
+
+class TestSummarizePlan:
+    def test_shape_and_seq_scans(self):
+        summary = summarize_plan(SELECT_BEDS, explain_output(INDEX_SCAN, SEQ_SCAN))
+
+        assert summary.shape == [
+            "Append",
+            "  Index Scan on beds_p0 using beds_p0_pkey",
+            "  Seq Scan on beds_p1",
+        ]
+        assert summary.seq_scans == ["beds_p1"]
+        assert summary.total_cost == 100.0
+
+    def test_round_trip(self):
+        summary = summarize_plan(SELECT_BEDS, explain_output(INDEX_SCAN))
+
+        assert PlanSummary.from_dict(summary.to_dict()) == summary
+
+    def test_explainable_statements(self):
+        assert is_explainable("  WITH upserted AS (...) SELECT 1")
+        assert is_explainable("update beds set length = 1")
+        assert not is_explainable("TRUNCATE plant_families_import")
+        assert not is_explainable("CREATE TEMPORARY TABLE t (x int)")
+
+
+class TestCompareRoute:
+    """Tests for flagging regressions against a baseline"""
+
+    def test_unchanged_plan_passes(self):
+        baseline = [summarize_plan(SELECT_BEDS, explain_output(INDEX_SCAN))]
+        current = [summarize_plan(SELECT_BEDS, explain_output(INDEX_SCAN, cost=120))]
+
+        assert compare_route(baseline, current) == []
+
+    def test_new_seq_scan(self):
+        baseline = [summarize_plan(SELECT_BEDS, explain_output(INDEX_SCAN))]
+        current = [summarize_plan(SELECT_BEDS, explain_output(SEQ_SCAN))]
+
+        assert compare_route(baseline, current) == [
+            f"new seq scan on beds_p1: {SELECT_BEDS}"
+        ]
+
+    def test_seq_scan_on_other_partition_is_known(self):
+        """A different partition of a table scanned before is not a regression"""
+        baseline = [summarize_plan(SELECT_BEDS, explain_output(SEQ_SCAN))]
+        other_partition = dict(SEQ_SCAN, **{"Relation Name": "beds_p2"})
+        current = [summarize_plan(SELECT_BEDS, explain_output(other_partition))]
+
+        assert compare_route(baseline, current) == []
+
+    def test_more_statements_and_higher_cost(self):
+        baseline = [summarize_plan(SELECT_BEDS, explain_output(INDEX_SCAN))]
+        current = [
+            summarize_plan(SELECT_BEDS, explain_output(INDEX_SCAN, cost=400)),
+            summarize_plan("SELECT 1", explain_output()),
+        ]
+
+        assert compare_route(baseline, current) == [
+            "2 statements, baseline 1",
+            f"estimated cost 400, baseline 100: {SELECT_BEDS}",
+            "new statement: SELECT 1",
+        ]
+
+    def test_missing_baseline(self):
+        assert compare_route(None, []) == ["no baseline recorded"]
@@ -0,0 +1,48 @@
+"""Unit tests for SQL statement spans"""
+from sqlalchemy import create_engine, text
+
+from app.database.sql.tracing import instrument_sql
+from app.services.tracing import SPAN_KIND_CLIENT, Tracer, use_span
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+class TestSqlSpans:
+    """Tests for spans of executed statements"""
+
+    def test_statements_get_spans_with_row_counts(self):
+        instrument_sql()
+        engine = create_engine("sqlite://")
+        exporter = RecordingExporter()
+        tracer = Tracer(exporter, 1.0, export_interval=0.01)
+
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE beds (id INTEGER)"))
+            with use_span(tracer.start_request_span("GET /beds", None)) as root:
+                connection.execute(text("INSERT INTO beds VALUES (1), (2), (3)"))
+                connection.execute(text("DELETE FROM beds WHERE id > 1"))
+        tracer.shutdown()
+
+        statements = [s for s in exporter.spans if s["kind"] == SPAN_KIND_CLIENT]
+        assert [s["name"] for s in statements] == ["INSERT", "DELETE"]
+        assert {s["parentSpanId"] for s in statements} == {root.span_id}
+        rows = [
+            a["value"]["intValue"]
+            for s in statements
+            for a in s["attributes"]
+            if a["key"] == "db.response.rows"
+        ]
+        assert rows == ["3", "2"]
+
+    def test_no_spans_outside_a_trace(self):
+        instrument_sql()
+        engine = create_engine("sqlite://")
+
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT 1")).scalar() == 1
@@ -0,0 +1,141 @@
+"""Unit tests for the admission control middleware"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.middleware.admission_control import (
+    READ,
+    WRITE,
+    AdmissionControlMiddleware,
+    AdmissionController,
+    AdmissionRejected,
+    PriorityLimiter,
+    RouteLimit,
+)
+
+
+class TestPriorityLimiter:
+    """Tests for the prioritised concurrency limiter"""
+
+    async def test_admits_up_to_max_concurrency(self):
+        """Requests are admitted immediately while slots are free"""
+        limiter = PriorityLimiter("test", RouteLimit(max_concurrency=2, max_queue=1))
+
+        await limiter.acquire(WRITE)
+        await limiter.acquire(WRITE)
+
+        assert limiter.active == 2
+        assert limiter.stats()["admitted"][WRITE] == 2
+
+    async def test_rejects_when_queue_is_full(self):
+        """A full wait queue fails fast instead of growing"""
+        limiter = PriorityLimiter("test", RouteLimit(max_concurrency=1, max_queue=1))
+        await limiter.acquire(READ)
+        waiter = asyncio.create_task(limiter.acquire(READ))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await limiter.acquire(READ)
+
+        assert limiter.stats()["rejected"][READ] == 1
+        limiter.release()
+        await waiter
+        assert limiter.active == 1
+
+    async def test_writes_are_woken_before_reads(self):
+        """Queued writes get the next free slot even if reads queued first"""
+        limiter = PriorityLimiter("test", RouteLimit(max_concurrency=1, max_queue=5))
+        await limiter.acquire(READ)
+        order = []
+
+        async def acquire(priority):
+            await limiter.acquire(priority)
+            order.append(priority)
+            limiter.release()
+
+        tasks = [asyncio.create_task(acquire(READ))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(acquire(WRITE)))
+        await asyncio.sleep(0)
+
+        limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == [WRITE, READ]
+
+    async def test_reads_cannot_use_reserved_write_slots(self):
+        """Reserved slots stay available to writes while reads saturate"""
+        limiter = PriorityLimiter(
+            "test",
+            RouteLimit(max_concurrency=2, max_queue=5, reserved_write_slots=1),
+        )
+        await limiter.acquire(READ)
+        read_waiter = asyncio.create_task(limiter.acquire(READ))
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(limiter.acquire(WRITE), timeout=1)
+
+        assert not read_waiter.done()
+        assert limiter.stats()["queue_depth"][READ] == 1
+        read_waiter.cancel()
+
+    async def test_queue_timeout_rejects(self):
+        """Waiting longer than the queue timeout is rejected"""
+        limiter = PriorityLimiter(
+            "test", RouteLimit(max_concurrency=1, max_queue=1, queue_timeout=0.01)
+        )
+        await limiter.acquire(WRITE)
+
+        with pytest.raises(AdmissionRejected):
+            await limiter.acquire(WRITE)
+
+        assert limiter.stats()["timed_out"][WRITE] == 1
+        assert limiter.queue_depth() == 0
+
+
+class TestAdmissionControlMiddleware:
+    """Tests for the ASGI middleware"""
+
+    async def test_returns_503_with_retry_after_when_overloaded(self):
+        """Requests beyond concurrency plus queue get 503 and Retry-After"""
+        release = asyncio.Event()
+        app = FastAPI()
+
+        @app.get("/garden/beds")
+        async def slow():
+            await release.wait()
+            return []
+
+        controller = AdmissionController(
+            {"/garden": RouteLimit(max_concurrency=1, max_queue=0)}, retry_after=3
+        )
+        app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            first = asyncio.create_task(client.get("/garden/beds"))
+            while controller.limiter_for("/garden/beds").active == 0:
+                await asyncio.sleep(0.001)
+
+            rejected = await client.get("/garden/beds")
+            release.set()
+            accepted = await first
+
+        assert rejected.status_code == 503
+        assert rejected.headers["retry-after"] == "3"
+        assert accepted.status_code == 200
+        assert controller.stats()["/garden"]["rejected"][READ] == 1
+
+    def test_unlimited_paths_are_not_matched(self):
+        """Paths outside the configured prefixes bypass admission control"""
+        controller = AdmissionController(
+            {"/garden": RouteLimit(max_concurrency=1, max_queue=0)}
+        )
+
+        assert controller.limiter_for("/health") is None
+        assert controller.limiter_for("/gardenx") is None
+        assert controller.limiter_for("/garden/beds/1") is not None
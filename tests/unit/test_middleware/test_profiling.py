@@ -0,0 +1,136 @@
+"""Unit tests for the request profiling middleware"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api.profile_routes import router as profile_router
+from app.dependencies import get_request_profiler
+from app.middleware.profiling import (
+    PROFILE_ID_HEADER,
+    WAITING,
+    ProfilingMiddleware,
+    RequestProfiler,
+)
+
+
+def busy_work(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def build_app(profiler: RequestProfiler) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        busy_work(0.05)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return app
+
+
+async def get(app: FastAPI, headers=None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get("/slow", headers=headers)
+
+
+async def wait_for_profiles(profiler: RequestProfiler, count: int) -> list:
+    for _ in range(100):
+        profiles = profiler.list_profiles()
+        if len(profiles) >= count:
+            return profiles
+        await asyncio.sleep(0.01)
+    return profiler.list_profiles()
+
+
+class TestProfilingMiddleware:
+    """Tests for profiling requests on demand"""
+
+    async def test_token_header_profiles_the_request(self, tmp_path):
+        """Running and waiting time both end up in the collapsed stacks"""
+        profiler = RequestProfiler(str(tmp_path), token="secret", interval=0.001)
+
+        response = await get(build_app(profiler), {"X-Profile": "secret"})
+
+        name = response.headers[PROFILE_ID_HEADER.decode()]
+        profiles = await wait_for_profiles(profiler, 1)
+        assert [(p["name"], p["method"]) for p in profiles] == [(name, "GET")]
+        stacks = {}
+        for line in profiler.read_profile(name).splitlines():
+            stack, count = line.rsplit(" ", 1)
+            stacks[tuple(stack.split(";"))] = int(count)
+        assert any(frame.startswith("busy_work ") for s in stacks for frame in s)
+        assert any(s[-1] == WAITING for s in stacks)
+
+    async def test_other_requests_are_not_profiled(self, tmp_path):
+        profiler = RequestProfiler(str(tmp_path), token="secret", interval=0.001)
+
+        response = await get(build_app(profiler), {"X-Profile": "wrong"})
+
+        assert PROFILE_ID_HEADER.decode() not in response.headers
+        assert profiler.list_profiles() == []
+
+    async def test_sample_rate(self, tmp_path):
+        profiler = RequestProfiler(str(tmp_path), sample_rate=1.0, interval=0.001)
+
+        response = await get(build_app(profiler))
+
+        assert response.status_code == 200
+        assert len(await wait_for_profiles(profiler, 1)) == 1
+
+    async def test_keeps_the_newest_profiles(self, tmp_path):
+        profiler = RequestProfiler(
+            str(tmp_path), sample_rate=1.0, interval=0.001, keep=2
+        )
+        app = build_app(profiler)
+
+        for _ in range(3):
+            await get(app)
+            for sampler in profiler.active:
+                sampler.join()
+
+        assert len(profiler.list_profiles()) == 2
+
+    def test_unknown_names_are_not_read(self, tmp_path):
+        profiler = RequestProfiler(str(tmp_path), token="secret")
+
+        assert profiler.read_profile("../../etc/passwd") is None
+        assert not RequestProfiler(str(tmp_path)).enabled
+
+
+class TestProfileRoutes:
+    """Tests for reading profiles through /profiles"""
+
+    async def list_profiles(self, profiler: RequestProfiler, headers=None):
+        app = FastAPI()
+        app.include_router(profile_router)
+        app.dependency_overrides[get_request_profiler] = lambda: profiler
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return await client.get("/profiles", headers=headers)
+
+    async def test_token_is_required(self, tmp_path):
+        profiler = RequestProfiler(str(tmp_path), token="secret")
+
+        missing = await self.list_profiles(profiler)
+        wrong = await self.list_profiles(profiler, {"X-Profile": "guess"})
+        right = await self.list_profiles(profiler, {"X-Profile": "secret"})
+
+        assert (missing.status_code, wrong.status_code) == (403, 403)
+        assert right.status_code == 200
+
+    async def test_sampling_alone_keeps_profiles_closed(self, tmp_path):
+        """Without a token there is nothing that opens the routes"""
+        profiler = RequestProfiler(str(tmp_path), sample_rate=1.0)
+
+        response = await self.list_profiles(profiler, {"X-Profile": ""})
+
+        assert response.status_code == 403
@@ -0,0 +1,90 @@
+"""Unit tests for the tracing middleware"""
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.middleware.tracing import TracingMiddleware
+from app.services.tracing import STATUS_ERROR, Tracer, traced_methods
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@traced_methods
+class ThingService:
+    async def get_thing(self, thing_id: int) -> dict:
+        if thing_id == 0:
+            raise HTTPException(status_code=500, detail="broken")
+        return {"id": thing_id}
+
+
+def build_app(tracer: Tracer) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: int):
+        return await ThingService().get_thing(thing_id)
+
+    app.add_middleware(TracingMiddleware, tracer=tracer)
+    return app
+
+
+async def get(app: FastAPI, path: str, headers=None) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+def attributes(span: dict) -> dict:
+    return {a["key"]: next(iter(a["value"].values())) for a in span["attributes"]}
+
+
+class TestTracingMiddleware:
+    """Tests for request spans"""
+
+    async def test_request_span_continues_the_incoming_trace(self):
+        exporter = RecordingExporter()
+        tracer = Tracer(exporter, 0.0, export_interval=0.01)
+
+        response = await get(
+            build_app(tracer),
+            "/things/7",
+            {"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"},
+        )
+        tracer.shutdown()
+
+        assert response.status_code == 200
+        spans = {span["name"]: span for span in exporter.spans}
+        server = spans["GET /things/{thing_id}"]
+        assert server["traceId"] == TRACE_ID
+        assert server["parentSpanId"] == "00f067aa0ba902b7"
+        assert attributes(server)["http.route"] == "/things/{thing_id}"
+        assert attributes(server)["http.response.status_code"] == "200"
+        assert spans["ThingService.get_thing"]["parentSpanId"] == server["spanId"]
+
+    async def test_server_errors_mark_the_span(self):
+        exporter = RecordingExporter()
+        tracer = Tracer(exporter, 1.0, export_interval=0.01)
+
+        response = await get(build_app(tracer), "/things/0")
+        tracer.shutdown()
+
+        assert response.status_code == 500
+        server = next(s for s in exporter.spans if s["name"].startswith("GET"))
+        assert server["status"]["code"] == STATUS_ERROR
+
+    async def test_unsampled_requests_have_no_spans(self):
+        exporter = RecordingExporter()
+        tracer = Tracer(exporter, 0.0, export_interval=0.01)
+
+        response = await get(build_app(tracer), "/things/7")
+        tracer.shutdown()
+
+        assert response.status_code == 200
+        assert exporter.spans == []
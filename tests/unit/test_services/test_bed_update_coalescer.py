@@ -0,0 +1,193 @@
+"""Unit tests for coalescing rapid bed updates"""
+import asyncio
+
+import pytest
+
+from app.database.sql.session_router import current_client_id, is_pinned_to_primary
+from app.models.bed import Bed, BedCreate
+from app.services.bed_service import BedService
+from app.services.bed_update_coalescer import BedUpdateCoalescer
+
+
+class RecordingRepository:
+    """Keeps beds in memory and records every batched update"""
+
+    def __init__(self, bed_ids, fail=False):
+        self.beds = {bed_id: BedCreate(length=100, width=100) for bed_id in bed_ids}
+        self.batches = []
+        self.single_updates = 0
+        self.fail = fail
+        self.version = 0
+
+    async def update_beds(self, updates, garden_id):
+        self.batches.append(dict(updates))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.version += 1
+        updated = []
+        for bed_id, bed in updates.items():
+            if bed_id in self.beds:
+                self.beds[bed_id] = bed
+                updated.append(
+                    Bed(
+                        id=bed_id,
+                        garden_id=garden_id,
+                        index=bed_id,
+                        length=bed.length,
+                        width=bed.width,
+                        version=self.version,
+                    )
+                )
+        return updated
+
+    async def update_bed(self, bed_id, bed, garden_id, expected_version=None):
+        self.single_updates += 1
+        return Bed(
+            id=bed_id,
+            garden_id=garden_id,
+            index=bed_id,
+            length=bed.length,
+            width=bed.width,
+            version=1,
+        )
+
+
+class BlockedRepository(RecordingRepository):
+    """Holds every batched update until unblocked"""
+
+    def __init__(self, bed_ids):
+        super().__init__(bed_ids)
+        self.unblocked = asyncio.Event()
+
+    async def update_beds(self, updates, garden_id):
+        await self.unblocked.wait()
+        return await super().update_beds(updates, garden_id)
+
+
+def size(length: float) -> BedCreate:
+    return BedCreate(length=length, width=100)
+
+
+class TestBedUpdateCoalescer:
+    """Tests for merging updates into batched writes"""
+
+    async def test_rapid_updates_of_a_bed_are_one_write(self):
+        """Every caller gets the bed as written by the last update"""
+        repository = RecordingRepository([1])
+        coalescer = BedUpdateCoalescer(window=0.01)
+
+        results = await asyncio.gather(
+            *(
+                coalescer.update_bed(repository, 1, size(length), 1)
+                for length in range(101, 121)
+            )
+        )
+
+        assert repository.batches == [{1: size(120)}]
+        assert {(bed.length, bed.version) for bed in results} == {(120, 1)}
+        assert coalescer.stats()["submitted"] == 20
+        assert coalescer.stats()["flushes"] == 1
+
+    async def test_beds_of_a_garden_share_a_write(self):
+        """Pending updates of different beds go out in one batch"""
+        repository = RecordingRepository([1, 2, 3])
+        coalescer = BedUpdateCoalescer(window=0.01)
+
+        results = await asyncio.gather(
+            coalescer.update_bed(repository, 1, size(110), 1),
+            coalescer.update_bed(repository, 2, size(120), 1),
+            coalescer.update_bed(repository, 4, size(140), 1),
+        )
+
+        assert len(repository.batches) == 1
+        assert [bed and bed.length for bed in results] == [110, 120, None]
+
+    async def test_later_batches_wait_for_earlier_ones(self):
+        """Updates arriving during a flush are written after it"""
+        repository = RecordingRepository([1])
+        coalescer = BedUpdateCoalescer(window=0.01)
+
+        first = asyncio.create_task(coalescer.update_bed(repository, 1, size(110), 1))
+        await asyncio.sleep(0.015)
+        second = await coalescer.update_bed(repository, 1, size(120), 1)
+
+        assert (await first).length == 110
+        assert second.length == 120
+        assert repository.beds[1].length == 120
+        assert len(repository.batches) == 2
+
+    async def test_errors_reach_every_caller(self):
+        repository = RecordingRepository([1, 2], fail=True)
+        coalescer = BedUpdateCoalescer(window=0.01)
+
+        results = await asyncio.gather(
+            coalescer.update_bed(repository, 1, size(110), 1),
+            coalescer.update_bed(repository, 2, size(120), 1),
+            return_exceptions=True,
+        )
+
+        assert [str(result) for result in results] == ["database unavailable"] * 2
+
+    async def test_cancelled_caller_does_not_break_the_batch(self):
+        repository = RecordingRepository([1])
+        coalescer = BedUpdateCoalescer(window=0.01)
+
+        cancelled = asyncio.create_task(
+            coalescer.update_bed(repository, 1, size(110), 1)
+        )
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        bed = await coalescer.update_bed(repository, 1, size(120), 1)
+
+        assert bed.length == 120
+        assert repository.batches == [{1: size(120)}]
+
+    async def test_cancelled_flush_releases_its_callers(self):
+        """A flush cancelled while waiting for the previous one fails its callers"""
+        repository = BlockedRepository([1])
+        coalescer = BedUpdateCoalescer(window=0.01)
+
+        first = asyncio.create_task(coalescer.update_bed(repository, 1, size(110), 1))
+        await asyncio.sleep(0.015)
+        second = asyncio.create_task(coalescer.update_bed(repository, 1, size(120), 1))
+        await asyncio.sleep(0.015)
+        coalescer._flushes[1].cancel()
+
+        with pytest.raises(RuntimeError, match="cancelled"):
+            await asyncio.wait_for(second, timeout=1)
+        repository.unblocked.set()
+        assert (await first).length == 110
+
+    async def test_every_caller_reads_its_write_from_the_primary(self):
+        repository = RecordingRepository([1])
+        coalescer = BedUpdateCoalescer(window=0.01, read_your_writes_window=5)
+
+        async def update_as(client_id: str, length: float):
+            current_client_id.set(client_id)
+            return await coalescer.update_bed(repository, 1, size(length), 1)
+
+        await asyncio.gather(update_as("first", 110), update_as("second", 120))
+
+        assert is_pinned_to_primary("first")
+        assert is_pinned_to_primary("second")
+
+
+class TestBedServiceCoalescing:
+    """Tests for when the bed service coalesces updates"""
+
+    async def test_conditional_updates_bypass_the_coalescer(self):
+        repository = RecordingRepository([1])
+        service = BedService(repository, BedUpdateCoalescer(window=0.01))
+
+        await service.update_bed(1, size(110), 1, expected_version=1)
+        await service.update_bed(1, size(120), 1)
+
+        assert repository.single_updates == 1
+        assert repository.batches == [{1: size(120)}]
+
+    async def test_missing_bed(self):
+        service = BedService(RecordingRepository([]), BedUpdateCoalescer(window=0.01))
+
+        with pytest.raises(ValueError, match="not found"):
+            await service.update_bed(1, size(110), 1)
@@ -0,0 +1,145 @@
+"""Unit tests for the change feed fan-out"""
+import asyncio
+
+from app.api.change_routes import _sse_events, websocket_changes
+from app.database.sql.notifications import PostgresListener
+from app.models.change import ChangeEvent
+from app.services.change_feed_service import ChangeFeedService, Subscription
+
+
+def make_feed(buffer_size: int = 10) -> ChangeFeedService:
+    """Change feed whose listener is never started"""
+    return ChangeFeedService(PostgresListener("postgresql://unused"), buffer_size)
+
+
+class TestSubscription:
+    """Tests for per-subscriber buffering"""
+
+    async def test_overflow_collapses_to_resync(self):
+        """A full buffer is replaced by one resync event"""
+        subscription = Subscription(garden_id=None, buffer_size=2)
+
+        for bed_id in range(5):
+            subscription.offer(ChangeEvent(entity="bed", op="update", ids=[bed_id]))
+
+        assert subscription.queue.qsize() <= 2
+        assert subscription.dropped > 0
+        events = []
+        while not subscription.queue.empty():
+            events.append(subscription.queue.get_nowait())
+        assert ChangeEvent(op="resync") in events
+
+    async def test_filters_other_gardens(self):
+        """Garden-scoped subscribers only see their garden and global events"""
+        subscription = Subscription(garden_id=1, buffer_size=10)
+
+        subscription.offer(ChangeEvent(entity="bed", op="insert", garden_id=2, ids=[1]))
+        subscription.offer(ChangeEvent(entity="bed", op="insert", garden_id=1, ids=[2]))
+        subscription.offer(ChangeEvent(entity="plant_family", op="delete", ids=[3]))
+
+        events = [subscription.queue.get_nowait() for _ in range(2)]
+        assert [event.ids for event in events] == [[2], [3]]
+        assert subscription.queue.empty()
+
+    async def test_next_event_times_out(self):
+        """Waiting on an idle subscription returns None"""
+        subscription = Subscription(garden_id=None, buffer_size=1)
+
+        assert await subscription.next_event(timeout=0.01) is None
+
+
+class TestChangeFeedService:
+    """Tests for notification parsing and fan-out"""
+
+    async def test_notification_is_fanned_out(self):
+        """One notification reaches every subscriber"""
+        feed = make_feed()
+        first = Subscription(None, 10)
+        second = Subscription(None, 10)
+        feed.subscriptions.update({first, second})
+
+        feed._on_notification('{"entity":"bed","op":"delete","garden_id":1,"ids":[4]}')
+
+        for subscription in (first, second):
+            event = subscription.queue.get_nowait()
+            assert event.op == "delete"
+            assert event.ids == [4]
+
+    async def test_malformed_notification_is_ignored(self):
+        """Payloads that are not change events are dropped"""
+        feed = make_feed()
+        subscription = Subscription(None, 10)
+        feed.subscriptions.add(subscription)
+
+        feed._on_notification("not json")
+
+        assert subscription.queue.empty()
+
+    async def test_reconnect_sends_resync(self):
+        """Subscribers are told to reload after the listener reconnects"""
+        feed = make_feed()
+        subscription = Subscription(None, 10)
+        feed.subscriptions.add(subscription)
+
+        feed._on_reconnect()
+
+        assert subscription.queue.get_nowait().op == "resync"
+
+
+class StartedListener(PostgresListener):
+    """A listener that pretends to be connected"""
+
+    async def ensure_started(self) -> None:
+        pass
+
+
+class DisconnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return True
+
+
+class TestServerSentEvents:
+    """Tests for the lifetime of SSE subscriptions"""
+
+    async def test_subscribes_only_once_streaming(self):
+        """A stream that is never iterated leaves no subscription behind"""
+        feed = ChangeFeedService(StartedListener("postgresql://unused"))
+
+        events = _sse_events(DisconnectedRequest(), feed, garden_id=1)
+        assert feed.subscriptions == set()
+
+        assert [event async for event in events] == []
+        assert feed.subscriptions == set()
+
+
+class ClosingWebSocket:
+    """A websocket whose client closes once told to"""
+
+    def __init__(self):
+        self.closed = asyncio.Event()
+
+    async def accept(self) -> None:
+        pass
+
+    async def receive(self) -> dict:
+        await self.closed.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+
+class TestWebSocket:
+    """Tests for the lifetime of WebSocket subscriptions"""
+
+    async def test_close_unsubscribes_while_idle(self):
+        """A close is noticed while waiting for events, not on the next send"""
+        feed = ChangeFeedService(StartedListener("postgresql://unused"))
+        websocket = ClosingWebSocket()
+        handler = asyncio.create_task(
+            websocket_changes(websocket, garden_id=1, all_gardens=False, feed=feed)
+        )
+        await asyncio.sleep(0)
+        assert [s.garden_id for s in feed.subscriptions] == [1]
+
+        websocket.closed.set()
+
+        await asyncio.wait_for(handler, timeout=1)
+        assert feed.subscriptions == set()
@@ -0,0 +1,98 @@
+"""Unit tests for the neighbour-aware plant family planner"""
+from array import array
+
+from app.services.companion_planner import (
+    UNASSIGNED,
+    CompatibilityMatrix,
+    chain_score,
+    initial_positions,
+    plan_companions,
+)
+
+
+def plan(matrix: CompatibilityMatrix, beds: int, **kwargs):
+    kwargs.setdefault("time_budget", 5.0)
+    result = plan_companions(
+        array("i", [UNASSIGNED] * beds).tobytes(),
+        matrix.scores.tobytes(),
+        matrix.size,
+        **kwargs,
+    )
+    positions = array("i")
+    positions.frombytes(result.positions)
+    return positions, result
+
+
+class TestCompatibilityMatrix:
+    def test_is_symmetric_and_ignores_other_families(self):
+        matrix = CompatibilityMatrix.build(
+            [10, 20, 30], [(10, 30, 4), (20, 20, -2), (10, 99, 7)]
+        )
+
+        assert matrix.scores[0 * 3 + 2] == matrix.scores[2 * 3 + 0] == 4
+        assert matrix.scores[1 * 3 + 1] == -2
+        assert sum(matrix.scores) == 6
+
+    def test_chain_score_skips_unassigned_beds(self):
+        matrix = CompatibilityMatrix.build([1, 2], [(1, 2, 3), (1, 1, -1)])
+        positions = initial_positions([[1], [7, 2], [], [1], [1, 2], [7]], {1: 0, 2: 1})
+
+        assert list(positions) == [0, 1, UNASSIGNED, 0, 0, UNASSIGNED]
+        assert chain_score(positions, matrix.scores, matrix.size) == 3 - 1
+
+
+class TestPlanCompanions:
+    """Tests for the simulated annealing search"""
+
+    def test_alternates_families_that_like_each_other(self):
+        """Neighbours of the same family are penalized, different ones rewarded"""
+        matrix = CompatibilityMatrix.build(
+            [1, 2, 3], [(1, 1, -5), (2, 2, -5), (3, 3, -5), (1, 2, 5), (2, 3, -5)]
+        )
+
+        positions, result = plan(matrix, 50, seed=1, max_iterations=50_000)
+
+        assert result.score == 49 * 5
+        assert chain_score(positions, matrix.scores, matrix.size) == result.score
+        for left, right in zip(positions, positions[1:]):
+            assert {left, right} == {0, 1}
+
+    def test_is_reproducible_with_a_seed(self):
+        pairs = [
+            (a, b, (a * 7 + b * 3) % 11 - 5) for a in range(6) for b in range(a, 6)
+        ]
+        matrix = CompatibilityMatrix.build(list(range(6)), pairs)
+
+        first = plan(matrix, 200, seed=7, max_iterations=20_000)
+        second = plan(matrix, 200, seed=7, max_iterations=20_000)
+
+        assert first[0] == second[0]
+        assert first[1].score == second[1].score
+
+    def test_never_returns_worse_than_the_start(self):
+        matrix = CompatibilityMatrix.build([1, 2], [(1, 2, -3), (1, 1, 2)])
+        start = array("i", [0] * 20)
+
+        result = plan_companions(
+            start.tobytes(), matrix.scores.tobytes(), 2, 5.0, 3, 1000
+        )
+
+        assert result.score >= chain_score(start, matrix.scores, 2) == 38
+
+    def test_respects_the_time_budget(self):
+        matrix = CompatibilityMatrix.build(
+            list(range(20)), [(a, a, -1) for a in range(20)]
+        )
+
+        positions, result = plan(matrix, 5000, time_budget=0.05, seed=1)
+
+        assert len(positions) == 5000
+        assert 0 < result.iterations < 5_000_000
+
+    def test_trivial_gardens(self):
+        matrix = CompatibilityMatrix.build([1], [(1, 1, -4)])
+
+        assert plan(matrix, 0)[1].score == 0
+        positions, result = plan(matrix, 3)
+        assert list(positions) == [0, 0, 0]
+        assert result.score == -8
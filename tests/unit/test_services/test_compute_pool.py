@@ -0,0 +1,55 @@
+"""Unit tests for the compute pool and the event loop lag monitor"""
+import asyncio
+import os
+import time
+
+from app.services.compute_pool import ComputePool
+from app.services.loop_monitor import EventLoopLagMonitor
+
+
+class TestComputePool:
+    """Tests for offloading CPU-bound work"""
+
+    async def test_small_work_runs_inline(self):
+        pool = ComputePool(max_workers=1, offload_threshold=10)
+
+        assert await pool.run(9, os.getpid) == os.getpid()
+        assert pool.stats()["inline"] == 1
+        assert pool.stats()["offloaded"] == 0
+
+    async def test_large_work_runs_in_worker_process(self):
+        pool = ComputePool(max_workers=1, offload_threshold=10)
+        try:
+            assert await pool.run(10, os.getpid) != os.getpid()
+        finally:
+            pool.shutdown()
+        assert pool.stats()["offloaded"] == 1
+
+    async def test_offload_ignores_the_threshold(self):
+        pool = ComputePool(max_workers=1, offload_threshold=10)
+        try:
+            assert await pool.offload(os.getpid) != os.getpid()
+        finally:
+            pool.shutdown()
+
+    async def test_disabled_pool_runs_inline(self):
+        pool = ComputePool(max_workers=0, offload_threshold=0)
+
+        assert not pool.offloads(1_000_000)
+        assert await pool.run(1_000_000, os.getpid) == os.getpid()
+        assert await pool.offload(os.getpid) == os.getpid()
+
+
+class TestEventLoopLagMonitor:
+    async def test_measures_blocked_loop(self):
+        """Blocking the loop shows up as lag"""
+        monitor = EventLoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["samples"] > 0
+        assert stats["max_ms"] >= 50
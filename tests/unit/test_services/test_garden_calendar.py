@@ -0,0 +1,147 @@
+"""Unit tests for the garden calendar and its cache"""
+from app.models.bed import Bed
+from app.models.plant_family import PlantFamily
+from app.services.garden_calendar import (
+    CalendarCache,
+    CalendarIndex,
+    calendar_entries,
+)
+
+
+def family(pf_id: int, start=None, end=None, growing=None) -> PlantFamily:
+    return PlantFamily(
+        id=pf_id,
+        name=f"Family {pf_id}",
+        nutrition_requirements="light",
+        rotation_time=3,
+        sowing_start_week=start,
+        sowing_end_week=end,
+        growing_weeks=growing,
+        version=1,
+    )
+
+
+def bed(bed_id: int, *plant_families: int) -> Bed:
+    return Bed(
+        id=bed_id,
+        garden_id=1,
+        index=bed_id,
+        length=100,
+        width=100,
+        plant_families=list(plant_families),
+        version=1,
+    )
+
+
+def summary(entries):
+    return [
+        (e.activity, e.bed_id, e.plant_family_id, e.start_week, e.end_week)
+        for e in entries
+    ]
+
+
+class TestCalendarEntries:
+    """Tests for building entries from beds and plant families"""
+
+    def test_sow_and_harvest(self):
+        entries = calendar_entries(
+            [bed(1, 10, 20, 30)],
+            [family(10, 10, 14, 8), family(20, 5, 6), family(30)],
+        )
+
+        assert summary(entries) == [
+            ("sow", 1, 10, 10, 14),
+            ("harvest", 1, 10, 18, 22),
+            ("sow", 1, 20, 5, 6),
+        ]
+
+    def test_windows_across_the_turn_of_the_year(self):
+        """Windows ending before they start and harvests next year wrap"""
+        entries = calendar_entries([bed(1, 10)], [family(10, 44, 2, 30)])
+
+        assert summary(entries) == [
+            ("sow", 1, 10, 44, 54),
+            ("harvest", 1, 10, 22, 32),
+        ]
+
+
+class TestCalendarIndex:
+    """Tests for finding the entries of a range of weeks"""
+
+    def index(self) -> CalendarIndex:
+        beds = [bed(1, 10), bed(2, 20), bed(3, 30)]
+        families = [family(10, 10, 14, 8), family(20, 30, 31), family(30, 50, 3)]
+        return CalendarIndex(7, calendar_entries(beds, families))
+
+    def test_single_week(self):
+        assert summary(self.index().between(12, 12)) == [("sow", 1, 10, 10, 14)]
+        assert summary(self.index().between(22, 22)) == [("harvest", 1, 10, 18, 22)]
+        assert self.index().between(40, 40) == []
+
+    def test_range_is_ordered_by_first_week(self):
+        entries = self.index().between(14, 30)
+
+        assert summary(entries) == [
+            ("sow", 1, 10, 10, 14),
+            ("harvest", 1, 10, 18, 22),
+            ("sow", 2, 20, 30, 31),
+        ]
+
+    def test_entries_spanning_the_turn_of_the_year(self):
+        """An entry into next year is found in January and reported in 1..52"""
+        assert summary(self.index().between(2, 2)) == [("sow", 3, 30, 50, 3)]
+        assert summary(self.index().between(51, 1)) == [("sow", 3, 30, 50, 3)]
+
+    def test_matches_a_scan(self):
+        """Bisection finds exactly the entries a week-by-week scan finds"""
+        families = [
+            family(pf_id, 1 + pf_id * 7 % 52, 1 + pf_id * 11 % 52, 1 + pf_id % 40)
+            for pf_id in range(1, 60)
+        ]
+        beds = [bed(pf_id, pf_id) for pf_id in range(1, 60)]
+        index = CalendarIndex(1, calendar_entries(beds, families))
+
+        def weeks(first, last):
+            if last < first:
+                last += 52
+            return {(week - 1) % 52 + 1 for week in range(first, last + 1)}
+
+        for first, last in [(1, 1), (5, 20), (40, 10), (52, 52), (1, 52)]:
+            expected = [
+                entry
+                for entry in index.between(1, 52)
+                if weeks(entry.start_week, entry.end_week) & weeks(first, last)
+            ]
+            assert summary(index.between(first, last)) == summary(expected)
+
+
+class TestCalendarCache:
+    """Tests for the per-version cache"""
+
+    def test_serves_only_the_cached_version(self):
+        cache = CalendarCache()
+        index = CalendarIndex(5, [])
+        cache.put(1, index)
+
+        assert cache.get(1, 5) is index
+        assert cache.get(1, 6) is None
+        assert cache.get(2, 5) is None
+        assert cache.stats() == {"gardens": 1, "hits": 1, "misses": 2}
+
+    def test_keeps_newer_version(self):
+        cache = CalendarCache()
+        newer = CalendarIndex(6, [])
+        cache.put(1, newer)
+        cache.put(1, CalendarIndex(5, []))
+
+        assert cache.get(1, 6) is newer
+
+    def test_evicts_least_recently_used(self):
+        cache = CalendarCache(max_gardens=2)
+        cache.put(1, CalendarIndex(1, []))
+        cache.put(2, CalendarIndex(1, []))
+        cache.get(1, 1)
+        cache.put(3, CalendarIndex(1, []))
+
+        assert cache.get(2, 1) is None
+        assert cache.get(1, 1) is not None
@@ -0,0 +1,209 @@
+"""Unit tests for the background job runner"""
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.database.base.job import JobRepository
+from app.models.job import UNFINISHED_JOB_STATUSES, Job
+from app.services.job_runner import JobContext, JobRunner
+
+
+class MemoryJobRepository(JobRepository):
+    """Job repository keeping records in a dict, shared by several runners"""
+
+    def __init__(self):
+        self.jobs: Dict[int, dict] = {}
+
+    def _job(self, record: dict) -> Job:
+        return Job(
+            **{k: v for k, v in record.items() if k in Job.model_fields},
+        )
+
+    async def create_job(self, kind, params, owner, garden_id=None):
+        job_id = len(self.jobs) + 1
+        self.jobs[job_id] = {
+            "id": job_id,
+            "kind": kind,
+            "garden_id": garden_id,
+            "status": "queued",
+            "params": params,
+            "owner": owner,
+            "alive": True,
+            "cancel_requested": False,
+            "created_at": datetime.now(timezone.utc),
+        }
+        return self._job(self.jobs[job_id])
+
+    async def get_job(self, job_id):
+        record = self.jobs.get(job_id)
+        return self._job(record) if record else None
+
+    async def get_job_params(self, job_id):
+        return self.jobs[job_id]["params"]
+
+    async def start_job(self, job_id, owner):
+        record = self.jobs[job_id]
+        if record["status"] not in UNFINISHED_JOB_STATUSES or record["cancel_requested"]:
+            return False
+        record.update(status="running", owner=owner)
+        return True
+
+    async def update_progress(self, job_id, done, total):
+        self.jobs[job_id].update(progress_done=done, progress_total=total)
+        return self.jobs[job_id]["cancel_requested"]
+
+    async def finish_job(self, job_id, status, result=None, error=None):
+        record = self.jobs[job_id]
+        if record["status"] in UNFINISHED_JOB_STATUSES:
+            record.update(status=status, result=result, error=error)
+
+    async def request_cancel(self, job_id):
+        record = self.jobs.get(job_id)
+        if record is None or record["status"] not in UNFINISHED_JOB_STATUSES:
+            return None
+        record["cancel_requested"] = True
+        if record["status"] == "queued":
+            record["status"] = "cancelled"
+        return self._job(record)
+
+    async def heartbeat(self, owner, job_ids):
+        return [
+            job_id
+            for job_id in job_ids
+            if self.jobs[job_id]["owner"] == owner and self.jobs[job_id]["cancel_requested"]
+        ]
+
+    async def claim_stale_jobs(self, owner, stale_after):
+        claimed = []
+        for record in self.jobs.values():
+            if record["status"] in UNFINISHED_JOB_STATUSES and not record["alive"]:
+                record.update(owner=owner, alive=True)
+                claimed.append(self._job(record))
+        return claimed
+
+    async def release_jobs(self, owner):
+        for record in self.jobs.values():
+            if record["owner"] == owner and record["status"] in UNFINISHED_JOB_STATUSES:
+                record["alive"] = False
+
+
+async def wait_for_status(repository: MemoryJobRepository, job_id: int, status: str):
+    for _ in range(200):
+        if repository.jobs[job_id]["status"] == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} is {repository.jobs[job_id]['status']}")
+
+
+def make_runner(repository: MemoryJobRepository, **kwargs) -> JobRunner:
+    return JobRunner(repository, heartbeat_interval=3600, progress_interval=0, **kwargs)
+
+
+class TestJobRunner:
+    """Tests for running, bounding and cancelling jobs"""
+
+    async def test_records_result(self):
+        """A finished job stores its handler's result"""
+        repository = MemoryJobRepository()
+        runner = make_runner(repository)
+
+        async def double(job: JobContext) -> Dict[str, Any]:
+            await job.report_progress(1, 1)
+            return {"value": job.params["value"] * 2}
+
+        runner.register("double", double)
+        job = await runner.submit("double", {"value": 21}, garden_id=3)
+
+        await wait_for_status(repository, job.id, "succeeded")
+        assert repository.jobs[job.id]["result"] == {"value": 42}
+        assert job.garden_id == 3
+        await runner.stop()
+
+    async def test_failure_is_recorded(self):
+        repository = MemoryJobRepository()
+        runner = make_runner(repository)
+
+        async def broken(job: JobContext) -> Optional[Dict[str, Any]]:
+            raise RuntimeError("boom")
+
+        runner.register("broken", broken)
+        job = await runner.submit("broken", {})
+
+        await wait_for_status(repository, job.id, "failed")
+        assert repository.jobs[job.id]["error"] == "boom"
+        await runner.stop()
+
+    async def test_concurrency_is_bounded(self):
+        """No more than max_concurrency jobs run at the same time"""
+        repository = MemoryJobRepository()
+        runner = make_runner(repository, max_concurrency=2)
+        running: List[int] = []
+        peak = 0
+
+        async def work(job: JobContext) -> None:
+            nonlocal peak
+            running.append(job.job.id)
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.02)
+            running.remove(job.job.id)
+
+        runner.register("work", work)
+        jobs = [await runner.submit("work", {}) for _ in range(5)]
+
+        for job in jobs:
+            await wait_for_status(repository, job.id, "succeeded")
+        assert peak == 2
+        await runner.stop()
+
+    async def test_cancel_running_job(self):
+        """Cancelling a running job interrupts it and records the cancellation"""
+        repository = MemoryJobRepository()
+        runner = make_runner(repository)
+        started = asyncio.Event()
+
+        async def forever(job: JobContext) -> None:
+            started.set()
+            await asyncio.sleep(3600)
+
+        runner.register("forever", forever)
+        job = await runner.submit("forever", {})
+        await started.wait()
+
+        assert (await runner.cancel(job.id)).cancel_requested
+        await wait_for_status(repository, job.id, "cancelled")
+        assert await runner.cancel(job.id) is None
+        await runner.stop()
+
+    async def test_interrupted_jobs_resume_on_another_runner(self):
+        """Jobs of a stopped runner stay unfinished and the next runner resumes them"""
+        repository = MemoryJobRepository()
+        first = make_runner(repository)
+        started = asyncio.Event()
+        interrupted = []
+
+        async def slow(job: JobContext) -> None:
+            started.set()
+            try:
+                await asyncio.sleep(3600)
+            finally:
+                interrupted.append(job.interrupted)
+
+        first.register("slow", slow)
+        job = await first.submit("slow", {})
+        await started.wait()
+        await first.stop()
+
+        assert repository.jobs[job.id]["status"] == "running"
+        assert interrupted == [True]
+
+        second = make_runner(repository)
+
+        async def quick(job: JobContext) -> Dict[str, Any]:
+            return {"resumed": True}
+
+        second.register("slow", quick)
+        await second.start()
+
+        await wait_for_status(repository, job.id, "succeeded")
+        assert repository.jobs[job.id]["owner"] == second.worker_id
+        await second.stop()
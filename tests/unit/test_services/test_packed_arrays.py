@@ -0,0 +1,66 @@
+"""Unit tests for packed bed and plant family arrays"""
+import json
+
+from app.models.bed import Bed
+from app.models.plant_family import PlantFamily
+from app.services.packed_arrays import (
+    beds_to_json,
+    pack_beds,
+    pack_plant_families,
+    unpack_beds,
+    unpack_plant_families,
+)
+
+BEDS = [
+    Bed(
+        id=7, garden_id=1, index=1, length=200, width=100,
+        plant_families=[3, 4], version=41,
+    ),
+    Bed(id=8, garden_id=1, index=2, length=150, width=80, version=2**40),
+    Bed(
+        id=12, garden_id=1, index=3, length=90, width=90,
+        plant_families=[5], version=43,
+    ),
+]
+
+
+class TestPackedBeds:
+    """Tests for the columnar bed encoding"""
+
+    def test_round_trip(self):
+        beds = unpack_beds(pack_beds(BEDS))
+
+        assert len(beds) == 3
+        assert beds.ids.tolist() == [7, 8, 12]
+        assert beds.lengths.tolist() == [200, 150, 90]
+        assert beds.versions.tolist() == [41, 2**40, 43]
+        assert [beds.plant_families(i).tolist() for i in range(3)] == [[3, 4], [], [5]]
+
+    def test_empty(self):
+        assert len(unpack_beds(pack_beds([]))) == 0
+        assert beds_to_json(pack_beds([])) == b"[]"
+
+    def test_json_matches_models(self):
+        """The rendered body equals the serialization of the Bed models"""
+        assert json.loads(beds_to_json(pack_beds(BEDS))) == [
+            bed.model_dump() for bed in BEDS
+        ]
+
+
+class TestPackedPlantFamilies:
+    def test_round_trip(self):
+        families = [
+            PlantFamily(
+                id=3, name="Legumes", nutrition_requirements="low",
+                rotation_time=3, version=1,
+            ),
+            PlantFamily(
+                id=9, name="Brassicas", nutrition_requirements="high",
+                rotation_time=4, version=2,
+            ),
+        ]
+
+        packed = unpack_plant_families(pack_plant_families(families))
+
+        assert packed.ids.tolist() == [3, 9]
+        assert packed.rotation_times.tolist() == [3, 4]
@@ -0,0 +1,133 @@
+"""Unit tests for parsing plant family uploads"""
+import pytest
+
+from app.services.plant_family_import import import_format_for, read_plant_families
+
+
+async def chunked(data: bytes, size: int = 7):
+    """Feed an upload in small chunks so records span chunk boundaries"""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def read_all(data: bytes, import_format: str):
+    return [row async for row in read_plant_families(chunked(data), import_format)]
+
+
+class TestCsv:
+    """Tests for CSV uploads"""
+
+    async def test_parses_records(self):
+        """Records are parsed by header name regardless of column order"""
+        data = (
+            "\ufeffrotation_time,name,nutrition_requirements\r\n"
+            '3,Nightshades,"heavy, feeds"\r\n'
+            "4,Legumes,light\r\n"
+        ).encode()
+
+        rows = await read_all(data, "csv")
+
+        assert [(row.line, row.plant_family.name) for row in rows] == [
+            (2, "Nightshades"),
+            (3, "Legumes"),
+        ]
+        assert rows[0].plant_family.nutrition_requirements == "heavy, feeds"
+        assert rows[1].plant_family.rotation_time == 4
+
+    async def test_quoted_field_spanning_lines(self):
+        """Quoted newlines stay in the field and keep the line numbers right"""
+        data = (
+            b"name,nutrition_requirements,rotation_time\n"
+            b'Brassicas,"heavy\nfeeder",4\n'
+            b"Legumes,light,3\n"
+        )
+
+        rows = await read_all(data, "csv")
+
+        assert rows[0].plant_family.nutrition_requirements == "heavy\nfeeder"
+        assert [row.line for row in rows] == [2, 4]
+
+    async def test_bad_rows_are_reported(self):
+        """Invalid records are reported with their line and skipped"""
+        data = (
+            b"name,nutrition_requirements,rotation_time\n"
+            b"Legumes,light,three\n"
+            b"Alliums,medium\n"
+            b"Roots,light,99999999999\n"
+            b"Brassicas,heavy,4\n"
+        )
+
+        rows = await read_all(data, "csv")
+
+        assert [(row.line, row.error is None) for row in rows] == [
+            (2, False),
+            (3, False),
+            (4, False),
+            (5, True),
+        ]
+        assert rows[0].error.startswith("rotation_time")
+        assert rows[1].error == "expected 3 columns, got 2"
+        assert rows[2].error == "rotation_time: out of range"
+
+    async def test_optional_sowing_columns(self):
+        """Sowing windows may be given, left empty or out of range"""
+        data = (
+            b"name,nutrition_requirements,rotation_time,sowing_start_week,"
+            b"sowing_end_week,growing_weeks\n"
+            b"Legumes,light,3,14,20,12\n"
+            b"Roots,light,2,,,\n"
+            b"Alliums,medium,4,60,62,10\n"
+        )
+
+        rows = await read_all(data, "csv")
+
+        legumes = rows[0].plant_family
+        assert (
+            legumes.sowing_start_week,
+            legumes.sowing_end_week,
+            legumes.growing_weeks,
+        ) == (14, 20, 12)
+        assert rows[1].plant_family.sowing_start_week is None
+        assert rows[2].error.startswith("sowing_start_week")
+
+    async def test_missing_header_column(self):
+        """A header without a required column makes the whole upload unusable"""
+        with pytest.raises(ValueError, match="rotation_time"):
+            await read_all(b"name,nutrition_requirements\nLegumes,light\n", "csv")
+
+
+class TestNdjson:
+    """Tests for NDJSON uploads"""
+
+    async def test_parses_records_and_reports_errors(self):
+        """Each line is one object; broken lines don't stop the upload"""
+        data = (
+            b'{"name": "Legumes", "nutrition_requirements": "light", '
+            b'"rotation_time": 3}\n'
+            b"\n"
+            b"{not json\n"
+            b'["Alliums"]\n'
+            b'{"name": "Alliums", "nutrition_requirements": "medium"}\n'
+            b'{"name": "Roots", "nutrition_requirements": "light", "rotation_time": 2}'
+        )
+
+        rows = await read_all(data, "ndjson")
+
+        assert [row.line for row in rows] == [1, 3, 4, 5, 6]
+        assert [row.plant_family.name for row in rows if row.error is None] == [
+            "Legumes",
+            "Roots",
+        ]
+        assert rows[1].error.startswith("invalid JSON")
+        assert rows[2].error == "expected a JSON object"
+        assert rows[3].error.startswith("rotation_time")
+
+
+class TestImportFormat:
+    """Tests for deriving the format from the Content-Type"""
+
+    def test_content_types(self):
+        assert import_format_for("text/csv; charset=utf-8") == "csv"
+        assert import_format_for("application/x-ndjson") == "ndjson"
+        assert import_format_for("application/json") is None
+        assert import_format_for(None) is None
@@ -0,0 +1,161 @@
+"""Unit tests for the invalidated per-worker read cache"""
+import asyncio
+import json
+
+from app.database.sql.notifications import (
+    INVALIDATION_CHANNEL,
+    PLANT_FAMILIES_KEY,
+    bed_list_key,
+    change_notification,
+)
+from app.database.sql.session_router import current_client_id, pin_to_primary
+from app.services.read_cache import ReadCache
+
+
+class FakeListener:
+    """Stands in for the LISTEN connection; tests deliver its notifications"""
+
+    def __init__(self, connected: bool = True):
+        self.connected = connected
+        self.reconnecting = False
+        self.starts = 0
+        self.callbacks = {}
+        self.reconnect_callbacks = []
+
+    def listening(self, channel: str) -> bool:
+        return self.connected and channel in self.callbacks
+
+    def add_callback(self, channel, callback):
+        self.callbacks.setdefault(channel, []).append(callback)
+
+    def on_reconnect(self, callback):
+        self.reconnect_callbacks.append(callback)
+
+    async def ensure_started(self):
+        self.starts += 1
+        self.connected = True
+
+    def notify(self, *keys: str) -> None:
+        for callback in self.callbacks[INVALIDATION_CHANNEL]:
+            callback(json.dumps(keys))
+
+    def reconnect(self) -> None:
+        self.connected = True
+        for callback in self.reconnect_callbacks:
+            callback()
+
+
+class Loads:
+    """Counts loads and answers them with the current value"""
+
+    def __init__(self, value="v1", delay: float = 0.0):
+        self.value = value
+        self.delay = delay
+        self.count = 0
+
+    async def __call__(self):
+        self.count += 1
+        value = self.value
+        await asyncio.sleep(self.delay)
+        return value
+
+
+class TestReadCache:
+    """Tests for storing, serving and invalidating entries"""
+
+    async def test_serves_until_invalidated(self):
+        listener = FakeListener()
+        cache = ReadCache(listener, max_age=60)
+        load = Loads()
+
+        assert await cache.get_or_load("beds:1", load) == "v1"
+        assert await cache.get_or_load("beds:1", load) == "v1"
+        load.value = "v2"
+        listener.notify("beds:2")
+        assert await cache.get_or_load("beds:1", load) == "v1"
+        listener.notify("beds:1")
+        assert await cache.get_or_load("beds:1", load) == "v2"
+
+        assert load.count == 2
+        assert cache.stats()["hits"] == 2
+
+    async def test_overtaken_loads_are_not_stored(self):
+        """A load that started before an invalidation may hold stale data"""
+        listener = FakeListener()
+        cache = ReadCache(listener, max_age=60)
+        load = Loads(delay=0.01)
+
+        first = asyncio.create_task(cache.get_or_load("beds:1", load))
+        await asyncio.sleep(0)
+        load.value = "v2"
+        listener.notify("beds:1")
+
+        assert await first == "v1"
+        assert await cache.get_or_load("beds:1", load) == "v2"
+        assert load.count == 2
+
+    async def test_reconnect_drops_everything(self):
+        """Invalidations missed while disconnected cannot leave stale entries"""
+        listener = FakeListener()
+        cache = ReadCache(listener, max_age=60)
+        load = Loads(delay=0.01)
+        await cache.get_or_load("beds:1", load)
+        in_flight = asyncio.create_task(cache.get_or_load("beds:2", load))
+        await asyncio.sleep(0)
+
+        listener.connected = False
+        load.value = "v2"
+        listener.reconnect()
+        await in_flight
+
+        assert cache.stats()["generation"] == 1
+        assert cache.stats()["entries"] == 0
+        assert await cache.get_or_load("beds:1", load) == "v2"
+
+    async def test_reads_uncached_until_listening(self):
+        listener = FakeListener(connected=False)
+        cache = ReadCache(listener, max_age=60)
+        load = Loads()
+
+        await cache.get_or_load(PLANT_FAMILIES_KEY, load)
+        await asyncio.sleep(0)
+        assert listener.starts == 1
+        await cache.get_or_load(PLANT_FAMILIES_KEY, load)
+        await cache.get_or_load(PLANT_FAMILIES_KEY, load)
+
+        assert load.count == 2
+        assert cache.stats()["bypassed"] == 1
+
+    async def test_pinned_clients_bypass_the_cache(self):
+        cache = ReadCache(FakeListener(), max_age=60)
+        load = Loads()
+        await cache.get_or_load("beds:1", load)
+        pin_to_primary("client-r", 30)
+        token = current_client_id.set("client-r")
+        try:
+            await cache.get_or_load("beds:1", load)
+        finally:
+            current_client_id.reset(token)
+
+        assert load.count == 2
+
+    async def test_entries_expire_and_are_bounded(self):
+        cache = ReadCache(FakeListener(), max_age=0.01, max_entries=2)
+        load = Loads()
+        for garden_id in range(3):
+            await cache.get_or_load(f"beds:{garden_id}", load)
+        assert cache.stats()["entries"] == 2
+
+        await asyncio.sleep(0.02)
+        await cache.get_or_load("beds:2", load)
+        assert load.count == 4
+
+    def test_changes_publish_invalidations(self):
+        """Writes name the cached lists they make stale"""
+        bed_change = change_notification("bed", "update", 7, [1]).compile()
+        family_change = change_notification("plant_family", "delete", ids=[3]).compile()
+        garden_delete = change_notification("garden", "delete", 7, [7]).compile()
+
+        assert json.dumps([bed_list_key(7)]) in bed_change.params.values()
+        assert json.dumps([PLANT_FAMILIES_KEY]) in family_change.params.values()
+        assert json.dumps([bed_list_key(7)]) in garden_delete.params.values()
@@ -0,0 +1,146 @@
+"""Unit tests for request tracing"""
+import json
+
+import pytest
+
+from app.services.tracing import (
+    STATUS_ERROR,
+    JsonlSpanExporter,
+    Tracer,
+    child_span,
+    parse_traceparent,
+    traced_methods,
+    use_span,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@traced_methods
+class Service:
+    async def outer(self):
+        return await self.inner()
+
+    async def inner(self):
+        return 42
+
+    async def fails(self):
+        raise ValueError("nope")
+
+    def sync(self):
+        return "untouched"
+
+
+class TestTraceparent:
+    """Tests for parsing W3C trace context"""
+
+    def test_valid(self):
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (
+            TRACE_ID,
+            PARENT_ID,
+            True,
+        )
+        assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00")[2] is False
+
+    @pytest.mark.parametrize(
+        "value",
+        [None, "", "garbage", f"00-{'0' * 32}-{PARENT_ID}-01", f"01-{TRACE_ID}-x-01"],
+    )
+    def test_invalid(self, value):
+        assert parse_traceparent(value) is None
+
+
+class TestSampling:
+    """Tests for deciding which requests are traced"""
+
+    def test_ratio(self):
+        assert Tracer(RecordingExporter(), 1.0).start_request_span("GET", None)
+        assert Tracer(RecordingExporter(), 0.0).start_request_span("GET", None) is None
+
+    def test_parent_decision_wins(self):
+        tracer = Tracer(RecordingExporter(), 0.0)
+
+        span = tracer.start_request_span("GET", f"00-{TRACE_ID}-{PARENT_ID}-01")
+
+        assert (span.trace_id, span.parent_span_id) == (TRACE_ID, PARENT_ID)
+        unsampled = Tracer(RecordingExporter(), 1.0).start_request_span(
+            "GET", f"00-{TRACE_ID}-{PARENT_ID}-00"
+        )
+        assert unsampled is None
+
+    def test_disabled_without_exporter(self):
+        assert Tracer(None, 1.0).start_request_span("GET", None) is None
+
+
+class TestTracedMethods:
+    """Tests for method spans"""
+
+    async def test_nested_spans(self):
+        exporter = RecordingExporter()
+        tracer = Tracer(exporter, 1.0, export_interval=0.01)
+
+        with use_span(tracer.start_request_span("GET /x", None)) as root:
+            assert await Service().outer() == 42
+        tracer.shutdown()
+
+        spans = {span["name"]: span for span in exporter.spans}
+        assert set(spans) == {"GET /x", "Service.outer", "Service.inner"}
+        assert spans["Service.outer"]["parentSpanId"] == root.span_id
+        outer_id = spans["Service.outer"]["spanId"]
+        assert spans["Service.inner"]["parentSpanId"] == outer_id
+        assert {span["traceId"] for span in exporter.spans} == {root.trace_id}
+        assert Service().sync() == "untouched"
+
+    async def test_errors_are_recorded(self):
+        exporter = RecordingExporter()
+        tracer = Tracer(exporter, 1.0, export_interval=0.01)
+
+        with use_span(tracer.start_request_span("GET /x", None)):
+            with pytest.raises(ValueError):
+                await Service().fails()
+        tracer.shutdown()
+
+        failed = next(s for s in exporter.spans if s["name"] == "Service.fails")
+        assert failed["status"] == {"code": STATUS_ERROR, "message": "nope"}
+
+    async def test_no_spans_outside_a_trace(self):
+        with child_span("orphan") as span:
+            assert span is None
+        assert await Service().outer() == 42
+
+
+class TestJsonlExport:
+    """Tests for exporting spans to a local file"""
+
+    def test_one_otlp_span_per_line(self, tmp_path):
+        path = tmp_path / "traces" / "spans.jsonl"
+        tracer = Tracer(JsonlSpanExporter(str(path)), 1.0, export_interval=0.01)
+
+        with use_span(tracer.start_request_span("GET /x", None, **{"a": 1})):
+            with child_span("child", b="text"):
+                pass
+        tracer.shutdown()
+
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [span["name"] for span in spans] == ["child", "GET /x"]
+        assert spans[1]["kind"] == 2
+        assert spans[1]["attributes"] == [{"key": "a", "value": {"intValue": "1"}}]
+        assert tracer.stats()["exported"] == 2
+
+    def test_full_queue_drops_spans(self):
+        tracer = Tracer(RecordingExporter(), 1.0, max_queue=1)
+        tracer.start = lambda: None
+
+        for _ in range(3):
+            tracer.start_request_span("GET", None).end()
+
+        assert tracer.stats()["dropped"] == 2